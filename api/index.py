@@ -7,6 +7,7 @@ import traceback
 os.environ.setdefault('VERCEL', '1')
 os.environ.setdefault('VERCEL_ENV', os.environ.get('VERCEL_ENV', 'production'))
 os.environ.setdefault('PYTHONUNBUFFERED', '1')
+os.environ.setdefault('APP_SERVERLESS', '1')  # skip read-only FS probe at import
 os.environ.setdefault('INSTANCE_PATH', '/tmp/instance')
 os.environ.setdefault('DATA_DIR', '/tmp/data')
 os.environ.setdefault('UPLOAD_DIR', '/tmp/uploads')
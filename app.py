@@ -1,5 +1,9 @@
 import os
+import time
 import shutil
+
+_STARTUP_T0 = time.perf_counter()
+
 from datetime import datetime, timedelta
 try:
     from dateutil.tz import tzlocal, gettz
@@ -15,26 +19,202 @@ except ImportError:
         tzlocal = lambda: timezone.utc
         gettz = lambda name: timezone.utc if name else timezone.utc
 
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, session, jsonify, abort
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from flask import Flask, request, redirect, url_for, flash, session, jsonify, g, current_app, has_app_context, has_request_context
 from werkzeug.exceptions import HTTPException
-from werkzeug.utils import secure_filename
+from blinker import Namespace
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Index, CheckConstraint, event, func
-from sqlalchemy.pool import NullPool
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy import Index, CheckConstraint, event, func, inspect as sa_inspect, create_engine as sa_create_engine
+from sqlalchemy.pool import NullPool, Pool
 from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session as OrmSession
 from sqlalchemy.exc import SQLAlchemyError, OperationalError, IntegrityError
-from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
+from flask_login import LoginManager, UserMixin, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from io import BytesIO
-from openpyxl import Workbook
-import uuid
+from werkzeug.utils import send_file as werkzeug_send_file
+from urllib.parse import quote as url_quote
+import re
+import hashlib
+import tempfile
+import mimetypes
+import secrets
+import importlib
+import threading
+import sqlite3
+import unicodedata
+import random
+from collections import namedtuple, deque
+from concurrent.futures import ThreadPoolExecutor
 import functools
-# Defer pandas import to avoid heavy loading at module import time
+import click
+from contextlib import contextmanager
+from views import register_blueprints
+# pandas / openpyxl / requests 는 무거우므로 사용하는 함수 안에서 import (콜드 스타트 단축)
+
+# python app.py 로 실행해도 뷰 모듈(views/*.py)의 `from app import ...` 가 이 모듈을 쓰도록
+if __name__ == '__main__':
+    sys.modules.setdefault('app', sys.modules[__name__])
+
+
+# ---------------------------------------------------------------------------
+# Startup profiling
+# 모듈 import 구간별 소요 시간과 첫 요청 초기화(ensure_initialized) 단계를 기록한다.
+# /admin/diagnostics/startup 에서 확인, 콜드 스타트 측정은 bench_cold_start.py.
+# ---------------------------------------------------------------------------
+STARTUP_PHASES = []
+_startup_last = _STARTUP_T0
+
+
+def _startup_mark(name):
+    """직전 표시 이후 경과 시간을 name 단계로 기록 (모듈 import 구간용)"""
+    global _startup_last
+    now = time.perf_counter()
+    STARTUP_PHASES.append((name, round((now - _startup_last) * 1000, 2)))
+    _startup_last = now
+
+
+@contextmanager
+def startup_phase(name):
+    """with startup_phase('name'): 블록 소요 시간을 기록 (초기화 단계용)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_PHASES.append((name, round((time.perf_counter() - started) * 1000, 2)))
+
+
+_startup_mark('imports')
 
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 DEFAULT_PASSWORD_HASH_METHOD = os.environ.get('WERKZEUG_PREFERRED_HASH', 'pbkdf2:sha256')
 
+# ---------------------------------------------------------------------------
+# Logging
+#
+# Log records are pushed onto an in-process queue by the request thread and
+# formatted/written to stderr by a single QueueListener thread, so a log call
+# never blocks a request on I/O. Loggers are per subsystem (hyundai.db,
+# hyundai.auth, ...); disabled levels are rejected by ``isEnabledFor`` before
+# any message formatting happens, so keep arguments lazy (``log.debug("%s", x)``).
+#
+#   LOG_LEVEL   root level for hyundai.* loggers (default INFO)
+#   LOG_LEVELS  per-logger overrides, e.g. "hyundai.db=DEBUG,hyundai.api=WARNING"
+#   LOG_FORMAT  "json" (default, one object per line) or "text"
+# ---------------------------------------------------------------------------
+LOG_ROOT = 'hyundai'
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line (Vercel / docker log collectors)"""
+
+    def format(self, record):
+        payload = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _StderrHandler(logging.StreamHandler):
+    """StreamHandler bound to the *current* sys.stderr (api/index.py swaps it during import)"""
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting (incl. tracebacks) to the listener thread.
+
+    The stock ``prepare`` formats the whole record in the caller so it can be
+    pickled; our queue never leaves the process, so only the message args are
+    resolved here (they may be mutated after the call returns).
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_log_listener = None
+
+
+def _parse_log_levels(spec):
+    levels = {}
+    for item in (spec or '').split(','):
+        name, sep, level = item.partition('=')
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging():
+    """Attach the queue handler to the hyundai.* logger tree and start the listener (idempotent)"""
+    global _log_listener
+    root = logging.getLogger(LOG_ROOT)
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    for name, level in _parse_log_levels(os.environ.get('LOG_LEVELS')).items():
+        try:
+            logging.getLogger(name).setLevel(level)
+        except (TypeError, ValueError):
+            pass
+    if _log_listener is not None:
+        return
+
+    if os.environ.get('LOG_FORMAT', 'json').lower() == 'text':
+        formatter = logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s')
+    else:
+        formatter = JsonLogFormatter()
+    output = _StderrHandler()
+    output.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root.handlers = [_DeferredQueueHandler(log_queue)]
+    root.propagate = False
+    _log_listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _log_listener
+    listener, _log_listener = _log_listener, None
+    if listener is not None:
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
+
+configure_logging()
+app_log = logging.getLogger(f'{LOG_ROOT}.app')
+db_log = logging.getLogger(f'{LOG_ROOT}.db')
+auth_log = logging.getLogger(f'{LOG_ROOT}.auth')
+files_log = logging.getLogger(f'{LOG_ROOT}.files')
+insurance_log = logging.getLogger(f'{LOG_ROOT}.insurance')
+partner_log = logging.getLogger(f'{LOG_ROOT}.partner')
+admin_log = logging.getLogger(f'{LOG_ROOT}.admin')
+api_log = logging.getLogger(f'{LOG_ROOT}.api')
+
 # 한국 시간대 설정
 try:
     KST = gettz('Asia/Seoul')
@@ -82,9 +262,17 @@ is_serverless = bool(
     os.environ.get('K_SERVICE')
 )
 
-# Only check filesystem if env vars didn't indicate serverless
-# This avoids potential import-time errors
-if not is_serverless:
+# APP_SERVERLESS=0/1 로 미리 지정하면 감지 생략 (api/index.py, Dockerfile 에서 설정)
+_serverless_override = os.environ.get('APP_SERVERLESS', '').strip().lower()
+if _serverless_override in ('1', 'true', 'yes', 'on', '0', 'false', 'no', 'off'):
+    is_serverless = _serverless_override in ('1', 'true', 'yes', 'on')
+    SERVERLESS_DETECTED_BY = 'APP_SERVERLESS'
+elif is_serverless:
+    SERVERLESS_DETECTED_BY = 'env'
+else:
+    # Only check filesystem if env vars didn't indicate serverless
+    # This avoids potential import-time errors
+    SERVERLESS_DETECTED_BY = 'filesystem'
     try:
         is_serverless = _is_read_only_fs()
     except Exception:
@@ -138,6 +326,324 @@ else:
     except (OSError, PermissionError):
         pass
 
+_startup_mark('environment')
+
+
+# 배포 프로필별 DB 커넥션 풀 설정
+# - serverless: 인스턴스당 동시 요청이 거의 없으므로 작은 풀 + 짧은 recycle
+#   (pgbouncer 사용 시 풀링은 pgbouncer에 맡기고 NullPool)
+# - container: 장기 실행 프로세스용 QueuePool
+# - dev: 로컬 SQLite, 기본 풀
+# DB_PROFILE 로 선택하고 DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_RECYCLE /
+# DB_POOL_TIMEOUT / DB_POOL_PRE_PING / DB_STATEMENT_TIMEOUT_MS 로 개별 값을 덮어쓴다.
+DB_POOL_PROFILES = {
+    'serverless': {
+        'poolclass': 'QueuePool',
+        'pool_size': 1,
+        'max_overflow': 2,
+        'pool_recycle': 300,
+        'pool_timeout': 10,
+        'pool_pre_ping': True,
+        'statement_timeout_ms': 15000,
+    },
+    'container': {
+        'poolclass': 'QueuePool',
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_recycle': 1800,
+        'pool_timeout': 30,
+        'pool_pre_ping': True,
+        'statement_timeout_ms': 30000,
+    },
+    'dev': {
+        'poolclass': 'QueuePool',
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_recycle': -1,
+        'pool_timeout': 30,
+        'pool_pre_ping': False,
+        'statement_timeout_ms': 0,
+    },
+}
+
+
+def _default_db_profile():
+    if is_serverless:
+        return 'serverless'
+    if os.path.exists('/.dockerenv'):
+        return 'container'
+    return 'dev'
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _resolve_db_profile():
+    profile = (os.environ.get('DB_PROFILE') or _default_db_profile()).strip().lower()
+    if profile not in DB_POOL_PROFILES:
+        db_log.warning("Unknown DB_PROFILE %r, falling back to %s", profile, _default_db_profile())
+        profile = _default_db_profile()
+    settings = dict(DB_POOL_PROFILES[profile])
+    settings['poolclass'] = os.environ.get('DB_POOL_CLASS', settings['poolclass'])
+    settings['pool_size'] = _env_int('DB_POOL_SIZE', settings['pool_size'])
+    settings['max_overflow'] = _env_int('DB_MAX_OVERFLOW', settings['max_overflow'])
+    settings['pool_recycle'] = _env_int('DB_POOL_RECYCLE', settings['pool_recycle'])
+    settings['pool_timeout'] = _env_int('DB_POOL_TIMEOUT', settings['pool_timeout'])
+    settings['pool_pre_ping'] = _env_flag('DB_POOL_PRE_PING', settings['pool_pre_ping'])
+    settings['statement_timeout_ms'] = _env_int('DB_STATEMENT_TIMEOUT_MS', settings['statement_timeout_ms'])
+    return profile, settings
+
+
+DB_PROFILE, DB_POOL_SETTINGS = _resolve_db_profile()
+# pgbouncer (transaction pooling) 호환 모드: 시작 파라미터(options)를 보내지 않고
+# statement_timeout 은 트랜잭션마다 SET LOCAL 로 적용한다.
+DB_PGBOUNCER = _env_flag('DB_PGBOUNCER')
+if DB_PGBOUNCER and DB_PROFILE == 'serverless' and 'DB_POOL_CLASS' not in os.environ:
+    DB_POOL_SETTINGS['poolclass'] = 'NullPool'
+
+
+def build_engine_options(database_uri):
+    """DB_PROFILE 설정을 SQLALCHEMY_ENGINE_OPTIONS 로 변환"""
+    settings = DB_POOL_SETTINGS
+    is_sqlite = database_uri.startswith('sqlite')
+    is_postgres = database_uri.startswith(('postgresql', 'postgres'))
+    options = {'pool_pre_ping': settings['pool_pre_ping']}
+    
+    if settings['poolclass'] == 'NullPool':
+        options['poolclass'] = NullPool
+    else:
+        options['pool_size'] = settings['pool_size']
+        options['max_overflow'] = settings['max_overflow']
+        options['pool_recycle'] = settings['pool_recycle']
+        options['pool_timeout'] = settings['pool_timeout']
+    
+    if is_sqlite:
+        options['connect_args'] = {
+            'check_same_thread': False,
+            'timeout': 20,
+        }
+    else:
+        connect_args = {'connect_timeout': 10}
+        timeout_ms = settings['statement_timeout_ms']
+        if is_postgres and timeout_ms > 0 and not DB_PGBOUNCER:
+            connect_args['options'] = f'-c statement_timeout={timeout_ms}'
+        options['connect_args'] = connect_args
+    return options
+
+
+# 커넥션 풀 지표 (진단 엔드포인트용)
+_pool_counters = {
+    'connects': 0,
+    'checkouts': 0,
+    'checkins': 0,
+    'invalidations': 0,
+}
+_pool_events_registered = False
+
+
+def _count_pool_event(name):
+    def _listener(*args):
+        _pool_counters[name] += 1
+    return _listener
+
+
+def register_pool_events():
+    """Pool 이벤트 카운터 등록 (called once)"""
+    global _pool_events_registered
+    if not _pool_events_registered:
+        try:
+            event.listen(Pool, 'connect', _count_pool_event('connects'))
+            event.listen(Pool, 'checkout', _count_pool_event('checkouts'))
+            event.listen(Pool, 'checkin', _count_pool_event('checkins'))
+            event.listen(Pool, 'invalidate', _count_pool_event('invalidations'))
+            _pool_events_registered = True
+        except Exception as e:
+            db_log.warning("Failed to register pool events: %s", e)
+
+
+def _apply_local_statement_timeout(session, transaction, connection):
+    if connection.dialect.name == 'postgresql':
+        connection.exec_driver_sql(
+            f"SET LOCAL statement_timeout = {int(DB_POOL_SETTINGS['statement_timeout_ms'])}"
+        )
+
+
+def register_pgbouncer_events():
+    """pgbouncer 모드에서 트랜잭션 단위 statement_timeout 적용 (called once)"""
+    if DB_PGBOUNCER and DB_POOL_SETTINGS['statement_timeout_ms'] > 0:
+        if not event.contains(OrmSession, 'after_begin', _apply_local_statement_timeout):
+            event.listen(OrmSession, 'after_begin', _apply_local_statement_timeout)
+
+
+def pool_metrics():
+    """현재 엔진 풀 상태 + 누적 이벤트 카운터"""
+    pool = db.engine.pool
+    metrics = {
+        'profile': DB_PROFILE,
+        'pgbouncer': DB_PGBOUNCER,
+        'dialect': db.engine.dialect.name,
+        'pool_class': type(pool).__name__,
+        'settings': dict(DB_POOL_SETTINGS),
+        'status': pool.status(),
+        'counters': dict(_pool_counters),
+    }
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        getter = getattr(pool, name, None)
+        if callable(getter):
+            metrics[name] = getter()
+    replica = _read_replica['engine']
+    if replica is not None:
+        metrics['replica'] = {
+            'dialect': replica.dialect.name,
+            'pool_class': type(replica.pool).__name__,
+            'status': replica.pool.status(),
+        }
+    return metrics
+
+
+# 읽기 전용 리포트 경로의 읽기/쓰기 엔진 분리
+# DATABASE_READ_URL 이 설정되면 @read_replica 뷰의 GET 요청에서 SELECT 는 복제본 엔진으로 보낸다.
+# 같은 요청에서 flush 가 있었거나, 사용자의 마지막 쓰기 후 DB_READ_STALE_SECONDS 이내면 primary 사용.
+# SQLite 로컬 대체: DATABASE_READ_URL=sqlite:///file:/app/data/busan.db?mode=ro&uri=true
+DATABASE_READ_URL = os.environ.get('DATABASE_READ_URL')
+DB_READ_STALE_SECONDS = int(os.environ.get('DB_READ_STALE_SECONDS', '5'))
+_read_replica = {'engine': None, 'lock': threading.Lock()}
+
+
+def get_read_engine():
+    """복제본 엔진 (DATABASE_READ_URL 미설정 시 None)"""
+    if not DATABASE_READ_URL:
+        return None
+    engine = _read_replica['engine']
+    if engine is None:
+        with _read_replica['lock']:
+            engine = _read_replica['engine']
+            if engine is None:
+                engine = sa_create_engine(DATABASE_READ_URL, **build_engine_options(DATABASE_READ_URL))
+                _read_replica['engine'] = engine
+                db_log.info("Read replica engine created (%s)", engine.dialect.name)
+    return engine
+
+
+def _replica_allowed():
+    if not DATABASE_READ_URL or not has_request_context():
+        return False
+    if not g.get('_db_read_replica') or g.get('_db_wrote'):
+        return False
+    last_write = session.get('_db_last_write')
+    if last_write and time.time() - last_write < DB_READ_STALE_SECONDS:
+        return False
+    return True
+
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """읽기 전용 뷰의 SELECT 를 복제본 엔진으로 라우팅하는 세션"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and clause is not None
+            and getattr(clause, 'is_select', False)
+            and getattr(clause, '_for_update_arg', None) is None
+            and _replica_allowed()
+        ):
+            engine = get_read_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _record_db_write(orm_session, flush_context):
+    if DATABASE_READ_URL and has_request_context():
+        g._db_wrote = True
+        session['_db_last_write'] = int(time.time())
+
+
+def register_read_replica_events():
+    """flush 발생 시 stale-read 보호용 쓰기 시각 기록 (called once)"""
+    if DATABASE_READ_URL and not event.contains(OrmSession, 'after_flush', _record_db_write):
+        event.listen(OrmSession, 'after_flush', _record_db_write)
+
+
+def read_replica(view):
+    """GET/HEAD 요청에서 SELECT 를 복제본으로 보내는 리포트 뷰 데코레이터"""
+    @functools.wraps(view)
+    def wrapped(*args, **kwargs):
+        if DATABASE_READ_URL and request.method in ('GET', 'HEAD'):
+            g._db_read_replica = True
+        return view(*args, **kwargs)
+    return wrapped
+
+
+# 템플릿 모드
+# - development: 렌더링마다 템플릿 변경 확인 (TEMPLATE_MODE=development 또는 FLASK_ENV=development / FLASK_DEBUG=1)
+# - production : 컴파일된 템플릿을 크기 제한 LRU 캐시에 유지하고, 바이트코드를 디스크에 저장해
+#                재기동/워커 교체 시 재컴파일하지 않음. 자동 재로드는 debug 실행(python app.py)에서만.
+def _template_mode():
+    mode = os.environ.get('TEMPLATE_MODE', '').strip().lower()
+    if mode in ('development', 'production'):
+        return mode
+    if _env_flag('FLASK_DEBUG') or os.environ.get('FLASK_ENV', '').lower() == 'development':
+        return 'development'
+    return 'production'
+
+
+TEMPLATE_MODE = _template_mode()
+TEMPLATE_CACHE_SIZE = _env_int('TEMPLATE_CACHE_SIZE', 200)
+TEMPLATE_BYTECODE_DIR = os.environ.get('TEMPLATE_BYTECODE_DIR', os.path.join(INSTANCE_DIR, 'jinja-cache'))
+TEMPLATE_PRECOMPILE = _env_flag('TEMPLATE_PRECOMPILE', True)
+
+
+def _template_bytecode_cache():
+    from jinja2 import FileSystemBytecodeCache
+
+    try:
+        os.makedirs(TEMPLATE_BYTECODE_DIR, exist_ok=True)
+    except OSError as e:
+        app_log.warning("Template bytecode cache disabled (%s): %s", TEMPLATE_BYTECODE_DIR, e)
+        return None
+    return FileSystemBytecodeCache(TEMPLATE_BYTECODE_DIR)
+
+
+def configure_templates(flask_app):
+    """TEMPLATE_MODE 에 따른 Jinja 설정 (jinja_env 가 만들어지기 전에 호출)"""
+    if TEMPLATE_MODE == 'development':
+        flask_app.config['TEMPLATES_AUTO_RELOAD'] = True
+        return
+    # None: Flask 가 debug 값을 따름 (python app.py 는 재로드, gunicorn 은 재로드 없음)
+    flask_app.config['TEMPLATES_AUTO_RELOAD'] = None
+    options = dict(flask_app.jinja_options, cache_size=TEMPLATE_CACHE_SIZE)
+    bytecode_cache = _template_bytecode_cache()
+    if bytecode_cache is not None:
+        options['bytecode_cache'] = bytecode_cache
+    flask_app.jinja_options = options
+
+
+def precompile_templates(flask_app=None):
+    """모든 템플릿을 미리 컴파일 (메모리 캐시 + 바이트코드 캐시). Returns (compiled_count, failed_names)."""
+    flask_app = flask_app or app
+    env = flask_app.jinja_env
+    compiled, failed = 0, []
+    for name in env.list_templates(extensions=('html',)):
+        try:
+            env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            failed.append(name)
+            app_log.warning("Template precompile failed (%s): %s", name, e)
+    return compiled, failed
 
 
 def create_app():
@@ -167,84 +673,66 @@ def create_app():
     app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)  # 24시간 세션 유지
     app.config['SESSION_COOKIE_PATH'] = '/'  # 모든 경로에서 쿠키 사용
     
-    # Disable template caching in development
-    if not is_serverless:
-        app.config['TEMPLATES_AUTO_RELOAD'] = True
-        app.jinja_env.auto_reload = True
-        app.jinja_env.cache = {}
+    configure_templates(app)
     
-    # Database configuration with Vercel support
-    if is_serverless:
-        # Check for external database first
-        database_url = os.environ.get('DATABASE_URL')
-        if database_url:
-            # External database (PostgreSQL, MySQL, etc.)
-            app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-                'poolclass': NullPool,  # Serverless-friendly
-                'pool_pre_ping': True,
-                'connect_args': {
-                    'connect_timeout': 10,
-                }
-            }
-            # PostgreSQL-specific: enable autocommit mode to avoid transaction issues
-            if 'postgresql' in database_url or 'postgres' in database_url:
-                try:
-                    # Register event listener to handle transaction errors
-                    @event.listens_for(Engine, "connect")
-                    def set_postgres_pragmas(dbapi_connection, connection_record):
-                        """PostgreSQL connection setup"""
-                        try:
-                            if hasattr(dbapi_connection, 'cursor'):
-                                cursor = dbapi_connection.cursor()
-                                # Don't set autocommit here - let SQLAlchemy manage transactions
-                                # But ensure connection is clean
-                                cursor.close()
-                        except Exception:
-                            pass
-                except Exception as e:
-                    try:
-                        import sys
-                        sys.stderr.write(f"Warning: Failed to register PostgreSQL event: {e}\n")
-                    except Exception:
-                        pass
-        else:
-            # Fallback to /tmp SQLite for Vercel
-            tmp_db_path = os.path.join(DATA_DIR, 'busan.db')
-            app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_db_path}'
-            
-            # SQLite pragma를 위한 커스텀 커넥션 팩토리
-            def get_sqlite_connect_args():
-                return {
-                    'check_same_thread': False,
-                    'timeout': 20,
-                }
-            
-            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-                'poolclass': NullPool,  # Serverless-friendly
-                'connect_args': get_sqlite_connect_args(),
-            }
-            # Log a clear warning about ephemeral storage on serverless
-            try:
-                import sys
-                sys.stderr.write(
-                    "WARNING: Using ephemeral SQLite on serverless (/tmp). "
-                    "Data will be lost on cold start. Set DATABASE_URL to a persistent DB.\n"
-                )
-                sys.stderr.write(f"DB_FILE: {tmp_db_path}\n")
-            except Exception:
-                pass
+    # Database configuration: URI는 환경별로, 엔진/풀 설정은 DB_PROFILE 기준
+    database_url = os.environ.get('DATABASE_URL')
+    if database_url:
+        # External database (PostgreSQL, MySQL, etc.)
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    elif is_serverless:
+        # Fallback to /tmp SQLite for Vercel
+        tmp_db_path = os.path.join(DATA_DIR, 'busan.db')
+        app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp_db_path}'
+        # Log a clear warning about ephemeral storage on serverless
+        db_log.warning(
+            "Using ephemeral SQLite on serverless (/tmp). "
+            "Data will be lost on cold start. Set DATABASE_URL to a persistent DB. DB_FILE: %s",
+            tmp_db_path,
+        )
     else:
-        # Local development
+        # Local development / container volume
         app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{DB_PATH}'
     
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    db_log.info(
+        "DB profile=%s pool=%s pgbouncer=%s",
+        DB_PROFILE, DB_POOL_SETTINGS['poolclass'], DB_PGBOUNCER,
+    )
+    
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # URL 규칙만 등록하고 뷰 모듈은 첫 요청 시 import (views/__init__.py)
+    register_blueprints(app)
     return app
 
 
-# SQLite foreign keys 설정 함수 (app 생성 전에 정의)
+# SQLite 연결 설정 (app 생성 전에 정의)
+# 기본은 WAL 모드: 내보내기/일괄 승인 같은 긴 쓰기 중에도 읽기가 막히지 않고,
+# busy_timeout 동안 쓰기 잠금을 기다린다. SQLITE_JOURNAL_MODE=DELETE 로 기존 방식 사용 가능.
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL').upper()
+SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', '20000'))
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_MAINTENANCE_INTERVAL = int(os.environ.get('SQLITE_MAINTENANCE_INTERVAL', '600'))
+
 _sqlite_pragma_registered = False
 
+
+def sqlite_pragmas():
+    """연결마다 실행할 PRAGMA 목록"""
+    return [
+        "PRAGMA foreign_keys=ON",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
 def register_sqlite_pragma():
     """Register SQLite pragma event listener (called once, in app context)"""
     global _sqlite_pragma_registered
@@ -253,57 +741,128 @@ def register_sqlite_pragma():
             # Register on Engine class level (doesn't require app context)
             @event.listens_for(Engine, "connect")
             def set_sqlite_pragma(dbapi_connection, connection_record):
-                """SQLite 연결 시 foreign keys 활성화"""
+                """SQLite 연결 시 foreign keys / WAL / 캐시 설정"""
+                if not isinstance(dbapi_connection, sqlite3.Connection):
+                    return
                 try:
-                    if hasattr(dbapi_connection, 'cursor'):
-                        cursor = dbapi_connection.cursor()
-                        cursor.execute("PRAGMA foreign_keys=ON")
-                        cursor.close()
+                    cursor = dbapi_connection.cursor()
+                    for pragma in sqlite_pragmas():
+                        try:
+                            cursor.execute(pragma)
+                        except sqlite3.Error as e:
+                            db_log.warning("SQLite pragma failed (%s): %s", pragma, e)
+                    cursor.close()
                 except Exception:
                     pass
             _sqlite_pragma_registered = True
         except Exception as e:
-            print(f"Warning: Failed to register SQLite pragma: {e}")
-            pass
+            db_log.warning("Failed to register SQLite pragma: %s", e)
+
+
+# 주기적 WAL 체크포인트 + PRAGMA optimize (장기 실행 프로세스 전용)
+_sqlite_maintenance = {'thread': None, 'stop': threading.Event()}
+
+
+def run_sqlite_maintenance():
+    """WAL 파일을 잘라내고 통계를 갱신; 결과 (busy, log, checkpointed) 반환"""
+    with db.engine.connect() as conn:
+        result = None
+        if SQLITE_JOURNAL_MODE == 'WAL':
+            result = tuple(conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").fetchone())
+        conn.exec_driver_sql("PRAGMA optimize")
+        return result
+
+
+def _sqlite_maintenance_loop(flask_app, stop_event):
+    while not stop_event.wait(SQLITE_MAINTENANCE_INTERVAL):
+        try:
+            with flask_app.app_context():
+                result = run_sqlite_maintenance()
+            db_log.debug("SQLite maintenance done: checkpoint=%s", result)
+        except Exception as e:
+            db_log.warning("SQLite maintenance failed: %s", e)
+
+
+def start_sqlite_maintenance(flask_app):
+    """SQLite 사용 시 유지보수 스레드 시작 (serverless 제외, idempotent)"""
+    if is_serverless or SQLITE_MAINTENANCE_INTERVAL <= 0:
+        return
+    if not flask_app.config.get('SQLALCHEMY_DATABASE_URI', '').startswith('sqlite'):
+        return
+    thread = _sqlite_maintenance['thread']
+    if thread is not None and thread.is_alive():
+        return
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=_sqlite_maintenance_loop, args=(flask_app, stop_event),
+        name='sqlite-maintenance', daemon=True,
+    )
+    _sqlite_maintenance.update(thread=thread, stop=stop_event)
+    thread.start()
+
+
+def stop_sqlite_maintenance():
+    _sqlite_maintenance['stop'].set()
+
+
+atexit.register(stop_sqlite_maintenance)
+
+
+# Transaction health tracking: a DB error inside a request marks g._db_tx_failed,
+# a rollback/commit clears it. after_request rolls back only when the flag is set,
+# instead of probing every request with SELECT 1.
+_tx_health_registered = False
+
+def _mark_tx_failed(exception_context):
+    if has_app_context():
+        g._db_tx_failed = True
+
+
+def _clear_tx_failed(session, *args):
+    if has_app_context():
+        g.pop('_db_tx_failed', None)
+
+
+def register_tx_health_events():
+    """Register engine/session listeners for transaction failure tracking (called once)"""
+    global _tx_health_registered
+    if not _tx_health_registered:
+        try:
+            event.listen(Engine, "handle_error", _mark_tx_failed)
+            event.listen(OrmSession, "after_rollback", _clear_tx_failed)
+            event.listen(OrmSession, "after_commit", _clear_tx_failed)
+            _tx_health_registered = True
+        except Exception as e:
+            db_log.warning("Failed to register transaction health events: %s", e)
 
 # Create app and extensions using standard Flask pattern
 try:
     app = create_app()
-    db = SQLAlchemy()
+    db = SQLAlchemy(session_options={'class_': RoutingSession})
     login_manager = LoginManager()
     
     # Initialize extensions with app - CRITICAL for serverless
     db.init_app(app)
     login_manager.init_app(app)
-    login_manager.login_view = 'login'
+    login_manager.login_view = 'auth.login'
     
     # Verify extensions are attached
     if not hasattr(app, 'extensions') or 'sqlalchemy' not in app.extensions:
         try:
-            import sys
-            sys.stderr.write("WARNING: SQLAlchemy not properly attached to app\n")
+            app_log.warning("SQLAlchemy not properly attached to app")
             # Force re-init
             db.init_app(app)
         except Exception as e:
-            try:
-                import sys
-                sys.stderr.write(f"WARNING: Failed to re-init db: {e}\n")
-            except Exception:
-                pass
+            app_log.warning("Failed to re-init db: %s", e)
     
     if not hasattr(app, 'login_manager'):
         try:
-            import sys
-            sys.stderr.write("WARNING: LoginManager not properly attached to app\n")
+            app_log.warning("LoginManager not properly attached to app")
             # Force re-init
             login_manager.init_app(app)
-            login_manager.login_view = 'login'
+            login_manager.login_view = 'auth.login'
         except Exception as e:
-            try:
-                import sys
-                sys.stderr.write(f"WARNING: Failed to re-init login_manager: {e}\n")
-            except Exception:
-                pass
+            app_log.warning("Failed to re-init login_manager: %s", e)
     
     # Ensure tzlocal is available in Jinja templates
     try:
@@ -312,19 +871,13 @@ try:
         pass
     # Register SQLite pragma after app is created
     register_sqlite_pragma()
-    try:
-        import sys
-        sys.stderr.write("✓ Flask app created successfully\n")
-    except Exception:
-        print("✓ Flask app created successfully")
+    register_tx_health_events()
+    register_pool_events()
+    register_pgbouncer_events()
+    register_read_replica_events()
+    app_log.info("✓ Flask app created successfully")
 except Exception as e:
-    import traceback
-    error_msg = f"CRITICAL: App creation failed: {e}\n{traceback.format_exc()}"
-    try:
-        import sys
-        sys.stderr.write(f"VERCEL_ERROR: {error_msg}\n")
-    except Exception:
-        print(error_msg)
+    app_log.critical("App creation failed: %s", e, exc_info=True)
     # Create minimal error app instead of crashing
     # But still try to create db and login_manager for Vercel compatibility
     try:
@@ -335,7 +888,7 @@ except Exception as e:
         try:
             db.init_app(app)
             login_manager.init_app(app)
-            login_manager.login_view = 'login'
+            login_manager.login_view = 'auth.login'
         except Exception:
             pass
     except Exception:
@@ -343,6 +896,8 @@ except Exception as e:
         db = None
         login_manager = None
 
+_startup_mark('create_app')
+
 # Add custom Jinja filter for datetime formatting (only if app exists)
 if app is not None:
     @app.template_filter('to_local_datetime')
@@ -388,11 +943,7 @@ def ensure_logo():
         os.makedirs(STATIC_DIR, exist_ok=True)
     except (OSError, PermissionError) as e:
         # Cannot create static directory - skip logo setup
-        try:
-            import sys
-            sys.stderr.write(f"Warning: Cannot create static directory: {e}\n")
-        except Exception:
-            pass
+        files_log.warning("Cannot create static directory: %s", e)
         return
     
     dst = os.path.join(STATIC_DIR, 'logo.png')
@@ -436,28 +987,16 @@ def ensure_logo():
                 # Vercel 환경에서는 복사 시도 (실패해도 계속)
                 try:
                     shutil.copy(src, dst)
-                    try:
-                        import sys
-                        sys.stderr.write(f"✓ Logo copied from {src} to {dst}\n")
-                    except Exception:
-                        pass
+                    files_log.info("✓ Logo copied from %s to %s", src, dst)
                     return
                 except (OSError, IOError, PermissionError) as e:
                     # Cannot write to static in serverless - this is expected
-                    try:
-                        import sys
-                        sys.stderr.write(f"Info: Cannot copy logo in serverless (expected): {e}\n")
-                    except Exception:
-                        pass
+                    files_log.info("Cannot copy logo in serverless (expected): %s", e)
                     # Continue - will serve from source path directly
                     continue
                 except Exception as e:
                     # Other errors
-                    try:
-                        import sys
-                        sys.stderr.write(f"Warning: Error copying logo: {e}\n")
-                    except Exception:
-                        pass
+                    files_log.warning("Error copying logo: %s", e)
                     continue
             else:
                 # 로컬 환경: 정상 복사
@@ -465,19 +1004,11 @@ def ensure_logo():
                     shutil.copy(src, dst)
                     return
                 except (OSError, IOError, PermissionError) as e:
-                    try:
-                        import sys
-                        sys.stderr.write(f"Warning: Could not copy logo: {e}\n")
-                    except Exception:
-                        pass
+                    files_log.warning("Could not copy logo: %s", e)
                     continue
         except Exception as e:
             # Any other error - log and continue to next path
-            try:
-                import sys
-                sys.stderr.write(f"Warning: Error processing logo path {src}: {e}\n")
-            except Exception:
-                pass
+            files_log.warning("Error processing logo path %s: %s", src, e)
             continue
     
     # 로고 파일이 없으면 빈 파일 생성 시도 (나중에 업로드 가능)
@@ -499,6 +1030,38 @@ def ensure_logo():
 # For Vercel: models are defined conditionally but Member/InsuranceApplication classes always exist
 _model_classes_defined = False
 
+_PLATE_SEPARATORS = re.compile(r'[\s\-.·_]+')
+
+
+def normalize_plate(value):
+    """차량번호 정규화: 전각/호환 자모 → 표준 한글(NFKC), 공백·하이픈 등 구분자 제거, 영문 대문자.
+
+    "12 가 3456", "12가-3456", "１２가３４５６" → "12가3456". 빈 값은 None.
+    """
+    if not value:
+        return None
+    plate = unicodedata.normalize('NFKC', str(value))
+    plate = _PLATE_SEPARATORS.sub('', plate).upper()
+    return plate or None
+
+
+def normalize_vin(value):
+    """차대번호 정규화: NFKC, 공백·하이픈 제거, 대문자. 엑셀 빈 칸('nan')은 None."""
+    vin = normalize_plate(value)
+    if vin in ('NAN', 'NONE'):
+        return None
+    return vin
+
+
+def _sync_derived_columns(mapper, connection, target):
+    """INSERT/UPDATE 시 파생 컬럼 갱신: effective_date = COALESCE(start_at, created_at), 정규화 차량번호/차대번호"""
+    if target.created_at is None:
+        target.created_at = datetime.now(KST)
+    target.effective_date = target.start_at or target.created_at
+    target.car_plate_normalized = normalize_plate(target.car_plate)
+    target.vin_normalized = normalize_vin(target.vin)
+
+
 def define_models():
     """Define SQLAlchemy models - called once when db is available"""
     global PartnerGroup, Member, InsuranceApplication, DepositHistory, DepositRequest, VirtualAccount, PremiumSetting, _model_classes_defined
@@ -528,6 +1091,8 @@ def define_models():
             logo_path = db.Column(db.String(512))  # 로고 첨부
             memo = db.Column(db.String(255))  # 비고
             created_at = db.Column(db.DateTime, default=lambda: datetime.now(KST))
+            # 수정시간: 다른 워커 프로세스가 그룹 캐시를 갱신할지 판단 (partner_group_version)
+            updated_at = db.Column(db.DateTime, default=lambda: datetime.now(KST), onupdate=lambda: datetime.now(KST))
             
             __table_args__ = (
                 Index('idx_partner_group_created_at', 'created_at'),
@@ -619,7 +1184,9 @@ def define_models():
             insured_code = db.Column(db.String(64))  # 피보험자코드 = 사업자번호
             contractor_code = db.Column(db.String(64), default='부산자동차매매사업자조합')  # 계약자코드
             car_plate = db.Column(db.String(64))  # 한글차량번호
+            car_plate_normalized = db.Column(db.String(64))  # 정규화 차량번호 (normalize_plate, 조회/중복확인용)
             vin = db.Column(db.String(64))  # 차대번호
+            vin_normalized = db.Column(db.String(64))  # 정규화 차대번호 (normalize_vin, 중복가입 확인용)
             car_name = db.Column(db.String(128))  # 차량명
             car_registered_at = db.Column(db.Date)  # 차량등록일자
             premium = db.Column(db.Integer, default=9500)  # 보험료
@@ -628,16 +1195,35 @@ def define_models():
             insurance_policy_url = db.Column(db.String(512))  # 보험증권 URL
             created_by_member_id = db.Column(db.Integer, db.ForeignKey('member.id'))
             point_deducted = db.Column(db.Boolean, default=False)  # 포인트 차감 여부
+            archived_at = db.Column(db.DateTime(timezone=True))  # 보관 처리 시간 (종료 후 ARCHIVE_AFTER_DAYS 경과)
+            effective_date = db.Column(db.DateTime(timezone=True))  # 기준일시 = COALESCE(start_at, created_at), 저장 시 갱신
 
             __table_args__ = (
-                Index('idx_ins_app_partner_group', 'partner_group_id'),
-                Index('idx_ins_app_created_by', 'created_by_member_id'),
+                # 복합 인덱스: 목록(그룹/회원 + 신청시간 정렬), 정산(그룹 + 가입시간 범위), 승인 대기
+                Index('idx_ins_app_group_created', 'partner_group_id', 'created_at'),
+                Index('idx_ins_app_member_created', 'created_by_member_id', 'created_at'),
+                Index('idx_ins_app_group_start', 'partner_group_id', 'start_at'),
+                Index('idx_ins_app_member_effective', 'created_by_member_id', 'effective_date'),
+                Index('idx_ins_app_group_effective', 'partner_group_id', 'effective_date'),
+                Index('idx_ins_app_pending', 'partner_group_id', 'id',
+                      sqlite_where=db.text('approved_at IS NULL'),
+                      postgresql_where=db.text('approved_at IS NULL')),
                 Index('idx_ins_app_vehicle_type', 'vehicle_type_id'),
                 Index('idx_ins_app_created', 'created_at'),
                 Index('idx_ins_app_approved', 'approved_at'),
                 Index('idx_ins_app_start', 'start_at'),
                 Index('idx_ins_app_car_plate', 'car_plate'),
+                Index('idx_ins_app_plate_norm', 'car_plate_normalized', 'created_at'),
+                # Postgres 접두 검색(LIKE 'x%'): 비 C 콜레이션에서도 btree 를 쓰도록 패턴 연산자 클래스
+                Index('idx_ins_app_plate_norm_prefix', 'car_plate_normalized',
+                      postgresql_ops={'car_plate_normalized': 'varchar_pattern_ops'}).ddl_if(dialect='postgresql'),
+                # 중복가입(보장기간 겹침) 확인: 차대번호 일치 + 기간 조건을 인덱스 안에서 판정
+                Index('idx_ins_app_vin_coverage', 'vin_normalized', 'start_at', 'end_at'),
                 Index('idx_ins_app_vin', 'vin'),
+                # 보관되지 않은 행만 담는 부분 인덱스 (목록 화면용)
+                Index('idx_ins_app_active_created', 'created_at',
+                      sqlite_where=db.text('archived_at IS NULL'),
+                      postgresql_where=db.text('archived_at IS NULL')),
             )
 
             # 관계 설정
@@ -653,22 +1239,23 @@ def define_models():
 
                 # 승인 후 2시간 경과 시 가입시간 기록 (이전까지는 비워둠)
                 if approved_at_local and start_at_local is None:
-                    activation_time = approved_at_local + timedelta(hours=2)
+                    activation_time = approved_at_local + ACTIVATION_DELAY
                     if now >= activation_time:
                         self.start_at = activation_time
                         start_at_local = activation_time
-                        self.end_at = activation_time + timedelta(days=30)
+                        self.end_at = activation_time + POLICY_TERM
                         end_at_local = _ensure_aware(self.end_at)
 
                 if start_at_local is not None:
                     if end_at_local is None:
-                        self.end_at = start_at_local + timedelta(days=30)
+                        self.end_at = start_at_local + POLICY_TERM
                         end_at_local = _ensure_aware(self.end_at)
 
                     if end_at_local and now >= end_at_local:
                         self.status = '종료'
                     else:
-                        if self.status != '가입':
+                        # status 는 컬럼이 아니므로 DB 에서 읽은 객체에는 아직 없을 수 있다
+                        if getattr(self, 'status', None) != '가입':
                             self.status = '가입'
                         if not self.point_deducted and self.created_by_member is not None:
                             member = self.created_by_member
@@ -693,11 +1280,7 @@ def define_models():
                                             db.session.add(adjustment)
                                         except Exception as e:
                                             # 로깅만 하고 계속 진행
-                                            try:
-                                                import sys
-                                                sys.stderr.write(f"Point adjustment logging failed: {e}\n")
-                                            except Exception:
-                                                pass
+                                            db_log.error("Point adjustment logging failed: %s", e)
                                     
                                     self.point_deducted = True
                 else:
@@ -719,6 +1302,10 @@ def define_models():
             member = db.relationship('Member', backref='deposit_histories')
             partner_group = db.relationship('PartnerGroup', backref='deposit_histories')
 
+            __table_args__ = (
+                Index('idx_deposit_history_member_date', 'member_id', 'deposit_date'),
+            )
+
         class DepositRequest(ModelBase):
             __tablename__ = 'deposit_request'
 
@@ -736,7 +1323,7 @@ def define_models():
             partner_group = db.relationship('PartnerGroup', backref='deposit_requests')
 
             __table_args__ = (
-                Index('idx_deposit_request_partner_group', 'partner_group_id'),
+                Index('idx_deposit_request_group_status', 'partner_group_id', 'status', 'created_at'),
                 Index('idx_deposit_request_member', 'member_id'),
                 Index('idx_deposit_request_status', 'status'),
             )
@@ -756,6 +1343,10 @@ def define_models():
             member = db.relationship('Member', backref='point_adjustments')
             partner_group = db.relationship('PartnerGroup', backref='point_adjustments')
 
+            __table_args__ = (
+                Index('idx_point_adjustment_member_created', 'member_id', 'created_at'),
+            )
+
         class VirtualAccount(ModelBase):
             __tablename__ = 'virtual_account'
 
@@ -772,6 +1363,26 @@ def define_models():
 
             member = db.relationship('Member', backref='virtual_accounts')
             partner_group = db.relationship('PartnerGroup', backref='virtual_accounts')
+
+            __table_args__ = (
+                Index('idx_virtual_account_member_status', 'member_id', 'status'),
+            )
+
+        class StoredDocument(ModelBase):
+            """문서 저장소 메타데이터 (내용 주소 방식: 같은 내용은 한 번만 저장)"""
+            __tablename__ = 'stored_document'
+
+            sha256 = db.Column(db.String(64), primary_key=True)  # 내용 해시 = 저장소 키
+            size = db.Column(db.BigInteger, nullable=False)  # 바이트
+            mimetype = db.Column(db.String(128), nullable=False)
+            created_at = db.Column(db.DateTime, default=lambda: datetime.now(KST))
+            # 업로드 후 백그라운드 처리 결과 (process_document)
+            processing_status = db.Column(db.String(16), default='pending')  # pending / ready / failed
+            processed_at = db.Column(db.DateTime)
+            page_count = db.Column(db.Integer)  # PDF 쪽수 (이미지는 1)
+            width = db.Column(db.Integer)  # 이미지 가로/세로 (방향 보정 후, px)
+            height = db.Column(db.Integer)
+            has_preview = db.Column(db.Boolean, default=False)  # 썸네일/미리보기 JPEG 생성 여부
         
         # Make models available globally
         globals()['PartnerGroup'] = PartnerGroup
@@ -782,13 +1393,15 @@ def define_models():
         globals()['PointAdjustment'] = PointAdjustment
         globals()['VirtualAccount'] = VirtualAccount
         globals()['PremiumSetting'] = PremiumSetting
+        globals()['StoredDocument'] = StoredDocument
+        
+        event.listen(InsuranceApplication, 'before_insert', _sync_derived_columns)
+        event.listen(InsuranceApplication, 'before_update', _sync_derived_columns)
         
         _model_classes_defined = True
-        print("✓ Models defined successfully")
+        db_log.info("✓ Models defined successfully")
     except Exception as e:
-        print(f"✗ Model definition failed: {e}")
-        import traceback
-        traceback.print_exc()
+        db_log.exception("✗ Model definition failed: %s", e)
 
 # Initialize models if db is available at module import time
 if db is not None:
@@ -846,6 +1459,12 @@ else:
         id = None
         pass
 
+    class StoredDocument:
+        sha256 = None
+        pass
+
+_startup_mark('models')
+
 
 # User loader - register conditionally
 def load_user(user_id):
@@ -859,78 +1478,185 @@ def load_user(user_id):
             except Exception:
                 pass
         if _model_classes_defined:
-            # Use get() which is more efficient and handles detached sessions better
+            # Single SELECT per request; Flask-Login caches the result on g for the rest of the request
             try:
                 user = db.session.get(Member, int(user_id))
-                # Ensure the user object is properly bound to the session
                 if user is not None:
-                    # Refresh to ensure attributes are accessible
-                    try:
-                        db.session.refresh(user)
-                    except Exception:
-                        # If refresh fails, merge to attach to current session
-                        try:
-                            db.session.merge(user)
-                        except Exception:
-                            pass
+                    _set_auth_context(user)
                 return user
             except Exception as e:
                 # Log error but don't crash
-                try:
-                    import sys
-                    sys.stderr.write(f"Error loading user {user_id}: {e}\n")
-                except Exception:
-                    pass
+                auth_log.error("Error loading user %s: %s", user_id, e)
                 return None
         return None
     except Exception:
         return None
 
+
+# Request-scoped identity (id, role, approval_status, partner_group_id).
+# Built once from the row load_user() already fetched and cached on g, so role /
+# approval checks in decorators and views cost no extra query. The same values
+# are mirrored into the signed session cookie ('auth'), which non-authoritative
+# checks (e.g. the /dashboard redirect) may use without loading the user at all.
+AuthContext = namedtuple('AuthContext', ['id', 'role', 'approval_status', 'partner_group_id'])
+
+
+def _set_auth_context(user):
+    ctx = AuthContext(int(user.id), user.role or 'member', user.approval_status, user.partner_group_id)
+    g.auth_context = ctx
+    try:
+        snapshot = list(ctx)
+        if session.get('auth') != snapshot:
+            session['auth'] = snapshot
+        if session.get('user_type') != 'partner_admin' and session.get('user_role') != ctx.role:
+            # 세션 역할은 캐시일 뿐: DB 값과 다르면 갱신 (권한 변경 즉시 반영)
+            session['user_role'] = ctx.role
+    except RuntimeError:
+        # outside a request (e.g. CLI scripts)
+        pass
+    return ctx
+
+
+def get_auth_context():
+    """Identity of the logged-in member for this request, or None (loads the user at most once)"""
+    if 'auth_context' not in g:
+        try:
+            if not current_user.is_authenticated:
+                return None
+        except Exception:
+            return None
+        if 'auth_context' not in g:
+            _set_auth_context(current_user)
+    return g.auth_context
+
+
+def session_auth_hint():
+    """Signed-session fast path: identity snapshot from the cookie, no DB access.
+
+    Only for routing decisions; access control must use get_auth_context().
+    """
+    snapshot = session.get('auth')
+    if not snapshot or len(snapshot) != len(AuthContext._fields):
+        return None
+    if str(snapshot[0]) != str(session.get('_user_id')):
+        return None
+    return AuthContext(*snapshot)
+
+
+def invalidate_auth_context(member_id):
+    """Call after changing a member's role / approval status / partner group.
+
+    The acting user's cached identity is dropped immediately; any other member's
+    snapshot is replaced from the database row on their next request.
+    """
+    ctx = g.get('auth_context')
+    if ctx is not None and ctx.id == member_id:
+        g.pop('auth_context', None)
+        session.pop('auth', None)
+    auth_log.info("Auth context invalidated for member %s", member_id)
+
 # Register user loader only if login_manager exists
 if login_manager is not None:
     login_manager.user_loader(load_user)
 
 
+# 인덱스 마이그레이션: (이름, 테이블, 컬럼, 부분 인덱스 조건)
+# 모델 __table_args__ 와 같은 정의를 유지한다. CREATE INDEX IF NOT EXISTS 라 반복 실행해도 안전.
+INDEX_MIGRATIONS = [
+    ('idx_ins_app_group_created', 'insurance_application', 'partner_group_id, created_at', None),
+    ('idx_ins_app_member_created', 'insurance_application', 'created_by_member_id, created_at', None),
+    ('idx_ins_app_group_start', 'insurance_application', 'partner_group_id, start_at', None),
+    ('idx_ins_app_pending', 'insurance_application', 'partner_group_id, id', 'approved_at IS NULL'),
+    ('idx_ins_app_member_effective', 'insurance_application', 'created_by_member_id, effective_date', None),
+    ('idx_ins_app_group_effective', 'insurance_application', 'partner_group_id, effective_date', None),
+    ('idx_ins_app_active_created', 'insurance_application', 'created_at', 'archived_at IS NULL'),
+    ('idx_ins_app_plate_norm', 'insurance_application', 'car_plate_normalized, created_at', None),
+    ('idx_ins_app_vin_coverage', 'insurance_application', 'vin_normalized, start_at, end_at', None),
+    ('idx_deposit_history_member_date', 'deposit_history', 'member_id, deposit_date', None),
+    ('idx_deposit_request_group_status', 'deposit_request', 'partner_group_id, status, created_at', None),
+    ('idx_point_adjustment_member_created', 'point_adjustment', 'member_id, created_at', None),
+    ('idx_virtual_account_member_status', 'virtual_account', 'member_id, status', None),
+]
+# PostgreSQL 전용 (연산자 클래스 등 SQLite 에 없는 문법)
+POSTGRES_INDEX_MIGRATIONS = [
+    ('idx_ins_app_plate_norm_prefix', 'insurance_application', 'car_plate_normalized varchar_pattern_ops', None),
+]
+# 복합 인덱스의 선두 컬럼과 겹쳐 더 이상 필요 없는 인덱스
+RETIRED_INDEXES = [
+    'idx_ins_app_partner_group',
+    'idx_ins_app_created_by',
+    'idx_deposit_request_partner_group',
+]
+
+
+def apply_index_migrations():
+    """INDEX_MIGRATIONS (+ PostgreSQL 이면 POSTGRES_INDEX_MIGRATIONS) 생성 + RETIRED_INDEXES 삭제"""
+    from sqlalchemy import text
+    
+    migrations = list(INDEX_MIGRATIONS)
+    if db.engine.dialect.name == 'postgresql':
+        migrations += POSTGRES_INDEX_MIGRATIONS
+    for name, table, columns, where in migrations:
+        sql = f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+        if where:
+            sql += f" WHERE {where}"
+        try:
+            db.session.execute(text(sql))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            db_log.warning("Index migration failed (%s): %s", name, e)
+    for name in RETIRED_INDEXES:
+        try:
+            db.session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            db_log.warning("Index drop failed (%s): %s", name, e)
+
+
+# 기존 stored_document 테이블에 추가된 컬럼 (create_all 은 기존 테이블을 변경하지 않음)
+STORED_DOCUMENT_COLUMNS = (
+    ('processing_status', "VARCHAR(16) DEFAULT 'pending'"),
+    ('processed_at', 'DATETIME'),
+    ('page_count', 'INTEGER'),
+    ('width', 'INTEGER'),
+    ('height', 'INTEGER'),
+    ('has_preview', 'BOOLEAN DEFAULT FALSE'),
+)
+
+
 def init_db_and_assets():
     """데이터베이스 및 리소스 초기화 (app context 내에서 호출해야 함)"""
     from flask import current_app
     
     if db is None:
-        print("Warning: db is None, skipping initialization")
+        db_log.warning("db is None, skipping initialization")
         return
     
     # Ensure models are defined before creating tables
     try:
         define_models()
     except Exception as e:
-        print(f"Warning: Model definition failed: {e}")
-        import traceback
-        traceback.print_exc()
+        db_log.warning("Model definition failed: %s", e, exc_info=True)
     
     try:
         # Vercel에서도 in-memory SQLite를 사용하므로 테이블 생성은 항상 수행
         db.create_all()
     except Exception as e:
-        print(f"Warning: Database creation failed: {e}")
-        import traceback
-        traceback.print_exc()
+        db_log.warning("Database creation failed: %s", e, exc_info=True)
         # Continue anyway - tables might already exist
     
     try:
         ensure_logo()
     except Exception as e:
         # Logo setup failure should not crash the app
-        try:
-            import sys
-            sys.stderr.write(f"Warning: Logo setup failed: {e}\n")
-            import traceback
-            sys.stderr.write(traceback.format_exc())
-        except Exception:
-            print(f"Warning: Logo setup failed: {e}")
+        db_log.warning("Logo setup failed: %s", e, exc_info=True)
         # Continue - logo is not critical for app functionality
         pass
 
     # 스키마 보정: 컬럼이 없으면 추가
+    vehicle_key_backfill_needed = False
     try:
         from sqlalchemy import text, inspect
         db_uri = current_app.config.get('SQLALCHEMY_DATABASE_URI', '')
@@ -950,9 +1676,9 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN member_type VARCHAR(32) DEFAULT '법인'"))
                         safe_commit()
-                        print("Added member_type column to member table")
+                        db_log.info("Added member_type column to member table")
                     except Exception as e:
-                        print(f"Warning: Failed to add member_type: {e}")
+                        db_log.warning("Failed to add member_type: %s", e)
             
             # Member 테이블: privacy_agreement 컬럼 추가 (SQLite)
             if 'privacy_agreement' not in cols:
@@ -960,9 +1686,9 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN privacy_agreement BOOLEAN DEFAULT 0"))
                         safe_commit()
-                        print("Added privacy_agreement column to member table")
+                        db_log.info("Added privacy_agreement column to member table")
                     except Exception as e:
-                        print(f"Warning: Failed to add privacy_agreement: {e}")
+                        db_log.warning("Failed to add privacy_agreement: %s", e)
             
             # Member 테이블: memo 컬럼 추가 (SQLite)
             if 'memo' not in cols:
@@ -970,9 +1696,9 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN memo VARCHAR(255)"))
                         safe_commit()
-                        print("Added memo column to member table")
+                        db_log.info("Added memo column to member table")
                     except Exception as e:
-                        print(f"Warning: Failed to add memo: {e}")
+                        db_log.warning("Failed to add memo: %s", e)
 
             # Member 테이블: point_balance 컬럼 추가 (SQLite)
             if 'point_balance' not in cols:
@@ -980,9 +1706,9 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN point_balance INTEGER DEFAULT 0"))
                         safe_commit()
-                        print("Added point_balance column to member table")
+                        db_log.info("Added point_balance column to member table")
                     except Exception as e:
-                        print(f"Warning: Failed to add point_balance: {e}")
+                        db_log.warning("Failed to add point_balance: %s", e)
 
             # Member 테이블: settlement_method 컬럼 추가 (SQLite)
             if 'settlement_method' not in cols:
@@ -990,9 +1716,9 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN settlement_method VARCHAR(16) DEFAULT '포인트'"))
                         safe_commit()
-                        print("Added settlement_method column to member table")
+                        db_log.info("Added settlement_method column to member table")
                     except Exception as e:
-                        print(f"Warning: Failed to add settlement_method: {e}")
+                        db_log.warning("Failed to add settlement_method: %s", e)
             
             # InsuranceApplication 테이블: 보험증권 필드 추가 (SQLite)
             res = db.session.execute(text("PRAGMA table_info(insurance_application)"))
@@ -1003,41 +1729,105 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN insurance_policy_path TEXT"))
                         safe_commit()
-                        print("Added insurance_policy_path column to insurance_application table")
+                        db_log.info("Added insurance_policy_path column to insurance_application table")
                     except Exception as e:
-                        print(f"Warning: Failed to add insurance_policy_path: {e}")
+                        db_log.warning("Failed to add insurance_policy_path: %s", e)
             
             if 'insurance_policy_url' not in cols:
                 if not is_serverless:
                     try:
                         db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN insurance_policy_url TEXT"))
                         safe_commit()
-                        print("Added insurance_policy_url column to insurance_application table")
+                        db_log.info("Added insurance_policy_url column to insurance_application table")
                     except Exception as e:
-                        print(f"Warning: Failed to add insurance_policy_url: {e}")
+                        db_log.warning("Failed to add insurance_policy_url: %s", e)
 
             if 'point_deducted' not in cols:
                 if not is_serverless:
                     try:
                         db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN point_deducted BOOLEAN DEFAULT 0"))
                         safe_commit()
-                        print("Added point_deducted column to insurance_application table")
+                        db_log.info("Added point_deducted column to insurance_application table")
                     except Exception as e:
-                        print(f"Warning: Failed to add point_deducted: {e}")
-        elif 'postgresql' in db_uri or 'postgres' in db_uri:
-            # PostgreSQL: 컬럼 존재 여부 확인 후 추가
-            inspector = inspect(db.engine)
-            
-            # Member 테이블: role 컬럼 추가 (PostgreSQL)
-            member_cols = [col['name'] for col in inspector.get_columns('member')]
-            if 'role' not in member_cols:
+                        db_log.warning("Failed to add point_deducted: %s", e)
+
+            if 'archived_at' not in cols:
+                if not is_serverless:
+                    try:
+                        db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN archived_at DATETIME"))
+                        safe_commit()
+                        db_log.info("Added archived_at column to insurance_application table")
+                    except Exception as e:
+                        db_log.warning("Failed to add archived_at: %s", e)
+
+            if 'effective_date' not in cols:
+                if not is_serverless:
+                    try:
+                        db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN effective_date DATETIME"))
+                        db.session.execute(text(
+                            "UPDATE insurance_application SET effective_date = COALESCE(start_at, created_at)"
+                        ))
+                        safe_commit()
+                        db_log.info("Added effective_date column to insurance_application table")
+                    except Exception as e:
+                        db_log.warning("Failed to add effective_date: %s", e)
+
+            if 'car_plate_normalized' not in cols:
+                if not is_serverless:
+                    try:
+                        db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN car_plate_normalized VARCHAR(64)"))
+                        safe_commit()
+                        vehicle_key_backfill_needed = True
+                        db_log.info("Added car_plate_normalized column to insurance_application table")
+                    except Exception as e:
+                        db_log.warning("Failed to add car_plate_normalized: %s", e)
+
+            if 'vin_normalized' not in cols:
+                if not is_serverless:
+                    try:
+                        db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN vin_normalized VARCHAR(64)"))
+                        safe_commit()
+                        vehicle_key_backfill_needed = True
+                        db_log.info("Added vin_normalized column to insurance_application table")
+                    except Exception as e:
+                        db_log.warning("Failed to add vin_normalized: %s", e)
+
+            # partner_group 테이블: updated_at 컬럼 추가 (SQLite)
+            res = db.session.execute(text("PRAGMA table_info(partner_group)"))
+            cols = [r[1] for r in res.fetchall()]
+            if cols and 'updated_at' not in cols and not is_serverless:
+                try:
+                    db.session.execute(text("ALTER TABLE partner_group ADD COLUMN updated_at DATETIME"))
+                    safe_commit()
+                    db_log.info("Added updated_at column to partner_group table")
+                except Exception as e:
+                    db_log.warning("Failed to add partner_group.updated_at: %s", e)
+
+            # stored_document 테이블: 문서 처리 결과 컬럼 추가 (SQLite)
+            res = db.session.execute(text("PRAGMA table_info(stored_document)"))
+            cols = [r[1] for r in res.fetchall()]
+            for column, ddl in STORED_DOCUMENT_COLUMNS:
+                if cols and column not in cols and not is_serverless:
+                    try:
+                        db.session.execute(text(f"ALTER TABLE stored_document ADD COLUMN {column} {ddl}"))
+                        safe_commit()
+                        db_log.info("Added %s column to stored_document table", column)
+                    except Exception as e:
+                        db_log.warning("Failed to add %s: %s", column, e)
+        elif 'postgresql' in db_uri or 'postgres' in db_uri:
+            # PostgreSQL: 컬럼 존재 여부 확인 후 추가
+            inspector = inspect(db.engine)
+            
+            # Member 테이블: role 컬럼 추가 (PostgreSQL)
+            member_cols = [col['name'] for col in inspector.get_columns('member')]
+            if 'role' not in member_cols:
                 if not is_serverless:
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN role VARCHAR(32) NOT NULL DEFAULT 'member'"))
                         safe_commit()
-                        print("Added role column to member table (PostgreSQL)")
+                        db_log.info("Added role column to member table (PostgreSQL)")
                     except Exception as e:
-                        print(f"Warning: Failed to add role to member: {e}")
+                        db_log.warning("Failed to add role to member: %s", e)
             
             # Member 테이블: member_type 컬럼 추가 (PostgreSQL)
             if 'member_type' not in member_cols:
@@ -1045,9 +1835,9 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN member_type VARCHAR(32) DEFAULT '법인'"))
                         safe_commit()
-                        print("Added member_type column to member table (PostgreSQL)")
+                        db_log.info("Added member_type column to member table (PostgreSQL)")
                     except Exception as e:
-                        print(f"Warning: Failed to add member_type: {e}")
+                        db_log.warning("Failed to add member_type: %s", e)
             
             # Member 테이블: privacy_agreement 컬럼 추가 (PostgreSQL)
             if 'privacy_agreement' not in member_cols:
@@ -1055,9 +1845,9 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN privacy_agreement BOOLEAN DEFAULT FALSE"))
                         safe_commit()
-                        print("Added privacy_agreement column to member table (PostgreSQL)")
+                        db_log.info("Added privacy_agreement column to member table (PostgreSQL)")
                     except Exception as e:
-                        print(f"Warning: Failed to add privacy_agreement: {e}")
+                        db_log.warning("Failed to add privacy_agreement: %s", e)
             
             # Member 테이블: memo 컬럼 추가 (PostgreSQL)
             if 'memo' not in member_cols:
@@ -1065,9 +1855,9 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN memo VARCHAR(255)"))
                         safe_commit()
-                        print("Added memo column to member table (PostgreSQL)")
+                        db_log.info("Added memo column to member table (PostgreSQL)")
                     except Exception as e:
-                        print(f"Warning: Failed to add memo: {e}")
+                        db_log.warning("Failed to add memo: %s", e)
 
             # Member 테이블: settlement_method 컬럼 추가 (PostgreSQL)
             if 'settlement_method' not in member_cols:
@@ -1075,9 +1865,9 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN settlement_method VARCHAR(16) DEFAULT '포인트'"))
                         safe_commit()
-                        print("Added settlement_method column to member table (PostgreSQL)")
+                        db_log.info("Added settlement_method column to member table (PostgreSQL)")
                     except Exception as e:
-                        print(f"Warning: Failed to add settlement_method: {e}")
+                        db_log.warning("Failed to add settlement_method: %s", e)
 
             # Member 테이블: point_balance 컬럼 추가 (PostgreSQL)
             if 'point_balance' not in member_cols:
@@ -1085,9 +1875,9 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE member ADD COLUMN point_balance INTEGER DEFAULT 0"))
                         safe_commit()
-                        print("Added point_balance column to member table (PostgreSQL)")
+                        db_log.info("Added point_balance column to member table (PostgreSQL)")
                     except Exception as e:
-                        print(f"Warning: Failed to add point_balance: {e}")
+                        db_log.warning("Failed to add point_balance: %s", e)
             
             # InsuranceApplication 테이블: 보험증권 필드 추가 (PostgreSQL)
             ins_app_cols = [col['name'] for col in inspector.get_columns('insurance_application')]
@@ -1097,32 +1887,100 @@ def init_db_and_assets():
                     try:
                         db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN insurance_policy_path VARCHAR(512)"))
                         safe_commit()
-                        print("Added insurance_policy_path column to insurance_application table (PostgreSQL)")
+                        db_log.info("Added insurance_policy_path column to insurance_application table (PostgreSQL)")
                     except Exception as e:
-                        print(f"Warning: Failed to add insurance_policy_path: {e}")
+                        db_log.warning("Failed to add insurance_policy_path: %s", e)
             
             if 'insurance_policy_url' not in ins_app_cols:
                 if not is_serverless:
                     try:
                         db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN insurance_policy_url VARCHAR(512)"))
                         safe_commit()
-                        print("Added insurance_policy_url column to insurance_application table (PostgreSQL)")
+                        db_log.info("Added insurance_policy_url column to insurance_application table (PostgreSQL)")
                     except Exception as e:
-                        print(f"Warning: Failed to add insurance_policy_url: {e}")
+                        db_log.warning("Failed to add insurance_policy_url: %s", e)
 
             if 'point_deducted' not in ins_app_cols:
                 if not is_serverless:
                     try:
                         db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN point_deducted BOOLEAN DEFAULT FALSE"))
                         safe_commit()
-                        print("Added point_deducted column to insurance_application table (PostgreSQL)")
+                        db_log.info("Added point_deducted column to insurance_application table (PostgreSQL)")
+                    except Exception as e:
+                        db_log.warning("Failed to add point_deducted: %s", e)
+
+            if 'archived_at' not in ins_app_cols:
+                if not is_serverless:
+                    try:
+                        db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN archived_at TIMESTAMP WITH TIME ZONE"))
+                        safe_commit()
+                        db_log.info("Added archived_at column to insurance_application table (PostgreSQL)")
+                    except Exception as e:
+                        db_log.warning("Failed to add archived_at: %s", e)
+
+            if 'effective_date' not in ins_app_cols:
+                if not is_serverless:
+                    try:
+                        db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN effective_date TIMESTAMP WITH TIME ZONE"))
+                        db.session.execute(text(
+                            "UPDATE insurance_application SET effective_date = COALESCE(start_at, created_at)"
+                        ))
+                        safe_commit()
+                        db_log.info("Added effective_date column to insurance_application table (PostgreSQL)")
+                    except Exception as e:
+                        db_log.warning("Failed to add effective_date: %s", e)
+
+            if 'car_plate_normalized' not in ins_app_cols:
+                if not is_serverless:
+                    try:
+                        db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN car_plate_normalized VARCHAR(64)"))
+                        safe_commit()
+                        vehicle_key_backfill_needed = True
+                        db_log.info("Added car_plate_normalized column to insurance_application table (PostgreSQL)")
+                    except Exception as e:
+                        db_log.warning("Failed to add car_plate_normalized: %s", e)
+
+            if 'vin_normalized' not in ins_app_cols:
+                if not is_serverless:
+                    try:
+                        db.session.execute(text("ALTER TABLE insurance_application ADD COLUMN vin_normalized VARCHAR(64)"))
+                        safe_commit()
+                        vehicle_key_backfill_needed = True
+                        db_log.info("Added vin_normalized column to insurance_application table (PostgreSQL)")
+                    except Exception as e:
+                        db_log.warning("Failed to add vin_normalized: %s", e)
+
+            # partner_group 테이블: updated_at 컬럼 추가 (PostgreSQL)
+            group_cols = [col['name'] for col in inspector.get_columns('partner_group')]
+            if group_cols and 'updated_at' not in group_cols and not is_serverless:
+                try:
+                    db.session.execute(text("ALTER TABLE partner_group ADD COLUMN updated_at TIMESTAMP"))
+                    safe_commit()
+                    db_log.info("Added updated_at column to partner_group table (PostgreSQL)")
+                except Exception as e:
+                    db_log.warning("Failed to add partner_group.updated_at: %s", e)
+
+            # stored_document 테이블: 문서 처리 결과 컬럼 추가 (PostgreSQL)
+            document_cols = [col['name'] for col in inspector.get_columns('stored_document')]
+            for column, ddl in STORED_DOCUMENT_COLUMNS:
+                if column not in document_cols and not is_serverless:
+                    try:
+                        db.session.execute(text(f"ALTER TABLE stored_document ADD COLUMN {column} {ddl.replace('DATETIME', 'TIMESTAMP')}"))
+                        safe_commit()
+                        db_log.info("Added %s column to stored_document table (PostgreSQL)", column)
                     except Exception as e:
-                        print(f"Warning: Failed to add point_deducted: {e}")
+                        db_log.warning("Failed to add %s: %s", column, e)
     except Exception as e:
-        print(f"Warning: Schema migration failed: {e}")
-        import traceback
-        traceback.print_exc()
-        pass
+        db_log.warning("Schema migration failed: %s", e, exc_info=True)
+    
+    # 인덱스 마이그레이션 (기존 테이블에는 create_all 이 인덱스를 만들지 않음)
+    if not is_serverless:
+        apply_index_migrations()
+        apply_search_indexes()
+    
+    # 정규화 차량번호/차대번호 백필 (정규화가 Python 함수라 SQL UPDATE 한 번으로 채울 수 없음)
+    if vehicle_key_backfill_needed:
+        backfill_vehicle_keys()
     
     # 전체관리자 계정 생성/업데이트 (요구사항: hyundai / #admin1004)
     try:
@@ -1183,7 +2041,7 @@ def init_db_and_assets():
                 db.session.add(admin)
                 if not safe_commit():
                     raise Exception("Failed to commit admin account creation")
-                print(f'관리자 계정이 생성되었습니다. 아이디: {admin_username}, 비밀번호: {admin_password}')
+                db_log.info("관리자 계정이 생성되었습니다. 아이디: %s", admin_username)
                 return  # 성공적으로 생성했으므로 종료
         
         # 기존 관리자 계정 업데이트
@@ -1226,13 +2084,12 @@ def init_db_and_assets():
         if needs_update:
             if not safe_commit():
                 raise Exception("Failed to commit admin account update")
-            print(f'관리자 계정 정보가 업데이트되었습니다. 아이디: {admin_username}, 비밀번호: {admin_password}')
+            db_log.info("관리자 계정 정보가 업데이트되었습니다. 아이디: %s", admin_username)
         
     except IntegrityError as e:
         # UNIQUE constraint 오류 처리
         try:
-            import sys
-            sys.stderr.write(f"Admin account IntegrityError: {e}\n")
+            db_log.error("Admin account IntegrityError: %s", e)
             db.session.rollback()
         except Exception:
             pass
@@ -1250,42 +2107,79 @@ def init_db_and_assets():
                 admin.approval_status = '승인'
                 admin.set_password(admin_password)
                 safe_commit()
-                print(f'관리자 계정 정보가 업데이트되었습니다 (재시도). 아이디: {admin_username}, 비밀번호: {admin_password}')
+                db_log.info("관리자 계정 정보가 업데이트되었습니다 (재시도). 아이디: %s", admin_username)
         except Exception as retry_err:
-            try:
-                import sys
-                sys.stderr.write(f"Admin account retry failed: {retry_err}\n")
-            except Exception:
-                pass
+            db_log.error("Admin account retry failed: %s", retry_err)
     
     except Exception as e:
-        print(f"Warning: Admin account creation/update failed: {e}")
-        import traceback
-        traceback.print_exc()
+        db_log.warning("Admin account creation/update failed: %s", e, exc_info=True)
         try:
             db.session.rollback()
         except Exception:
             pass
 
+# Post-commit write verification (re-reads the committed row by primary key).
+#   WRITE_VERIFY_MODE         off | sample | always
+#                             default: always when app.debug, sample when FLASK_ENV=staging, else off
+#   WRITE_VERIFY_SAMPLE_RATE  fraction of commits verified in sample mode (default 0.1)
+WRITE_VERIFY_MODE = os.environ.get('WRITE_VERIFY_MODE', '').strip().lower()
+try:
+    WRITE_VERIFY_SAMPLE_RATE = float(os.environ.get('WRITE_VERIFY_SAMPLE_RATE', '0.1'))
+except ValueError:
+    WRITE_VERIFY_SAMPLE_RATE = 0.1
+
+
+def _write_verify_mode():
+    if WRITE_VERIFY_MODE in ('off', 'sample', 'always'):
+        return WRITE_VERIFY_MODE
+    if app is not None and app.debug:
+        return 'always'
+    if os.environ.get('FLASK_ENV', '').lower() == 'staging':
+        return 'sample'
+    return 'off'
+
+
+def _should_verify_write():
+    mode = _write_verify_mode()
+    if mode == 'always':
+        return True
+    if mode == 'sample':
+        return random.random() < WRITE_VERIFY_SAMPLE_RATE
+    return False
+
+
+def _verify_write(obj, label):
+    """Re-select a just-committed row by primary key and log if it is missing"""
+    try:
+        state = sa_inspect(obj)
+        identity = state.identity  # available after flush without reloading the expired instance
+        if identity is None:
+            db_log.warning("%s: cannot verify %s without a primary key", label, type(obj).__name__)
+            return
+        found = db.session.get(type(obj), identity, populate_existing=True)
+        if found is None:
+            db_log.warning("%s: %s %s not found after commit", label, type(obj).__name__, identity)
+        else:
+            db_log.debug("%s: verified %s %s", label, type(obj).__name__, identity)
+    except Exception as e:
+        db_log.warning("%s: write verification error: %s", label, e)
+
+
 # Safe commit helper function
-def safe_commit():
-    """Safely commit database transaction with automatic rollback on error"""
+def safe_commit(verify=None, label='commit'):
+    """Safely commit database transaction with automatic rollback on error.
+
+    ``verify``: model instance to re-read after a successful commit, subject to
+    WRITE_VERIFY_MODE (no extra round trip when verification is off).
+    """
     if db is None:
-        try:
-            import sys
-            sys.stderr.write("safe_commit: Database is None\n")
-        except Exception:
-            pass
+        db_log.info("safe_commit: Database is None")
         return False
     try:
         # 커밋 전 세션 상태 확인
         pending_count = len(db.session.new) + len(db.session.dirty) + len(db.session.deleted)
         if pending_count > 0:
-            try:
-                import sys
-                sys.stderr.write(f"safe_commit: Committing {pending_count} pending changes\n")
-            except Exception:
-                pass
+            db_log.debug("safe_commit: Committing %s pending changes", pending_count)
         
         db.session.commit()
         
@@ -1295,16 +2189,13 @@ def safe_commit():
         except Exception:
             pass
         
+        if verify is not None and _should_verify_write():
+            _verify_write(verify, label)
+        
         return True
     except Exception as e:
         error_str = str(e)
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"DB commit error: {error_str}\n")
-            sys.stderr.write(f"DB commit traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
+        db_log.exception("DB commit error: %s", error_str)
         
         # Always rollback on error
         try:
@@ -1314,30 +2205,677 @@ def safe_commit():
         
         # Check for PostgreSQL transaction errors
         if 'InFailedSqlTransaction' in error_str or 'current transaction is aborted' in error_str.lower():
-            try:
-                import sys
-                sys.stderr.write("PostgreSQL transaction error detected, rolled back\n")
-            except Exception:
-                pass
+            db_log.error("PostgreSQL transaction error detected, rolled back")
             return False
         
         # SQLite constraint errors
         if 'UNIQUE constraint failed' in error_str or 'NOT NULL constraint failed' in error_str:
-            try:
-                import sys
-                sys.stderr.write(f"SQLite constraint error: {error_str}\n")
-            except Exception:
-                pass
+            db_log.error("SQLite constraint error: %s", error_str)
             return False
         
         # Re-raise other exceptions for debugging
-        try:
-            import sys
-            sys.stderr.write(f"Re-raising exception: {type(e).__name__}: {error_str}\n")
-        except Exception:
-            pass
+        db_log.info("Re-raising exception: %s: %s", type(e).__name__, error_str)
         return False  # Don't raise, just return False
 
+# 보험신청 라이프사이클 이벤트 (포인트 차감, 가입 예약 등 후속 처리용)
+# receiver(sender, **data) 형태로 connect 해서 사용한다.
+lifecycle_signals = Namespace()
+insurance_approved = lifecycle_signals.signal('insurance-approved')
+insurance_bulk_approved = lifecycle_signals.signal('insurance-bulk-approved')
+
+# SQLite 는 쓰기 잠금이 DB 전체에 걸리므로 id 구간별로 나눠 커밋한다.
+BULK_APPROVE_CHUNK_SIZE = int(os.environ.get('BULK_APPROVE_CHUNK_SIZE', '1000'))
+
+
+def _update_id_ranges(query_factory):
+    """대량 UPDATE 구간: SQLite 는 대상 id 범위를 청크로 분할, 그 외는 [(None, None)] 한 번"""
+    if db.engine.dialect.name != 'sqlite':
+        return [(None, None)]
+    first_id, last_id = query_factory().with_entities(
+        func.min(InsuranceApplication.id), func.max(InsuranceApplication.id)
+    ).one()
+    if first_id is None:
+        return []
+    return [(lo, lo + BULK_APPROVE_CHUNK_SIZE - 1)
+            for lo in range(first_id, last_id + 1, BULK_APPROVE_CHUNK_SIZE)]
+
+
+def bulk_approve_applications(partner_group_id=None, approved_at=None):
+    """미승인 보험신청을 UPDATE 문으로 일괄 승인.
+
+    partner_group_id 가 None 이면 전체 파트너그룹 대상.
+    Returns (approved_count, success). 구간 커밋 중 실패하면 그때까지 승인된 건수와 False.
+    """
+    if db is None:
+        return 0, False
+    approved_at = approved_at or datetime.now(KST)
+    
+    def pending_query():
+        query = db.session.query(InsuranceApplication).filter(InsuranceApplication.approved_at.is_(None))
+        if partner_group_id is not None:
+            query = query.filter(InsuranceApplication.partner_group_id == partner_group_id)
+        return query
+    
+    # status 는 컬럼이 아니라 recompute_status() 가 approved_at 으로부터 계산한다.
+    values = {'approved_at': approved_at}
+    ranges = _update_id_ranges(pending_query)
+    
+    approved_count = 0
+    for lo, hi in ranges:
+        query = pending_query()
+        if lo is not None:
+            query = query.filter(InsuranceApplication.id.between(lo, hi))
+        try:
+            count = query.update(values, synchronize_session=False)
+        except Exception as e:
+            db_log.exception("Bulk approve update failed: %s", e)
+            db.session.rollback()
+            return approved_count, False
+        if not safe_commit(label='bulk approve'):
+            return approved_count, False
+        approved_count += count
+        if count:
+            insurance_approved.send(
+                current_app._get_current_object(), partner_group_id=partner_group_id,
+                approved_at=approved_at, id_range=(lo, hi), count=count,
+            )
+    
+    insurance_bulk_approved.send(
+        current_app._get_current_object(), partner_group_id=partner_group_id,
+        approved_at=approved_at, count=approved_count,
+    )
+    return approved_count, True
+
+
+# 종료된 보험신청 보관 처리
+# 종료시간 후 ARCHIVE_AFTER_DAYS 가 지난 행에 archived_at 을 기록하고, 목록 화면은
+# archived_at IS NULL 부분 인덱스만 읽는다. 정산은 가입시간 기준이라 보관 행도 그대로 집계된다.
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '90'))
+
+
+def include_archived_requested():
+    """?include_archived=1 이면 보관된 신청도 조회"""
+    return request.args.get('include_archived') == '1'
+
+
+def exclude_archived(query, include_archived=False):
+    if include_archived:
+        return query
+    return query.filter(InsuranceApplication.archived_at.is_(None))
+
+
+def archive_expired_applications(older_than_days=None, now=None):
+    """종료 후 보관 기한이 지난 신청을 보관 처리. Returns (archived_count, success)."""
+    if db is None:
+        return 0, False
+    now = now or datetime.now(KST)
+    days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = now - timedelta(days=days)
+    
+    def expired_query():
+        return db.session.query(InsuranceApplication).filter(
+            InsuranceApplication.archived_at.is_(None),
+            InsuranceApplication.end_at.isnot(None),
+            InsuranceApplication.end_at < cutoff,
+        )
+    
+    archived_count = 0
+    for lo, hi in _update_id_ranges(expired_query):
+        query = expired_query()
+        if lo is not None:
+            query = query.filter(InsuranceApplication.id.between(lo, hi))
+        try:
+            count = query.update({'archived_at': now}, synchronize_session=False)
+        except Exception as e:
+            db_log.exception("Archive update failed: %s", e)
+            db.session.rollback()
+            return archived_count, False
+        if not safe_commit(label='archive applications'):
+            return archived_count, False
+        archived_count += count
+    
+    db_log.info("Archived %s insurance applications (end_at < %s)", archived_count, cutoff)
+    return archived_count, True
+
+
+# 검색: 상사명/대표자(member), 차량번호/차대번호(insurance_application)
+# - SQLite  : FTS5 trigram 외부 콘텐츠 테이블 + 동기화 트리거, bm25 순위
+# - Postgres: pg_trgm GIN 인덱스 + ILIKE, similarity 순위
+# - 그 외 / 인덱스 생성 불가 / 3글자 미만 검색어: LIKE (접두 일치 우선)
+SEARCH_MIN_TRGM = 3  # trigram 인덱스는 3글자 이상 검색어에만 사용 가능
+SEARCH_PER_PAGE = int(os.environ.get('SEARCH_PER_PAGE', '20'))
+SEARCH_MAX_PER_PAGE = 100
+SEARCH_TARGETS = {
+    # 종류: (FTS 테이블, 원본 테이블, 검색 컬럼)
+    'member': ('member_search', 'member', ('company_name', 'representative')),
+    'vehicle': ('vehicle_search', 'insurance_application', ('car_plate', 'vin')),
+}
+_search_state = {'backend': None}
+
+
+def _sqlite_search_ddl(fts, table, columns):
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def apply_search_indexes():
+    """검색 인덱스 생성 (SQLite FTS5 / PostgreSQL pg_trgm). 반복 실행해도 안전."""
+    from sqlalchemy import text
+    
+    dialect = db.engine.dialect.name
+    _search_state['backend'] = None
+    try:
+        if dialect == 'sqlite':
+            for fts, table, columns in SEARCH_TARGETS.values():
+                exists = db.session.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': fts}
+                ).first()
+                for statement in _sqlite_search_ddl(fts, table, columns):
+                    db.session.execute(text(statement))
+                if not exists:
+                    # 기존 행 색인 (트리거는 이후 변경분만 반영)
+                    db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+                    db_log.info("Created FTS5 search table %s", fts)
+            db.session.commit()
+        elif dialect == 'postgresql':
+            db.session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for _fts, table, columns in SEARCH_TARGETS.values():
+                for column in columns:
+                    db.session.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS idx_{table}_{column}_trgm "
+                        f"ON {table} USING gin ({column} gin_trgm_ops)"
+                    ))
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        db_log.warning("Search index setup failed, falling back to LIKE: %s", e)
+
+
+def search_backend():
+    """'fts5' | 'trgm' | 'like' (프로세스당 한 번 확인)"""
+    if _search_state['backend'] is None:
+        from sqlalchemy import text
+        
+        backend = 'like'
+        try:
+            dialect = db.engine.dialect.name
+            if dialect == 'sqlite':
+                names = [fts for fts, _table, _columns in SEARCH_TARGETS.values()]
+                found = {row[0] for row in db.session.execute(
+                    text("SELECT name FROM sqlite_master WHERE type = 'table'")
+                )}
+                if all(name in found for name in names):
+                    backend = 'fts5'
+            elif dialect == 'postgresql':
+                if db.session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+                    backend = 'trgm'
+        except Exception as e:
+            db_log.warning("Search backend detection failed: %s", e)
+        _search_state['backend'] = backend
+    return _search_state['backend']
+
+
+def _fts_phrase(term, columns):
+    """검색어를 FTS5 검색식으로 변환 (공백 단위 AND, 특수문자는 따옴표로 무력화, 컬럼 한정)"""
+    phrases = ' '.join('"%s"' % token.replace('"', '""') for token in term.split())
+    return '{%s} : (%s)' % (' '.join(columns), phrases)
+
+
+def _like_pattern(term):
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _search_match(kind, term, columns=None):
+    """(매칭 조건, 순위 식(작을수록 우선), 조인할 FTS 테이블 또는 None)"""
+    from sqlalchemy import or_, case, literal, table as sa_table, column as sa_column, literal_column
+    
+    fts_name, _table, all_columns = SEARCH_TARGETS[kind]
+    columns = columns or all_columns
+    model = Member if kind == 'member' else InsuranceApplication
+    attrs = [getattr(model, c) for c in columns]
+    backend = search_backend()
+    trgm_ok = all(len(token) >= SEARCH_MIN_TRGM for token in term.split())
+    
+    if backend == 'fts5' and trgm_ok:
+        fts = sa_table(fts_name, sa_column('rowid'))
+        fts_ref = literal_column(fts_name)
+        condition = fts_ref.op('MATCH')(_fts_phrase(term, columns))
+        return condition, func.bm25(fts_ref), fts
+    
+    pattern = _like_pattern(term)
+    if backend == 'trgm':
+        condition = or_(*[attr.ilike(pattern, escape='\\') for attr in attrs])
+        score = func.greatest(*[func.similarity(func.coalesce(attr, ''), term) for attr in attrs])
+        return condition, -score, None
+    
+    condition = or_(*[attr.like(pattern, escape='\\') for attr in attrs])
+    prefix = _like_pattern(term)[1:]
+    rank = case(*[(attr.like(prefix, escape='\\'), literal(0)) for attr in attrs], else_=literal(1))
+    return condition, rank, None
+
+
+def search_member_ids(term, columns=('company_name',)):
+    """검색어와 일치하는 회원 id 서브쿼리 (목록 필터용, 기본은 상사명만)"""
+    condition, _rank, fts = _search_match('member', term, columns)
+    query = db.session.query(Member.id)
+    if fts is not None:
+        query = query.join(fts, fts.c.rowid == Member.id)
+    return query.filter(condition).scalar_subquery()
+
+
+def search_records(kind, term, partner_group_id=None, page=1, per_page=None, include_archived=False):
+    """순위순 검색 결과 한 페이지. Returns {'total', 'page', 'per_page', 'items'}."""
+    per_page = max(1, min(per_page or SEARCH_PER_PAGE, SEARCH_MAX_PER_PAGE))
+    page = max(1, page)
+    condition, rank, fts = _search_match(kind, term)
+    
+    if kind == 'member':
+        query = db.session.query(Member, rank.label('rank')).filter(Member.role == 'member')
+        model = Member
+    else:
+        query = exclude_archived(db.session.query(InsuranceApplication, rank.label('rank')), include_archived)
+        model = InsuranceApplication
+    if fts is not None:
+        query = query.join(fts, fts.c.rowid == model.id)
+    query = query.filter(condition)
+    if partner_group_id is not None:
+        query = query.filter(model.partner_group_id == partner_group_id)
+    
+    total = query.order_by(None).count()
+    rows = query.order_by(rank, model.id.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    
+    items = []
+    if kind == 'member':
+        for member, _score in rows:
+            items.append({
+                'id': member.id,
+                'company_name': member.company_name,
+                'representative': member.representative,
+                'business_number': member.business_number,
+                'partner_group_id': member.partner_group_id,
+            })
+    else:
+        for application, _score in rows:
+            member = application.created_by_member
+            items.append({
+                'id': application.id,
+                'car_plate': application.car_plate,
+                'vin': application.vin,
+                'car_name': application.car_name,
+                'company_name': member.company_name if member else None,
+                'partner_group_id': application.partner_group_id,
+                'created_at': application.created_at.isoformat() if application.created_at else None,
+                'start_at': application.start_at.isoformat() if application.start_at else None,
+            })
+    return {'total': total, 'page': page, 'per_page': per_page, 'items': items}
+
+
+VEHICLE_KEY_BACKFILL_BATCH_SIZE = int(os.environ.get('VEHICLE_KEY_BACKFILL_BATCH_SIZE', '1000'))
+PLATE_HISTORY_LIMIT = 200
+
+
+def backfill_vehicle_keys(batch_size=None):
+    """car_plate_normalized / vin_normalized 가 비어 있는 행을 id 순 배치로 채움. Returns (updated_count, success)."""
+    from sqlalchemy import or_, and_
+    
+    if db is None:
+        return 0, False
+    batch_size = batch_size or VEHICLE_KEY_BACKFILL_BATCH_SIZE
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(
+            InsuranceApplication.id, InsuranceApplication.car_plate, InsuranceApplication.vin
+        ).filter(
+            InsuranceApplication.id > last_id,
+            or_(
+                and_(InsuranceApplication.car_plate.isnot(None), InsuranceApplication.car_plate_normalized.is_(None)),
+                and_(InsuranceApplication.vin.isnot(None), InsuranceApplication.vin_normalized.is_(None)),
+            ),
+        ).order_by(InsuranceApplication.id).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        # 매퍼 이벤트를 거치지 않는 PK 기준 일괄 UPDATE (executemany)
+        mappings = [
+            {'id': row.id, 'car_plate_normalized': normalize_plate(row.car_plate), 'vin_normalized': normalize_vin(row.vin)}
+            for row in rows
+        ]
+        db.session.bulk_update_mappings(InsuranceApplication, mappings)
+        if not safe_commit(label='vehicle key backfill'):
+            return updated, False
+        updated += len(mappings)
+    db_log.info("Backfilled normalized plate/VIN for %s insurance applications", updated)
+    return updated, True
+
+
+def plate_history(plate, partner_group_id=None, prefix=False, include_archived=True):
+    """정규화 차량번호로 보험 이력 조회 (idx_ins_app_plate_norm 한 번의 범위 탐색, 최신순).
+
+    prefix=True 이면 정규화 값이 plate 로 시작하는 차량 전체 (입력 중 자동완성용).
+    """
+    normalized = normalize_plate(plate)
+    if not normalized:
+        return []
+    column = InsuranceApplication.car_plate_normalized
+    if prefix and db.engine.dialect.name == 'postgresql':
+        # 범위 조건은 비 C 콜레이션에서 행을 놓칠 수 있으므로 LIKE 'x%' (idx_ins_app_plate_norm_prefix)
+        pattern = re.sub(r'([\\%_])', r'\\\1', normalized) + '%'
+        query = db.session.query(InsuranceApplication).filter(column.like(pattern, escape='\\'))
+    elif prefix:
+        # SQLite 는 LIKE 가 대소문자 무시라 인덱스를 못 쓰므로 범위 조건 (BINARY 콜레이션이라 정확)
+        query = db.session.query(InsuranceApplication).filter(column >= normalized, column < normalized + '\uffff')
+    else:
+        query = db.session.query(InsuranceApplication).filter(column == normalized)
+    query = exclude_archived(query, include_archived)
+    if partner_group_id is not None:
+        query = query.filter(InsuranceApplication.partner_group_id == partner_group_id)
+    return query.order_by(column, InsuranceApplication.created_at.desc()).limit(PLATE_HISTORY_LIMIT).all()
+
+
+# 중복가입 확인: 신규 신청의 보장기간 [가입, 가입 + POLICY_TERM) 과 같은 차대번호의 보관되지 않은
+# 신청 기간 [COALESCE(start_at, created_at), 종료) 가 겹치면 중복이다 (반열린 구간이라 만료 시각에
+# 시작하는 갱신은 겹치지 않음). 신규 신청은 승인 후 ACTIVATION_DELAY 뒤에 가입되므로 가장 이른
+# 가입시간은 지금 + ACTIVATION_DELAY 이다. 기존 신청의 종료가 비어 있으면:
+#   - 가입시간이 있으면 start_at + POLICY_TERM
+#   - 승인만 되었으면 approved_at + ACTIVATION_DELAY + POLICY_TERM
+#   - 승인 대기면 가입 전이라 종료를 알 수 없으므로 겹친다고 보되, PENDING_STALE_DAYS 가 지난
+#     미승인 신청은 방치된 것으로 보고 무시한다.
+POLICY_TERM = timedelta(days=30)
+ACTIVATION_DELAY = timedelta(hours=2)
+PENDING_STALE_DAYS = int(os.environ.get('PENDING_STALE_DAYS', '7'))
+COVERAGE_CHECK_CHUNK_SIZE = 500
+
+
+def new_coverage_period(start_at=None, now=None):
+    """신규 신청의 예상 보장기간 (start_at, end_at). start_at 이 없으면 가장 이른 가입시간."""
+    if start_at is None:
+        start_at = (now or datetime.now(KST)) + ACTIVATION_DELAY
+    return start_at, start_at + POLICY_TERM
+
+
+def _coverage_overlap_filter(start_at, end_at, now):
+    """기존 신청 중 [start_at, end_at) 와 보장기간이 겹치는 것"""
+    from sqlalchemy import or_, and_
+    
+    row = InsuranceApplication
+    return and_(
+        row.archived_at.is_(None),
+        func.coalesce(row.start_at, row.created_at) < end_at,
+        or_(
+            row.end_at > start_at,
+            and_(row.end_at.is_(None), row.start_at > start_at - POLICY_TERM),
+            and_(row.end_at.is_(None), row.start_at.is_(None),
+                 row.approved_at > start_at - POLICY_TERM - ACTIVATION_DELAY),
+            and_(row.end_at.is_(None), row.start_at.is_(None), row.approved_at.is_(None),
+                 row.created_at > now - timedelta(days=PENDING_STALE_DAYS)),
+        ),
+    )
+
+
+def find_active_coverage(vin, start_at=None, now=None):
+    """같은 차대번호로 신규 신청과 보장기간이 겹치는 신청 (idx_ins_app_vin_coverage 한 번의 탐색), 없으면 None"""
+    normalized = normalize_vin(vin)
+    if not normalized:
+        return None
+    now = now or datetime.now(KST)
+    start_at, end_at = new_coverage_period(start_at, now)
+    return db.session.query(InsuranceApplication).filter(
+        InsuranceApplication.vin_normalized == normalized,
+        _coverage_overlap_filter(start_at, end_at, now),
+    ).order_by(InsuranceApplication.id).first()
+
+
+def find_active_coverage_bulk(vins, start_at=None, now=None):
+    """엑셀 일괄 업로드용: {정규화 차대번호: 기간이 겹치는 기존 신청} (파일 전체를 IN 조회로 한 번에 확인)"""
+    normalized = sorted({v for v in (normalize_vin(vin) for vin in vins) if v})
+    now = now or datetime.now(KST)
+    start_at, end_at = new_coverage_period(start_at, now)
+    existing = {}
+    for i in range(0, len(normalized), COVERAGE_CHECK_CHUNK_SIZE):
+        chunk = normalized[i:i + COVERAGE_CHECK_CHUNK_SIZE]
+        rows = db.session.query(InsuranceApplication).filter(
+            InsuranceApplication.vin_normalized.in_(chunk),
+            _coverage_overlap_filter(start_at, end_at, now),
+        ).order_by(InsuranceApplication.id).all()
+        for row in rows:
+            existing.setdefault(row.vin_normalized, row)
+    return existing
+
+
+def split_duplicate_vins(rows, vin_of, start_at=None, now=None):
+    """엑셀 행 목록을 (등록할 행, 중복 행) 으로 분리. 기존 보장기간과 겹치거나 파일 안에서 반복된 차대번호는 중복."""
+    existing = find_active_coverage_bulk([vin_of(row) for row in rows], start_at=start_at, now=now)
+    seen = set()
+    accepted, duplicates = [], []
+    for row in rows:
+        normalized = normalize_vin(vin_of(row))
+        if normalized and (normalized in existing or normalized in seen):
+            duplicates.append(row)
+            continue
+        if normalized:
+            seen.add(normalized)
+        accepted.append(row)
+    return accepted, duplicates
+
+
+def duplicate_coverage_message(existing):
+    return (
+        f'보장기간이 겹치는 신청이 있는 차대번호입니다 '
+        f'(신청번호 {existing.id}, 차량번호 {existing.car_plate or "-"}).'
+    )
+
+
+def coverage_period(application, now=None):
+    """신청의 보장기간 (가입, 종료) — _coverage_overlap_filter 와 같은 규칙.
+
+    종료가 정해지지 않은 승인 대기 신청은 종료 None(열린 구간), 방치된 미승인 신청은 None.
+    """
+    now = now or datetime.now(KST)
+    start_at = _ensure_aware(application.start_at)
+    end_at = _ensure_aware(application.end_at)
+    approved_at = _ensure_aware(application.approved_at)
+    created_at = _ensure_aware(application.created_at)
+    if end_at is None:
+        if start_at is not None:
+            end_at = start_at + POLICY_TERM
+        elif approved_at is not None:
+            end_at = approved_at + ACTIVATION_DELAY + POLICY_TERM
+        elif created_at is None or created_at <= now - timedelta(days=PENDING_STALE_DAYS):
+            return None
+    return start_at or created_at, end_at
+
+
+def coverage_overlaps(limit=None, now=None):
+    """보장기간이 겹치는 같은 차대번호 신청 쌍 [(먼저 신청, 나중 신청)] (보관된 신청 제외)
+
+    SQL 은 종료가 비어 있으면 열린 구간으로 보고 후보만 좁히고, 신규 신청 확인과 같은 규칙
+    (coverage_period: 파생 종료, 방치된 미승인 제외)으로 다시 판정한다.
+    """
+    from sqlalchemy import or_, and_
+    from sqlalchemy.orm import aliased
+    
+    now = now or datetime.now(KST)
+    first = aliased(InsuranceApplication)
+    second = aliased(InsuranceApplication)
+    first_start = func.coalesce(first.start_at, first.created_at)
+    second_start = func.coalesce(second.start_at, second.created_at)
+    query = db.session.query(first, second).join(
+        second,
+        and_(second.vin_normalized == first.vin_normalized, second.id > first.id),
+    ).filter(
+        first.vin_normalized.isnot(None),
+        first.archived_at.is_(None),
+        second.archived_at.is_(None),
+        or_(first.end_at.is_(None), second_start < first.end_at),
+        or_(second.end_at.is_(None), first_start < second.end_at),
+    ).order_by(first.vin_normalized, first.id, second.id)
+    pairs = []
+    for pair in query:
+        periods = [coverage_period(application, now) for application in pair]
+        if None in periods:
+            continue
+        (first_start, first_end), (second_start, second_end) = periods
+        if (first_end is None or second_start < first_end) and (second_end is None or first_start < second_end):
+            pairs.append(pair)
+            if limit and len(pairs) >= limit:
+                break
+    return pairs
+
+
+# 요청과 무관한 후속 작업(파일 정리 등)용 백그라운드 워커
+BACKGROUND_WORKERS = int(os.environ.get('BACKGROUND_WORKERS', '2'))
+_background = {'executor': None, 'lock': threading.Lock()}
+
+
+def background_executor():
+    """프로세스 공용 ThreadPoolExecutor (지연 생성)"""
+    executor = _background['executor']
+    if executor is None:
+        with _background['lock']:
+            executor = _background['executor']
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix='background')
+                _background['executor'] = executor
+    return executor
+
+
+def run_in_background(func, *args, **kwargs):
+    """serverless 에서는 응답 후 스레드가 멈추므로 즉시 실행, 그 외에는 워커에 위임"""
+    if is_serverless:
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            app_log.warning("Background task %s failed: %s", getattr(func, '__name__', func), e)
+        return None
+    return background_executor().submit(func, *args, **kwargs)
+
+
+def shutdown_background(wait=True):
+    executor = _background['executor']
+    _background['executor'] = None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+atexit.register(shutdown_background)
+
+
+def reset_after_fork():
+    """prefork 서버(gunicorn --preload)의 워커 프로세스에서 fork 직후 호출.
+
+    부모에서 물려받은 스레드(로그 리스너, 백그라운드 워커, SQLite 유지보수)는 자식에서 동작하지 않고,
+    DB 커넥션은 부모와 소켓을 공유하므로 자식 상태를 새로 만든다.
+    - 커넥션 풀: dispose(close=False) 로 부모 소유 커넥션은 닫지 않고 참조만 버림
+    - 로그: 새 큐/리스너 스레드 시작 (부모 큐에 남은 레코드는 부모가 출력)
+    - 백그라운드 워커: 다음 run_in_background 호출 시 새로 생성
+    - SQLite 유지보수: 워커에서는 시작하지 않음 (preload 시 마스터 프로세스의 스레드 하나가 담당)
+    """
+    global _log_listener
+    _log_listener = None
+    configure_logging()
+    
+    _background.update(executor=None, lock=threading.Lock())
+    _sqlite_maintenance.update(thread=None, stop=threading.Event())
+    _document_store.update(store=None, lock=threading.Lock())
+    
+    if db is not None:
+        try:
+            with app.app_context():
+                for engine in db.engines.values():
+                    engine.dispose(close=False)
+        except Exception as e:
+            db_log.warning("Engine dispose after fork failed: %s", e)
+    replica = _read_replica['engine']
+    _read_replica['lock'] = threading.Lock()
+    if replica is not None:
+        replica.dispose(close=False)
+    app_log.info("Worker %s ready (state reset after fork)", os.getpid())
+
+
+def _upload_file_path(stored_path):
+    """DB에 저장된 첨부 경로('uploads/x.pdf' 또는 'x.pdf')를 UPLOAD_DIR 내부 실제 경로로 변환.
+
+    문서 저장소 파일은 다른 행과 공유될 수 있으므로 None (prune-documents 가 정리)
+    """
+    if not stored_path or document_ref(stored_path):
+        return None
+    filename = os.path.basename(stored_path.replace('\\', '/'))
+    if not filename or filename in ('.', '..'):
+        return None
+    return os.path.join(UPLOAD_DIR, filename)
+
+
+def delete_files(paths):
+    for path in paths:
+        try:
+            if os.path.isfile(path):
+                os.remove(path)
+                files_log.debug("Deleted file: %s", path)
+        except OSError as e:
+            files_log.error("File delete error (%s): %s", path, e)
+
+
+def discard_upload(stored_path):
+    """교체된 첨부 파일 정리 (이전 방식 파일만 백그라운드에서 삭제)"""
+    path = _upload_file_path(stored_path)
+    if path:
+        run_in_background(delete_files, [path])
+
+
+def remove_member(member):
+    """회원과 종속 데이터를 테이블당 DELETE 문 하나로 삭제 (단일 트랜잭션).
+
+    첨부 파일 삭제는 커밋 성공 후 백그라운드 워커에 넘긴다. Returns success.
+    """
+    member_id = member.id
+    stored_paths = [member.registration_cert_path, member.license_attachment_path]
+    stored_paths += [
+        path for (path,) in db.session.query(InsuranceApplication.insurance_policy_path).filter(
+            InsuranceApplication.created_by_member_id == member_id,
+            InsuranceApplication.insurance_policy_path.isnot(None),
+        )
+    ]
+    
+    try:
+        # 외래 키 순서: 종속 테이블 먼저, 회원은 마지막
+        deleted = {
+            'insurance_application': db.session.query(InsuranceApplication).filter(
+                InsuranceApplication.created_by_member_id == member_id).delete(synchronize_session=False),
+        }
+        for model in (DepositHistory, DepositRequest, VirtualAccount, PointAdjustment):
+            deleted[model.__tablename__] = db.session.query(model).filter(
+                model.member_id == member_id).delete(synchronize_session=False)
+        db.session.expunge(member)
+        db.session.query(Member).filter(Member.id == member_id).delete(synchronize_session=False)
+    except Exception as e:
+        db_log.exception("Member remove failed (ID %s): %s", member_id, e)
+        db.session.rollback()
+        return False
+    
+    if not safe_commit(label='remove member'):
+        return False
+    
+    db_log.debug("Member %s removed with related rows: %s", member_id, deleted)
+    invalidate_auth_context(member_id)
+    files = [path for path in map(_upload_file_path, stored_paths) if path]
+    if files:
+        run_in_background(delete_files, files)
+    return True
+
 # Safe database transaction handler
 def safe_db_operation(func):
     """Decorator to safely handle database operations with automatic rollback on error"""
@@ -1345,7 +2883,7 @@ def safe_db_operation(func):
     def wrapper(*args, **kwargs):
         if db is None:
             flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('auth.dashboard'))
         
         try:
             result = func(*args, **kwargs)
@@ -1364,113 +2902,201 @@ def safe_db_operation(func):
             # Check if it's a PostgreSQL transaction error
             error_str = str(e)
             if 'InFailedSqlTransaction' in error_str or 'current transaction is aborted' in error_str.lower():
-                try:
-                    import sys
-                    sys.stderr.write(f"PostgreSQL transaction error: {e}\n")
-                except Exception:
-                    pass
+                db_log.error("PostgreSQL transaction error: %s", e)
                 flash('데이터베이스 트랜잭션 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
             else:
                 # Re-raise other exceptions to be handled by error handler
                 raise
             # Return redirect to prevent showing error page
-            return redirect(request.url if request else url_for('dashboard'))
+            return redirect(request.url if request else url_for('auth.dashboard'))
     return wrapper
 
 # 관리자 권한 데코레이터
-def admin_required(view):
-    from functools import wraps
-    @wraps(view)
-    @login_required
-    def wrapped(*args, **kwargs):
-        # Flask-Login ensures current_user is available after @login_required
-        from flask_login import current_user
-        
-        # Check admin role using direct database query to avoid session issues
+# ---------------------------------------------------------------------------
+# Login throttling / password verification
+#
+# Bounds the CPU spent on password hashing by hostile traffic:
+#   * sliding-window limits per client IP (all attempts) and per account
+#     (failed attempts) are checked before any hash is computed
+#   * unknown usernames are verified against a dummy hash so they cost the
+#     same as a wrong password (no user-enumeration timing difference)
+#   * hashes created with older DEFAULT_PASSWORD_HASH_METHOD parameters are
+#     upgraded transparently on the next successful login
+#
+#   LOGIN_THROTTLE_WINDOW           window in seconds (default 300)
+#   LOGIN_MAX_ATTEMPTS_PER_IP       attempts per IP per window (default 30)
+#   LOGIN_MAX_FAILURES_PER_ACCOUNT  failed attempts per account per window (default 10)
+#   LOGIN_THROTTLE_BACKEND          optional "module:factory" returning an object with
+#                                   hit(key, window) -> int, count(key, window) -> int, reset(key)
+# ---------------------------------------------------------------------------
+LOGIN_THROTTLE_WINDOW = int(os.environ.get('LOGIN_THROTTLE_WINDOW', '300'))
+LOGIN_MAX_ATTEMPTS_PER_IP = int(os.environ.get('LOGIN_MAX_ATTEMPTS_PER_IP', '30'))
+LOGIN_MAX_FAILURES_PER_ACCOUNT = int(os.environ.get('LOGIN_MAX_FAILURES_PER_ACCOUNT', '10'))
+
+
+class SlidingWindowStore:
+    """In-process sliding-window hit counter (per worker process)"""
+
+    MAX_KEYS = 50000
+
+    def __init__(self):
+        self._hits = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, hits, now, window):
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+
+    def hit(self, key, window):
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                if len(self._hits) >= self.MAX_KEYS:
+                    self._evict(now, window)
+                hits = self._hits[key] = deque()
+            self._prune(hits, now, window)
+            hits.append(now)
+            return len(hits)
+
+    def count(self, key, window):
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.get(key)
+            if not hits:
+                return 0
+            self._prune(hits, now, window)
+            return len(hits)
+
+    def reset(self, key):
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def _evict(self, now, window):
+        for key in [k for k, v in self._hits.items() if not v or v[-1] <= now - window]:
+            del self._hits[key]
+        if len(self._hits) >= self.MAX_KEYS:
+            self._hits.clear()
+
+
+def _load_login_throttle_store():
+    spec = os.environ.get('LOGIN_THROTTLE_BACKEND', '').strip()
+    if spec:
         try:
-            # First, ensure we have a valid user object with id
-            if current_user is None or not hasattr(current_user, 'id'):
-                flash('사용자 정보를 불러올 수 없습니다.', 'danger')
-                return redirect(url_for('login'))
-            
-            user_id = int(current_user.id)
-            
-            # Direct database query to get user role - this avoids session attachment issues
-            if db is None:
-                flash('데이터베이스 연결 오류가 발생했습니다.', 'danger')
-                return redirect(url_for('login'))
-            
-            # 먼저 세션에서 user_role 확인 (더 빠르고 안전)
-            user_role = session.get('user_role', None)
-            
-            # 세션에 역할이 없거나 member인 경우에만 DB에서 조회
-            if user_role is None or user_role == 'member':
-                # Query role directly from database
-                try:
-                    # Use raw SQL query or direct column access to avoid lazy loading issues
-                    result = db.session.query(Member.role).filter(Member.id == user_id).first()
-                    if result:
-                        db_role = result[0] if isinstance(result, tuple) else result
-                        if db_role:
-                            user_role = db_role
-                            # 세션에 저장
-                            session['user_role'] = db_role
-                    else:
-                        # If query fails, try to get user object
-                        user = db.session.get(Member, user_id)
-                        if user:
-                            # Force eager load of role attribute
-                            db_role = db.session.query(Member.role).filter(Member.id == user_id).scalar()
-                            if db_role:
-                                user_role = db_role
-                                session['user_role'] = db_role
-                            else:
-                                user_role = 'member'
-                        else:
-                            flash('사용자 정보를 찾을 수 없습니다. 다시 로그인해주세요.', 'danger')
-                            return redirect(url_for('login'))
-                except Exception as query_error:
-                    # Fallback: try simple attribute access
-                    try:
-                        attr_role = getattr(current_user, 'role', 'member')
-                        # Verify it's not None
-                        if attr_role:
-                            user_role = attr_role
-                            session['user_role'] = attr_role
-                        else:
-                            user_role = 'member'
-                    except Exception:
-                        # Last resort: default to member
-                        user_role = 'member'
-                        try:
-                            import sys
-                            sys.stderr.write(f"Admin role check error: {type(query_error).__name__}: {str(query_error)}\n")
-                        except Exception:
-                            pass
-            
-            # Check if user is admin
-            # 회원가입을 통해 가입한 회원은 role='member'이므로 관리자 페이지 접근 불가
-            if user_role != 'admin':
-                flash('관리자만 접근 가능합니다.', 'warning')
+            module_name, _, factory = spec.partition(':')
+            return getattr(importlib.import_module(module_name), factory or 'create_store')()
+        except Exception as e:
+            auth_log.error("Login throttle backend %s unavailable, using in-process store: %s", spec, e)
+    return SlidingWindowStore()
+
+
+login_throttle_store = _load_login_throttle_store()
+
+
+def _client_ip():
+    # Vercel / reverse proxies put the client first in X-Forwarded-For
+    if is_serverless or os.environ.get('TRUST_FORWARDED_FOR') == '1':
+        route = request.access_route
+        if route:
+            return route[0]
+    return request.remote_addr or 'unknown'
+
+
+def login_throttled(account_key):
+    """Record a login attempt; True if the IP or the account is over its limit"""
+    try:
+        ip_hits = login_throttle_store.hit(f'login:ip:{_client_ip()}', LOGIN_THROTTLE_WINDOW)
+        failures = login_throttle_store.count(f'login:acct:{account_key}', LOGIN_THROTTLE_WINDOW)
+    except Exception as e:
+        auth_log.error("Login throttle check failed: %s", e)
+        return False
+    if ip_hits > LOGIN_MAX_ATTEMPTS_PER_IP or failures >= LOGIN_MAX_FAILURES_PER_ACCOUNT:
+        auth_log.warning("Login throttled: ip=%s account=%s ip_hits=%s failures=%s",
+                         _client_ip(), account_key, ip_hits, failures)
+        return True
+    return False
+
+
+def record_login_failure(account_key):
+    try:
+        login_throttle_store.hit(f'login:acct:{account_key}', LOGIN_THROTTLE_WINDOW)
+    except Exception:
+        pass
+
+
+def clear_login_failures(account_key):
+    try:
+        login_throttle_store.reset(f'login:acct:{account_key}')
+    except Exception:
+        pass
+
+
+_dummy_password_hash = None
+
+
+def _current_hash_prefix():
+    """'method:params' part of a hash produced with DEFAULT_PASSWORD_HASH_METHOD (computed once)"""
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        _dummy_password_hash = generate_password_hash(secrets.token_hex(16), method=DEFAULT_PASSWORD_HASH_METHOD)
+    return _dummy_password_hash.split('$', 1)[0]
+
+
+def verify_dummy_password(password):
+    """Spend the same hashing work as a real check when the account does not exist"""
+    _current_hash_prefix()
+    check_password_hash(_dummy_password_hash, password or '')
+    return False
+
+
+def password_needs_rehash(password_hash):
+    if not password_hash:
+        return False
+    return password_hash.split('$', 1)[0] != _current_hash_prefix()
+
+
+def rehash_password_if_needed(obj, password):
+    """Upgrade a Member / PartnerGroup admin hash to the current method after a successful check"""
+    try:
+        if isinstance(obj, PartnerGroup):
+            if password_needs_rehash(obj.admin_password_hash):
+                obj.set_admin_password(password)
+                safe_commit()
+        elif password_needs_rehash(getattr(obj, 'password_hash', None)):
+            obj.set_password(password)
+            safe_commit()
+    except Exception as e:
+        auth_log.warning("Password rehash failed: %s", e)
+
+
+def admin_required(view):
+    from functools import wraps
+    @wraps(view)
+    @login_required
+    def wrapped(*args, **kwargs):
+        try:
+            if db is None:
+                flash('데이터베이스 연결 오류가 발생했습니다.', 'danger')
+                return redirect(url_for('auth.login'))
+            
+            # Request-scoped identity: built from the row login_required already loaded
+            ctx = get_auth_context()
+            if ctx is None:
+                flash('사용자 정보를 불러올 수 없습니다.', 'danger')
+                return redirect(url_for('auth.login'))
+            
+            # Check if user is admin
+            # 회원가입을 통해 가입한 회원은 role='member'이므로 관리자 페이지 접근 불가
+            if ctx.role != 'admin':
+                flash('관리자만 접근 가능합니다.', 'warning')
                 # 권한이 없으면 로그인 페이지로 리다이렉트 (무한 루프 방지)
-                return redirect(url_for('login'))
+                return redirect(url_for('auth.login'))
             
             # Check if user is approved (회원가입 승인 상태 확인)
             # 회원가입 시 approval_status='신청'으로 고정되므로, 승인되지 않은 사용자는 접근 불가
-            try:
-                approval_status = db.session.query(Member.approval_status).filter(Member.id == user_id).scalar()
-                if approval_status != '승인':
-                    flash('회원가입 승인이 완료된 관리자만 접근 가능합니다.', 'warning')
-                    return redirect(url_for('login'))
-            except Exception as approval_error:
-                # 승인 상태 확인 실패 시에도 접근 차단 (안전을 위해)
-                try:
-                    import sys
-                    sys.stderr.write(f"Approval status check error: {type(approval_error).__name__}: {str(approval_error)}\n")
-                except Exception:
-                    pass
-                flash('회원가입 승인 상태를 확인할 수 없습니다.', 'warning')
-                return redirect(url_for('login'))
+            if ctx.approval_status != '승인':
+                flash('회원가입 승인이 완료된 관리자만 접근 가능합니다.', 'warning')
+                return redirect(url_for('auth.login'))
             
             # User is admin and approved, proceed with view
             # admin_redirect_attempt 플래그 제거 (성공적으로 접근했으므로)
@@ -1479,15 +3105,9 @@ def admin_required(view):
             
         except Exception as e:
             # Log error for debugging
-            try:
-                import sys
-                import traceback
-                sys.stderr.write(f"Admin required decorator error: {type(e).__name__}: {str(e)}\n")
-                sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-            except Exception:
-                pass
+            auth_log.exception("Admin required decorator error: %s: %s", type(e).__name__, str(e))
             flash('권한 확인 중 오류가 발생했습니다. 다시 로그인해주세요.', 'danger')
-            return redirect(url_for('login'))
+            return redirect(url_for('auth.login'))
     return wrapped
 
 
@@ -1504,11 +3124,7 @@ def ensure_initialized():
             # Ensure we have app context
             if not has_app_context():
                 # This should not happen in a request, but handle it
-                try:
-                    import sys
-                    sys.stderr.write("Warning: ensure_initialized called without app context\n")
-                except Exception:
-                    pass
+                app_log.warning("ensure_initialized called without app context")
                 return
             
             # CRITICAL: Ensure extensions are attached FIRST before any other operations
@@ -1521,48 +3137,228 @@ def ensure_initialized():
                             needs_db_init = False
                     if needs_db_init:
                         db.init_app(current_app)
-                        try:
-                            import sys
-                            sys.stderr.write("✓ Database extension initialized\n")
-                        except Exception:
-                            pass
+                        app_log.info("✓ Database extension initialized")
             except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Warning: Failed to init db: {e}\n")
-                except Exception:
-                    pass
+                app_log.warning("Failed to init db: %s", e)
             
             try:
                 if login_manager is not None and not hasattr(current_app, 'login_manager'):
                     login_manager.init_app(current_app)
-                    login_manager.login_view = 'login'
-                    try:
-                        import sys
-                        sys.stderr.write("✓ Login manager initialized\n")
-                    except Exception:
-                        pass
+                    login_manager.login_view = 'auth.login'
+                    app_log.info("✓ Login manager initialized")
             except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Warning: Failed to init login_manager: {e}\n")
-                except Exception:
-                    pass
+                app_log.warning("Failed to init login_manager: %s", e)
             
             # Now init_db_and_assets can safely use current_app and db
-            init_db_and_assets()
+            with startup_phase('init_db_and_assets'):
+                init_db_and_assets()
+            with startup_phase('resolve_static_assets'):
+                resolve_static_assets()
+            start_sqlite_maintenance(current_app._get_current_object())
+            if TEMPLATE_MODE == 'production' and TEMPLATE_PRECOMPILE and not is_serverless:
+                with startup_phase('precompile_templates'):
+                    compiled, failed = precompile_templates(current_app._get_current_object())
+                app_log.info("Precompiled %s templates (%s failed)", compiled, len(failed))
             _initialized = True
         except Exception as e:
-            try:
-                import sys
-                sys.stderr.write(f"Warning: Initialization failed: {e}\n")
-                import traceback
-                sys.stderr.write(traceback.format_exc())
-            except Exception:
-                pass
+            app_log.warning("Initialization failed: %s", e, exc_info=True)
             # Mark as initialized anyway to avoid infinite retry loops
             _initialized = True
 
+# Partner group metadata cache (name, bank info, ...), shared by the partner routes.
+# Entries expire after PARTNER_GROUP_CACHE_TTL seconds and are dropped explicitly
+# when a group is edited or deleted (invalidate_partner_group). That only clears the
+# worker that handled the edit, so every worker also compares a DB version stamp
+# (count, max id, max updated_at) at most every PARTNER_GROUP_VERSION_CHECK seconds
+# and drops both caches when it changes.
+PARTNER_GROUP_CACHE_TTL = int(os.environ.get('PARTNER_GROUP_CACHE_TTL', '300'))
+PARTNER_GROUP_VERSION_CHECK = float(os.environ.get('PARTNER_GROUP_VERSION_CHECK', '5'))
+PartnerGroupInfo = namedtuple('PartnerGroupInfo', [
+    'id', 'name', 'business_number', 'representative', 'phone', 'mobile',
+    'address', 'bank_name', 'account_number', 'logo_path',
+])
+_partner_group_cache = {}
+_partner_group_version = {'stamp': None, 'checked': 0.0}
+
+
+def partner_group_version():
+    """Check the shared DB stamp; on a change made by another worker, drop the cached groups"""
+    state = _partner_group_version
+    now = time.monotonic()
+    if db is None or state['checked'] + PARTNER_GROUP_VERSION_CHECK > now:
+        return state['stamp']
+    state['checked'] = now
+    try:
+        with db.session.no_autoflush:
+            stamp = tuple(db.session.query(
+                func.count(PartnerGroup.id), func.max(PartnerGroup.id), func.max(PartnerGroup.updated_at),
+            ).one())
+    except Exception as e:
+        auth_log.debug("Partner group version check failed: %s", e)
+        return state['stamp']
+    if state['stamp'] is not None and stamp != state['stamp']:
+        _partner_group_cache.clear()
+        bump_partner_directory()
+    state['stamp'] = stamp
+    return stamp
+
+
+def get_partner_group_info(group_id):
+    """Read-only PartnerGroup metadata, cached per process; None if the group does not exist"""
+    try:
+        group_id = int(group_id)
+    except (TypeError, ValueError):
+        return None
+    partner_group_version()
+    entry = _partner_group_cache.get(group_id)
+    now = time.monotonic()
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    if db is None:
+        return None
+    group = db.session.get(PartnerGroup, group_id)
+    if group is None:
+        _partner_group_cache.pop(group_id, None)
+        return None
+    info = PartnerGroupInfo(
+        group.id, group.name, group.business_number, group.representative, group.phone,
+        group.mobile, group.address, group.bank_name, group.account_number, group.logo_path,
+    )
+    _partner_group_cache[group_id] = (now + PARTNER_GROUP_CACHE_TTL, info)
+    return info
+
+
+def invalidate_partner_group(group_id=None):
+    """Drop cached metadata for one partner group (or all of them)"""
+    if group_id is None:
+        _partner_group_cache.clear()
+        return
+    try:
+        _partner_group_cache.pop(int(group_id), None)
+    except (TypeError, ValueError):
+        pass
+
+
+# Partner group directory (id, name) for the login / register / admin filter dropdowns.
+# Rebuilt when admin_partner_groups bumps the version, when another worker's change
+# shows up in partner_group_version(), or after the TTL.
+PartnerGroupEntry = namedtuple('PartnerGroupEntry', ['id', 'name'])
+_partner_directory = {'version': 0, 'loaded': None, 'expires': 0.0, 'groups': [], 'etag': None}
+
+
+def bump_partner_directory():
+    """Mark the cached partner group directory stale (call after create / update / delete)"""
+    _partner_directory['version'] += 1
+
+
+def get_partner_directory():
+    """Cached list of PartnerGroupEntry(id, name) ordered by name"""
+    partner_group_version()
+    state = _partner_directory
+    now = time.monotonic()
+    if state['loaded'] == state['version'] and state['expires'] > now:
+        return state['groups']
+    if db is None:
+        return []
+    version = state['version']
+    try:
+        rows = db.session.query(PartnerGroup.id, PartnerGroup.name).order_by(PartnerGroup.name).all()
+    except Exception as e:
+        auth_log.error("Error fetching partner groups: %s", e)
+        return state['groups']
+    groups = [PartnerGroupEntry(row.id, row.name) for row in rows]
+    digest = hashlib.sha1(repr(groups).encode('utf-8')).hexdigest()[:16]
+    state.update(groups=groups, etag=f'pg-{digest}', loaded=version, expires=now + PARTNER_GROUP_CACHE_TTL)
+    return groups
+
+
+def _template_stamp(*names):
+    """mtime-based stamp so a template deploy changes the ETag"""
+    stamp = []
+    for name in names:
+        try:
+            stamp.append(str(int(os.path.getmtime(os.path.join(TEMPLATE_DIR, name)))))
+        except OSError:
+            stamp.append('0')
+    return '.'.join(stamp)
+
+
+_LOGIN_TEMPLATE_STAMP = _template_stamp('auth/login.html', 'base.html')
+
+
+def partner_directory_etag():
+    """ETag of the anonymous login page: directory contents + template version + logo hash
+
+    The page embeds asset_url('logo.png'), so a new logo must invalidate cached copies too.
+    """
+    get_partner_directory()
+    if _partner_directory['etag'] is None:
+        return None
+    logo = get_static_asset('logo.png')
+    return f"{_partner_directory['etag']}-{_LOGIN_TEMPLATE_STAMP}-{logo.etag if logo else 'nologo'}"
+
+
+# Partner section access. The decorators resolve the partner group once per
+# request, cache it on g.partner_context and pass it to the view as ``partner``.
+PartnerContext = namedtuple('PartnerContext', ['group_id', 'group', 'is_partner_admin'])
+
+
+def partner_admin_required(view=None, api=False, denied=None, missing_group=None):
+    """Session-based partner group administrator only (``api=True`` answers with JSON)
+
+    ``denied`` / ``missing_group`` override the JSON (body, status) per view, so existing API
+    clients keep the response they already handle.
+    """
+    denied = denied or ({'success': False, 'message': '접근 권한이 없습니다.'}, 403)
+    missing_group = missing_group or ({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}, 400)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(*args, **kwargs):
+            ensure_initialized()
+            if session.get('user_type') != 'partner_admin':
+                if api:
+                    return jsonify(denied[0]), denied[1]
+                flash('파트너그룹 관리자만 접근 가능합니다.', 'warning')
+                return redirect(url_for('partner.dashboard'))
+            group = get_partner_group_info(session.get('partner_group_id'))
+            if group is None:
+                if api:
+                    return jsonify(missing_group[0]), missing_group[1]
+                flash('파트너그룹 정보를 확인할 수 없습니다.', 'danger')
+                return redirect(url_for('partner.dashboard'))
+            g.partner_context = PartnerContext(group.id, group, True)
+            return view(*args, partner=g.partner_context, **kwargs)
+        return wrapped
+    return decorator(view) if view is not None else decorator
+
+
+def partner_member_required(view):
+    """Partner group administrator, or a member (role='member') belonging to a partner group"""
+    @functools.wraps(view)
+    def wrapped(*args, **kwargs):
+        ensure_initialized()
+        if session.get('user_type') == 'partner_admin':
+            group_id = session.get('partner_group_id')
+            is_partner_admin = True
+        else:
+            auth_ctx = get_auth_context()
+            if auth_ctx is None:
+                flash('로그인이 필요합니다.', 'warning')
+                return redirect(url_for('auth.login'))
+            if auth_ctx.role != 'member' or not auth_ctx.partner_group_id:
+                flash('파트너그룹 접근 권한이 없습니다.', 'warning')
+                return redirect(url_for('auth.login'))
+            group_id = auth_ctx.partner_group_id
+            is_partner_admin = False
+        group = get_partner_group_info(group_id)
+        if group is None:
+            flash('파트너그룹 정보를 찾을 수 없습니다.', 'danger')
+            return redirect(url_for('auth.login'))
+        g.partner_context = PartnerContext(group.id, group, is_partner_admin)
+        return view(*args, partner=g.partner_context, **kwargs)
+    return wrapped
+
 # SQLite pragma registration is now done in register_sqlite_pragma() above
 
 # Don't initialize at module level - wait for first request
@@ -1595,75 +3391,23 @@ if app is not None:
             from flask import current_app
             if login_manager is not None and not hasattr(current_app, 'login_manager'):
                 login_manager.init_app(current_app)
-                login_manager.login_view = 'login'
+                login_manager.login_view = 'auth.login'
         except Exception as e:
             # Log the error but don't crash - this is best-effort
-            try:
-                import sys
-                sys.stderr.write(f"Warning: Failed to attach login_manager in before_request: {e}\n")
-            except Exception:
-                pass
+            app_log.warning("Failed to attach login_manager in before_request: %s", e)
     
     @app.after_request
     def _handle_db_transaction_errors(response):
-        """Handle PostgreSQL transaction errors after each request"""
-        if db is not None:
+        """Roll back a transaction that failed during the request (tracked by handle_error events)"""
+        if db is not None and g.pop('_db_tx_failed', False):
             try:
-                # Check if there's an active transaction that failed
-                # If session is in a bad state, rollback
-                if db.session.is_active:
-                    # Try to check if transaction is in error state
-                    try:
-                        from sqlalchemy import text
-                        # Simple test query to check if transaction is healthy
-                        db.session.execute(text('SELECT 1'))
-                    except Exception as e:
-                        error_str = str(e)
-                        if 'InFailedSqlTransaction' in error_str or 'current transaction is aborted' in error_str.lower():
-                            try:
-                                db.session.rollback()
-                                try:
-                                    import sys
-                                    sys.stderr.write("Rolled back failed transaction after request\n")
-                                except Exception:
-                                    pass
-                            except Exception:
-                                pass
+                db.session.rollback()
+                db_log.error("Rolled back failed transaction after request")
             except Exception:
-                # If we can't check, try to rollback anyway
-                try:
-                    db.session.rollback()
-                except Exception:
-                    pass
+                pass
         return response
 
 
-@app.route('/')
-def index():
-    try:
-        ensure_initialized()  # Initialize on first request for Vercel
-        # Safely check authentication status
-        try:
-            from flask_login import current_user
-            is_auth = getattr(current_user, 'is_authenticated', False)
-        except Exception:
-            # If login_manager not ready, assume not authenticated
-            is_auth = False
-        
-        if is_auth:
-            return redirect(url_for('dashboard'))
-        return redirect(url_for('login'))
-    except Exception as e:
-        import traceback
-        error_msg = traceback.format_exc()
-        try:
-            import sys
-            sys.stderr.write(f"ERROR in index route: {error_msg}\n")
-        except Exception:
-            pass
-        return f"<h1>Error</h1><pre>{error_msg}</pre>", 500
-
-
 @app.route('/healthz')
 def healthz():
     try:
@@ -1677,6676 +3421,742 @@ def healthz():
     except Exception as e:
         return f'error: {str(e)}', 500
 
-@app.route('/favicon.ico')
-def favicon():
-    """Handle favicon requests - serve logo.png as favicon or return 204"""
+@app.route('/admin/diagnostics/db')
+@admin_required
+def admin_db_diagnostics():
+    """DB 프로필 및 커넥션 풀 지표 (JSON)"""
     try:
-        # Try multiple paths for logo
-        logo_paths = [
-            os.path.join(STATIC_DIR, 'logo.png'),
-            os.path.join(BASE_DIR, 'logo.png'),
-            LOGO_SOURCE_PATH_IN_CONTAINER,
-        ]
-        
-        for logo_path in logo_paths:
-            try:
-                if os.path.exists(logo_path):
-                    file_size = os.path.getsize(logo_path)
-                    if file_size > 0:
-                        return send_file(logo_path, mimetype='image/png')
-            except (OSError, IOError, PermissionError) as e:
-                # File system errors - skip this path
-                try:
-                    import sys
-                    sys.stderr.write(f"Warning: Could not access logo at {logo_path}: {e}\n")
-                except Exception:
-                    pass
-                continue
-            except Exception as e:
-                # Other errors - log and continue
-                try:
-                    import sys
-                    sys.stderr.write(f"Warning: Error checking logo at {logo_path}: {e}\n")
-                except Exception:
-                    pass
-                continue
+        return jsonify(pool_metrics())
     except Exception as e:
-        # If everything fails, log and return 204 (no content)
-        try:
-            import sys
-            sys.stderr.write(f"Warning: favicon route error: {e}\n")
-        except Exception:
-            pass
-    
-    return '', 204
+        db_log.warning("DB diagnostics error: %s", e)
+        return jsonify({'error': str(e)}), 500
 
-@app.route('/static/logo.png')
-def serve_logo():
-    """Serve logo.png from static directory or fallback to root"""
-    try:
-        # Try static directory first, then root
-        logo_paths = [
-            os.path.join(STATIC_DIR, 'logo.png'),
-            os.path.join(BASE_DIR, 'logo.png'),
-            LOGO_SOURCE_PATH_IN_CONTAINER,
-        ]
-        
-        for logo_path in logo_paths:
-            try:
-                if os.path.exists(logo_path):
-                    file_size = os.path.getsize(logo_path)
-                    if file_size > 0:
-                        return send_file(logo_path, mimetype='image/png')
-            except (OSError, IOError, PermissionError) as e:
-                # File system errors - skip this path
-                try:
-                    import sys
-                    sys.stderr.write(f"Warning: Could not access logo at {logo_path}: {e}\n")
-                except Exception:
-                    pass
-                continue
-            except Exception as e:
-                # Other errors - log and continue
-                try:
-                    import sys
-                    sys.stderr.write(f"Warning: Error checking logo at {logo_path}: {e}\n")
-                except Exception:
-                    pass
+@app.route('/admin/diagnostics/startup')
+@admin_required
+def admin_startup_diagnostics():
+    """모듈 import / 초기화 단계별 소요 시간 (JSON)"""
+    heavy = ('pandas', 'openpyxl', 'requests', 'numpy')
+    return jsonify({
+        'serverless': is_serverless,
+        'serverless_detected_by': SERVERLESS_DETECTED_BY,
+        'initialized': _initialized,
+        'phases_ms': [{'phase': name, 'ms': ms} for name, ms in STARTUP_PHASES],
+        'import_total_ms': sum(ms for name, ms in STARTUP_PHASES if name in STARTUP_IMPORT_PHASES),
+        'modules_loaded': len(sys.modules),
+        'heavy_modules_loaded': [name for name in heavy if name in sys.modules],
+    })
+
+# ---------------------------------------------------------------------------
+# 정적 자산 (로고, 약관 PDF)
+# 경로는 기동 시 한 번만 찾고(resolve_static_assets) 내용 해시를 ETag 로 쓴다.
+# - asset_url() 로 만든 ?v=<해시> URL: 1년 immutable 캐시 (내용이 바뀌면 URL 이 바뀜)
+# - 그 외 URL: no-cache + ETag, If-None-Match 일치 시 파일을 열지 않고 304
+# - STATIC_SENDFILE=x-sendfile / x-accel-redirect: 파일 전송을 앞단 웹서버(nginx 등)에 넘김
+# ---------------------------------------------------------------------------
+STATIC_ASSETS = {
+    # name: (endpoint, 후보 경로 - 앞에서부터 처음 존재하는 파일)
+    'logo.png': ('serve_logo', [
+        os.path.join(STATIC_DIR, 'logo.png'),
+        os.path.join(BASE_DIR, 'logo.png'),
+        LOGO_SOURCE_PATH_IN_CONTAINER,
+    ]),
+    'terms-guide.pdf': ('insurance.terms_guide_pdf', [
+        os.path.join(BASE_DIR, '@중고차 상품화자동차보험_상품안내_부산.pdf'),
+        os.path.join(BASE_DIR, '@중고차매매업자자동차보험_상품안내_부산.pdf'),
+    ]),
+    'terms-policy.pdf': ('insurance.terms_policy_download', [
+        os.path.join(BASE_DIR, '중고차 매매업자 자동차보험 약관.pdf'),
+    ]),
+}
+STATIC_ASSET_MAX_AGE = 365 * 24 * 3600
+STATIC_SENDFILE = os.environ.get('STATIC_SENDFILE', '').strip().lower()
+STATIC_ACCEL_PREFIX = os.environ.get('STATIC_ACCEL_PREFIX', '/_assets/')
+StaticAsset = namedtuple('StaticAsset', ['path', 'etag', 'size', 'mtime', 'mimetype'])
+_static_assets = {}
+_static_assets_lock = threading.Lock()
+
+
+def _resolve_static_asset(name):
+    for path in STATIC_ASSETS[name][1]:
+        try:
+            stat = os.stat(path)
+            if stat.st_size <= 0:
                 continue
-    except Exception as e:
-        # If everything fails, log and return 404
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 16), b''):
+                    digest.update(chunk)
+        except OSError:
+            continue
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        return StaticAsset(path, digest.hexdigest()[:16], stat.st_size, stat.st_mtime, mimetype)
+    files_log.warning("Static asset not found: %s", name)
+    return None
+
+
+def resolve_static_assets():
+    """모든 정적 자산의 경로/해시 계산 (ensure_initialized 에서 로고 복사 후 한 번)"""
+    resolved = {name: _resolve_static_asset(name) for name in STATIC_ASSETS}
+    with _static_assets_lock:
+        _static_assets.clear()
+        _static_assets.update(resolved)
+    return resolved
+
+
+def get_static_asset(name):
+    if name not in _static_assets:
+        with _static_assets_lock:
+            if name not in _static_assets:
+                _static_assets[name] = _resolve_static_asset(name)
+    return _static_assets[name]
+
+
+def asset_url(name):
+    """내용 해시가 붙은 자산 URL (템플릿: {{ asset_url('logo.png') }})"""
+    asset = get_static_asset(name)
+    endpoint = STATIC_ASSETS[name][0]
+    return url_for(endpoint, v=asset.etag) if asset else url_for(endpoint)
+
+
+def send_file_response(path, etag, mimetype, cache_control, as_attachment=False, download_name=None,
+                       last_modified=None):
+    """ETag 파일 응답: If-None-Match 일치 시 파일을 열지 않고 304, Range/If-Range, X-Sendfile 처리"""
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        # use_x_sendfile 이면 본문 없이 X-Sendfile 헤더만 (Range/Content-Disposition 은 그대로 처리)
+        response = werkzeug_send_file(
+            path, request.environ, mimetype=mimetype,
+            as_attachment=as_attachment, download_name=download_name,
+            conditional=True, etag=etag, last_modified=last_modified, max_age=None,
+            use_x_sendfile=STATIC_SENDFILE in ('x-sendfile', 'x-accel-redirect'),
+            response_class=current_app.response_class,
+        )
+        # If-Modified-Since 로 Werkzeug 가 304 를 돌려주면 X-Sendfile 헤더가 없다
+        sendfile = response.headers.pop('X-Sendfile', None) if STATIC_SENDFILE == 'x-accel-redirect' else None
+        if sendfile:
+            relative = os.path.relpath(sendfile, BASE_DIR).replace(os.sep, '/')
+            response.headers['X-Accel-Redirect'] = STATIC_ACCEL_PREFIX.rstrip('/') + '/' + url_quote(relative)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def send_static_asset(name, as_attachment=False, download_name=None):
+    """정적 자산 응답 (ETag/304, immutable 캐시, X-Sendfile). 파일이 없으면 None"""
+    asset = get_static_asset(name)
+    if asset is None:
+        return None
+    if request.args.get('v') == asset.etag:
+        cache_control = f'public, max-age={STATIC_ASSET_MAX_AGE}, immutable'
+    else:
+        cache_control = 'public, no-cache'
+    return send_file_response(asset.path, asset.etag, asset.mimetype, cache_control,
+                              as_attachment=as_attachment, download_name=download_name,
+                              last_modified=asset.mtime)
+
+
+app.add_template_global(asset_url)
+
+# ---------------------------------------------------------------------------
+# 문서 저장소 (사업자등록증/신분증 첨부, 보험증권)
+# 업로드 파일은 내용의 SHA-256 을 키로 한 번만 저장하고(같은 파일을 다시 올리면 재사용),
+# 크기/MIME 은 stored_document 테이블에 둔다. 회원/그룹/신청 컬럼에는 지금처럼 파일명
+# ('uploads/<sha256>.pdf')이 들어가므로 템플릿과 /uploads/<filename> URL 은 그대로다.
+# - URL 이 곧 내용이므로 ETag = sha256, 첨부는 1년 immutable 캐시 (Range / If-None-Match 지원)
+# - DOCUMENT_STORE_BACKEND: local (기본, DOCUMENT_STORE_DIR) / s3 (S3 호환, presigned URL 로 리다이렉트)
+#   / "module:factory" (put/exists/download/delete/local_path/url, temp_dir 를 가진 객체, 선택: keys)
+# - 같은 내용을 여러 행이 참조할 수 있으므로 교체/삭제 시 바로 지우지 않고
+#   `flask --app app prune-documents` 가 참조 없는 문서를 정리한다. 커밋되지 못한 업로드의 파일은
+#   롤백/세션 종료 시 지우고, 그래도 남은 행 없는 파일은 prune 이 저장소 목록(keys)에서 찾아 지운다
+# - 이전 방식 파일(사업자번호_시각 파일명, 관리자가 입력한 증권 경로)은 그대로 제공되며
+#   `flask --app app migrate-documents` 로 저장소에 옮긴다
+# - 새 문서는 커밋 후 백그라운드 워커가 처리한다 (process_document): 이미지는 EXIF 방향을 보정한
+#   미리보기/썸네일 JPEG(<sha256>.preview / <sha256>.thumbnail)를 만들고, PDF 는 쪽수를 기록.
+#   원본은 내용 해시가 키이므로 바꾸지 않는다. 승인 화면은 document_info() 로 썸네일을 보여준다
+# ---------------------------------------------------------------------------
+DOCUMENT_STORE_BACKEND = os.environ.get('DOCUMENT_STORE_BACKEND', '').strip() or 'local'
+DOCUMENT_STORE_DIR = os.environ.get('DOCUMENT_STORE_DIR') or os.path.join(UPLOAD_DIR, 'documents')
+DOCUMENT_URL_EXPIRES = int(os.environ.get('DOCUMENT_URL_EXPIRES', '300'))
+DOCUMENT_CACHE_MAX_AGE = 365 * 24 * 3600
+DOCUMENT_META_CACHE_SIZE = 4096
+# 커밋 전 업로드가 올려 둔 파일을 prune 이 지우지 않도록, 행 없는 파일은 이 시간이 지나야 정리
+DOCUMENT_ORPHAN_GRACE = 3600
+DOCUMENT_REF_RE = re.compile(r'^([0-9a-f]{64})(\.[a-z0-9]{1,8})?$')
+DOCUMENT_PREVIEW_SIZE = int(os.environ.get('DOCUMENT_PREVIEW_SIZE', '1600'))
+DOCUMENT_THUMBNAIL_SIZE = int(os.environ.get('DOCUMENT_THUMBNAIL_SIZE', '320'))
+DOCUMENT_VARIANTS = ('preview', 'thumbnail')
+DocumentMeta = namedtuple('DocumentMeta', [
+    'sha256', 'size', 'mimetype', 'processing_status', 'page_count', 'width', 'height', 'has_preview',
+])
+_document_store = {'store': None, 'lock': threading.Lock()}
+_document_meta = {}
+_document_meta_lock = threading.Lock()
+
+
+class LocalDocumentStore:
+    """로컬 디스크 저장소: <root>/<sha256 앞 2자리>/<sha256>"""
+
+    def __init__(self, root):
+        self.root = root
+        # 업로드 임시 파일을 같은 파일시스템에 두어 os.replace 가 원자적으로 동작
+        self.temp_dir = os.path.join(root, 'tmp')
+
+    def local_path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key):
+        return os.path.isfile(self.local_path(key))
+
+    def put(self, key, source_path, mimetype):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+
+    def download(self, key, dest_path):
+        shutil.copyfile(self.local_path(key), dest_path)
+
+    def delete(self, key):
         try:
-            import sys
-            sys.stderr.write(f"Warning: serve_logo route error: {e}\n")
-        except Exception:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
             pass
-    
-    # If no logo found, return 404
-    return '', 404
 
-@app.route('/insurance/<int:insurance_id>/policy')
-@login_required
-def serve_insurance_policy(insurance_id):
-    """Serve insurance policy PDF if available"""
-    try:
-        ensure_initialized()
-        if db is None:
-            flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-            return redirect(url_for('dashboard'))
-        
-        # Get insurance application
-        insurance = db.session.get(InsuranceApplication, insurance_id)
-        if not insurance:
-            flash('보험 신청을 찾을 수 없습니다.', 'danger')
-            return redirect(url_for('dashboard'))
-        
-        # Check permission: user can only view their own insurance policies unless admin
-        user_role = getattr(current_user, 'role', 'member')
-        if user_role != 'admin' and insurance.created_by_member_id != current_user.id:
-            flash('권한이 없습니다.', 'danger')
-            return redirect(url_for('dashboard'))
-        
-        # Check if insurance policy path exists
-        if hasattr(insurance, 'insurance_policy_path') and insurance.insurance_policy_path:
-            policy_path = insurance.insurance_policy_path
-            # Handle both absolute and relative paths
-            if not os.path.isabs(policy_path):
-                # Try different possible locations
-                possible_paths = [
-                    os.path.join(UPLOAD_DIR, policy_path),
-                    os.path.join(BASE_DIR, 'uploads', policy_path),
-                    os.path.join(BASE_DIR, policy_path),
-                ]
-            else:
-                possible_paths = [policy_path]
-            
-            for path in possible_paths:
-                try:
-                    if os.path.exists(path) and os.path.isfile(path):
-                        return send_file(path, mimetype='application/pdf', as_attachment=False)
-                except (OSError, IOError, PermissionError):
-                    continue
-        
-        # If policy not found, return 404
-        flash('보험증권 파일을 찾을 수 없습니다.', 'warning')
-        return redirect(url_for('insurance'))
-        
-    except Exception as e:
+    def keys(self):
+        """저장된 (키, 수정시각 epoch) 목록 (prune 용, 업로드 임시 디렉터리 제외)"""
+        for shard in os.scandir(self.root) if os.path.isdir(self.root) else ():
+            if not shard.is_dir() or len(shard.name) != 2:
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file():
+                    yield entry.name, entry.stat().st_mtime
+
+    def url(self, key, mimetype, download_name=None):
+        return None
+
+
+class S3DocumentStore:
+    """S3 호환 저장소 (AWS S3, MinIO, R2 등). boto3 는 이 백엔드를 쓸 때만 import"""
+
+    temp_dir = None
+
+    def __init__(self, bucket, prefix='documents/', endpoint_url=None):
+        import boto3
+        self.client = boto3.client('s3', endpoint_url=endpoint_url or None)
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def local_path(self, key):
+        return None
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
         try:
-            import sys
-            sys.stderr.write(f"Error in serve_insurance_policy: {e}\n")
-        except Exception:
-            pass
-        flash('보험증권 조회 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('dashboard'))
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+        except ClientError:
+            return False
+        return True
 
-@app.route('/debug/template-check')
-def debug_template_check():
-    """Debug route to check template loading"""
-    if not app.debug and is_serverless:
-        return "Debug disabled", 404
-    
-    import os
-    template_path = os.path.join(TEMPLATE_DIR, 'admin', 'insurance.html')
+    def put(self, key, source_path, mimetype):
+        self.client.upload_file(source_path, self.bucket, self.prefix + key, ExtraArgs={
+            'ContentType': mimetype,
+            'CacheControl': f'private, max-age={DOCUMENT_CACHE_MAX_AGE}, immutable',
+        })
+
+    def download(self, key, dest_path):
+        self.client.download_file(self.bucket, self.prefix + key, dest_path)
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def keys(self):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get('Contents', ()):
+                yield obj['Key'][len(self.prefix):], obj['LastModified'].timestamp()
+
+    def url(self, key, mimetype, download_name=None):
+        params = {'Bucket': self.bucket, 'Key': self.prefix + key, 'ResponseContentType': mimetype}
+        if download_name:
+            params['ResponseContentDisposition'] = f"inline; filename*=UTF-8''{url_quote(download_name)}"
+        return self.client.generate_presigned_url('get_object', Params=params, ExpiresIn=DOCUMENT_URL_EXPIRES)
+
+
+def _load_document_store():
+    spec = DOCUMENT_STORE_BACKEND
     try:
-        with open(template_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Check if the template has been updated
-        has_filter = 'to_local_datetime' in content
-        has_old_syntax = 'tzlocal()' in content
-        
-        return f"""
-        <h1>Template Debug Info</h1>
-        <p><strong>Template Path:</strong> {template_path}</p>
-        <p><strong>File exists:</strong> {os.path.exists(template_path)}</p>
-        <p><strong>Has new filter:</strong> {has_filter}</p>
-        <p><strong>Has old syntax:</strong> {has_old_syntax}</p>
-        <p><strong>Template cache disabled:</strong> {app.config.get('TEMPLATES_AUTO_RELOAD', False)}</p>
-        <hr>
-        <h2>Line 86 area:</h2>
-        <pre>{chr(10).join(content.split(chr(10))[83:89])}</pre>
-        """
+        if spec == 's3':
+            return S3DocumentStore(
+                os.environ['DOCUMENT_S3_BUCKET'],
+                prefix=os.environ.get('DOCUMENT_S3_PREFIX', 'documents/'),
+                endpoint_url=os.environ.get('DOCUMENT_S3_ENDPOINT_URL'),
+            )
+        if spec != 'local':
+            module_name, _, factory = spec.partition(':')
+            return getattr(importlib.import_module(module_name), factory or 'create_store')()
     except Exception as e:
-        return f"Error reading template: {e}"
+        files_log.error("Document store backend %s unavailable, using local disk: %s", spec, e)
+    return LocalDocumentStore(DOCUMENT_STORE_DIR)
 
 
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    try:
-        ensure_initialized()  # Initialize on first request for Vercel
-        
-        # GET 요청: 파트너그룹 목록을 가져와서 템플릿에 전달
-        if request.method == 'GET':
-            partner_groups = []
-            if db is not None:
-                try:
-                    partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                except Exception as e:
-                    try:
-                        import sys
-                        sys.stderr.write(f"Error fetching partner groups: {e}\n")
-                    except Exception:
-                        pass
-            return render_template('auth/login.html', partner_groups=partner_groups)
-        
-        # POST 요청: 로그인 처리
-        if request.method == 'POST':
-            username = request.form.get('username', '').strip()
-            password = request.form.get('password', '')
-            partner_group_id = request.form.get('partner_group_id', '').strip()
-            
-            if not username or not password or not partner_group_id:
-                flash('모든 필드를 입력해주세요.', 'warning')
-                partner_groups = []
-                if db is not None:
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                return render_template('auth/login.html', partner_groups=partner_groups)
-            
-            if db is None:
-                try:
-                    import sys
-                    sys.stderr.write("Login error: db is None\n")
-                except Exception:
-                    pass
-                flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-                partner_groups = []
-                return render_template('auth/login.html', partner_groups=partner_groups)
-            
-            # Ensure models are defined
-            try:
-                if not _model_classes_defined:
-                    define_models()
-            except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Login error: Model definition failed: {e}\n")
-                except Exception:
-                    pass
-                flash('시스템 초기화 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.', 'danger')
-                return render_template('auth/login.html')
-            
-            try:
-                # 전체관리자 로그인 처리 - 파트너그룹 선택에서 "전체관리자" 선택 시
-                if partner_group_id == 'admin':
-                    # 전체관리자는 partner_group_id가 None이고 role이 'admin'
-                    try:
-                        user = db.session.query(Member).filter(
-                            Member.username == username,
-                            Member.partner_group_id.is_(None),
-                            Member.role == 'admin'
-                        ).first()
-                    except Exception as query_err:
-                        try:
-                            import sys
-                            import traceback
-                            sys.stderr.write(f"Admin login query error: {query_err}\n")
-                            sys.stderr.write(traceback.format_exc())
-                        except Exception:
-                            pass
-                        # Try to rollback and retry
-                        try:
-                            db.session.rollback()
-                            user = db.session.query(Member).filter(
-                                Member.username == username,
-                                Member.partner_group_id.is_(None),
-                                Member.role == 'admin'
-                            ).first()
-                        except Exception as retry_err:
-                            try:
-                                import sys
-                                sys.stderr.write(f"Admin login retry query error: {retry_err}\n")
-                            except Exception:
-                                pass
-                            flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                            partner_groups = []
-                            try:
-                                partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                            except Exception:
-                                pass
-                            return render_template('auth/login.html', partner_groups=partner_groups)
-                    
-                    # 특수 관리자 계정 처리: hyundai / #admin1004 (전체관리자 섹션)
-                    if username == 'hyundai' and password == '#admin1004':
-                        try:
-                            # 전체관리자 계정 생성/업데이트
-                            if not user:
-                                user = Member(
-                                    username=username,
-                                    company_name='현대해상 관리자',
-                                    role='admin',
-                                    partner_group_id=None,
-                                    approval_status='승인',
-                                    email='admin@hyundai.com'
-                                )
-                                user.set_password(password)
-                                db.session.add(user)
-                            else:
-                                # 비밀번호 및 권한 업데이트
-                                user.set_password(password)
-                                user.approval_status = '승인'
-                                user.role = 'admin'
-                            
-                            if safe_commit():
-                                login_user(user, remember=True)  # remember=True로 세션 유지
-                                session.permanent = True  # 세션을 영구적으로 설정
-                                session['user_role'] = 'admin'
-                                session['user_name'] = user.company_name if user.company_name else user.username
-                                session.pop('admin_selected_partner_group_id', None)
-                                session.pop('admin_selected_partner_group_name', None)
-                                return redirect(url_for('admin_dashboard'))
-                            else:
-                                flash('관리자 계정 설정 중 오류가 발생했습니다.', 'danger')
-                        except Exception as special_admin_err:
-                            try:
-                                import sys
-                                sys.stderr.write(f"Special admin account setup error (admin section): {special_admin_err}\n")
-                            except Exception:
-                                pass
-                            flash('관리자 계정 설정 중 오류가 발생했습니다.', 'danger')
-                        
-                        partner_groups = []
-                        try:
-                            partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                        except Exception:
-                            pass
-                        return render_template('auth/login.html', partner_groups=partner_groups)
-                    
-                    # 전체관리자 로그인 처리
-                    if user:
-                        # 비밀번호 확인
-                        try:
-                            password_valid = user.check_password(password)
-                        except Exception as pwd_err:
-                            try:
-                                import sys
-                                sys.stderr.write(f"Admin login password check error: {pwd_err}\n")
-                            except Exception:
-                                pass
-                            flash('비밀번호 확인 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                            partner_groups = []
-                            try:
-                                partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                            except Exception:
-                                pass
-                            return render_template('auth/login.html', partner_groups=partner_groups)
-                        
-                        if password_valid:
-                            # 전체관리자 로그인 성공 - 전체관리자 섹션으로 리다이렉트
-                            try:
-                                login_user(user, remember=True)  # remember=True로 세션 유지
-                                session.permanent = True  # 세션을 영구적으로 설정
-                                # 세션에 사용자 역할 저장 (템플릿에서 사용)
-                                session['user_role'] = 'admin'
-                                # 세션에 사용자 이름 저장
-                                session['user_name'] = user.company_name if user.company_name else user.username
-                                # 세션에서 파트너그룹 선택 정보 제거 (전체관리자 섹션으로 가므로)
-                                session.pop('admin_selected_partner_group_id', None)
-                                session.pop('admin_selected_partner_group_name', None)
-                                # 전체관리자 대시보드로 리다이렉트
-                                return redirect(url_for('admin_dashboard'))
-                            except Exception as login_err:
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Admin login user error: {login_err}\n")
-                                except Exception:
-                                    pass
-                                flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                                partner_groups = []
-                                try:
-                                    partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                                except Exception:
-                                    pass
-                                return render_template('auth/login.html', partner_groups=partner_groups)
-                        else:
-                            flash('아이디 또는 비밀번호가 올바르지 않습니다.', 'danger')
-                    else:
-                        flash('전체관리자 계정을 찾을 수 없습니다.', 'danger')
-                    
-                    # 전체관리자 로그인 실패 시 로그인 페이지 반환
-                    partner_groups = []
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                    return render_template('auth/login.html', partner_groups=partner_groups)
-                else:
-                    # 파트너그룹 선택 후 로그인 처리
-                    try:
-                        partner_group_id_int = int(partner_group_id)
-                        partner_group = db.session.get(PartnerGroup, partner_group_id_int)
-                        
-                        if not partner_group:
-                            flash('선택한 파트너그룹이 존재하지 않습니다.', 'danger')
-                            partner_groups = []
-                            try:
-                                partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                            except Exception:
-                                pass
-                            return render_template('auth/login.html', partner_groups=partner_groups)
-                        
-                        # 특수 관리자 계정 처리: hyundai / #admin1004
-                        # 이 계정은 전체관리자 및 파트너그룹 관리자 권한을 모두 가짐
-                        if username == 'hyundai' and password == '#admin1004':
-                            try:
-                                # 1. 전체관리자 계정 생성/업데이트
-                                admin_user = db.session.query(Member).filter(
-                                    Member.username == username,
-                                    Member.partner_group_id.is_(None),
-                                    Member.role == 'admin'
-                                ).first()
-                                
-                                if not admin_user:
-                                    # 전체관리자 계정 생성
-                                    admin_user = Member(
-                                        username=username,
-                                        company_name='현대해상 관리자',
-                                        role='admin',
-                                        partner_group_id=None,
-                                        approval_status='승인',
-                                        email='admin@hyundai.com'
-                                    )
-                                    admin_user.set_password(password)
-                                    db.session.add(admin_user)
-                                else:
-                                    # 비밀번호 업데이트 (변경된 경우)
-                                    admin_user.set_password(password)
-                                    admin_user.approval_status = '승인'
-                                    admin_user.role = 'admin'
-                                
-                                # 2. 파트너그룹 관리자 권한 부여
-                                partner_group.admin_username = username
-                                partner_group.set_admin_password(password)
-                                
-                                # 커밋
-                                if safe_commit():
-                                    # 전체관리자 권한으로 로그인 (파트너그룹 선택 상태)
-                                    login_user(admin_user, remember=True)  # remember=True로 세션 유지
-                                    session.permanent = True  # 세션을 영구적으로 설정
-                                    session['user_role'] = 'admin'
-                                    session['user_name'] = admin_user.company_name if admin_user.company_name else admin_user.username
-                                    session['admin_selected_partner_group_id'] = partner_group_id_int
-                                    session['admin_selected_partner_group_name'] = partner_group.name
-                                    # 파트너그룹 관리자 권한도 세션에 저장 (양쪽 권한 모두 사용 가능)
-                                    session['partner_group_id'] = partner_group_id_int
-                                    session['partner_group_name'] = partner_group.name
-                                    session['user_type'] = 'partner_admin'  # 파트너그룹 관리자 권한도 부여
-                                    return redirect(url_for('partner_dashboard'))
-                                else:
-                                    flash('권한 부여 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                            except Exception as special_admin_err:
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Special admin account setup error: {special_admin_err}\n")
-                                except Exception:
-                                    pass
-                                flash('관리자 계정 설정 중 오류가 발생했습니다.', 'danger')
-                            
-                            partner_groups = []
-                            try:
-                                partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                            except Exception:
-                                pass
-                            return render_template('auth/login.html', partner_groups=partner_groups)
-                        
-                        # 먼저 전체관리자인지 확인 (파트너그룹 선택했지만 전체관리자 계정)
-                        admin_user = db.session.query(Member).filter(
-                            Member.username == username,
-                            Member.partner_group_id.is_(None),
-                            Member.role == 'admin'
-                        ).first()
-                        
-                        if admin_user:
-                            # 전체관리자가 파트너그룹을 선택한 경우
-                            if admin_user.check_password(password):
-                                # 세션에 파트너그룹 정보 저장
-                                session['admin_selected_partner_group_id'] = partner_group_id_int
-                                session['admin_selected_partner_group_name'] = partner_group.name
-                                login_user(admin_user, remember=True)  # remember=True로 세션 유지
-                                session.permanent = True  # 세션을 영구적으로 설정
-                                # 세션에 사용자 역할 저장 (템플릿에서 사용)
-                                session['user_role'] = 'admin'
-                                # 세션에 사용자 이름 저장
-                                session['user_name'] = admin_user.company_name if admin_user.company_name else admin_user.username
-                                # 파트너그룹 섹션으로 리다이렉트
-                                return redirect(url_for('partner_dashboard'))
-                            else:
-                                flash('아이디 또는 비밀번호가 올바르지 않습니다.', 'danger')
-                                partner_groups = []
-                                try:
-                                    partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                                except Exception:
-                                    pass
-                                return render_template('auth/login.html', partner_groups=partner_groups)
-                        
-                        # 파트너그룹 관리자인지 확인
-                        if partner_group.admin_username == username:
-                            # 파트너그룹 관리자 로그인
-                            if partner_group.check_admin_password(password):
-                                # 임시 사용자 객체 생성 (세션에 저장할 정보)
-                                session['user_type'] = 'partner_admin'
-                                session['partner_group_id'] = partner_group_id_int
-                                session['username'] = username
-                                session['partner_group_name'] = partner_group.name
-                                session['user_role'] = 'partner_admin'  # 파트너그룹 관리자
-                                session['user_name'] = partner_group.name  # 파트너그룹 이름을 사용자 이름으로 사용
-                                return redirect(url_for('partner_dashboard'))
-                            else:
-                                flash('아이디 또는 비밀번호가 올바르지 않습니다.', 'danger')
-                                partner_groups = []
-                                try:
-                                    partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                                except Exception:
-                                    pass
-                                return render_template('auth/login.html', partner_groups=partner_groups)
-                        
-                        # 회원사 로그인
-                        user = db.session.query(Member).filter(
-                            Member.username == username,
-                            Member.partner_group_id == partner_group_id_int,
-                            Member.role == 'member'
-                        ).first()
-                    except ValueError:
-                        flash('잘못된 파트너그룹입니다.', 'danger')
-                        partner_groups = []
-                        try:
-                            partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                        except Exception:
-                            pass
-                        return render_template('auth/login.html', partner_groups=partner_groups)
-                    except Exception as query_err:
-                        try:
-                            import sys
-                            import traceback
-                            sys.stderr.write(f"Member login query error: {query_err}\n")
-                            sys.stderr.write(traceback.format_exc())
-                        except Exception:
-                            pass
-                        # Try to rollback and retry
-                        try:
-                            db.session.rollback()
-                            user = db.session.query(Member).filter(
-                                Member.username == username,
-                                Member.partner_group_id == partner_group_id_int,
-                                Member.role == 'member'
-                            ).first()
-                        except Exception as retry_err:
-                            try:
-                                import sys
-                                sys.stderr.write(f"Member login retry query error: {retry_err}\n")
-                            except Exception:
-                                pass
-                            flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                            partner_groups = []
-                            try:
-                                partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                            except Exception:
-                                pass
-                            return render_template('auth/login.html', partner_groups=partner_groups)
-                
-                if user:
-                    # Check password with error handling
-                    try:
-                        password_valid = user.check_password(password)
-                    except Exception as pwd_err:
-                            try:
-                                import sys
-                                sys.stderr.write(f"Login password check error: {pwd_err}\n")
-                            except Exception:
-                                pass
-                            flash('비밀번호 확인 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                            partner_groups = []
-                            try:
-                                partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                            except Exception:
-                                pass
-                            return render_template('auth/login.html', partner_groups=partner_groups)
-                    
-                    if password_valid:
-                        # Check approval status
-                        try:
-                            approval_status = getattr(user, 'approval_status', None)
-                            if approval_status != '승인':
-                                flash('회원가입 승인이 완료되지 않았습니다. 관리자 승인 후 이용하여 주세요.', 'warning')
-                                return redirect(url_for('login'))
-                            
-                            # Login user
-                            try:
-                                login_user(user, remember=True)  # remember=True로 세션 유지
-                                session.permanent = True  # 세션을 영구적으로 설정
-                                # 세션에 사용자 역할 저장 (템플릿에서 사용)
-                                session['user_role'] = getattr(user, 'role', 'member')
-                                # 세션에 사용자 이름 저장
-                                session['user_name'] = user.company_name if user.company_name else user.username
-                                # 회원사는 파트너그룹 대시보드로
-                                return redirect(url_for('partner_dashboard'))
-                            except Exception as login_err:
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Login user error: {login_err}\n")
-                                except Exception:
-                                    pass
-                                flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                                partner_groups = []
-                                try:
-                                    partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                                except Exception:
-                                    pass
-                                return render_template('auth/login.html', partner_groups=partner_groups)
-                        except Exception as status_err:
-                            try:
-                                import sys
-                                sys.stderr.write(f"Login approval check error: {status_err}\n")
-                            except Exception:
-                                pass
-                            flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                            partner_groups = []
-                            try:
-                                partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                            except Exception:
-                                pass
-                            return render_template('auth/login.html', partner_groups=partner_groups)
-                    else:
-                        flash('아이디 또는 비밀번호가 올바르지 않습니다.', 'danger')
-                else:
-                    flash('아이디 또는 비밀번호가 올바르지 않습니다.', 'danger')
-                    
-            except Exception as e:
-                try:
-                    import sys
-                    import traceback
-                    sys.stderr.write(f"Login processing error: {e}\n")
-                    sys.stderr.write(traceback.format_exc())
-                except Exception:
-                    pass
-                flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-        
-        # 기본적으로 파트너그룹 목록과 함께 로그인 페이지 반환
-        partner_groups = []
-        if db is not None:
-            try:
-                partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-            except Exception:
-                pass
-        return render_template('auth/login.html', partner_groups=partner_groups)
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Login route error: {e}\n")
-            sys.stderr.write(traceback.format_exc())
-        except Exception:
-            pass
-        flash('로그인 페이지 로드 중 오류가 발생했습니다.', 'danger')
-        try:
-            partner_groups = []
-            return render_template('auth/login.html', partner_groups=partner_groups)
-        except Exception:
-            return "로그인 페이지를 불러올 수 없습니다.", 500
-
-
-@app.route('/logout')
-def logout():
-    # Flask-Login 사용자 로그아웃
-    try:
-        from flask_login import logout_user
-        logout_user()
-    except Exception:
-        pass
-    
-    # 세션 정보 정리 (Flask-Login 및 세션 기반 모두)
-    session.pop('user_role', None)
-    session.pop('user_name', None)
-    session.pop('admin_selected_partner_group_id', None)
-    session.pop('admin_selected_partner_group_name', None)
-    session.pop('partner_group_id', None)
-    session.pop('partner_group_name', None)
-    session.pop('user_type', None)
-    session.pop('username', None)
-    
-    return redirect(url_for('login'))
-
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    try:
-        ensure_initialized()  # Initialize on first request for Vercel
-        
-        # GET 요청: 파트너그룹 목록을 가져와서 템플릿에 전달
-        if request.method == 'GET':
-            partner_groups = []
-            if db is not None:
-                try:
-                    partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                except Exception as e:
-                    try:
-                        import sys
-                        sys.stderr.write(f"Error fetching partner groups for register: {e}\n")
-                    except Exception:
-                        pass
-            return render_template('auth/register.html', partner_groups=partner_groups)
-        
-        # POST 요청: 회원가입 처리
-        if request.method == 'POST':
-            partner_group_id = request.form.get('partner_group_id', '').strip()
-            member_type = request.form.get('member_type', '법인사업자').strip()  # 법인사업자 또는 개인사업자
-            privacy_agreement = request.form.get('privacy_agreement') == 'on'  # 개인정보이용동의 체크박스
-            terms_agreement = request.form.get('terms_agreement') == 'on'  # 가입자 안내 동의 체크박스
-            username = request.form.get('username', '').strip()
-            password = request.form.get('password', '')
-            company_name = request.form.get('company_name', '').strip()
-            position = request.form.get('position', '').strip()
-            full_name = request.form.get('full_name', '').strip()
-            license_number = request.form.get('license_number', '').strip()
-            address = request.form.get('address', '').strip()
-            business_number = request.form.get('business_number', '').strip()
-            car_dealership_number = request.form.get('car_dealership_number', '').strip()
-            corporation_number = request.form.get('corporation_number', '').strip()
-            representative = request.form.get('representative', '').strip()
-            phone = request.form.get('phone', '').strip()
-            mobile = request.form.get('mobile', '').strip()
-            email = request.form.get('email', '').strip()
-            
-            # 가입자 안내 동의 필수 체크
-            if not terms_agreement:
-                flash('가입자 안내를 확인하고 내용 숙지에 동의해주세요.', 'warning')
-                partner_groups = []
-                if db is not None:
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                return render_template('auth/register.html', partner_groups=partner_groups)
-
-            # 개인사업자 선택 시 개인정보이용동의 필수 체크
-            if member_type == '개인사업자' and not privacy_agreement:
-                flash('개인 회원가입 시 개인정보이용동의서에 동의해주세요.', 'warning')
-                partner_groups = []
-                if db is not None:
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                return render_template('auth/register.html', partner_groups=partner_groups)
-
-            # 법인/개인 공통: 주민등록번호/법인번호 필수 체크
-            if not corporation_number:
-                if member_type == '개인사업자':
-                    flash('대표자주민등록번호를 입력해주세요.', 'warning')
-                else:
-                    flash('법인번호를 입력해주세요.', 'warning')
-                partner_groups = []
-                if db is not None:
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                return render_template('auth/register.html', partner_groups=partner_groups)
-
-            if not partner_group_id:
-                flash('파트너그룹을 선택해주세요.', 'warning')
-                partner_groups = []
-                if db is not None:
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                return render_template('auth/register.html', partner_groups=partner_groups)
-
-            if db is None:
-                flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-                partner_groups = []
-                return render_template('auth/register.html', partner_groups=partner_groups)
-            
-            try:
-                # 파트너그룹 존재 확인
-                try:
-                    partner_group_id_int = int(partner_group_id)
-                    partner_group = db.session.get(PartnerGroup, partner_group_id_int)
-                    if not partner_group:
-                        flash('선택한 파트너그룹이 존재하지 않습니다.', 'danger')
-                        partner_groups = []
-                        try:
-                            partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                        except Exception:
-                            pass
-                        return render_template('auth/register.html', partner_groups=partner_groups)
-                except ValueError:
-                    flash('잘못된 파트너그룹입니다.', 'danger')
-                    partner_groups = []
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                    return render_template('auth/register.html', partner_groups=partner_groups)
-                
-                # Check for duplicate username within the same partner group
-                if db.session.query(Member).filter(
-                    Member.username == username,
-                    Member.partner_group_id == partner_group_id_int
-                ).first():
-                    flash('해당 파트너그룹에 이미 존재하는 아이디입니다.', 'danger')
-                    partner_groups = []
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                    return render_template('auth/register.html', partner_groups=partner_groups)
-                
-                # Check for duplicate business number
-                if business_number and db.session.query(Member).filter_by(business_number=business_number).first():
-                    flash('이미 등록된 사업자번호입니다.', 'danger')
-                    partner_groups = []
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                    return render_template('auth/register.html', partner_groups=partner_groups)
-
-                # Check for duplicate car dealership number
-                if car_dealership_number and db.session.query(Member).filter_by(car_dealership_number=car_dealership_number).first():
-                    flash('이미 등록된 자동차관리업 등록번호입니다.', 'danger')
-                    partner_groups = []
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                    return render_template('auth/register.html', partner_groups=partner_groups)
-            except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Register duplicate check error: {e}\n")
-                except Exception:
-                    pass
-                flash('회원 정보 확인 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                return render_template('auth/register.html')
-
-            # 파일 업로드 처리
-            registration_cert_path = None
-            license_attachment_path = None
-            if 'registration_cert' in request.files:
-                try:
-                    file = request.files['registration_cert']
-                    if file and file.filename:
-                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
-                        file_ext = os.path.splitext(file.filename)[1].lower()
-                        if file_ext in allowed_extensions:
-                            # 업로드 디렉토리 확인 및 생성
-                            os.makedirs(UPLOAD_DIR, exist_ok=True)
-                            
-                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                            filename = f"{business_number}_{timestamp}{file_ext}"
-                            filepath = os.path.join(UPLOAD_DIR, filename)
-                            file.save(filepath)
-                            
-                            # 파일이 실제로 저장되었는지 확인
-                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                registration_cert_path = os.path.join('uploads', filename)
-                                print(f"Registration cert saved successfully: {registration_cert_path}")
-                            else:
-                                print(f"ERROR: Registration cert file was not saved properly. Path: {filepath}")
-                        else:
-                            print(f"Invalid file extension: {file_ext}")
-                except Exception as e:
-                    try:
-                        import sys
-                        import traceback
-                        sys.stderr.write(f"File upload error: {e}\n")
-                        sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                    except Exception:
-                        pass
-                    # Continue without file - not critical
-
-            # 종사원증 파일 업로드 처리
-            if 'license_attachment' in request.files:
-                try:
-                    file = request.files['license_attachment']
-                    if file and file.filename:
-                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
-                        file_ext = os.path.splitext(file.filename)[1].lower()
-                        if file_ext in allowed_extensions:
-                            # 업로드 디렉토리 확인 및 생성
-                            os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                            filename = f"{business_number}_license_{timestamp}{file_ext}"
-                            filepath = os.path.join(UPLOAD_DIR, filename)
-                            file.save(filepath)
-
-                            # 파일이 실제로 저장되었는지 확인
-                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                license_attachment_path = os.path.join('uploads', filename)
-                                print(f"License attachment saved successfully: {license_attachment_path}")
-                            else:
-                                print(f"ERROR: License attachment file was not saved properly. Path: {filepath}")
-                        else:
-                            print(f"Invalid license file extension: {file_ext}")
-                except Exception as e:
-                    try:
-                        import sys
-                        import traceback
-                        sys.stderr.write(f"License file upload error: {e}\n")
-                        sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                    except Exception:
-                        pass
-                    # Continue without file - not critical
-
-            try:
-                # 회원가입 시 승인상태는 항상 '신청'으로 고정, 등급은 항상 'member'로 고정
-                # 관리자 페이지 접근은 admin_required 데코레이터에서 role='admin' 및 approval_status='승인' 체크로 차단됨
-                # 개발 환경에서는 자동 승인, 운영 환경에서는 승인 대기
-                from os import environ
-                is_development = environ.get('FLASK_ENV') == 'development'
-
-                member = Member(
-                    partner_group_id=partner_group_id_int,
-                    username=username,
-                    company_name=company_name,
-                    position=position,
-                    full_name=full_name,
-                    license_number=license_number,
-                    address=address,
-                    business_number=business_number,
-                    car_dealership_number=car_dealership_number,
-                    corporation_number=corporation_number,
-                    representative=representative,
-                    phone=phone,
-                    mobile=mobile,
-                    email=email,
-                    registration_cert_path=registration_cert_path,
-                    license_attachment_path=license_attachment_path,
-                    member_type=member_type,
-                    privacy_agreement=privacy_agreement if member_type == '개인사업자' else False,
-                    approval_status='승인' if is_development else '신청',  # 개발 환경에서는 자동 승인
-                    role='member',  # 회원가입 시 항상 'member'로 고정 (관리자 페이지 접근 불가)
-                )
-                member.set_password(password)
-                db.session.add(member)
-                
-                # 커밋 전에 세션 상태 확인 및 디버깅
-                try:
-                    import sys
-                    sys.stderr.write(f"Register: Adding member {username} to session\n")
-                    sys.stderr.write(f"Register: Session pending objects: {len(db.session.new)}\n")
-                except Exception:
-                    pass
-                
-                # 커밋 시도
-                commit_success = safe_commit()
-                
-                if not commit_success:
-                    # 커밋 실패 시 상세 로그 출력
-                    try:
-                        import sys
-                        import traceback
-                        sys.stderr.write(f"Register: Commit failed for member {username}\n")
-                        sys.stderr.write(f"Register: Traceback: {traceback.format_exc()}\n")
-                    except Exception:
-                        pass
-                    flash('회원가입 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                    partner_groups = []
-                    try:
-                        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                    except Exception:
-                        pass
-                    return render_template('auth/register.html', partner_groups=partner_groups)
-                
-                # 커밋 성공 확인
-                try:
-                    import sys
-                    sys.stderr.write(f"Register: Successfully committed member {username} (ID: {member.id})\n")
-                    # 커밋 후 다시 조회하여 확인
-                    verify_member = db.session.get(Member, member.id)
-                    if verify_member:
-                        sys.stderr.write(f"Register: Verified member {username} exists in database\n")
-                    else:
-                        sys.stderr.write(f"Register: WARNING - Member {username} not found after commit!\n")
-                except Exception as verify_err:
-                    try:
-                        import sys
-                        sys.stderr.write(f"Register: Verification error: {verify_err}\n")
-                    except Exception:
-                        pass
-                
-                # 개발 환경에서는 즉시 로그인 가능
-                from os import environ
-                is_development = environ.get('FLASK_ENV') == 'development'
-
-                if is_development:
-                    flash('회원가입이 완료되었습니다. 즉시 로그인하여 이용하실 수 있습니다.', 'success')
-                else:
-                    flash('신청이 접수되었습니다. 파트너그룹 관리자 승인 후 로그인 가능합니다.', 'success')
-                return redirect(url_for('login'))
-            except Exception as e:
-                try:
-                    import sys
-                    import traceback
-                    sys.stderr.write(f"Register member creation error: {e}\n")
-                    sys.stderr.write(f"Register: Traceback: {traceback.format_exc()}\n")
-                except Exception:
-                    pass
-                # 예외 발생 시 롤백
-                try:
-                    db.session.rollback()
-                except Exception:
-                    pass
-                flash('회원가입 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                partner_groups = []
-                try:
-                    partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-                except Exception:
-                    pass
-                return render_template('auth/register.html', partner_groups=partner_groups)
-
-        # 기본적으로 파트너그룹 목록과 함께 회원가입 페이지 반환
-        partner_groups = []
-        if db is not None:
-            try:
-                partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-            except Exception:
-                pass
-        return render_template('auth/register.html', partner_groups=partner_groups)
-    except Exception as e:
-        try:
-            import sys
-            sys.stderr.write(f"Register route error: {e}\n")
-        except Exception:
-            pass
-        flash('회원가입 페이지 로드 중 오류가 발생했습니다.', 'danger')
-        try:
-            partner_groups = []
-            return render_template('auth/register.html', partner_groups=partner_groups)
-        except Exception:
-            return "회원가입 페이지를 불러올 수 없습니다.", 500
-
-
-# 전체관리자 대시보드 (요구사항의 전체대시보드페이지)
-@app.route('/admin/dashboard')
-@admin_required
-def admin_dashboard():
-    try:
-        ensure_initialized()
-        
-        # 통계 데이터 계산
-        total_partner_groups = 0
-        total_members = 0
-        total_insurance = 0
-        
-        try:
-            total_partner_groups = db.session.query(PartnerGroup).count()
-        except Exception:
-            pass
-        
-        try:
-            total_members = db.session.query(Member).filter_by(role='member').count()
-        except Exception:
-            pass
-        
-        try:
-            total_insurance = db.session.query(InsuranceApplication).count()
-        except Exception:
-            pass
-        
-        return render_template('admin/dashboard.html',
-                             total_partner_groups=total_partner_groups,
-                             total_members=total_members,
-                             total_insurance=total_insurance)
-    except Exception as e:
-        try:
-            import sys
-            sys.stderr.write(f"Admin dashboard route error: {e}\n")
-        except Exception:
-            pass
-        flash('전체대시보드 로드 중 오류가 발생했습니다.', 'danger')
-        try:
-            return render_template('admin/dashboard.html',
-                                 total_partner_groups=0,
-                                 total_members=0,
-                                 total_insurance=0)
-        except Exception:
-            try:
-                return redirect(url_for('login'))
-            except Exception:
-                return "전체대시보드를 불러올 수 없습니다.", 500
-
-# 보험료 설정 페이지
-@app.route('/admin/premium-settings', methods=['GET', 'POST'])
-@admin_required
-def admin_premium_settings():
-    try:
-        ensure_initialized()
-        
-        if request.method == 'POST':
-            action = request.form.get('action')
-            
-            if action == 'add':
-                # 새 보험료 추가
-                vehicle_type = request.form.get('vehicle_type', '').strip()
-                premium_amount = request.form.get('premium_amount', '').strip()
-                
-                if not vehicle_type or not premium_amount:
-                    flash('차종분류와 보험료는 필수입니다.', 'warning')
-                else:
-                    try:
-                        premium_amount_int = int(premium_amount)
-                        
-                        # 중복 확인
-                        existing = db.session.query(PremiumSetting).filter_by(vehicle_type=vehicle_type).first()
-                        if existing:
-                            flash('이미 존재하는 차종분류입니다.', 'danger')
-                        else:
-                            new_setting = PremiumSetting(
-                                vehicle_type=vehicle_type,
-                                premium_amount=premium_amount_int
-                            )
-                            db.session.add(new_setting)
-                            
-                            if safe_commit():
-                                flash('보험료가 추가되었습니다.', 'success')
-                            else:
-                                flash('보험료 추가 중 오류가 발생했습니다.', 'danger')
-                    except ValueError:
-                        flash('보험료는 숫자로 입력해주세요.', 'warning')
-            
-            elif action == 'save':
-                # 보험료 수정
-                setting_id = request.form.get('setting_id')
-                vehicle_type = request.form.get('vehicle_type', '').strip()
-                premium_amount = request.form.get('premium_amount', '').strip()
-                
-                if setting_id and vehicle_type and premium_amount:
-                    try:
-                        premium_amount_int = int(premium_amount)
-                        setting = db.session.get(PremiumSetting, int(setting_id))
-                        
-                        if setting:
-                            # 차종분류 변경 시 중복 확인
-                            if setting.vehicle_type != vehicle_type:
-                                existing = db.session.query(PremiumSetting).filter_by(vehicle_type=vehicle_type).first()
-                                if existing:
-                                    flash('이미 존재하는 차종분류입니다.', 'danger')
-                                    return redirect(url_for('admin_premium_settings'))
-                            
-                            setting.vehicle_type = vehicle_type
-                            setting.premium_amount = premium_amount_int
-                            setting.updated_at = datetime.now(KST)
-                            
-                            if safe_commit():
-                                flash('보험료가 수정되었습니다.', 'success')
-                            else:
-                                flash('보험료 수정 중 오류가 발생했습니다.', 'danger')
-                        else:
-                            flash('보험료 설정을 찾을 수 없습니다.', 'danger')
-                    except ValueError:
-                        flash('보험료는 숫자로 입력해주세요.', 'warning')
-            
-            elif action == 'delete':
-                # 보험료 삭제
-                setting_id = request.form.get('setting_id')
-                if setting_id:
-                    setting = db.session.get(PremiumSetting, int(setting_id))
-                    if setting:
-                        db.session.delete(setting)
-                        if safe_commit():
-                            flash('보험료가 삭제되었습니다.', 'success')
-                        else:
-                            flash('보험료 삭제 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('보험료 설정을 찾을 수 없습니다.', 'danger')
-            
-            return redirect(url_for('admin_premium_settings'))
-        
-        # GET 요청: 보험료 목록 조회
-        edit_id = request.args.get('edit_id')
-        settings = db.session.query(PremiumSetting).order_by(PremiumSetting.vehicle_type).all()
-        
-        return render_template('admin/premium_settings.html',
-                             settings=settings,
-                             edit_id=edit_id)
-    
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Premium settings route error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        flash('보험료 설정 페이지 로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('admin_dashboard'))
-
-# 파트너그룹 대시보드 (요구사항의 파트너그룹별 대시보드페이지)
-@app.route('/partner/dashboard')
-def partner_dashboard():
-    try:
-        ensure_initialized()
-        
-        # 세션 기반 파트너그룹 관리자 확인
-        if 'user_type' in session and session['user_type'] == 'partner_admin':
-            # 파트너그룹 관리자
-            partner_group_id = session.get('partner_group_id')
-            partner_group_name = session.get('partner_group_name')
-            
-            # 통계 계산
-            total_members = 0
-            monthly_insurance = 0
-            pending_approvals = 0
-            
-            try:
-                if db is not None and partner_group_id:
-                    try:
-                        partner_group_id_int = int(partner_group_id)
-                    except (ValueError, TypeError):
-                        partner_group_id_int = None
-                    
-                    if partner_group_id_int:
-                        # 총 회원사: 해당 파트너그룹의 role='member'인 회원 수
-                        total_members = db.session.query(Member).filter(
-                            Member.partner_group_id == partner_group_id_int,
-                            Member.role == 'member'
-                        ).count()
-                        
-                        # 이달 가입: 이번 달에 가입한 회원 수 (Member의 created_at 기준)
-                        now = datetime.now(KST)
-                        start_of_month = datetime(now.year, now.month, 1, tzinfo=KST)
-                        if now.month == 12:
-                            end_of_month = datetime(now.year + 1, 1, 1, tzinfo=KST)
-                        else:
-                            end_of_month = datetime(now.year, now.month + 1, 1, tzinfo=KST)
-                        
-                        monthly_insurance = db.session.query(Member).filter(
-                            Member.partner_group_id == partner_group_id_int,
-                            Member.role == 'member',
-                            Member.created_at.is_not(None),
-                            Member.created_at >= start_of_month,
-                            Member.created_at < end_of_month
-                        ).count()
-                        
-                        # 승인 대기: approval_status가 '신청'인 회원 수 (승인되지 않은 회원)
-                        pending_approvals = db.session.query(Member).filter(
-                            Member.partner_group_id == partner_group_id_int,
-                            Member.role == 'member',
-                            Member.approval_status == '신청'
-                        ).count()
-            except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Partner dashboard stats error: {e}\n")
-                except Exception:
-                    pass
-            
-            return render_template('partner/dashboard.html', 
-                                 is_partner_admin=True,
-                                 partner_group_id=partner_group_id,
-                                 partner_group_name=partner_group_name,
-                                 total_members=total_members,
-                                 monthly_insurance=monthly_insurance,
-                                 pending_approvals=pending_approvals)
-        
-        # Flask-Login 기반 사용자 확인
-        try:
-            from flask_login import current_user
-            is_auth = getattr(current_user, 'is_authenticated', False)
-        except Exception:
-            is_auth = False
-        
-        if not is_auth:
-            flash('로그인이 필요합니다.', 'warning')
-            return redirect(url_for('login'))
-        
-        # 세션에서 user_role 확인 (더 안전)
-        user_role = session.get('user_role', 'member')
-        
-        # 세션에 역할이 없으면 DB에서 조회
-        if user_role == 'member' and hasattr(current_user, 'id'):
-            try:
-                if db is not None:
-                    db_role = db.session.query(Member.role).filter(Member.id == int(current_user.id)).scalar()
-                    if db_role:
-                        user_role = db_role
-                        session['user_role'] = db_role
-            except Exception:
-                # fallback: 속성 접근 시도
-                try:
-                    user_role = getattr(current_user, 'role', 'member')
-                    if user_role:
-                        session['user_role'] = user_role
-                except Exception:
-                    pass
-        
-        # partner_admin 역할인 경우 추가 검증
-        if user_role == 'partner_admin' and hasattr(current_user, 'id'):
-            try:
-                # DB에서 실제 역할과 승인 상태 확인
-                member = db.session.get(Member, current_user.id)
-                if not member or member.role != 'partner_admin' or member.approval_status != '승인':
-                    flash('관리자 권한이 없거나 승인되지 않은 계정입니다.', 'danger')
-                    return redirect(url_for('login'))
-                
-                # 파트너그룹 정보 업데이트
-                if member.partner_group_id:
-                    session['user_type'] = 'partner_admin'
-                    session['partner_group_id'] = member.partner_group_id
-                    session['user_role'] = 'partner_admin'
-                    
-                    # 파트너그룹 이름 조회
-                    partner_group = db.session.get(PartnerGroup, member.partner_group_id)
-                    if partner_group:
-                        session['partner_group_name'] = partner_group.name
-            except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Partner admin verification error: {e}\n")
-                except Exception:
-                    pass
-        
-        # 전체관리자가 파트너그룹을 선택한 경우
-        if user_role == 'admin' and 'admin_selected_partner_group_id' in session:
-            partner_group_id = session.get('admin_selected_partner_group_id')
-            partner_group_name = session.get('admin_selected_partner_group_name', '')
-            
-            # 통계 계산 (관리자가 파트너그룹을 선택한 경우에도 표시)
-            total_members = 0
-            monthly_insurance = 0
-            pending_approvals = 0
-            
-            try:
-                if db is not None and partner_group_id:
-                    try:
-                        partner_group_id_int = int(partner_group_id)
-                    except (ValueError, TypeError):
-                        partner_group_id_int = None
-                    
-                    if partner_group_id_int:
-                        # 총 회원사: 해당 파트너그룹의 role='member'인 회원 수
-                        total_members = db.session.query(Member).filter(
-                            Member.partner_group_id == partner_group_id_int,
-                            Member.role == 'member'
-                        ).count()
-                        
-                        # 이달 가입: 이번 달에 가입한 회원 수 (Member의 created_at 기준)
-                        now = datetime.now(KST)
-                        start_of_month = datetime(now.year, now.month, 1, tzinfo=KST)
-                        if now.month == 12:
-                            end_of_month = datetime(now.year + 1, 1, 1, tzinfo=KST)
-                        else:
-                            end_of_month = datetime(now.year, now.month + 1, 1, tzinfo=KST)
-                        
-                        monthly_insurance = db.session.query(Member).filter(
-                            Member.partner_group_id == partner_group_id_int,
-                            Member.role == 'member',
-                            Member.created_at.is_not(None),
-                            Member.created_at >= start_of_month,
-                            Member.created_at < end_of_month
-                        ).count()
-                        
-                        # 승인 대기: approval_status가 '신청'인 회원 수 (승인되지 않은 회원)
-                        pending_approvals = db.session.query(Member).filter(
-                            Member.partner_group_id == partner_group_id_int,
-                            Member.role == 'member',
-                            Member.approval_status == '신청'
-                        ).count()
-            except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Admin partner dashboard stats error: {e}\n")
-                except Exception:
-                    pass
-            
-            return render_template('partner/dashboard.html',
-                                 is_partner_admin=False,
-                                 partner_group_id=partner_group_id,
-                                 partner_group_name=partner_group_name,
-                                 is_admin=True,
-                                 total_members=total_members,
-                                 monthly_insurance=monthly_insurance,
-                                 pending_approvals=pending_approvals)
-        
-        # 회원사 로그인
-        if user_role == 'member':
-            try:
-                partner_group_id = None
-                partner_group_name = ''
-                if hasattr(current_user, 'partner_group_id') and current_user.partner_group_id:
-                    partner_group_id = current_user.partner_group_id
-                    if hasattr(current_user, 'partner_group') and current_user.partner_group:
-                        partner_group_name = current_user.partner_group.name
-                    else:
-                        # DB에서 조회
-                        if db is not None:
-                            partner_group = db.session.get(PartnerGroup, partner_group_id)
-                            if partner_group:
-                                partner_group_name = partner_group.name
-                
-                if partner_group_id:
-                    return render_template('partner/dashboard.html',
-                                         is_partner_admin=False,
-                                         partner_group_id=partner_group_id,
-                                         partner_group_name=partner_group_name)
-            except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Partner dashboard member error: {e}\n")
-                except Exception:
-                    pass
-        
-        # 전체관리자이지만 파트너그룹을 선택하지 않은 경우
-        # admin_dashboard는 @admin_required로 보호되므로 직접 접근해야 함
-        # 하지만 무한 루프를 방지하기 위해 세션 플래그 사용
-        if user_role == 'admin':
-            # admin_redirect_attempt 플래그가 없으면 한 번만 리다이렉트 시도
-            if 'admin_redirect_attempt' not in session:
-                session['admin_redirect_attempt'] = 1
-                return redirect(url_for('admin_dashboard'))
-            else:
-                # 이미 리다이렉트 시도했으면 플래그 제거하고 로그인으로
-                session.pop('admin_redirect_attempt', None)
-                flash('전체관리자 대시보드 접근 오류가 발생했습니다. 다시 로그인해주세요.', 'warning')
-                return redirect(url_for('login'))
-        
-        flash('파트너그룹 접근 권한이 없습니다.', 'warning')
-        return redirect(url_for('login'))
-                
-    except Exception as e:
-        try:
-            import sys
-            sys.stderr.write(f"Partner dashboard route error: {e}\n")
-        except Exception:
-            pass
-        flash('대시보드 로드 중 오류가 발생했습니다.', 'danger')
-        try:
-            return render_template('partner/dashboard.html')
-        except Exception:
-            try:
-                return redirect(url_for('login'))
-            except Exception:
-                return "대시보드를 불러올 수 없습니다.", 500
-
-# 기존 dashboard는 리다이렉트 처리
-@app.route('/dashboard')
-def dashboard():
-    try:
-        # 로그인 상태 확인
-        try:
-            from flask_login import current_user
-            is_auth = getattr(current_user, 'is_authenticated', False)
-        except Exception:
-            is_auth = False
-        
-        if not is_auth and 'user_type' not in session:
-            return redirect(url_for('login'))
-        
-        # 세션 기반 파트너그룹 관리자
-        if 'user_type' in session and session['user_type'] == 'partner_admin':
-            return redirect(url_for('partner_dashboard'))
-        
-        # Flask-Login 기반 사용자
-        if is_auth:
-            try:
-                # 세션에서 user_role 확인 (더 안전)
-                user_role = session.get('user_role', 'member')
-                
-                # 세션에 역할이 없으면 DB에서 조회
-                if user_role == 'member' and hasattr(current_user, 'id'):
-                    try:
-                        if db is not None:
-                            db_role = db.session.query(Member.role).filter(Member.id == int(current_user.id)).scalar()
-                            if db_role:
-                                user_role = db_role
-                                session['user_role'] = db_role
-                    except Exception:
-                        pass
-                
-                # 전체관리자가 파트너그룹을 선택한 경우 파트너그룹 섹션으로
-                if user_role == 'admin' and 'admin_selected_partner_group_id' in session:
-                    return redirect(url_for('partner_dashboard'))
-                elif user_role == 'admin':
-                    return redirect(url_for('admin_dashboard'))
-                else:
-                    return redirect(url_for('partner_dashboard'))
-            except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Dashboard role check error: {e}\n")
-                except Exception:
-                    pass
-                # 오류 발생 시 기본적으로 파트너 대시보드로
-                return redirect(url_for('partner_dashboard'))
-        
-        return redirect(url_for('login'))
-    except Exception as e:
-        try:
-            import sys
-            sys.stderr.write(f"Dashboard redirect error: {e}\n")
-        except Exception:
-            pass
-        return redirect(url_for('login'))
-
-
-@app.route('/uploads/<filename>')
-def uploaded_file(filename):
-    """업로드된 파일 제공 - 로그인한 사용자만 접근 가능"""
-    try:
-        # Flask-Login의 세션 확인
-        from flask_login import current_user
-        
-        # 세션 쿠키 확인
-        session_cookie = request.cookies.get('hyundai_session') or request.cookies.get('session')
-        
-        # Flask-Login의 세션 키 확인 (Flask-Login은 '_user_id'를 사용)
-        flask_login_user_id = session.get('_user_id', None)
-        
-        # current_user 확인
-        is_authenticated = False
-        try:
-            is_authenticated = hasattr(current_user, 'is_authenticated') and current_user.is_authenticated
-        except Exception:
-            pass
-        
-        # 세션 쿠키가 있거나 Flask-Login 세션이 있으면 허용
-        if not session_cookie and not flask_login_user_id and not is_authenticated:
-            import sys
-            sys.stderr.write(f"File access denied: No session. Cookies: {list(request.cookies.keys())}, Session keys: {list(session.keys())}\n")
-            return redirect(url_for('login', next=request.url))
-        
-        # 보안: 파일명 검증 (경로 조작 방지)
-        if '..' in filename or '/' in filename or '\\' in filename:
-            abort(403, description="잘못된 파일 요청입니다.")
-        
-        filepath = os.path.join(UPLOAD_DIR, filename)
-        
-        # 파일 존재 확인
-        if not os.path.exists(filepath):
-            try:
-                import sys
-                sys.stderr.write(f"File not found: {filepath}\n")
-            except Exception:
-                pass
-            abort(404, description="파일을 찾을 수 없습니다.")
-        
-        # MIME 타입 자동 감지
-        import mimetypes
-        mimetype = mimetypes.guess_type(filepath)[0] or 'application/octet-stream'
-        
-        # 파일 제공 (브라우저에서 직접 열기)
-        # 세션 쿠키를 명시적으로 설정하여 응답에 포함
-        response = send_file(
-            filepath, 
-            mimetype=mimetype,
-            as_attachment=False,
-            download_name=filename
-        )
-        
-        return response
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"File download error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        abort(500, description="파일을 불러오는 중 오류가 발생했습니다.")
-
-
-@app.route('/terms')
-def terms():
-    ensure_initialized()  # Ensure initialization
-    return render_template('terms.html')
-
-
-@app.route('/terms/guide.pdf')
-@login_required
-def terms_guide_pdf():
-    """상품안내 PDF를 브라우저에 표시 (inline)"""
-    try:
-        pdf_path = os.path.join(BASE_DIR, '@중고차 상품화자동차보험_상품안내_부산.pdf')
-        return send_file(pdf_path, mimetype='application/pdf')
-    except Exception:
-        flash('안내 문서를 불러올 수 없습니다.', 'danger')
-        return redirect(url_for('terms'))
-
-
-@app.route('/terms/policy/download')
-@login_required
-def terms_policy_download():
-    """약관 PDF 다운로드"""
-    try:
-        pdf_path = os.path.join(BASE_DIR, '중고차 매매업자 자동차보험 약관.pdf')
-        return send_file(pdf_path, as_attachment=True, download_name='중고차_매매업자_자동차보험_약관.pdf', mimetype='application/pdf')
-    except Exception:
-        flash('약관 파일을 다운로드할 수 없습니다.', 'danger')
-        return redirect(url_for('terms'))
-
-
-def parse_date(value: str):
-    if not value:
-        return None
-    try:
-        return datetime.strptime(value, '%Y-%m-%d').date()
-    except Exception:
-        return None
-
-
-def parse_datetime(value: str):
-    if not value:
-        return None
-    try:
-        dt = datetime.strptime(value, '%Y-%m-%d %H:%M')
-        return _ensure_aware(dt)
-    except ValueError:
-        try:
-            dt = datetime.strptime(value, '%Y-%m-%d')
-            return _ensure_aware(dt)
-        except Exception:
-            return None
-    except Exception:
-        return None
-
-
-@app.route('/insurance', methods=['GET', 'POST'])
-@login_required
-def insurance():
-    ensure_initialized()  # Ensure initialization
-    if request.method == 'POST':
-        action = request.form.get('action')
-        
-        if action == 'save' or action == 'delete':
-            # 저장/삭제 작업
-            row_id = request.form.get('row_id')
-            if row_id:
-                row = db.session.get(InsuranceApplication, int(row_id))
-                if row and row.created_by_member_id == current_user.id:
-                    if action == 'delete':
-                        if not row.approved_at:  # 조합승인 전까지만 삭제 가능
-                            try:
-                                row_id = row.id
-                                db.session.delete(row)
-                                
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Insurance delete (/insurance): Deleting application ID {row_id}\n")
-                                except Exception:
-                                    pass
-                                
-                                commit_success = safe_commit()
-                                
-                                if commit_success:
-                                    try:
-                                        import sys
-                                        sys.stderr.write(f"Insurance delete (/insurance): Successfully deleted ID {row_id}\n")
-                                    except Exception:
-                                        pass
-                                    flash('삭제되었습니다.', 'success')
-                                else:
-                                    try:
-                                        import sys
-                                        import traceback
-                                        sys.stderr.write(f"Insurance delete (/insurance): Commit failed for ID {row_id}\n")
-                                        sys.stderr.write(f"Insurance delete traceback: {traceback.format_exc()}\n")
-                                    except Exception:
-                                        pass
-                                    flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                            except Exception as e:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Insurance deletion error: {e}\n")
-                                    sys.stderr.write(f"Insurance deletion traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                try:
-                                    db.session.rollback()
-                                except Exception:
-                                    pass
-                                flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                        else:
-                            flash('조합승인 후에는 삭제할 수 없습니다.', 'warning')
-                    elif action == 'save':
-                        if not row.approved_at:  # 조합승인 전까지만 수정 가능
-                            try:
-                                row_id = row.id
-                                # 편집 모드에서 온 경우에만 모든 필드 업데이트
-                                if request.form.get('car_plate'):
-                                    row.car_plate = request.form.get('car_plate', '').strip()
-                                    row.vin = request.form.get('vin', '').strip()
-                                    row.car_name = request.form.get('car_name', '').strip()
-                                    row.car_registered_at = parse_date(request.form.get('car_registered_at'))
-                                # 비고는 항상 업데이트 가능
-                                row.memo = request.form.get('memo', '').strip()
-                                
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Insurance save (/insurance): Updating application ID {row_id}\n")
-                                except Exception:
-                                    pass
-                                
-                                commit_success = safe_commit()
-                                
-                                if commit_success:
-                                    try:
-                                        import sys
-                                        verify_app = db.session.get(InsuranceApplication, row_id)
-                                        if verify_app:
-                                            sys.stderr.write(f"Insurance save (/insurance): Verified application ID {row_id} exists\n")
-                                        else:
-                                            sys.stderr.write(f"Insurance save (/insurance): WARNING - Application ID {row_id} not found after commit!\n")
-                                    except Exception:
-                                        pass
-                                    flash('저장되었습니다.', 'success')
-                                else:
-                                    try:
-                                        import sys
-                                        import traceback
-                                        sys.stderr.write(f"Insurance save (/insurance): Commit failed for ID {row_id}\n")
-                                        sys.stderr.write(f"Insurance save traceback: {traceback.format_exc()}\n")
-                                    except Exception:
-                                        pass
-                                    flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-                            except Exception as e:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Insurance update error: {e}\n")
-                                    sys.stderr.write(f"Insurance update traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                try:
-                                    db.session.rollback()
-                                except Exception:
-                                    pass
-                                flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-                        else:
-                            flash('조합승인 후에는 수정할 수 없습니다.', 'warning')
-            return redirect(url_for('insurance'))
-        
-        # 신규 가입
-        car_plate = request.form.get('car_plate', '').strip()
-        vin = request.form.get('vin', '').strip()
-        car_name = request.form.get('car_name', '').strip()
-        car_registered_at = parse_date(request.form.get('car_registered_at'))
-        memo = request.form.get('memo', '').strip()
-
-        try:
-            app_row = InsuranceApplication(
-                insured_code=current_user.business_number or '',
-                contractor_code='부산자동차매매사업자조합',
-                car_plate=car_plate,
-                vin=vin,
-                car_name=car_name,
-                car_registered_at=car_registered_at,
-                premium=9500,
-                memo=memo,
-                created_by_member_id=current_user.id,
-            )
-            db.session.add(app_row)
-            
-            try:
-                import sys
-                sys.stderr.write(f"Insurance application (/insurance): Adding {car_plate} to session\n")
-            except Exception:
-                pass
-            
-            commit_success = safe_commit()
-            
-            if not commit_success:
-                try:
-                    import sys
-                    import traceback
-                    sys.stderr.write(f"Insurance application (/insurance): Commit failed for {car_plate}\n")
-                    sys.stderr.write(f"Insurance application traceback: {traceback.format_exc()}\n")
-                except Exception:
-                    pass
-                flash('신청 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-                return redirect(url_for('insurance'))
-            
-            # 커밋 성공 후 검증
-            try:
-                import sys
-                verify_app = db.session.get(InsuranceApplication, app_row.id)
-                if verify_app:
-                    sys.stderr.write(f"Insurance application (/insurance): Verified {car_plate} (ID: {app_row.id}) exists\n")
-                else:
-                    sys.stderr.write(f"Insurance application (/insurance): WARNING - {car_plate} not found after commit!\n")
-            except Exception:
-                pass
-            
-            flash('신청이 등록되었습니다.', 'success')
-            return redirect(url_for('insurance'))
-        except Exception as e:
-            try:
-                import sys
-                import traceback
-                sys.stderr.write(f"Insurance application (/insurance) error: {e}\n")
-                sys.stderr.write(f"Insurance application traceback: {traceback.format_exc()}\n")
-            except Exception:
-                pass
-            try:
-                db.session.rollback()
-            except Exception:
-                pass
-            flash('신청 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-            return redirect(url_for('insurance'))
-
-    # 검색
-    start_date = parse_date(request.args.get('start_date', ''))
-    end_date = parse_date(request.args.get('end_date', ''))
-    edit_id = request.args.get('edit_id')  # 편집 모드
-
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('dashboard'))
-    q = db.session.query(InsuranceApplication).filter_by(created_by_member_id=current_user.id)
-    if start_date:
-        q = q.filter(
-            db.or_(
-                db.and_(InsuranceApplication.start_at.is_not(None),
-                       InsuranceApplication.start_at >= datetime.combine(start_date, datetime.min.time()).replace(tzinfo=KST)),
-                db.and_(InsuranceApplication.start_at.is_(None),
-                       InsuranceApplication.created_at >= datetime.combine(start_date, datetime.min.time()).replace(tzinfo=KST))
-            )
-        )
-    if end_date:
-        q = q.filter(
-            db.or_(
-                db.and_(InsuranceApplication.start_at.is_not(None),
-                       InsuranceApplication.start_at <= datetime.combine(end_date, datetime.max.time()).replace(tzinfo=KST)),
-                db.and_(InsuranceApplication.start_at.is_(None),
-                       InsuranceApplication.created_at <= datetime.combine(end_date, datetime.max.time()).replace(tzinfo=KST))
-            )
-        )
-
-    rows = q.order_by(InsuranceApplication.created_at.desc()).all()
-    # 상태 재계산
-    changed = False
-    for r in rows:
-        old_status = r.status
-        r.recompute_status()
-        if r.status != old_status:
-            changed = True
-    if changed:
-        safe_commit()  # Don't show error if status update fails, just log it
-
-    # Build view models with proper timezone formatting
-    def fmt_display_safe(dt):
-        if not dt:
-            return ''
-        try:
-            # Ensure timezone-aware datetime and convert to KST
-            if dt.tzinfo is None:
-                # If naive, assume it's already in KST
-                local_dt = dt.replace(tzinfo=KST)
-            else:
-                # Convert to KST
-                local_dt = dt.astimezone(KST)
-            return local_dt.strftime('%Y-%m-%d %H:%M')
-        except Exception:
-            return ''
-
-    items = []
-    for r in rows:
-        items.append({
-            'id': r.id,
-            'created_at_str': fmt_display_safe(r.created_at),
-            'start_at_str': fmt_display_safe(r.start_at),
-            'end_at_str': fmt_display_safe(r.end_at),
-            'approved_at_str': fmt_display_safe(r.approved_at),
-        })
-
-    # 포인트 관련 정보 추가
-    member_point_balance = 0
-    member_total_deposit = 0
-    member_recent_deposits = []
-    member_settlement_method = '포인트'
-    pending_virtual_account = None
-    point_requirement = 9500
-    
-    if hasattr(current_user, 'id'):
-        member = db.session.get(Member, current_user.id)
-        if member:
-            member_point_balance = member.point_balance or 0
-            member_settlement_method = member.settlement_method or '포인트'
-            member_total_deposit = db.session.query(
-                func.coalesce(func.sum(DepositHistory.deposit_amount), 0)
-            ).filter(
-                DepositHistory.member_id == member.id
-            ).scalar() or 0
-            recent_deposit_rows = db.session.query(DepositHistory).filter(
-                DepositHistory.member_id == member.id
-            ).order_by(DepositHistory.deposit_date.desc()).limit(3).all()
-            member_recent_deposits = [
-                f"{row.bank_name}/{row.account_number}/{row.deposit_amount:,}원"
-                for row in recent_deposit_rows
-            ]
-            pending_virtual_account = db.session.query(VirtualAccount).filter(
-                VirtualAccount.member_id == member.id,
-                VirtualAccount.status == '대기'
-            ).order_by(VirtualAccount.created_at.desc()).first()
-    
-    return render_template('insurance.html', 
-                         rows=rows, 
-                         items=items, 
-                         edit_id=edit_id,
-                         member_point_balance=member_point_balance,
-                         member_total_deposit=member_total_deposit,
-                         member_recent_deposits=member_recent_deposits,
-                         member_settlement_method=member_settlement_method,
-                         pending_virtual_account=pending_virtual_account,
-                         point_requirement=point_requirement)
-
-
-@app.route('/insurance/template')
-@login_required
-def insurance_template_download():
-    # Import pandas only when needed
-    import pandas as pd
-    
-    # Create Excel template in-memory
-    df = pd.DataFrame([
-        {
-            '가입희망일자(YYYY-MM-DD)': '',
-            '한글차량번호': '',
-            '차대번호': '',
-            '차량명': '',
-            '차량등록일자(YYYY-MM-DD)': '',
-            '비고': '',
-        }
-    ])
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='template')
-    buffer.seek(0)
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name='insurance_upload_template.xlsx',
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-
-
-@app.route('/insurance/upload', methods=['POST'])
-@login_required
-def insurance_upload():
-    if is_serverless:
-        flash('Vercel 환경에서는 엑셀 업로드가 제한됩니다.', 'warning')
-        return redirect(url_for('insurance'))
-    file = request.files.get('file')
-    if not file:
-        flash('파일을 선택하세요.', 'warning')
-        return redirect(url_for('insurance'))
-    try:
-        # Import pandas only when needed
-        import pandas as pd
-        df = pd.read_excel(file)
-        required_cols = {
-            '한글차량번호',
-            '차대번호',
-            '차량명',
-            '차량등록일자(YYYY-MM-DD)'
-        }
-        if not required_cols.issubset(set(df.columns)):
-            flash('엑셀 양식이 올바르지 않습니다.', 'danger')
-            return redirect(url_for('insurance'))
-        count = 0
-        for _, row in df.iterrows():
-            car_plate = str(row.get('한글차량번호', '')).strip()
-            vin = str(row.get('차대번호', '')).strip()
-            car_name = str(row.get('차량명', '')).strip()
-            car_registered_at = parse_date(str(row.get('차량등록일자(YYYY-MM-DD)', '')).strip())
-            memo = str(row.get('비고', '')).strip() if '비고' in df.columns else None
-            if not car_plate:
-                continue
-            app_row = InsuranceApplication(
-                insured_code=current_user.business_number or '',
-                contractor_code='부산자동차매매사업자조합',
-                car_plate=car_plate,
-                vin=vin,
-                car_name=car_name,
-                car_registered_at=car_registered_at,
-                premium=9500,
-                memo=memo,
-                created_by_member_id=current_user.id,
-            )
-            db.session.add(app_row)
-            count += 1
-        if not safe_commit():
-            flash('업로드 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
-        else:
-            flash(f'{count}건 업로드되었습니다.', 'success')
-    except Exception as e:
-        flash('업로드 중 오류가 발생했습니다.', 'danger')
-    return redirect(url_for('insurance'))
-
-
-# 파트너그룹 관리 (요구사항의 파트너그룹만들기 페이지)
-@app.route('/admin/partner-groups', methods=['GET', 'POST'])
-@login_required
-@admin_required
-def admin_partner_groups():
-    ensure_initialized()
-    
-    if request.method == 'POST':
-        action = request.form.get('action')
-        
-        if action == 'create':
-            # 신규 파트너그룹 생성
-            name = request.form.get('name', '').strip()
-            admin_username = request.form.get('admin_username', '').strip()
-            admin_password = request.form.get('admin_password', '').strip()
-            business_number = request.form.get('business_number', '').strip()
-            representative = request.form.get('representative', '').strip()
-            phone = request.form.get('phone', '').strip()
-            mobile = request.form.get('mobile', '').strip()
-            address = request.form.get('address', '').strip()
-            bank_name = request.form.get('bank_name', '').strip()
-            account_number = request.form.get('account_number', '').strip()
-            memo = request.form.get('memo', '').strip()
-            
-            # 필수 항목 검증
-            if not name or not business_number or not representative or not phone:
-                flash('파트너그룹명, 사업자등록번호, 대표자, 유선번호는 필수항목입니다.', 'warning')
-                return redirect(url_for('admin_partner_groups'))
-            
-            # 중복 검증
-            if db.session.query(PartnerGroup).filter(
-                (PartnerGroup.name == name) | 
-                (PartnerGroup.business_number == business_number) |
-                (PartnerGroup.admin_username == admin_username)
-            ).first():
-                flash('이미 존재하는 파트너그룹명, 사업자번호 또는 관리자 아이디입니다.', 'danger')
-                return redirect(url_for('admin_partner_groups'))
-            
-            # 파일 업로드 처리
-            registration_cert_path = None
-            logo_path = None
-            
-            # 사업자등록증 파일 처리
-            if 'registration_cert' in request.files:
-                file = request.files['registration_cert']
-                file_filename = file.filename if file else None
-                print(f"Registration cert file: {file}, filename: {file_filename}")
-                
-                # 파일이 실제로 선택되었는지 확인 (빈 파일이 아닌지)
-                if file and file_filename and file_filename.strip():
-                    try:
-                        filename = secure_filename(file.filename)
-                        file_ext = os.path.splitext(filename)[1].lower()
-                        allowed_extensions = ['.pdf', '.jpg', '.jpeg', '.png']
-                        
-                        print(f"Processing registration cert: {filename}, ext: {file_ext}")
-                        if file_ext in allowed_extensions:
-                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                            new_filename = f"reg_{business_number}_{timestamp}{file_ext}"
-                            filepath = os.path.join(UPLOAD_DIR, new_filename)
-                            print(f"Saving registration cert to: {filepath}")
-                            
-                            # 디렉토리가 존재하는지 확인
-                            os.makedirs(UPLOAD_DIR, exist_ok=True)
-                            
-                            # 파일 저장
-                            file.save(filepath)
-                            
-                            # 파일이 실제로 저장되었는지 확인
-                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                registration_cert_path = new_filename
-                                print(f"Registration cert saved successfully: {registration_cert_path}")
-                            else:
-                                print(f"ERROR: Registration cert file was not saved properly. Path: {filepath}")
-                                registration_cert_path = None
-                        else:
-                            print(f"Invalid file extension for registration cert: {file_ext}")
-                    except Exception as e:
-                        try:
-                            import sys
-                            import traceback
-                            sys.stderr.write(f"Registration cert upload error: {e}\n")
-                            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                        except Exception:
-                            pass
-            else:
-                print("No registration_cert file in request")
-            
-            # 로고 파일 처리
-            if 'logo' in request.files:
-                file = request.files['logo']
-                file_filename = file.filename if file else None
-                print(f"Logo file: {file}, filename: {file_filename}")
-                
-                # 파일이 실제로 선택되었는지 확인 (빈 파일이 아닌지)
-                if file and file_filename and file_filename.strip():
-                    try:
-                        filename = secure_filename(file.filename)
-                        file_ext = os.path.splitext(filename)[1].lower()
-                        allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif']
-                        
-                        print(f"Processing logo: {filename}, ext: {file_ext}")
-                        if file_ext in allowed_extensions:
-                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                            new_filename = f"logo_{business_number}_{timestamp}{file_ext}"
-                            
-                            # 파트너그룹 로고 디렉토리에 저장
-                            partner_logo_dir = os.path.join('static', 'partner_logos')
-                            os.makedirs(partner_logo_dir, exist_ok=True)
-                            filepath = os.path.join(partner_logo_dir, new_filename)
-                            print(f"Saving logo to: {filepath}")
-                            
-                            # 파일 저장
-                            file.save(filepath)
-                            
-                            # 파일이 실제로 저장되었는지 확인
-                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                logo_path = os.path.join('partner_logos', new_filename)
-                                print(f"Logo saved successfully: {logo_path}")
-                            else:
-                                print(f"ERROR: Logo file was not saved properly. Path: {filepath}")
-                                logo_path = None
-                        else:
-                            print(f"Invalid file extension for logo: {file_ext}")
-                    except Exception as e:
-                        try:
-                            import sys
-                            import traceback
-                            sys.stderr.write(f"Logo upload error: {e}\n")
-                            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                        except Exception:
-                            pass
-            else:
-                print("No logo file in request")
-
-            try:
-                print(f"Creating partner group with files:")
-                print(f"  Registration cert path: {registration_cert_path}")
-                print(f"  Logo path: {logo_path}")
-                
-                partner_group = PartnerGroup(
-                    name=name,
-                    admin_username=admin_username,
-                    business_number=business_number,
-                    representative=representative,
-                    phone=phone,
-                    mobile=mobile,
-                    address=address,
-                    bank_name=bank_name,
-                    account_number=account_number,
-                    registration_cert_path=registration_cert_path,
-                    logo_path=logo_path,
-                    memo=memo
-                )
-                partner_group.set_admin_password(admin_password)
-                db.session.add(partner_group)
-                print(f"Partner group added to session: {name}")
-                
-                try:
-                    import sys
-                    sys.stderr.write(f"Partner group create: Adding {name} to session\n")
-                except Exception:
-                    pass
-                
-                commit_success = safe_commit()
-                
-                if not commit_success:
-                    try:
-                        import sys
-                        import traceback
-                        sys.stderr.write(f"Partner group create: Commit failed for {name}\n")
-                        sys.stderr.write(f"Partner group create traceback: {traceback.format_exc()}\n")
-                    except Exception:
-                        pass
-                    flash('파트너그룹 생성 중 오류가 발생했습니다.', 'danger')
-                    print("ERROR: Failed to commit partner group to database")
-                else:
-                    # 커밋 성공 후 검증
-                    try:
-                        import sys
-                        verify_group = db.session.get(PartnerGroup, partner_group.id)
-                        if verify_group:
-                            sys.stderr.write(f"Partner group create: Verified {name} (ID: {partner_group.id}) exists\n")
-                        else:
-                            sys.stderr.write(f"Partner group create: WARNING - {name} not found after commit!\n")
-                    except Exception:
-                        pass
-                    # 데이터베이스에 저장된 정보 확인
-                    db.session.refresh(partner_group)
-                    print(f"Partner group saved successfully:")
-                    print(f"  ID: {partner_group.id}")
-                    print(f"  Registration cert path: {partner_group.registration_cert_path}")
-                    print(f"  Logo path: {partner_group.logo_path}")
-                    
-                    # 로고가 업로드된 경우 파트너그룹별 로고 파일도 생성
-                    if logo_path and 'logo' in request.files:
-                        try:
-                            file = request.files['logo']
-                            file_ext = os.path.splitext(secure_filename(file.filename))[1].lower()
-                            group_logo_filename = f"group_{partner_group.id}_logo{file_ext}"
-                            partner_logo_dir = os.path.join('static', 'partner_logos')
-                            group_logo_path = os.path.join(partner_logo_dir, group_logo_filename)
-                            file.seek(0)  # 파일 포인터 리셋
-                            file.save(group_logo_path)
-                        except Exception as e:
-                            try:
-                                import sys
-                                sys.stderr.write(f"Group logo creation error: {e}\n")
-                            except Exception:
-                                pass
-                    
-                    flash(f'파트너그룹 "{name}"이 생성되었습니다.', 'success')
-            except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Partner group creation error: {e}\n")
-                except Exception:
-                    pass
-                flash('파트너그룹 생성 중 오류가 발생했습니다.', 'danger')
-                
-        elif action in ['save', 'delete']:
-            # 수정/삭제
-            group_id = request.form.get('group_id')
-            if group_id:
-                group = db.session.get(PartnerGroup, int(group_id))
-                if group:
-                    if action == 'delete':
-                        try:
-                            group_id = group.id
-                            group_name = group.name
-                            db.session.delete(group)
-                            
-                            try:
-                                import sys
-                                sys.stderr.write(f"Partner group delete: Deleting {group_name} (ID: {group_id})\n")
-                            except Exception:
-                                pass
-                            
-                            commit_success = safe_commit()
-                            
-                            if commit_success:
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Partner group delete: Successfully deleted {group_name}\n")
-                                except Exception:
-                                    pass
-                                flash('파트너그룹이 삭제되었습니다.', 'success')
-                            else:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Partner group delete: Commit failed for {group_name}\n")
-                                    sys.stderr.write(f"Partner group delete traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                        except Exception as e:
-                            try:
-                                import sys
-                                import traceback
-                                sys.stderr.write(f"Partner group deletion error: {e}\n")
-                                sys.stderr.write(f"Partner group deletion traceback: {traceback.format_exc()}\n")
-                            except Exception:
-                                pass
-                            try:
-                                db.session.rollback()
-                            except Exception:
-                                pass
-                            flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                    elif action == 'save':
-                        try:
-                            group.name = request.form.get('name', '').strip()
-                            group.admin_username = request.form.get('admin_username', '').strip()
-                            if request.form.get('admin_password', '').strip():
-                                group.set_admin_password(request.form.get('admin_password', '').strip())
-                            group.business_number = request.form.get('business_number', '').strip()
-                            group.representative = request.form.get('representative', '').strip()
-                            group.phone = request.form.get('phone', '').strip()
-                            group.mobile = request.form.get('mobile', '').strip()
-                            group.address = request.form.get('address', '').strip()
-                            group.bank_name = request.form.get('bank_name', '').strip()
-                            group.account_number = request.form.get('account_number', '').strip()
-                            group.memo = request.form.get('memo', '').strip()
-                            
-                            # 파일 업데이트 처리
-                            # 사업자등록증 파일 처리
-                            if 'registration_cert' in request.files:
-                                file = request.files['registration_cert']
-                                if file and file.filename:
-                                    try:
-                                        filename = secure_filename(file.filename)
-                                        file_ext = os.path.splitext(filename)[1].lower()
-                                        allowed_extensions = ['.pdf', '.jpg', '.jpeg', '.png']
-                                        
-                                        if file_ext in allowed_extensions:
-                                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                                            new_filename = f"reg_{group.business_number}_{timestamp}{file_ext}"
-                                            
-                                            # 업로드 디렉토리 확인 및 생성
-                                            os.makedirs(UPLOAD_DIR, exist_ok=True)
-                                            
-                                            filepath = os.path.join(UPLOAD_DIR, new_filename)
-                                            file.save(filepath)
-                                            
-                                            # 파일이 실제로 저장되었는지 확인
-                                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                                group.registration_cert_path = new_filename
-                                                try:
-                                                    import sys
-                                                    sys.stderr.write(f"Registration cert updated: {new_filename}\n")
-                                                except Exception:
-                                                    pass
-                                            else:
-                                                try:
-                                                    import sys
-                                                    sys.stderr.write(f"Registration cert save failed: {filepath}\n")
-                                                except Exception:
-                                                    pass
-                                    except Exception as e:
-                                        try:
-                                            import sys
-                                            sys.stderr.write(f"Registration cert update error: {e}\n")
-                                        except Exception:
-                                            pass
-                            
-                            # 로고 파일 처리
-                            if 'logo' in request.files:
-                                file = request.files['logo']
-                                if file and file.filename:
-                                    try:
-                                        filename = secure_filename(file.filename)
-                                        file_ext = os.path.splitext(filename)[1].lower()
-                                        allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif']
-                                        
-                                        if file_ext in allowed_extensions:
-                                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                                            new_filename = f"logo_{group.business_number}_{timestamp}{file_ext}"
-                                            
-                                            # 파트너그룹 로고 디렉토리에 저장
-                                            partner_logo_dir = os.path.join('static', 'partner_logos')
-                                            os.makedirs(partner_logo_dir, exist_ok=True)
-                                            filepath = os.path.join(partner_logo_dir, new_filename)
-                                            file.save(filepath)
-                                            
-                                            # 파일이 실제로 저장되었는지 확인
-                                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                                group.logo_path = os.path.join('partner_logos', new_filename)
-                                                
-                                                # 파트너그룹별 로고 파일도 생성 (group_{id}_logo.png)
-                                                try:
-                                                    group_logo_filename = f"group_{group.id}_logo{file_ext}"
-                                                    group_logo_path = os.path.join(partner_logo_dir, group_logo_filename)
-                                                    file.seek(0)  # 파일 포인터 리셋
-                                                    file.save(group_logo_path)
-                                                    
-                                                    try:
-                                                        import sys
-                                                        sys.stderr.write(f"Logo updated: {group.logo_path}\n")
-                                                    except Exception:
-                                                        pass
-                                                except Exception as e:
-                                                    try:
-                                                        import sys
-                                                        sys.stderr.write(f"Group logo copy error: {e}\n")
-                                                    except Exception:
-                                                        pass
-                                            else:
-                                                try:
-                                                    import sys
-                                                    sys.stderr.write(f"Logo save failed: {filepath}\n")
-                                                except Exception:
-                                                    pass
-                                    except Exception as e:
-                                        try:
-                                            import sys
-                                            sys.stderr.write(f"Logo update error: {e}\n")
-                                        except Exception:
-                                            pass
-                            
-                            try:
-                                import sys
-                                sys.stderr.write(f"Partner group save: Updating {group_name} (ID: {group_id})\n")
-                            except Exception:
-                                pass
-                            
-                            commit_success = safe_commit()
-                            
-                            if commit_success:
-                                # 커밋 성공 후 검증
-                                try:
-                                    import sys
-                                    verify_group = db.session.get(PartnerGroup, group_id)
-                                    if verify_group:
-                                        sys.stderr.write(f"Partner group save: Verified {group_name} (ID: {group_id}) exists\n")
-                                    else:
-                                        sys.stderr.write(f"Partner group save: WARNING - {group_name} not found after commit!\n")
-                                except Exception:
-                                    pass
-                                flash('파트너그룹 정보가 저장되었습니다.', 'success')
-                            else:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Partner group save: Commit failed for {group_name}\n")
-                                    sys.stderr.write(f"Partner group save traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-                        except Exception as e:
-                            try:
-                                import sys
-                                import traceback
-                                sys.stderr.write(f"Partner group update error: {e}\n")
-                                sys.stderr.write(f"Partner group update traceback: {traceback.format_exc()}\n")
-                            except Exception:
-                                pass
-                            try:
-                                db.session.rollback()
-                            except Exception:
-                                pass
-                            flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-        
-        return redirect(url_for('admin_partner_groups'))
-    
-    # GET 요청: 파트너그룹 목록 조회
-    edit_id = request.args.get('edit_id')
-    partner_groups = []
-    if db is not None:
-        try:
-            partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.created_at.desc()).all()
-        except Exception as e:
-            try:
-                import sys
-                sys.stderr.write(f"Error fetching partner groups: {e}\n")
-            except Exception:
-                pass
-    
-    return render_template('admin/partner_groups.html', 
-                         partner_groups=partner_groups, 
-                         edit_id=edit_id)
-
-# 전체책임보험현황 (요구사항의 전체책임보험현황페이지)
-@app.route('/admin/insurance-overview', methods=['GET', 'POST'])
-@admin_required
-def admin_insurance_overview():
-    ensure_initialized()
-    
-    edit_id = request.args.get('edit_id', '')
-    
-    if request.method == 'POST':
-        action = request.form.get('action')
-        application_id = request.form.get('application_id')
-        
-        if not application_id:
-            flash('신청 ID가 필요합니다.', 'danger')
-            return redirect(url_for('admin_insurance_overview'))
-        
-        try:
-            app = db.session.query(InsuranceApplication).filter_by(id=int(application_id)).first()
-            if not app:
-                flash('보험 신청을 찾을 수 없습니다.', 'danger')
-                return redirect(url_for('admin_insurance_overview'))
-            
-            if action == 'save':
-                # 수정 저장
-                app.car_plate = request.form.get('car_plate', '').strip() or app.car_plate
-                app.vin = request.form.get('vin', '').strip() or app.vin
-                app.car_name = request.form.get('car_name', '').strip() or app.car_name
-                app.car_registered_at = parse_date(request.form.get('car_registered_at', '')) or app.car_registered_at
-                app.insured_code = request.form.get('insured_code', '').strip() or app.insured_code
-                app.contractor_code = request.form.get('contractor_code', '').strip() or app.contractor_code
-                app.premium = float(request.form.get('premium', 0) or 0) or app.premium
-                app.memo = request.form.get('memo', '').strip() or app.memo
-                
-                # 가입시간 처리
-                start_at_str = request.form.get('start_at', '').strip()
-                if start_at_str:
-                    try:
-                        app.start_at = datetime.strptime(start_at_str, '%Y-%m-%dT%H:%M').replace(tzinfo=KST)
-                    except ValueError:
-                        pass
-                
-                # 종료시간 처리
-                end_at_str = request.form.get('end_at', '').strip()
-                if end_at_str:
-                    try:
-                        app.end_at = datetime.strptime(end_at_str, '%Y-%m-%dT%H:%M').replace(tzinfo=KST)
-                    except ValueError:
-                        pass
-                
-                # 조합승인시간 처리
-                approved_at_str = request.form.get('approved_at', '').strip()
-                if approved_at_str:
-                    try:
-                        app.approved_at = datetime.strptime(approved_at_str, '%Y-%m-%dT%H:%M').replace(tzinfo=KST)
-                        app.status = '조합승인'
-                    except ValueError:
-                        pass
-                
-                db.session.add(app)
-                if safe_commit():
-                    flash('보험 신청 정보가 저장되었습니다.', 'success')
-                else:
-                    flash('저장 중 오류가 발생했습니다.', 'danger')
-            
-            elif action == 'delete':
-                # 삭제
-                db.session.delete(app)
-                if safe_commit():
-                    flash('보험 신청이 삭제되었습니다.', 'success')
-                else:
-                    flash('삭제 중 오류가 발생했습니다.', 'danger')
-        
-        except Exception as e:
-            flash(f'처리 중 오류가 발생했습니다: {str(e)}', 'danger')
-        
-        # 검색 조건 유지하며 리다이렉트
-        params = {}
-        for key in ['start_date', 'end_date', 'partner_group_id', 'company_name', 'status_filter']:
-            if request.args.get(key):
-                params[key] = request.args.get(key)
-        return redirect(url_for('admin_insurance_overview', **params))
-    
-    # 검색 조건
-    start_date = parse_date(request.args.get('start_date', ''))
-    end_date = parse_date(request.args.get('end_date', ''))
-    partner_group_id = request.args.get('partner_group_id', '')
-    company_name = request.args.get('company_name', '').strip()
-    status_filter = request.args.get('status_filter', '')  # 가입완료/미가입
-    
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('admin_dashboard'))
-    
-    # 파트너그룹 목록
-    partner_groups = []
-    try:
-        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-    except Exception:
-        pass
-    
-    # 선택된 파트너그룹의 회원사 목록 (상사명 필터용)
-    members = []
-    if partner_group_id:
-        try:
-            members = db.session.query(Member).filter_by(
-                partner_group_id=int(partner_group_id),
-                role='member'
-            ).order_by(Member.company_name).all()
-        except (ValueError, Exception):
-            pass
-    
-    # 보험신청 데이터 조회
-    q = db.session.query(InsuranceApplication)
-    
-    if start_date:
-        q = q.filter(InsuranceApplication.created_at >= datetime.combine(start_date, datetime.min.time(), tzinfo=KST))
-    if end_date:
-        q = q.filter(InsuranceApplication.created_at <= datetime.combine(end_date, datetime.max.time(), tzinfo=KST))
-    if partner_group_id:
-        try:
-            q = q.filter(InsuranceApplication.partner_group_id == int(partner_group_id))
-        except ValueError:
-            pass
-    if company_name:
-        q = q.join(Member).filter(Member.company_name.like(f'%{company_name}%'))
-    if status_filter == '가입완료':
-        q = q.filter(InsuranceApplication.start_at.is_not(None))
-    elif status_filter == '미가입':
-        q = q.filter(InsuranceApplication.start_at.is_(None))
-    
-    applications = q.order_by(InsuranceApplication.created_at.desc()).all()
-    
-    # 상태 재계산
-    for app in applications:
-        app.recompute_status()
-    safe_commit()
-    
-    return render_template('admin/insurance_overview.html',
-                         applications=applications,
-                         partner_groups=partner_groups,
-                         members=members,
-                         start_date=start_date,
-                         end_date=end_date,
-                         partner_group_id=partner_group_id,
-                         company_name=company_name,
-                         status_filter=status_filter,
-                         edit_id=edit_id)
-
-# 전체책임보험현황 회원사 목록 API
-@app.route('/admin/insurance-overview/members')
-@admin_required
-def admin_insurance_overview_members():
-    ensure_initialized()
-    partner_group_id = request.args.get('partner_group_id', '')
-    
-    if not partner_group_id:
-        return jsonify({'members': []})
-    
-    try:
-        members = db.session.query(Member).filter_by(
-            partner_group_id=int(partner_group_id),
-            role='member'
-        ).order_by(Member.company_name).all()
-        
-        return jsonify({
-            'members': [{'company_name': m.company_name} for m in members]
-        })
-    except Exception as e:
-        return jsonify({'members': [], 'error': str(e)})
-
-# 전체책임보험현황 엑셀 다운로드
-@app.route('/admin/insurance-overview/export')
-@admin_required
-def admin_insurance_overview_export():
-    ensure_initialized()
-    import pandas as pd
-    from io import BytesIO
-    
-    # 검색 조건 (동일한 필터 적용)
-    start_date = parse_date(request.args.get('start_date', ''))
-    end_date = parse_date(request.args.get('end_date', ''))
-    partner_group_id = request.args.get('partner_group_id', '')
-    company_name = request.args.get('company_name', '').strip()
-    status_filter = request.args.get('status_filter', '')
-    
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('admin_insurance_overview'))
-    
-    # 보험신청 데이터 조회 (동일한 필터)
-    q = db.session.query(InsuranceApplication)
-    
-    if start_date:
-        q = q.filter(InsuranceApplication.created_at >= datetime.combine(start_date, datetime.min.time(), tzinfo=KST))
-    if end_date:
-        q = q.filter(InsuranceApplication.created_at <= datetime.combine(end_date, datetime.max.time(), tzinfo=KST))
-    if partner_group_id:
-        try:
-            q = q.filter(InsuranceApplication.partner_group_id == int(partner_group_id))
-        except ValueError:
-            pass
-    if company_name:
-        q = q.join(Member).filter(Member.company_name.like(f'%{company_name}%'))
-    if status_filter == '가입완료':
-        q = q.filter(InsuranceApplication.start_at.is_not(None))
-    elif status_filter == '미가입':
-        q = q.filter(InsuranceApplication.start_at.is_(None))
-    
-    applications = q.order_by(InsuranceApplication.created_at.desc()).all()
-    
-    # 엑셀 데이터 생성
-    data = []
-    for app in applications:
-        partner_group_name = ''
-        if app.partner_group_id:
-            try:
-                pg = db.session.query(PartnerGroup).filter_by(id=app.partner_group_id).first()
-                if pg:
-                    partner_group_name = pg.name
-            except Exception:
-                pass
-        
-        data.append({
-            '순': len(data) + 1,
-            '파트너그룹(상호)': partner_group_name,
-            '상사명': app.created_by_member.company_name if app.created_by_member else '',
-            '신청시간': app.created_at.strftime('%Y-%m-%d %H:%M:%S') if app.created_at else '',
-            '가입시간': app.start_at.strftime('%Y-%m-%d %H:%M:%S') if app.start_at else '',
-            '종료시간': app.end_at.strftime('%Y-%m-%d %H:%M:%S') if app.end_at else '',
-            '조합승인시간': app.approved_at.strftime('%Y-%m-%d %H:%M:%S') if app.approved_at else '',
-            '피보험자코드': app.insured_code or '',
-            '계약자코드': app.contractor_code or '',
-            '한글차량번호': app.car_plate or '',
-            '차대번호': app.vin or '',
-            '차량명': app.car_name or '',
-            '차량등록일자': app.car_registered_at.strftime('%Y-%m-%d') if app.car_registered_at else '',
-            '보험료': app.premium or 0,
-            '보험증권': '있음' if (app.insurance_policy_path or app.insurance_policy_url) else '없음',
-            '비고': app.memo or '',
-        })
-    
-    df = pd.DataFrame(data)
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='전체책임보험현황')
-    buffer.seek(0)
-    
-    filename = f'전체책임보험현황_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=filename,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-
-# 전체정산페이지 (요구사항의 전체정산페이지)
-@app.route('/admin/settlement-overview')
-@admin_required
-def admin_settlement_overview():
-    ensure_initialized()
-    
-    year = int(request.args.get('year', datetime.now().year))
-    month = int(request.args.get('month', datetime.now().month))
-    partner_group_id = request.args.get('partner_group_id', '')
-    
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('admin_dashboard'))
-    
-    # 파트너그룹 목록
-    partner_groups = []
-    try:
-        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-    except Exception:
-        pass
-    
-    # 정산 데이터 계산
-    start_period = datetime(year, month, 1, tzinfo=KST)
-    if month == 12:
-        next_month = datetime(year + 1, 1, 1, tzinfo=KST)
-    else:
-        next_month = datetime(year, month + 1, 1, tzinfo=KST)
-    
-    q = db.session.query(InsuranceApplication).filter(
-        InsuranceApplication.start_at.is_not(None),
-        InsuranceApplication.start_at >= start_period,
-        InsuranceApplication.start_at < next_month,
-    )
-    
-    if partner_group_id:
-        try:
-            q = q.filter(InsuranceApplication.partner_group_id == int(partner_group_id))
-        except ValueError:
-            pass
-    
-    applications = q.all()
-    
-    # 파트너그룹별 정산 데이터 집계
-    settlements_by_group = {}
-    for app in applications:
-        if app.partner_group and app.created_by_member:
-            group_key = app.partner_group_id
-            company_key = (app.created_by_member.company_name, app.created_by_member.representative)
-            
-            if group_key not in settlements_by_group:
-                settlements_by_group[group_key] = {
-                    'group_name': app.partner_group.name,
-                    'companies': {},
-                    'total_count': 0,
-                    'total_amount': 0
-                }
-            
-            if company_key not in settlements_by_group[group_key]['companies']:
-                settlements_by_group[group_key]['companies'][company_key] = {
-                    'company_name': app.created_by_member.company_name,
-                    'representative': app.created_by_member.representative,
-                    'count': 0,
-                    'amount': 0
-                }
-            
-            settlements_by_group[group_key]['companies'][company_key]['count'] += 1
-            settlements_by_group[group_key]['companies'][company_key]['amount'] += 95000  # 건수 × 95,000원
-            settlements_by_group[group_key]['total_count'] += 1
-            settlements_by_group[group_key]['total_amount'] += 95000
-    
-    # 전체 합계
-    grand_total_count = sum(group['total_count'] for group in settlements_by_group.values())
-    grand_total_amount = sum(group['total_amount'] for group in settlements_by_group.values())
-    
-    return render_template('admin/settlement_overview.html',
-                         settlements_by_group=settlements_by_group,
-                         partner_groups=partner_groups,
-                         year=year,
-                         month=month,
-                         partner_group_id=partner_group_id,
-                         grand_total_count=grand_total_count,
-                         grand_total_amount=grand_total_amount)
-
-# 전체정산페이지 엑셀 다운로드
-@app.route('/admin/settlement-overview/export')
-@admin_required
-def admin_settlement_overview_export():
-    ensure_initialized()
-    import pandas as pd
-    from io import BytesIO
-    
-    year = int(request.args.get('year', datetime.now().year))
-    month = int(request.args.get('month', datetime.now().month))
-    partner_group_id = request.args.get('partner_group_id', '')
-    
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('admin_settlement_overview'))
-    
-    # 정산 데이터 계산 (동일한 로직)
-    start_period = datetime(year, month, 1, tzinfo=KST)
-    if month == 12:
-        next_month = datetime(year + 1, 1, 1, tzinfo=KST)
-    else:
-        next_month = datetime(year, month + 1, 1, tzinfo=KST)
-    
-    q = db.session.query(InsuranceApplication).filter(
-        InsuranceApplication.start_at.is_not(None),
-        InsuranceApplication.start_at >= start_period,
-        InsuranceApplication.start_at < next_month,
-    )
-    
-    if partner_group_id:
-        try:
-            q = q.filter(InsuranceApplication.partner_group_id == int(partner_group_id))
-        except ValueError:
-            pass
-    
-    applications = q.all()
-    
-    # 정산 데이터 집계
-    data = []
-    row_num = 1
-    settlements_by_group = {}
-    
-    for app in applications:
-        if app.partner_group and app.created_by_member:
-            group_key = app.partner_group_id
-            company_key = (app.created_by_member.company_name, app.created_by_member.representative)
-            
-            if group_key not in settlements_by_group:
-                settlements_by_group[group_key] = {
-                    'group_name': app.partner_group.name,
-                    'companies': {},
-                    'total_count': 0,
-                    'total_amount': 0
-                }
-            
-            if company_key not in settlements_by_group[group_key]['companies']:
-                settlements_by_group[group_key]['companies'][company_key] = {
-                    'company_name': app.created_by_member.company_name,
-                    'representative': app.created_by_member.representative,
-                    'count': 0,
-                    'amount': 0
-                }
-            
-            settlements_by_group[group_key]['companies'][company_key]['count'] += 1
-            settlements_by_group[group_key]['companies'][company_key]['amount'] += 95000
-            settlements_by_group[group_key]['total_count'] += 1
-            settlements_by_group[group_key]['total_amount'] += 95000
-    
-    # 엑셀 데이터 생성
-    grand_total_count = 0
-    grand_total_amount = 0
-    
-    for group_id, group_data in sorted(settlements_by_group.items()):
-        # 회사별 데이터
-        for company_key, company_data in sorted(group_data['companies'].items()):
-            data.append({
-                '순': row_num,
-                '파트너그룹': group_data['group_name'],
-                '상사명': company_data['company_name'],
-                '대표자': company_data['representative'],
-                '건수': company_data['count'],
-                '금액': company_data['amount'],
-                '비고': '',
-            })
-            row_num += 1
-        
-        # 파트너그룹별 합계
-        data.append({
-            '순': '',
-            '파트너그룹': f"{group_data['group_name']} 합계",
-            '상사명': '',
-            '대표자': '',
-            '건수': group_data['total_count'],
-            '금액': group_data['total_amount'],
-            '비고': '',
-        })
-        grand_total_count += group_data['total_count']
-        grand_total_amount += group_data['total_amount']
-    
-    # 총합계
-    if data:
-        data.append({
-            '순': '',
-            '파트너그룹': '총합계',
-            '상사명': '',
-            '대표자': '',
-            '건수': grand_total_count,
-            '금액': grand_total_amount,
-            '비고': '',
-        })
-    
-    df = pd.DataFrame(data)
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='정산내역')
-    buffer.seek(0)
-    
-    filename = f'정산내역_{year}년{month}월_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=filename,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
-
-# 전체관리자페이지 (요구사항의 전체관리자페이지)
-@app.route('/admin/administrators', methods=['GET', 'POST'])
-@admin_required
-def admin_administrators():
-    ensure_initialized()
-    
-    if request.method == 'POST':
-        action = request.form.get('action')
-        
-        if action == 'create':
-            # 새 관리자 추가
-            name = request.form.get('name', '').strip()
-            username = request.form.get('username', '').strip()
-            password = request.form.get('password', '').strip()
-            is_active = request.form.get('is_active') == 'on'
-            permission = request.form.get('permission', 'viewer')
-            memo = request.form.get('memo', '').strip()
-            
-            if not name or not username or not password:
-                flash('이름, 아이디, 비밀번호는 필수입니다.', 'warning')
-                return redirect(url_for('admin_administrators'))
-            
-            # 중복 확인
-            if db.session.query(Member).filter(
-                Member.username == username,
-                Member.partner_group_id.is_(None)
-            ).first():
-                flash('이미 존재하는 아이디입니다.', 'danger')
-                return redirect(url_for('admin_administrators'))
-            
-            try:
-                admin = Member(
-                    partner_group_id=None,
-                    username=username,
-                    company_name=name,
-                    representative=name,
-                    approval_status='승인' if is_active else '신청',
-                    role='admin' if permission == 'admin' else 'viewer'  # 권한: 관리자 또는 열람
-                )
-                admin.set_password(password)
-                db.session.add(admin)
-                
-                if not safe_commit():
-                    flash('관리자 추가 중 오류가 발생했습니다.', 'danger')
-                else:
-                    flash('관리자가 추가되었습니다.', 'success')
-            except Exception as e:
-                try:
-                    import sys
-                    sys.stderr.write(f"Admin creation error: {e}\n")
-                except Exception:
-                    pass
-                flash('관리자 추가 중 오류가 발생했습니다.', 'danger')
-        
-        elif action in ['save', 'delete']:
-            admin_id = request.form.get('admin_id')
-            if admin_id:
-                admin = db.session.get(Member, int(admin_id))
-                if admin and admin.partner_group_id is None:
-                    if action == 'delete':
-                        # 자기 자신은 삭제할 수 없음
-                        if admin.id == current_user.id:
-                            flash('자기 자신은 삭제할 수 없습니다.', 'warning')
-                        else:
-                            try:
-                                db.session.delete(admin)
-                                if not safe_commit():
-                                    flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                                else:
-                                    flash('관리자가 삭제되었습니다.', 'success')
-                            except Exception as e:
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Admin deletion error: {e}\n")
-                                except Exception:
-                                    pass
-                                flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                    elif action == 'save':
-                        try:
-                            admin.company_name = request.form.get('name', '').strip()
-                            admin.representative = request.form.get('name', '').strip()
-                            admin.username = request.form.get('username', '').strip()
-                            if request.form.get('password', '').strip():
-                                admin.set_password(request.form.get('password', '').strip())
-                            admin.approval_status = '승인' if request.form.get('is_active') == 'on' else '신청'
-                            permission = request.form.get('permission', 'viewer')
-                            admin.role = 'admin' if permission == 'admin' else 'viewer'  # 권한 업데이트
-                            
-                            if not safe_commit():
-                                flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-                            else:
-                                flash('관리자 정보가 저장되었습니다.', 'success')
-                        except Exception as e:
-                            try:
-                                import sys
-                                sys.stderr.write(f"Admin update error: {e}\n")
-                            except Exception:
-                                pass
-                            flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-        
-        return redirect(url_for('admin_administrators'))
-    
-    # GET 요청: 관리자 목록 조회
-    edit_id = request.args.get('edit_id')
-    administrators = []
-    if db is not None:
-        try:
-            # 전체관리자 페이지: role='admin' 또는 role='viewer'인 관리자 모두 조회
-            administrators = db.session.query(Member).filter(
-                Member.partner_group_id.is_(None),
-                Member.role.in_(['admin', 'viewer'])
-            ).order_by(Member.created_at.desc()).all()
-        except Exception as e:
-            try:
-                import sys
-                sys.stderr.write(f"Error fetching administrators: {e}\n")
-            except Exception:
-                pass
-    
-    return render_template('admin/administrators.html',
-                         administrators=administrators,
-                         edit_id=edit_id)
-
-# 파트너그룹 섹션 라우트들
-
-# 파트너그룹 보험가입 페이지 (요구사항의 책임보험가입페이지)
-@app.route('/partner/insurance', methods=['GET', 'POST'])
-def partner_insurance():
-    try:
-        ensure_initialized()
-        
-        # 권한 확인
-        partner_group_id = None
-        is_partner_admin = False
-        
-        if 'user_type' in session and session['user_type'] == 'partner_admin':
-            # 파트너그룹 관리자
-            partner_group_id = session.get('partner_group_id')
-            is_partner_admin = True
-        else:
-            # Flask-Login 기반 회원사 확인
-            try:
-                from flask_login import current_user
-                is_auth = getattr(current_user, 'is_authenticated', False)
-            except Exception:
-                is_auth = False
-            
-            if not is_auth:
-                flash('로그인이 필요합니다.', 'warning')
-                return redirect(url_for('login'))
-            
-            if current_user.role == 'member' and current_user.partner_group_id:
-                partner_group_id = current_user.partner_group_id
-            else:
-                flash('파트너그룹 접근 권한이 없습니다.', 'warning')
-                return redirect(url_for('login'))
-        
-        if not partner_group_id:
-            flash('파트너그룹 정보를 찾을 수 없습니다.', 'danger')
-            return redirect(url_for('login'))
-        
-        member_for_points = None
-        available_points = 0
-        member_total_deposit = 0
-        member_recent_deposits = []
-        member_settlement_method = '포인트'
-        pending_virtual_account = None
-        point_requirement = 9500
-
-        if not is_partner_admin:
-            if hasattr(current_user, 'id'):
-                member_for_points = db.session.get(Member, current_user.id)
-                if member_for_points:
-                    available_points = member_for_points.point_balance or 0
-                    member_settlement_method = member_for_points.settlement_method or '포인트'
-                    member_total_deposit = db.session.query(
-                        func.coalesce(func.sum(DepositHistory.deposit_amount), 0)
-                    ).filter(
-                        DepositHistory.member_id == member_for_points.id
-                    ).scalar() or 0
-                    recent_deposit_rows = db.session.query(DepositHistory).filter(
-                        DepositHistory.member_id == member_for_points.id
-                    ).order_by(DepositHistory.deposit_date.desc()).limit(3).all()
-                    member_recent_deposits = [
-                        f"{row.bank_name}/{row.account_number}/{row.deposit_amount:,}원"
-                        for row in recent_deposit_rows
-                    ]
-                    pending_virtual_account = db.session.query(VirtualAccount).filter(
-                        VirtualAccount.member_id == member_for_points.id,
-                        VirtualAccount.status == '대기'
-                    ).order_by(VirtualAccount.created_at.desc()).first()
-
-        if request.method == 'POST':
-            action = request.form.get('action')
-            
-            if action == 'apply':
-                # 신규 가입 신청 (회원사 및 파트너그룹 관리자 모두 가능)
-                vehicle_type_id = request.form.get('vehicle_type_id', '').strip()
-                car_plate = request.form.get('car_plate', '').strip()
-                vin = request.form.get('vin', '').strip()
-                car_name = request.form.get('car_name', '').strip()
-                car_registered_at = parse_date(request.form.get('car_registered_at'))
-                memo = request.form.get('memo', '').strip()
-                
-                # 피보험자코드: 파트너그룹 관리자는 폼에서 가져오거나, 회원사는 자동으로
-                insured_code = request.form.get('insured_code', '').strip()
-                
-                # 차종분류와 차량번호는 필수
-                if not vehicle_type_id:
-                    flash('차종분류를 선택해주세요.', 'warning')
-                    return redirect(url_for('partner_insurance'))
-                
-                if not car_plate:
-                    flash('차량번호는 필수입니다.', 'warning')
-                    return redirect(url_for('partner_insurance'))
-                
-                # 차종분류에서 보험료 가져오기
-                premium_amount = 9500  # 기본값
-                try:
-                    premium_setting = db.session.get(PremiumSetting, int(vehicle_type_id))
-                    if premium_setting:
-                        premium_amount = premium_setting.premium_amount
-                except Exception:
-                    pass
-                
-                creation_allowed = True
-
-                if not is_partner_admin and member_for_points:
-                    current_balance = member_for_points.point_balance or 0
-                    if member_settlement_method != '후불정산' and current_balance < premium_amount:
-                        session['point_top_up_required'] = True
-                        flash('포인트 충전 후 사용해주세요.', 'warning')
-                        creation_allowed = False
-                
-                if creation_allowed:
-                    try:
-                        # 파트너그룹 정보 가져오기
-                        partner_group = db.session.query(PartnerGroup).filter_by(id=partner_group_id).first()
-                        partner_group_name = partner_group.name if partner_group else ''
-                        
-                        # 피보험자코드 설정
-                        if not is_partner_admin:
-                            # 회원사: 로그인한 사업자의 사업자번호
-                            if hasattr(current_user, 'business_number'):
-                                insured_code = current_user.business_number or ''
-                            else:
-                                insured_code = ''
-                        # 파트너그룹 관리자는 폼에서 입력받은 값 사용 (이미 위에서 가져옴)
-                        
-                        # 계약자코드: 파트너그룹 이름
-                        contractor_code = partner_group_name
-                        
-                        application = InsuranceApplication(
-                            partner_group_id=partner_group_id,
-                            vehicle_type_id=int(vehicle_type_id) if vehicle_type_id else None,
-                            insured_code=insured_code,  # 피보험자코드
-                            contractor_code=contractor_code,  # 계약자코드: 파트너그룹 이름
-                            car_plate=car_plate,
-                            vin=vin,
-                            car_name=car_name,
-                            car_registered_at=car_registered_at,
-                            premium=premium_amount,  # 차종분류에 따른 보험료
-                            memo=memo,
-                            created_by_member_id=current_user.id if not is_partner_admin and hasattr(current_user, 'id') else None,
-                        )
-                        db.session.add(application)
-                        
-                        # 커밋 전 디버깅
-                        try:
-                            import sys
-                            sys.stderr.write(f"Insurance application: Adding {car_plate} to session\n")
-                        except Exception:
-                            pass
-                        
-                        commit_success = safe_commit()
-                        
-                        if not commit_success:
-                            try:
-                                import sys
-                                import traceback
-                                sys.stderr.write(f"Insurance application: Commit failed for {car_plate}\n")
-                                sys.stderr.write(f"Insurance application traceback: {traceback.format_exc()}\n")
-                            except Exception:
-                                pass
-                            flash('신청 처리 중 오류가 발생했습니다.', 'danger')
-                        else:
-                            # 커밋 성공 후 검증
-                            try:
-                                import sys
-                                verify_app = db.session.get(InsuranceApplication, application.id)
-                                if verify_app:
-                                    sys.stderr.write(f"Insurance application: Verified {car_plate} (ID: {application.id}) exists\n")
-                                else:
-                                    sys.stderr.write(f"Insurance application: WARNING - {car_plate} not found after commit!\n")
-                            except Exception:
-                                pass
-                            flash('보험 신청이 등록되었습니다.', 'success')
-                    except Exception as e:
-                        try:
-                            import sys
-                            import traceback
-                            sys.stderr.write(f"Insurance application error: {e}\n")
-                            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                        except Exception:
-                            pass
-                        try:
-                            db.session.rollback()
-                        except Exception:
-                            pass
-                        flash(f'신청 처리 중 오류가 발생했습니다: {str(e)}', 'danger')
-            
-            elif action == 'excel_upload':
-                # 엑셀 일괄 업로드
-                if 'excel_file' not in request.files:
-                    flash('파일을 선택해주세요.', 'warning')
-                    return redirect(url_for('partner_insurance'))
-                
-                file = request.files['excel_file']
-                if file and file.filename:
-                    try:
-                        import pandas as pd
-                        from io import BytesIO
-                        
-                        # 엑셀 파일 읽기
-                        df = pd.read_excel(file)
-                        
-                        # 파트너그룹 정보
-                        partner_group = db.session.query(PartnerGroup).filter_by(id=partner_group_id).first()
-                        partner_group_name = partner_group.name if partner_group else ''
-                        
-                        success_count = 0
-                        error_count = 0
-                        
-                        for _, row in df.iterrows():
-                            try:
-                                car_plate = str(row.get('한글차량번호', '')).strip()
-                                
-                                if not car_plate:
-                                    error_count += 1
-                                    continue
-                                
-                                # 피보험자코드: 회원사는 본인 사업자번호, 관리자는 엑셀에서 가져오거나 기본값
-                                if is_partner_admin:
-                                    insured_code = str(row.get('피보험자코드', '')).strip() or ''
-                                else:
-                                    insured_code = current_user.business_number or ''
-                                
-                                # 계약자코드: 파트너그룹 이름
-                                contractor_code = partner_group_name
-                                
-                                application = InsuranceApplication(
-                                    partner_group_id=partner_group_id,
-                                    insured_code=insured_code,
-                                    contractor_code=contractor_code,
-                                    car_plate=car_plate,
-                                    vin=str(row.get('차대번호', '')).strip() or None,
-                                    car_name=str(row.get('차량명', '')).strip() or None,
-                                    car_registered_at=parse_date(str(row.get('차량등록일자', ''))),
-                                    premium=9500,
-                                    memo=str(row.get('비고', '')).strip() or None,
-                                    created_by_member_id=current_user.id if not is_partner_admin else None,
-                                )
-                                db.session.add(application)
-                                success_count += 1
-                            except Exception as e:
-                                error_count += 1
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Insurance excel upload error: {e}\n")
-                                except Exception:
-                                    pass
-                                continue
-                        
-                        # 커밋 전 디버깅
-                        try:
-                            import sys
-                            sys.stderr.write(f"Insurance excel upload: Committing {success_count} applications\n")
-                        except Exception:
-                            pass
-                        
-                        commit_success = safe_commit()
-                        
-                        if commit_success:
-                            try:
-                                import sys
-                                sys.stderr.write(f"Insurance excel upload: Successfully committed {success_count} applications\n")
-                            except Exception:
-                                pass
-                            flash(f'엑셀 업로드 완료: 성공 {success_count}건, 실패 {error_count}건', 'success' if success_count > 0 else 'warning')
-                        else:
-                            try:
-                                import sys
-                                import traceback
-                                sys.stderr.write(f"Insurance excel upload: Commit failed\n")
-                                sys.stderr.write(f"Insurance excel upload traceback: {traceback.format_exc()}\n")
-                            except Exception:
-                                pass
-                            flash('엑셀 업로드 중 오류가 발생했습니다.', 'danger')
-                    except Exception as e:
-                        try:
-                            import sys
-                            sys.stderr.write(f"Excel upload error: {e}\n")
-                        except Exception:
-                            pass
-                        flash(f'엑셀 파일 처리 중 오류가 발생했습니다: {str(e)}', 'danger')
-                
-                return redirect(url_for('partner_insurance'))
-            
-            elif action in ['save', 'delete']:
-                # 수정/삭제 (조합승인 전까지만 가능)
-                app_id = request.form.get('app_id')
-                if app_id:
-                    application = db.session.get(InsuranceApplication, int(app_id))
-                    if application and application.partner_group_id == partner_group_id:
-                        # 권한 확인: 본인이 신청한 것이거나 파트너그룹 관리자
-                        if not is_partner_admin:
-                            if not hasattr(current_user, 'id') or application.created_by_member_id != current_user.id:
-                                flash('권한이 없습니다.', 'warning')
-                                return redirect(url_for('partner_insurance'))
-                        if application.approved_at:
-                            flash('조합승인 후에는 수정/삭제할 수 없습니다.', 'warning')
-                        else:
-                            if action == 'delete':
-                                try:
-                                    app_id = application.id
-                                    db.session.delete(application)
-                                    
-                                    try:
-                                        import sys
-                                        sys.stderr.write(f"Insurance delete: Deleting application ID {app_id}\n")
-                                    except Exception:
-                                        pass
-                                    
-                                    commit_success = safe_commit()
-                                    
-                                    if not commit_success:
-                                        try:
-                                            import sys
-                                            import traceback
-                                            sys.stderr.write(f"Insurance delete: Commit failed for ID {app_id}\n")
-                                            sys.stderr.write(f"Insurance delete traceback: {traceback.format_exc()}\n")
-                                        except Exception:
-                                            pass
-                                        flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                                    else:
-                                        try:
-                                            import sys
-                                            sys.stderr.write(f"Insurance delete: Successfully deleted application ID {app_id}\n")
-                                        except Exception:
-                                            pass
-                                        flash('삭제되었습니다.', 'success')
-                                except Exception as e:
-                                    try:
-                                        import sys
-                                        import traceback
-                                        sys.stderr.write(f"Insurance deletion error: {e}\n")
-                                        sys.stderr.write(f"Insurance deletion traceback: {traceback.format_exc()}\n")
-                                    except Exception:
-                                        pass
-                                    try:
-                                        db.session.rollback()
-                                    except Exception:
-                                        pass
-                                    flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                            elif action == 'save':
-                                try:
-                                    app_id = application.id
-                                    application.car_plate = request.form.get('car_plate', '').strip()
-                                    application.vin = request.form.get('vin', '').strip()
-                                    application.car_name = request.form.get('car_name', '').strip()
-                                    application.car_registered_at = parse_date(request.form.get('car_registered_at'))
-                                    application.memo = request.form.get('memo', '').strip()
-                                    
-                                    try:
-                                        import sys
-                                        sys.stderr.write(f"Insurance save: Updating application ID {app_id}\n")
-                                    except Exception:
-                                        pass
-                                    
-                                    commit_success = safe_commit()
-                                    
-                                    if not commit_success:
-                                        try:
-                                            import sys
-                                            import traceback
-                                            sys.stderr.write(f"Insurance save: Commit failed for ID {app_id}\n")
-                                            sys.stderr.write(f"Insurance save traceback: {traceback.format_exc()}\n")
-                                        except Exception:
-                                            pass
-                                        flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-                                    else:
-                                        # 커밋 성공 후 검증
-                                        try:
-                                            import sys
-                                            verify_app = db.session.get(InsuranceApplication, app_id)
-                                            if verify_app:
-                                                sys.stderr.write(f"Insurance save: Verified application ID {app_id} exists\n")
-                                            else:
-                                                sys.stderr.write(f"Insurance save: WARNING - Application ID {app_id} not found after commit!\n")
-                                        except Exception:
-                                            pass
-                                        flash('저장되었습니다.', 'success')
-                                except Exception as e:
-                                    try:
-                                        import sys
-                                        import traceback
-                                        sys.stderr.write(f"Insurance update error: {e}\n")
-                                        sys.stderr.write(f"Insurance update traceback: {traceback.format_exc()}\n")
-                                    except Exception:
-                                        pass
-                                    try:
-                                        db.session.rollback()
-                                    except Exception:
-                                        pass
-                                    flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-            
-            return redirect(url_for('partner_insurance'))
-        
-        # GET 요청: 보험신청 목록 조회
-        start_date = parse_date(request.args.get('start_date', ''))
-        end_date = parse_date(request.args.get('end_date', ''))
-        edit_id = request.args.get('edit_id')
-        
-        # 파트너그룹 정보 가져오기
-        partner_group = db.session.query(PartnerGroup).filter_by(id=partner_group_id).first()
-        partner_group_name = partner_group.name if partner_group else ''
-        
-        # 보험료 설정 목록 가져오기
-        premium_settings = db.session.query(PremiumSetting).order_by(PremiumSetting.vehicle_type).all()
-        
-        # 위탁운영파트너 그룹 여부 확인
-        is_delegated_group = (partner_group_name == '위탁운영파트너 그룹')
-        delegated_members = []
-        if is_delegated_group and is_partner_admin:
-            # 위탁운영파트너 그룹의 승인된 회원 목록
-            delegated_members = db.session.query(Member).filter_by(
-                partner_group_id=partner_group_id,
-                approval_status='승인',
-                role='member'
-            ).order_by(Member.company_name).all()
-        
-        q = db.session.query(InsuranceApplication).filter_by(partner_group_id=partner_group_id)
-        
-        # 회원사는 본인 신청만 조회
-        if not is_partner_admin and hasattr(current_user, 'id'):
-            q = q.filter_by(created_by_member_id=current_user.id)
-        
-        # 검색 조건: 가입일자 기준 (start_at이 있으면 start_at, 없으면 created_at)
-        if start_date:
-            q = q.filter(
-                db.or_(
-                    db.and_(InsuranceApplication.start_at.is_not(None), 
-                           InsuranceApplication.start_at >= datetime.combine(start_date, datetime.min.time(), tzinfo=KST)),
-                    db.and_(InsuranceApplication.start_at.is_(None),
-                           InsuranceApplication.created_at >= datetime.combine(start_date, datetime.min.time(), tzinfo=KST))
-                )
-            )
-        if end_date:
-            q = q.filter(
-                db.or_(
-                    db.and_(InsuranceApplication.start_at.is_not(None),
-                           InsuranceApplication.start_at <= datetime.combine(end_date, datetime.max.time(), tzinfo=KST)),
-                    db.and_(InsuranceApplication.start_at.is_(None),
-                           InsuranceApplication.created_at <= datetime.combine(end_date, datetime.max.time(), tzinfo=KST))
-                )
-            )
-        
-        applications = q.order_by(InsuranceApplication.created_at.desc()).all()
-        
-        # 상태 재계산
-        for app in applications:
-            app.recompute_status()
-        safe_commit()
-        
-        show_point_modal = session.pop('point_top_up_required', False)
-
-        return render_template('partner/insurance.html',
-                             applications=applications,
-                             is_partner_admin=is_partner_admin,
-                             partner_group_id=partner_group_id,
-                             partner_group_name=partner_group_name,
-                             premium_settings=premium_settings,
-                             is_delegated_group=is_delegated_group,
-                             delegated_members=delegated_members,
-                             start_date=start_date,
-                             end_date=end_date,
-                             edit_id=edit_id,
-                            current_user=current_user if not is_partner_admin else None,
-                            member_point_balance=available_points,
-                            member_total_deposit=member_total_deposit,
-                            member_recent_deposits=member_recent_deposits,
-                            pending_virtual_account=pending_virtual_account,
-                             member_settlement_method=member_settlement_method,
-                             insufficient_points=show_point_modal,
-                            point_requirement=point_requirement)
-        
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Partner insurance route error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_dashboard'))
-
-# API: 차량 정보 조회 (보안을 위해 백엔드에서 처리)
-@app.route('/api/get-car-info', methods=['POST'])
-def api_get_car_info():
-    """외부 API에서 차량 정보를 가져오는 보안 엔드포인트"""
-    print("=== API 호출 시작 ===", flush=True)
-    try:
-        ensure_initialized()
-        print("1. ensure_initialized 완료", flush=True)
-
-        # 권한 확인
-        partner_group_id = None
-        is_partner_admin = False
-
-        print(f"2. Session: {dict(session)}", flush=True)
-
-        if 'user_type' in session and session['user_type'] == 'partner_admin':
-            partner_group_id = session.get('partner_group_id')
-            is_partner_admin = True
-            print(f"3. Partner admin - group_id: {partner_group_id}", flush=True)
-        else:
-            try:
-                from flask_login import current_user
-                is_auth = getattr(current_user, 'is_authenticated', False)
-                print(f"3. Current user auth: {is_auth}", flush=True)
-            except Exception as auth_err:
-                print(f"3. Auth error: {auth_err}", flush=True)
-                is_auth = False
-
-            if not is_auth:
-                print("4. 로그인 필요", flush=True)
-                return jsonify({'status': 'error', 'message': '로그인이 필요합니다.'}), 401
-
-            print(f"4. User role: {current_user.role}, partner_group_id: {current_user.partner_group_id}", flush=True)
-
-            if current_user.role == 'member' and current_user.partner_group_id:
-                partner_group_id = current_user.partner_group_id
-            else:
-                print("5. 접근 권한 없음", flush=True)
-                return jsonify({'status': 'error', 'message': '접근 권한이 없습니다.'}), 403
-
-        if not partner_group_id:
-            print("6. 파트너그룹 정보 없음", flush=True)
-            return jsonify({'status': 'error', 'message': '파트너그룹 정보를 찾을 수 없습니다.'}), 403
-
-        print(f"6. Partner group ID: {partner_group_id}", flush=True)
-
-        # 요청 데이터 가져오기
-        data = request.get_json()
-        print(f"7. Request data: {data}", flush=True)
-
-        if not data:
-            print("8. 요청 데이터 없음", flush=True)
-            return jsonify({'status': 'error', 'message': '요청 데이터가 없습니다.'}), 400
-
-        car_no = data.get('car_no', '').strip()
-        if not car_no:
-            print("9. 차량번호 없음", flush=True)
-            return jsonify({'status': 'error', 'message': '차량번호를 입력해주세요.'}), 400
-
-        print(f"9. 차량번호: {car_no}", flush=True)
-
-        # 외부 API 호출 (authkey는 서버측에서 관리)
-        import requests
-        print("10. requests 모듈 임포트 완료", flush=True)
-
-        api_url = 'https://diag.wecarmobility.co.kr/api/get_car_info'
-        authkey = 'ab9d332978438705e1fe52e6af0f0b025687128227dca046f9b6f6e5da5a5f7eee430edfdc6079092244a07fd737abc238e7e2ca71a36283619bfb4b978edb49'
-
-        print(f"11. 외부 API 호출 시작: {api_url}", flush=True)
-
-        try:
-            response = requests.post(
-                api_url,
-                data={
-                    'car_no': car_no,
-                    'authkey': authkey
-                },
-                timeout=10
-            )
-
-            print(f"12. 외부 API 응답 상태: {response.status_code}", flush=True)
-
-            if response.status_code == 200:
-                result = response.json()
-                print(f"13. 외부 API 응답 데이터: {result.get('status')}", flush=True)
-
-                # API 응답 확인
-                if result.get('status') == 'ok' and result.get('dto'):
-                    dto = result['dto']
-                    print(f"14. DTO 데이터 추출 완료", flush=True)
-
-                    # 필요한 데이터만 추출
-                    car_info = {
-                        'status': 'ok',
-                        'data': {
-                            'diag_registered_date': dto.get('diag_registred_date'),  # 최초등록일
-                            'diag_car_id': dto.get('diag_car_id'),  # 차대번호
-                            'diag_model': dto.get('diag_model')  # 차량명
-                        }
-                    }
-
-                    print(f"15. 성공 응답 반환: {car_info}", flush=True)
-                    return jsonify(car_info), 200
-                else:
-                    error_msg = result.get('msg', '차량 정보를 찾을 수 없습니다.')
-                    print(f"16. API 에러 응답: {error_msg}", flush=True)
-                    return jsonify({
-                        'status': 'error',
-                        'message': error_msg
-                    }), 404
-            else:
-                print(f"17. HTTP 에러: {response.status_code}", flush=True)
-                return jsonify({
-                    'status': 'error',
-                    'message': f'외부 API 오류 (HTTP {response.status_code})'
-                }), 500
-
-        except requests.exceptions.Timeout:
-            print("18. Timeout 에러", flush=True)
-            return jsonify({
-                'status': 'error',
-                'message': '요청 시간이 초과되었습니다. 다시 시도해주세요.'
-            }), 504
-        except requests.exceptions.RequestException as e:
-            print(f"19. Request 에러: {e}", flush=True)
-            try:
-                import sys
-                sys.stderr.write(f"Car info API error: {e}\n")
-            except Exception:
-                pass
-            return jsonify({
-                'status': 'error',
-                'message': '차량 정보 조회 중 오류가 발생했습니다.'
-            }), 500
-
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            error_msg = f"Get car info API error: {e}\n{traceback.format_exc()}"
-            sys.stderr.write(error_msg + "\n")
-            print(error_msg, flush=True)  # 콘솔 출력
-        except Exception as log_err:
-            print(f"Logging error: {log_err}", flush=True)
-        return jsonify({
-            'status': 'error',
-            'message': f'서버 오류가 발생했습니다: {str(e)}'
-        }), 500
-
-# 파트너그룹 책임보험가입 엑셀 양식 다운로드
-@app.route('/partner/insurance/excel-template')
-def partner_insurance_excel_template():
-    try:
-        ensure_initialized()
-        import pandas as pd
-        from io import BytesIO
-        
-        # 엑셀 양식 생성
-        data = {
-            '가입희망일자': ['2024-01-01'],
-            '피보험자코드': ['123-45-67890'],
-            '계약자코드': [''],
-            '한글차량번호': ['12가3456'],
-            '차대번호': [''],
-            '차량명': ['소나타'],
-            '차량등록일자': ['2020-01-01'],
-            '비고': [''],
-        }
-        
-        df = pd.DataFrame(data)
-        buffer = BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='보험가입양식')
-        buffer.seek(0)
-        
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name='보험가입업로드양식.xlsx',
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        )
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Partner insurance excel template error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        flash('엑셀 양식 다운로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_insurance'))
-
-# 파트너그룹 약관 페이지 (요구사항의 책임보험약관페이지)
-@app.route('/partner/terms')
-def partner_terms():
-    try:
-        ensure_initialized()
-        
-        # 권한 확인 (간단히)
-        if 'user_type' not in session and not getattr(current_user, 'is_authenticated', False):
-            flash('로그인이 필요합니다.', 'warning')
-            return redirect(url_for('login'))
-        
-        return render_template('partner/terms.html')
-        
-    except Exception as e:
-        try:
-            import sys
-            sys.stderr.write(f"Partner terms route error: {e}\n")
-        except Exception:
-            pass
-        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_dashboard'))
-
-# 파트너그룹 관리자페이지 (요구사항의 관리자페이지)
-@app.route('/partner/admin')
-def partner_admin():
-    try:
-        ensure_initialized()
-        
-        # 파트너그룹 관리자만 접근 가능
-        if 'user_type' not in session or session['user_type'] != 'partner_admin':
-            flash('파트너그룹 관리자만 접근 가능합니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group_id = session.get('partner_group_id')
-        partner_group_name = session.get('partner_group_name')
-        
-        return render_template('partner/admin.html',
-                             partner_group_id=partner_group_id,
-                             partner_group_name=partner_group_name)
-        
-    except Exception as e:
-        try:
-            import sys
-            sys.stderr.write(f"Partner admin route error: {e}\n")
-        except Exception:
-            pass
-        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_dashboard'))
-
-@app.route('/partner/admin/point-management', methods=['GET', 'POST'])
-def partner_admin_point_management():
-    try:
-        ensure_initialized()
-        
-        if 'user_type' not in session or session['user_type'] != 'partner_admin':
-            flash('파트너그룹 관리자만 접근 가능합니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group_id = session.get('partner_group_id')
-        partner_group_name = session.get('partner_group_name')
-        
-        if not partner_group_id:
-            flash('파트너그룹 정보를 확인할 수 없습니다.', 'danger')
-            return redirect(url_for('partner_dashboard'))
-        
-        if request.method == 'POST':
-            action = request.form.get('action')
-            
-            if action == 'deposit':
-                try:
-                    member_identifier = request.form.get('member_id') or request.form.get('member_username')
-                    bank_name = request.form.get('bank_name', '').strip()
-                    account_number = request.form.get('account_number', '').strip()
-                    deposit_amount_raw = request.form.get('deposit_amount', '').replace(',', '').strip()
-                    
-                    if not member_identifier or not bank_name or not account_number or not deposit_amount_raw:
-                        flash('회원, 은행, 계좌번호, 입금액은 필수입니다.', 'warning')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    try:
-                        deposit_amount = int(deposit_amount_raw)
-                    except ValueError:
-                        deposit_amount = 0
-                    
-                    if deposit_amount <= 0:
-                        flash('입금액은 0보다 큰 숫자여야 합니다.', 'warning')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    member = None
-                    # member_id 우선 확인
-                    try:
-                        member_id = int(member_identifier)
-                        member = db.session.get(Member, member_id)
-                    except (TypeError, ValueError):
-                        member = None
-                    
-                    if member is None:
-                        member = db.session.query(Member).filter(
-                            Member.partner_group_id == partner_group_id,
-                            Member.username == member_identifier
-                        ).first()
-                    
-                    if member is None or member.partner_group_id != partner_group_id:
-                        flash('선택한 회원을 찾을 수 없습니다.', 'danger')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    deposit_date_str = request.form.get('deposit_date', '').strip()
-                    deposit_date = datetime.now(KST)
-                    if deposit_date_str:
-                        try:
-                            deposit_date = datetime.strptime(deposit_date_str, '%Y-%m-%dT%H:%M')
-                            if deposit_date.tzinfo is None:
-                                deposit_date = deposit_date.replace(tzinfo=KST)
-                        except ValueError:
-                            flash('입금일시는 YYYY-MM-DDTHH:MM 형식으로 입력해주세요.', 'warning')
-                            return redirect(url_for('partner_admin_point_management'))
-                    
-                    deposit = DepositHistory(
-                        member_id=member.id,
-                        partner_group_id=partner_group_id,
-                        bank_name=bank_name,
-                        account_number=account_number,
-                        deposit_amount=deposit_amount,
-                        deposit_date=deposit_date
-                    )
-                    db.session.add(deposit)
-                    
-                    member.point_balance = (member.point_balance or 0) + deposit_amount
-                    
-                    if not safe_commit():
-                        flash('입금현황 저장 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('입금현황이 저장되었습니다.', 'success')
-                    
-                except Exception as e:
-                    try:
-                        import sys
-                        import traceback
-                        sys.stderr.write(f"Point deposit error: {e}\n")
-                        sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                    except Exception:
-                        pass
-                    try:
-                        db.session.rollback()
-                    except Exception:
-                        pass
-                    flash('입금현황 저장 중 오류가 발생했습니다.', 'danger')
-                
-                return redirect(url_for('partner_admin_point_management'))
-            
-            elif action == 'adjust_points':
-                try:
-                    member_id_value = request.form.get('member_id')
-                    decrease_raw = (request.form.get('point_decrease') or '0').replace(',', '').strip()
-                    increase_raw = (request.form.get('point_increase') or '0').replace(',', '').strip()
-                    change_note = request.form.get('change_note', '').strip()
-                    
-                    if not member_id_value:
-                        flash('포인트를 수정할 회원을 선택해주세요.', 'warning')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    try:
-                        member_id_int = int(member_id_value)
-                    except (TypeError, ValueError):
-                        flash('잘못된 회원 정보입니다.', 'danger')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    member = db.session.get(Member, member_id_int)
-                    if member is None or member.partner_group_id != partner_group_id:
-                        flash('선택한 회원을 찾을 수 없습니다.', 'danger')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    try:
-                        decrease_amount = max(int(decrease_raw or 0), 0)
-                    except ValueError:
-                        decrease_amount = 0
-                    
-                    try:
-                        increase_amount = max(int(increase_raw or 0), 0)
-                    except ValueError:
-                        increase_amount = 0
-                    
-                    if decrease_amount == 0 and increase_amount == 0:
-                        flash('포인트 차감 또는 증가 금액을 입력해주세요.', 'warning')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    current_balance = member.point_balance or 0
-                    new_balance = current_balance - decrease_amount + increase_amount
-                    if new_balance < 0:
-                        new_balance = 0
-                    
-                    member.point_balance = new_balance
-                    
-                    note_parts = []
-                    if decrease_amount > 0:
-                        note_parts.append(f"포인트차감 {decrease_amount:,}원")
-                    if increase_amount > 0:
-                        note_parts.append(f"포인트증가 {increase_amount:,}원")
-                    if change_note:
-                        note_parts.append(change_note)
-                    note_text = ' / '.join(note_parts) if note_parts else '변경 없음'
-                    
-                    adjustment = PointAdjustment(
-                        member_id=member.id,
-                        partner_group_id=partner_group_id,
-                        decrease_amount=decrease_amount,
-                        increase_amount=increase_amount,
-                        change_amount=increase_amount - decrease_amount,
-                        note=note_text
-                    )
-                    db.session.add(adjustment)
-                    
-                    if not safe_commit():
-                        flash('포인트 수정 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('포인트가 수정되었습니다.', 'success')
-                except Exception as e:
-                    try:
-                        import sys
-                        import traceback
-                        sys.stderr.write(f"Point adjust error: {e}\n")
-                        sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                    except Exception:
-                        pass
-                    try:
-                        db.session.rollback()
-                    except Exception:
-                        pass
-                    flash('포인트 수정 중 오류가 발생했습니다.', 'danger')
-                
-                return redirect(url_for('partner_admin_point_management'))
-            
-            elif action == 'export_excel':
-                try:
-                    members = db.session.query(Member).filter(
-                        Member.partner_group_id == partner_group_id,
-                        Member.approval_status == '승인'
-                    ).order_by(Member.company_name.asc()).all()
-                    
-                    wb = Workbook()
-                    ws = wb.active
-                    ws.title = "포인트현황"
-                    ws.append(['아이디', '상사명', '대표자', '사업자번호', '잔류포인트', '누적입금액', '포인트현황'])
-                    
-                    for member in members:
-                        total_deposit = db.session.query(
-                            func.coalesce(func.sum(DepositHistory.deposit_amount), 0)
-                        ).filter(
-                            DepositHistory.member_id == member.id
-                        ).scalar() or 0
-                        
-                        point_balance = member.point_balance or 0
-                        total_points = point_balance + total_deposit
-                        
-                        ws.append([
-                            member.username or '',
-                            member.company_name or '',
-                            member.representative or '',
-                            member.business_number or '',
-                            point_balance,
-                            total_deposit,
-                            total_points
-                        ])
-                    
-                    output = BytesIO()
-                    wb.save(output)
-                    output.seek(0)
-                    
-                    filename = f"point_management_{datetime.now(KST).strftime('%Y%m%d_%H%M%S')}.xlsx"
-                    return send_file(
-                        output,
-                        as_attachment=True,
-                        download_name=filename,
-                        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                    )
-                except Exception as e:
-                    try:
-                        import sys
-                        import traceback
-                        sys.stderr.write(f"Point export error: {e}\n")
-                        sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                    except Exception:
-                        pass
-                    flash('엑셀 다운로드 중 오류가 발생했습니다.', 'danger')
-                    return redirect(url_for('partner_admin_point_management'))
-
-            elif action == 'confirm_deposit_request':
-                try:
-                    request_id = request.form.get('deposit_request_id')
-                    if not request_id:
-                        flash('입금신청 정보를 찾을 수 없습니다.', 'warning')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    deposit_request = db.session.get(DepositRequest, int(request_id))
-                    if not deposit_request or deposit_request.partner_group_id != partner_group_id:
-                        flash('입금신청 정보를 찾을 수 없습니다.', 'warning')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    if deposit_request.status == 'confirmed':
-                        flash('이미 확인 처리된 입금신청입니다.', 'warning')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    # 회원 정보 조회
-                    member = db.session.get(Member, deposit_request.member_id)
-                    if not member:
-                        flash('회원 정보를 찾을 수 없습니다.', 'danger')
-                        return redirect(url_for('partner_admin_point_management'))
-                    
-                    # 입금 내역 기록
-                    deposit_history = DepositHistory(
-                        member_id=member.id,
-                        partner_group_id=partner_group_id,
-                        bank_name=deposit_request.bank_name,
-                        account_number='249-13-000395-8',  # 부산은행 계좌번호
-                        deposit_amount=deposit_request.amount,
-                        deposit_date=datetime.now(KST)
-                    )
-                    db.session.add(deposit_history)
-                    
-                    # 포인트 증가
-                    current_balance = member.point_balance or 0
-                    member.point_balance = current_balance + deposit_request.amount
-                    
-                    # 포인트 조정 내역 기록
-                    point_adjustment = PointAdjustment(
-                        member_id=member.id,
-                        partner_group_id=partner_group_id,
-                        decrease_amount=0,
-                        increase_amount=deposit_request.amount,
-                        change_amount=deposit_request.amount,
-                        note=f'입금신청 확인 (입금자: {deposit_request.account_holder}, 은행: {deposit_request.bank_name})'
-                    )
-                    db.session.add(point_adjustment)
-                    
-                    # 입금신청 상태 업데이트
-                    deposit_request.status = 'confirmed'
-                    deposit_request.confirmed_at = datetime.now(KST)
-                    
-                    if not safe_commit():
-                        flash('입금신청 확인 처리 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash(f'입금신청을 확인 처리했습니다. 포인트 {deposit_request.amount:,}원이 반영되었습니다.', 'success')
-                except Exception as e:
-                    try:
-                        import sys
-                        import traceback
-                        sys.stderr.write(f"Deposit request confirm error: {e}\n")
-                        sys.stderr.write(f"Deposit request confirm traceback: {traceback.format_exc()}\n")
-                    except Exception:
-                        pass
-                    try:
-                        db.session.rollback()
-                    except Exception:
-                        pass
-                    flash('입금신청 확인 처리 중 오류가 발생했습니다.', 'danger')
-
-                return redirect(url_for('partner_admin_point_management'))
-        
-        members = db.session.query(Member).filter(
-            Member.partner_group_id == partner_group_id,
-            Member.approval_status == '승인'
-        ).order_by(Member.company_name.asc()).all()
-        
-        member_rows = []
-        
-        for member in members:
-            recent_deposits = db.session.query(DepositHistory).filter(
-                DepositHistory.member_id == member.id
-            ).order_by(DepositHistory.deposit_date.desc()).limit(3).all()
-            
-            recent_display = [
-                f"{deposit.bank_name}/{deposit.account_number}/{deposit.deposit_amount:,}원"
-                for deposit in recent_deposits
-            ]
-            
-            total_deposit = db.session.query(
-                func.coalesce(func.sum(DepositHistory.deposit_amount), 0)
-            ).filter(
-                DepositHistory.member_id == member.id
-            ).scalar() or 0
-            
-            point_balance = member.point_balance or 0
-            last_adjustment = db.session.query(PointAdjustment).filter(
-                PointAdjustment.member_id == member.id
-            ).order_by(PointAdjustment.created_at.desc()).first()
-            last_adjustment_note = last_adjustment.note if last_adjustment else ''
-            
-            member_rows.append({
-                'member': member,
-                'point_balance': point_balance,
-                'total_deposit': total_deposit,
-                'recent_deposits': recent_display,
-                'last_adjustment_note': last_adjustment_note,
-                'last_adjustment_at': last_adjustment.created_at if last_adjustment else None
-            })
-        
-        pending_deposit_requests = db.session.query(DepositRequest).filter(
-            DepositRequest.partner_group_id == partner_group_id,
-            DepositRequest.status == 'requested'
-        ).order_by(DepositRequest.created_at.desc()).all()
-        
-        return render_template(
-            'partner/admin_point_management.html',
-            partner_group_id=partner_group_id,
-            partner_group_name=partner_group_name,
-            members=members,
-            member_rows=member_rows,
-            deposit_requests=pending_deposit_requests
-        )
-    
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Partner point management error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_dashboard'))
-
-@app.route('/partner/admin/deposit-request-count')
-def partner_admin_deposit_request_count():
-    """입금신청 개수 확인 API (알림용)"""
-    try:
-        ensure_initialized()
-        
-        # 파트너그룹 관리자만 접근 가능
-        if 'user_type' not in session or session['user_type'] != 'partner_admin':
-            return jsonify({'count': 0, 'error': 'Unauthorized'}), 401
-        
-        partner_group_id = session.get('partner_group_id')
-        if not partner_group_id:
-            return jsonify({'count': 0, 'error': 'Partner group not found'}), 400
-        
-        count = db.session.query(DepositRequest).filter(
-            DepositRequest.partner_group_id == partner_group_id,
-            DepositRequest.status == 'requested'
-        ).count()
-        
-        return jsonify({'count': count, 'success': True})
-    
-    except Exception as e:
-        try:
-            import sys
-            sys.stderr.write(f"Deposit request count error: {e}\n")
-        except Exception:
-            pass
-        return jsonify({'count': 0, 'error': str(e)}), 500
-
-@app.route('/partner/admin/point-history/<int:member_id>')
-def partner_admin_point_history(member_id):
-    """회원의 포인트 입출금 세부내역 조회"""
-    try:
-        ensure_initialized()
-        
-        # 파트너 관리자 권한 확인
-        if 'user_type' not in session or session['user_type'] != 'partner_admin':
-            flash('접근 권한이 없습니다.', 'danger')
-            return redirect(url_for('login'))
-        
-        partner_group_id = session.get('partner_group_id')
-        if not partner_group_id:
-            flash('파트너그룹 정보를 확인할 수 없습니다.', 'danger')
-            return redirect(url_for('partner_dashboard'))
-        
-        # 회원 정보 조회
-        member = db.session.query(Member).filter_by(
-            id=member_id, 
-            partner_group_id=partner_group_id
-        ).first()
-        
-        if not member:
-            flash('회원 정보를 찾을 수 없습니다.', 'danger')
-            return redirect(url_for('partner_admin_point_management'))
-        
-        # 파트너그룹 정보 조회
-        partner_group = db.session.get(PartnerGroup, partner_group_id)
-        partner_group_name = partner_group.name if partner_group else '파트너그룹'
-        
-        # 입금 내역 조회 (최신순)
-        deposit_history = db.session.query(DepositHistory).filter_by(
-            member_id=member_id
-        ).order_by(DepositHistory.deposit_date.desc()).all()
-        
-        # 포인트 조정 내역 조회 (최신순)
-        point_adjustments = db.session.query(PointAdjustment).filter_by(
-            member_id=member_id
-        ).order_by(PointAdjustment.created_at.desc()).all()
-        
-        # 통합 내역 생성 (시간순 정렬)
-        transactions = []
-        
-        # 입금 내역 추가
-        for deposit in deposit_history:
-            transactions.append({
-                'type': 'deposit',
-                'date': deposit.deposit_date,
-                'amount': deposit.deposit_amount,
-                'description': f'{deposit.bank_name} {deposit.account_number}',
-                'note': f'입금 {deposit.deposit_amount:,}원',
-                'balance_change': f'+{deposit.deposit_amount:,}원'
-            })
-        
-        # 포인트 조정 내역 추가
-        for adjustment in point_adjustments:
-            if adjustment.decrease_amount > 0:
-                transactions.append({
-                    'type': 'point_decrease',
-                    'date': adjustment.created_at,
-                    'amount': -adjustment.decrease_amount,
-                    'description': '포인트 차감',
-                    'note': adjustment.note or '포인트 차감',
-                    'balance_change': f'-{adjustment.decrease_amount:,}원'
-                })
-            
-            if adjustment.increase_amount > 0:
-                transactions.append({
-                    'type': 'point_increase',
-                    'date': adjustment.created_at,
-                    'amount': adjustment.increase_amount,
-                    'description': '포인트 증가',
-                    'note': adjustment.note or '포인트 증가',
-                    'balance_change': f'+{adjustment.increase_amount:,}원'
-                })
-        
-        # 날짜순 정렬 (최신순)
-        transactions.sort(key=lambda x: x['date'], reverse=True)
-        
-        # 현재 포인트 잔액
-        current_balance = member.point_balance or 0
-        
-        # 총 입금액
-        total_deposits = sum(d.deposit_amount for d in deposit_history)
-        
-        # 총 포인트 차감액
-        total_decreases = sum(a.decrease_amount for a in point_adjustments)
-        
-        # 총 포인트 증가액
-        total_increases = sum(a.increase_amount for a in point_adjustments)
-        
-        return render_template(
-            'partner/admin_point_history.html',
-            member=member,
-            partner_group_name=partner_group_name,
-            transactions=transactions,
-            current_balance=current_balance,
-            total_deposits=total_deposits,
-            total_decreases=total_decreases,
-            total_increases=total_increases
-        )
-    
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Point history error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        flash('포인트 내역 조회 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_admin_point_management'))
-
-@app.route('/partner/admin/deposit-summary')
-def partner_admin_deposit_summary():
-    """입금신청/확인 현황 요약"""
-    try:
-        ensure_initialized()
-        if 'user_type' not in session or session['user_type'] != 'partner_admin':
-            return jsonify({'success': False, 'message': '접근 권한이 없습니다.'}), 403
-        
-        partner_group_id = session.get('partner_group_id')
-        if not partner_group_id:
-            return jsonify({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}), 400
-        
-        requests = db.session.query(DepositRequest, Member).join(Member, DepositRequest.member_id == Member.id).filter(
-            DepositRequest.partner_group_id == partner_group_id
-        ).order_by(DepositRequest.created_at.desc()).all()
-        
-        summary = {}
-        for deposit_request, member in requests:
-            month_key = deposit_request.created_at.strftime('%Y-%m') if deposit_request.created_at else '미상'
-            entry = {
-                'company_name': member.company_name or member.username or '-',
-                'amount': deposit_request.amount,
-                'status': '입금신청' if deposit_request.status == 'requested' else '확인',
-                'requested_at': deposit_request.created_at.strftime('%Y-%m-%d %H:%M') if deposit_request.created_at else '',
-                'confirmed_at': deposit_request.confirmed_at.strftime('%Y-%m-%d %H:%M') if deposit_request.confirmed_at else ''
-            }
-            summary.setdefault(month_key, []).append(entry)
-        
-        # 정렬 (최근 월부터)
-        sorted_summary = [
-            {'month': month, 'items': summary[month]}
-            for month in sorted(summary.keys(), reverse=True)
-        ]
-        
-        return jsonify({'success': True, 'data': sorted_summary})
-    
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Deposit summary error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        return jsonify({'success': False, 'message': '입금현황 요약을 불러오는 중 오류가 발생했습니다.'}), 500
-
-@app.route('/partner/virtual-account', methods=['POST'])
-def partner_virtual_account():
-    try:
-        ensure_initialized()
-        
-        data = request.get_json(silent=True) or request.form
-        action_user_type = None
-        partner_group_id = None
-        target_member = None
-        
-        if 'user_type' in session and session['user_type'] == 'partner_admin':
-            action_user_type = 'partner_admin'
-            partner_group_id = session.get('partner_group_id')
-            
-            if not partner_group_id:
-                return jsonify({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}), 400
-            
-            member_identifier = data.get('member_id') or data.get('member_username')
-            if not member_identifier:
-                return jsonify({'success': False, 'message': '회원 정보를 입력해주세요.'}), 400
-            
-            try:
-                member_id = int(member_identifier)
-                target_member = db.session.get(Member, member_id)
-            except (TypeError, ValueError):
-                target_member = None
-            
-            if target_member is None:
-                target_member = db.session.query(Member).filter(
-                    Member.partner_group_id == partner_group_id,
-                    Member.username == member_identifier
-                ).first()
-            
-            if target_member is None or target_member.partner_group_id != partner_group_id:
-                return jsonify({'success': False, 'message': '선택한 회원을 찾을 수 없습니다.'}), 404
-        
-        else:
-            action_user_type = 'member'
-            if not current_user.is_authenticated:
-                return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
-            
-            partner_group_id = current_user.partner_group_id
-            if not partner_group_id:
-                return jsonify({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}), 400
-            
-            target_member = db.session.get(Member, current_user.id)
-            if target_member is None:
-                return jsonify({'success': False, 'message': '회원 정보를 확인할 수 없습니다.'}), 404
-        
-        account_holder = (data.get('account_holder') or '').strip()
-        bank_name = (data.get('bank_name') or '').strip()
-        deposit_amount_raw = (data.get('deposit_amount') or '').replace(',', '').strip()
-        
-        if not account_holder or not bank_name or not deposit_amount_raw:
-            return jsonify({'success': False, 'message': '입금주, 은행, 입금액은 필수입니다.'}), 400
-        
-        try:
-            deposit_amount = int(deposit_amount_raw)
-        except ValueError:
-            deposit_amount = 0
-        
-        if deposit_amount <= 0:
-            return jsonify({'success': False, 'message': '입금액은 0보다 큰 숫자여야 합니다.'}), 400
-        
-        def generate_account_number():
-            while True:
-                candidate = datetime.now(KST).strftime('%y%m%d') + str(uuid.uuid4().int)[-8:]
-                existing = db.session.query(VirtualAccount).filter(
-                    VirtualAccount.virtual_account_number == candidate
-                ).first()
-                if existing is None:
-                    return candidate
-        
-        # 기존 대기 중인 가상계좌 만료 처리
-        db.session.query(VirtualAccount).filter(
-            VirtualAccount.member_id == target_member.id,
-            VirtualAccount.status == '대기'
-        ).update({'status': '만료'}, synchronize_session=False)
-        
-        virtual_account_number = generate_account_number()
-        expiry_date = datetime.now(KST).date() + timedelta(days=3)
-        
-        virtual_account = VirtualAccount(
-            member_id=target_member.id,
-            partner_group_id=partner_group_id,
-            account_holder=account_holder,
-            bank_name=bank_name,
-            virtual_account_number=virtual_account_number,
-            deposit_amount=deposit_amount,
-            expiry_date=expiry_date,
-            status='대기'
-        )
-        db.session.add(virtual_account)
-        
-        if not safe_commit():
-            return jsonify({'success': False, 'message': '가상계좌 발급 중 오류가 발생했습니다.'}), 500
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'member_username': target_member.username,
-                'bank_name': bank_name,
-                'virtual_account_number': virtual_account_number,
-                'deposit_amount': deposit_amount,
-                'expiry_date': expiry_date.strftime('%Y-%m-%d'),
-                'account_holder': account_holder
-            }
-        })
-    
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Virtual account issue error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        return jsonify({'success': False, 'message': '가상계좌 발급 중 오류가 발생했습니다.'}), 500
-
-@app.route('/virtual-account', methods=['POST'])
-@login_required
-def virtual_account():
-    """일반 회원용 가상계좌 발급"""
-    try:
-        ensure_initialized()
-        
-        data = request.get_json(silent=True) or request.form
-        
-        # 로그인한 회원 정보 확인
-        if not current_user.is_authenticated:
-            return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
-        
-        partner_group_id = current_user.partner_group_id
-        if not partner_group_id:
-            return jsonify({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}), 400
-        
-        target_member = db.session.get(Member, current_user.id)
-        if target_member is None:
-            return jsonify({'success': False, 'message': '회원 정보를 확인할 수 없습니다.'}), 404
-        
-        account_holder = (data.get('account_holder') or '').strip()
-        bank_name = (data.get('bank_name') or '').strip()
-        deposit_amount_raw = (data.get('deposit_amount') or '').replace(',', '').strip()
-        
-        if not account_holder or not bank_name or not deposit_amount_raw:
-            return jsonify({'success': False, 'message': '입금주, 은행, 입금액은 필수입니다.'}), 400
-        
-        try:
-            deposit_amount = int(deposit_amount_raw)
-        except ValueError:
-            deposit_amount = 0
-        
-        if deposit_amount <= 0:
-            return jsonify({'success': False, 'message': '입금액은 0보다 큰 숫자여야 합니다.'}), 400
-        
-        def generate_account_number():
-            import uuid
-            while True:
-                candidate = datetime.now(KST).strftime('%y%m%d') + str(uuid.uuid4().int)[-8:]
-                existing = db.session.query(VirtualAccount).filter(
-                    VirtualAccount.virtual_account_number == candidate
-                ).first()
-                if existing is None:
-                    return candidate
-        
-        # 기존 대기 중인 가상계좌 만료 처리
-        db.session.query(VirtualAccount).filter(
-            VirtualAccount.member_id == target_member.id,
-            VirtualAccount.status == '대기'
-        ).update({'status': '만료'}, synchronize_session=False)
-        
-        virtual_account_number = generate_account_number()
-        expiry_date = datetime.now(KST).date() + timedelta(days=3)
-        
-        virtual_account = VirtualAccount(
-            member_id=target_member.id,
-            partner_group_id=partner_group_id,
-            account_holder=account_holder,
-            bank_name=bank_name,
-            virtual_account_number=virtual_account_number,
-            deposit_amount=deposit_amount,
-            expiry_date=expiry_date,
-            status='대기'
-        )
-        db.session.add(virtual_account)
-        
-        if not safe_commit():
-            return jsonify({'success': False, 'message': '가상계좌 발급 중 오류가 발생했습니다.'}), 500
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'member_username': target_member.username,
-                'bank_name': bank_name,
-                'virtual_account_number': virtual_account_number,
-                'deposit_amount': deposit_amount,
-                'expiry_date': expiry_date.strftime('%Y-%m-%d'),
-                'account_holder': account_holder
-            }
-        })
-    
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Virtual account issue error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        return jsonify({'success': False, 'message': '가상계좌 발급 중 오류가 발생했습니다.'}), 500
-
-@app.route('/deposit-request', methods=['POST'])
-@login_required
-def create_deposit_request():
-    """멤버가 입금 안내를 요청하면 관리자 검토를 위해 저장"""
-    try:
-        ensure_initialized()
-        if db is None:
-            return jsonify({'success': False, 'message': '데이터베이스가 초기화되지 않았습니다.'}), 500
-
-        from flask_login import current_user
-        if not current_user.is_authenticated:
-            return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
-
-        partner_group_id = getattr(current_user, 'partner_group_id', None)
-        if not partner_group_id:
-            return jsonify({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}), 400
-
-        data = request.get_json(silent=True) or request.form
-        raw_amount_value = data.get('amount')
-        if isinstance(raw_amount_value, str):
-            amount_raw = raw_amount_value.replace(',', '').strip()
-        elif isinstance(raw_amount_value, (int, float)):
-            amount_raw = str(int(raw_amount_value))
-        else:
-            amount_raw = ''
-
-        try:
-            amount = int(amount_raw)
-        except (TypeError, ValueError):
-            amount = 0
-
-        if amount < 100000 or amount > 2000000 or amount % 100000 != 0:
-            return jsonify({'success': False, 'message': '입금액은 10만원부터 200만원까지 10만원 단위로 선택해주세요.'}), 400
-
-        account_holder = (data.get('account_holder') or '').strip()
-        bank_name = (data.get('bank_name') or '').strip()
-        
-        if not account_holder:
-            return jsonify({'success': False, 'message': '입금자명을 입력해주세요.'}), 400
-        
-        if not bank_name:
-            return jsonify({'success': False, 'message': '입금은행을 입력해주세요.'}), 400
-
-        # 기존 대기중 요청이 있다면 그대로 두고 추가 저장
-        deposit_request = DepositRequest(
-            member_id=current_user.id,
-            partner_group_id=partner_group_id,
-            amount=amount,
-            account_holder=account_holder,
-            bank_name=bank_name,
-            status='requested',
-        )
-        db.session.add(deposit_request)
-
-        if not safe_commit():
-            return jsonify({'success': False, 'message': '입금신청 저장 중 오류가 발생했습니다.'}), 500
-
-        return jsonify({'success': True, 'message': '입금신청이 접수되었습니다.'})
-
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Deposit request error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        return jsonify({'success': False, 'message': '입금신청 처리 중 오류가 발생했습니다.'}), 500
-
-# 파트너그룹 회원가입승인 페이지
-@app.route('/partner/admin/member-approval', methods=['GET', 'POST'])
-def partner_admin_member_approval():
-    try:
-        ensure_initialized()
-        
-        # 파트너그룹 관리자만 접근 가능
-        if 'user_type' not in session or session['user_type'] != 'partner_admin':
-            flash('파트너그룹 관리자만 접근 가능합니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group_id = session.get('partner_group_id')
-        partner_group_name = session.get('partner_group_name')
-        
-        if request.method == 'POST':
-            action = request.form.get('action')
-            member_id = request.form.get('member_id')
-            
-            # 단건 승인 (신청 → 승인)
-            if action == 'approve' and member_id:
-                try:
-                    member = db.session.query(Member).filter_by(
-                        id=member_id,
-                        partner_group_id=partner_group_id,
-                        role='member'
-                    ).first()
-                    
-                    if not member:
-                        flash('해당 회원을 찾을 수 없습니다.', 'warning')
-                    else:
-                        if member.approval_status != '승인':
-                            member.approval_status = '승인'
-                            commit_success = safe_commit()
-                            if commit_success:
-                                flash('회원이 승인되었습니다.', 'success')
-                            else:
-                                flash('회원 승인 처리 중 오류가 발생했습니다.', 'danger')
-                        else:
-                            flash('이미 승인된 회원입니다.', 'info')
-                except Exception as e:
-                    try:
-                        import sys
-                        import traceback
-                        sys.stderr.write(f"Member approve error: {e}\n")
-                        sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                    except Exception:
-                        pass
-                    try:
-                        db.session.rollback()
-                    except Exception:
-                        pass
-                    flash('회원 승인 처리 중 오류가 발생했습니다.', 'danger')
-            
-            # 회원추가
-            elif action == 'add':
-                member_type = request.form.get('member_type', '법인사업자').strip()
-                company_name = request.form.get('company_name', '').strip()
-                position = request.form.get('position', '').strip()
-                full_name = request.form.get('full_name', '').strip()
-                license_number = request.form.get('license_number', '').strip()
-                username = request.form.get('username', '').strip()
-                password = request.form.get('password', '').strip()
-                address = request.form.get('address', '').strip()
-                business_number = request.form.get('business_number', '').strip()
-                car_dealership_number = request.form.get('car_dealership_number', '').strip()
-                corporation_number = request.form.get('corporation_number', '').strip()
-                representative = request.form.get('representative', '').strip()
-                phone = request.form.get('phone', '').strip()
-                mobile = request.form.get('mobile', '').strip()
-                email = request.form.get('email', '').strip()
-                approval_status = request.form.get('approval_status', '신청').strip()
-                memo = request.form.get('memo', '').strip()
-                settlement_method = request.form.get('settlement_method', '포인트').strip() or '포인트'
-                if settlement_method != '후불정산':
-                    settlement_method = '포인트'
-                
-                # 필수 필드 검증
-                if not company_name or not username or not password or not business_number or not car_dealership_number:
-                    flash('상사명, 아이디, 패스워드, 사업자번호, 자동차관리업 등록번호는 필수입니다.', 'warning')
-                elif not corporation_number:
-                    if member_type == '개인사업자':
-                        flash('대표자주민등록번호를 입력해주세요.', 'warning')
-                    else:
-                        flash('법인번호를 입력해주세요.', 'warning')
-                elif not position or not full_name or not license_number:
-                    flash('직책, 성명, 종사원증번호는 필수입니다.', 'warning')
-                elif not mobile or not representative:
-                    flash('휴대폰, 대표자는 필수입니다.', 'warning')
-                else:
-                    # 중복 확인 (파트너그룹 내에서)
-                    existing = db.session.query(Member).filter(
-                        Member.partner_group_id == partner_group_id,
-                        (Member.username == username) | (Member.business_number == business_number)
-                    ).first()
-                    
-                    if existing:
-                        flash('이미 존재하는 아이디 또는 사업자번호입니다.', 'danger')
-                    else:
-                        try:
-                            # 파일 업로드 처리
-                            registration_cert_path = None
-                            license_attachment_path = None
-                            
-                            # 사업자등록증 파일 처리
-                            if 'registration_cert' in request.files:
-                                try:
-                                    file = request.files['registration_cert']
-                                    if file and file.filename:
-                                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
-                                        file_ext = os.path.splitext(file.filename)[1].lower()
-                                        if file_ext in allowed_extensions:
-                                            os.makedirs(UPLOAD_DIR, exist_ok=True)
-                                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                                            filename = f"{business_number}_{timestamp}{file_ext}"
-                                            filepath = os.path.join(UPLOAD_DIR, filename)
-                                            file.save(filepath)
-                                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                                registration_cert_path = os.path.join('uploads', filename)
-                                except Exception as e:
-                                    try:
-                                        import sys
-                                        sys.stderr.write(f"Member add registration cert upload error: {e}\n")
-                                    except Exception:
-                                        pass
-                            
-                            # 종사원증 파일 처리
-                            if 'license_attachment' in request.files:
-                                try:
-                                    file = request.files['license_attachment']
-                                    if file and file.filename:
-                                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
-                                        file_ext = os.path.splitext(file.filename)[1].lower()
-                                        if file_ext in allowed_extensions:
-                                            os.makedirs(UPLOAD_DIR, exist_ok=True)
-                                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                                            filename = f"{business_number}_license_{timestamp}{file_ext}"
-                                            filepath = os.path.join(UPLOAD_DIR, filename)
-                                            file.save(filepath)
-                                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                                license_attachment_path = os.path.join('uploads', filename)
-                                except Exception as e:
-                                    try:
-                                        import sys
-                                        sys.stderr.write(f"Member add license attachment upload error: {e}\n")
-                                    except Exception:
-                                        pass
-                            
-                            new_member = Member(
-                                partner_group_id=partner_group_id,
-                                username=username,
-                                company_name=company_name,
-                                position=position,
-                                full_name=full_name,
-                                license_number=license_number,
-                                address=address,
-                                business_number=business_number,
-                                car_dealership_number=car_dealership_number,
-                                corporation_number=corporation_number,
-                                representative=representative,
-                                phone=phone,
-                                mobile=mobile,
-                                email=email,
-                                approval_status=approval_status,
-                                role='member',
-                                memo=memo,
-                                member_type=member_type,
-                                privacy_agreement=False,  # 관리자가 회원 추가 시 개인정보 동의는 불필요
-                                registration_cert_path=registration_cert_path,
-                                license_attachment_path=license_attachment_path,
-                                settlement_method=settlement_method
-                            )
-                            new_member.set_password(password)
-                            db.session.add(new_member)
-                            
-                            # 커밋 전 디버깅
-                            try:
-                                import sys
-                                sys.stderr.write(f"Add member: Adding {username} to session\n")
-                            except Exception:
-                                pass
-                            
-                            commit_success = safe_commit()
-                            
-                            if commit_success:
-                                # 커밋 성공 후 검증
-                                try:
-                                    import sys
-                                    verify_member = db.session.get(Member, new_member.id)
-                                    if verify_member:
-                                        sys.stderr.write(f"Add member: Verified {username} (ID: {new_member.id}) exists\n")
-                                    else:
-                                        sys.stderr.write(f"Add member: WARNING - {username} not found after commit!\n")
-                                except Exception:
-                                    pass
-                                flash('회원이 추가되었습니다.', 'success')
-                            else:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Add member: Commit failed for {username}\n")
-                                    sys.stderr.write(f"Add member: Traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                flash('회원 추가 중 오류가 발생했습니다.', 'danger')
-                        except Exception as e:
-                            try:
-                                import sys
-                                import traceback
-                                sys.stderr.write(f"Add member error: {e}\n")
-                                sys.stderr.write(f"Add member traceback: {traceback.format_exc()}\n")
-                            except Exception:
-                                pass
-                            try:
-                                db.session.rollback()
-                            except Exception:
-                                pass
-                            flash('회원 추가 중 오류가 발생했습니다.', 'danger')
-            
-            # 엑셀 업로드
-            elif action == 'excel_upload':
-                file = request.files.get('excel_file')
-                if not file:
-                    flash('엑셀 파일을 선택하세요.', 'warning')
-                else:
-                    try:
-                        import pandas as pd
-                        df = pd.read_excel(file)
-                        created = 0
-                        skipped = 0
-                        errors = []
-                        
-                        # 필수 컬럼 확인
-                        required_cols = {'username', 'company_name', 'business_number', 'car_dealership_number', 'password'}
-                        if not required_cols.issubset(set(df.columns)):
-                            flash('엑셀 컬럼이 올바르지 않습니다. (필수: username, company_name, business_number, password)', 'danger')
-                        else:
-                            for idx, row in df.iterrows():
-                                try:
-                                    username = str(row.get('username', '')).strip()
-                                    company_name = str(row.get('company_name', '')).strip()
-                                    business_number = str(row.get('business_number', '')).strip()
-                                    car_dealership_number = str(row.get('car_dealership_number', '')).strip()
-                                    password = str(row.get('password', '')).strip()
-                                    settlement_method = str(row.get('settlement_method', '포인트')).strip() or '포인트'
-                                    if settlement_method not in ('포인트', '후불정산'):
-                                        settlement_method = '포인트'
-                                    
-                                    if not username or not company_name or not business_number or not car_dealership_number or not password:
-                                        skipped += 1
-                                        continue
-                                    
-                                    # 중복 확인 (파트너그룹 내에서)
-                                    existing = db.session.query(Member).filter(
-                                        Member.partner_group_id == partner_group_id,
-                                        (Member.username == username) | (Member.business_number == business_number) | (Member.car_dealership_number == car_dealership_number)
-                                    ).first()
-                                    
-                                    if existing:
-                                        skipped += 1
-                                        continue
-                                    
-                                    new_member = Member(
-                                        partner_group_id=partner_group_id,
-                                        username=username,
-                                        company_name=company_name,
-                                        address=str(row.get('address', '') or '').strip(),
-                                        business_number=business_number,
-                                        car_dealership_number=car_dealership_number,
-                                        corporation_number=str(row.get('corporation_number', '') or '').strip(),
-                                        representative=str(row.get('representative', '') or '').strip(),
-                                        phone=str(row.get('phone', '') or '').strip(),
-                                        mobile=str(row.get('mobile', '') or '').strip(),
-                                        email=str(row.get('email', '') or '').strip(),
-                                        approval_status=str(row.get('approval_status', '신청') or '신청').strip() or '신청',
-                                        role='member',
-                                        memo=str(row.get('memo', '') or '').strip(),
-                                        member_type=str(row.get('member_type', '법인') or '법인').strip() or '법인',
-                                        privacy_agreement=bool(row.get('privacy_agreement', False)) if 'privacy_agreement' in row else False,
-                                        settlement_method=settlement_method
-                                    )
-                                    new_member.set_password(password)
-                                    db.session.add(new_member)
-                                    created += 1
-                                except Exception as e:
-                                    skipped += 1
-                                    errors.append(f"행 {idx+2}: {str(e)}")
-                                    try:
-                                        import sys
-                                        sys.stderr.write(f"Excel upload member error at row {idx+2}: {e}\n")
-                                    except Exception:
-                                        pass
-                            
-                            # 커밋 전 디버깅
-                            try:
-                                import sys
-                                sys.stderr.write(f"Excel upload: Committing {created} members\n")
-                            except Exception:
-                                pass
-                            
-                            commit_success = safe_commit()
-                            
-                            if not commit_success:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Excel upload: Commit failed\n")
-                                    sys.stderr.write(f"Excel upload traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                flash('일괄 업로드 처리 중 오류가 발생했습니다.', 'danger')
-                            else:
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Excel upload: Successfully committed {created} members\n")
-                                except Exception:
-                                    pass
-                                msg = f'일괄 업로드 완료: 추가 {created}건, 건너뜀 {skipped}건'
-                                if errors:
-                                    msg += f' (오류: {len(errors)}건)'
-                                flash(msg, 'success' if created > 0 else 'warning')
-                    except Exception as e:
-                        try:
-                            import sys
-                            sys.stderr.write(f"Excel upload error: {e}\n")
-                        except Exception:
-                            pass
-                        flash('업로드 처리 중 오류가 발생했습니다.', 'danger')
-            
-            # 기존 수정/삭제 처리
-            elif action in ['save', 'delete'] and member_id:
-                member = db.session.get(Member, int(member_id))
-                if member and member.partner_group_id == partner_group_id:
-                    if action == 'delete':
-                        try:
-                            member_id = member.id
-                            member_username = member.username
-
-                            # 삭제하기 전에 관련 데이터들을 먼저 확인하고 삭제
-                            import os
-                            files_to_delete = []
-
-                            # 1. 삭제 가능한지 먼저 확인
-                            can_delete = True
-                            delete_warnings = []
-
-                            try:
-                                # InsuranceApplication 모델 import
-                                from models import InsuranceApplication
-
-                                # 보험 신청 데이터 확인
-                                insurance_count = db.session.query(InsuranceApplication).filter_by(created_by_member_id=member_id).count()
-                                if insurance_count > 0:
-                                    delete_warnings.append(f"보험 신청 {insurance_count}건")
-                                    # 보험 신청이 있는 경우 삭제 가능하지만 경고
-                                    pass
-
-                            except Exception as check_error:
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Delete check error: {check_error}\n")
-                                except Exception:
-                                    pass
-                                # 확인 실패 시에도 삭제 시도
-                                pass
-
-                            # 2. 관련된 데이터들 삭제 (순서 중요: 외래 키 제약조건 고려)
-                            try:
-                                from models import InsuranceApplication, DepositHistory, DepositRequest, VirtualAccount, PointAdjustment
-
-                                # 보험 신청 데이터 삭제
-                                insurance_apps = db.session.query(InsuranceApplication).filter_by(created_by_member_id=member_id).all()
-                                for app in insurance_apps:
-                                    # 보험 신청 관련 파일들도 삭제 목록에 추가
-                                    if app.insurance_policy_path:
-                                        policy_file = os.path.join('static', app.insurance_policy_path)
-                                        if os.path.exists(policy_file):
-                                            files_to_delete.append(policy_file)
-                                    db.session.delete(app)
-
-                                # 입금 내역 삭제
-                                deposit_histories = db.session.query(DepositHistory).filter_by(member_id=member_id).all()
-                                for history in deposit_histories:
-                                    db.session.delete(history)
-
-                                # 입금 요청 삭제
-                                deposit_requests = db.session.query(DepositRequest).filter_by(member_id=member_id).all()
-                                for dep_request in deposit_requests:
-                                    db.session.delete(dep_request)
-
-                                # 가상 계좌 삭제
-                                virtual_accounts = db.session.query(VirtualAccount).filter_by(member_id=member_id).all()
-                                for account in virtual_accounts:
-                                    db.session.delete(account)
-
-                                # 포인트 조정 내역 삭제
-                                point_adjustments = db.session.query(PointAdjustment).filter_by(member_id=member_id).all()
-                                for adjustment in point_adjustments:
-                                    db.session.delete(adjustment)
-
-                            except Exception as related_error:
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Related data delete error: {related_error}\n")
-                                    sys.stderr.write(f"Related data delete traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                # 관련 데이터 삭제 실패 시 롤백하고 중단
-                                db.session.rollback()
-                                flash('관련 데이터 삭제 중 오류가 발생했습니다. 회원 삭제를 취소합니다.', 'danger')
-                                return redirect(url_for('partner_admin_member_approval'))
-
-                            # 2. 회원 첨부 파일들 삭제 목록에 추가
-                            if member.registration_cert_path:
-                                file_path = os.path.join('static', member.registration_cert_path)
-                                if os.path.exists(file_path):
-                                    files_to_delete.append(file_path)
-
-                            if member.license_attachment_path:
-                                file_path = os.path.join('static', member.license_attachment_path)
-                                if os.path.exists(file_path):
-                                    files_to_delete.append(file_path)
-
-                            # 3. 회원 삭제
-                            db.session.delete(member)
-
-                            try:
-                                import sys
-                                sys.stderr.write(f"Member delete: Deleting member {member_username} (ID: {member_id})\n")
-                            except Exception:
-                                pass
-
-                            # 4. 커밋 시도
-                            commit_success = safe_commit()
-
-                            if commit_success:
-                                # 파일들 삭제 (커밋 성공 후)
-                                for file_path in files_to_delete:
-                                    try:
-                                        os.remove(file_path)
-                                        try:
-                                            import sys
-                                            sys.stderr.write(f"Deleted file: {file_path}\n")
-                                        except Exception:
-                                            pass
-                                    except Exception as file_error:
-                                        try:
-                                            import sys
-                                            sys.stderr.write(f"File delete error: {file_error}\n")
-                                        except Exception:
-                                            pass
-
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Member delete: Successfully deleted member {member_username}\n")
-                                except Exception:
-                                    pass
-                                flash('회원이 삭제되었습니다.', 'success')
-                            else:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Member delete: Commit failed for {member_username}\n")
-                                    sys.stderr.write(f"Member delete traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                flash('회원 삭제 중 오류가 발생했습니다.', 'danger')
-                        except Exception as e:
-                            try:
-                                import sys
-                                import traceback
-                                sys.stderr.write(f"Member deletion error: {e}\n")
-                                sys.stderr.write(f"Member deletion traceback: {traceback.format_exc()}\n")
-                            except Exception:
-                                pass
-                            try:
-                                db.session.rollback()
-                            except Exception:
-                                pass
-                            flash('회원 삭제 중 오류가 발생했습니다.', 'danger')
-                    elif action == 'save':
-                        try:
-                            member_id = member.id
-                            member_username = member.username
-                            member.member_type = request.form.get('member_type', '법인사업자').strip()
-                            member.company_name = request.form.get('company_name', '').strip()
-                            member.position = request.form.get('position', '').strip()
-                            member.full_name = request.form.get('full_name', '').strip()
-                            member.license_number = request.form.get('license_number', '').strip()
-                            member.username = request.form.get('username', '').strip()
-                            if request.form.get('password', '').strip():
-                                member.set_password(request.form.get('password', '').strip())
-                            member.address = request.form.get('address', '').strip()
-                            member.business_number = request.form.get('business_number', '').strip()
-                            member.car_dealership_number = request.form.get('car_dealership_number', '').strip()
-                            member.corporation_number = request.form.get('corporation_number', '').strip()
-                            member.representative = request.form.get('representative', '').strip()
-                            member.phone = request.form.get('phone', '').strip()
-                            member.mobile = request.form.get('mobile', '').strip()
-                            member.email = request.form.get('email', '').strip()
-                            member.approval_status = request.form.get('approval_status', '신청')
-                            member.role = request.form.get('role', 'member')
-                            member.memo = request.form.get('memo', '').strip()
-                            settlement_method = request.form.get('settlement_method', member.settlement_method or '포인트').strip()
-                            if settlement_method not in ('포인트', '후불정산'):
-                                settlement_method = '포인트'
-                            member.settlement_method = settlement_method
-                            
-                            # 사업자등록증 파일 업로드 처리
-                            if 'registration_cert' in request.files:
-                                try:
-                                    file = request.files['registration_cert']
-                                    if file and file.filename:
-                                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
-                                        file_ext = os.path.splitext(file.filename)[1].lower()
-                                        if file_ext in allowed_extensions:
-                                            # 업로드 디렉토리 확인 및 생성
-                                            os.makedirs(UPLOAD_DIR, exist_ok=True)
-                                            
-                                            # 기존 파일이 있으면 삭제 (선택사항)
-                                            if member.registration_cert_path:
-                                                old_filepath = os.path.join(UPLOAD_DIR, member.registration_cert_path.split('/')[-1])
-                                                try:
-                                                    if os.path.exists(old_filepath):
-                                                        os.remove(old_filepath)
-                                                except Exception:
-                                                    pass  # 기존 파일 삭제 실패해도 계속 진행
-                                            
-                                            # 새 파일 저장
-                                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                                            business_number = member.business_number or 'unknown'
-                                            filename = f"{business_number}_{timestamp}{file_ext}"
-                                            filepath = os.path.join(UPLOAD_DIR, filename)
-                                            file.save(filepath)
-                                            
-                                            # 파일이 실제로 저장되었는지 확인
-                                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                                member.registration_cert_path = os.path.join('uploads', filename)
-                                                print(f"Registration cert updated successfully: {member.registration_cert_path}")
-                                            else:
-                                                print(f"ERROR: Registration cert file was not saved properly. Path: {filepath}")
-                                        else:
-                                            flash(f'허용되지 않은 파일 형식입니다. (PDF, JPG, PNG만 가능)', 'warning')
-                                except Exception as e:
-                                    try:
-                                        import sys
-                                        import traceback
-                                        sys.stderr.write(f"Registration cert upload error: {e}\n")
-                                        sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                                    except Exception:
-                                        pass
-                                    flash('사업자등록증 파일 업로드 중 오류가 발생했습니다.', 'warning')
-                                    # 파일 업로드 실패해도 다른 정보는 저장
-                            
-                            # 종사원증 파일 업로드 처리
-                            if 'license_attachment' in request.files:
-                                try:
-                                    file = request.files['license_attachment']
-                                    if file and file.filename:
-                                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
-                                        file_ext = os.path.splitext(file.filename)[1].lower()
-                                        if file_ext in allowed_extensions:
-                                            # 업로드 디렉토리 확인 및 생성
-                                            os.makedirs(UPLOAD_DIR, exist_ok=True)
-                                            
-                                            # 기존 파일이 있으면 삭제 (선택사항)
-                                            if member.license_attachment_path:
-                                                old_filepath = os.path.join(UPLOAD_DIR, member.license_attachment_path.split('/')[-1])
-                                                try:
-                                                    if os.path.exists(old_filepath):
-                                                        os.remove(old_filepath)
-                                                except Exception:
-                                                    pass
-                                            
-                                            # 새 파일 저장
-                                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                                            business_number = member.business_number or 'unknown'
-                                            filename = f"{business_number}_license_{timestamp}{file_ext}"
-                                            filepath = os.path.join(UPLOAD_DIR, filename)
-                                            file.save(filepath)
-                                            
-                                            # 파일이 실제로 저장되었는지 확인
-                                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                                member.license_attachment_path = os.path.join('uploads', filename)
-                                                print(f"License attachment updated successfully: {member.license_attachment_path}")
-                                            else:
-                                                print(f"ERROR: License attachment file was not saved properly. Path: {filepath}")
-                                        else:
-                                            flash(f'허용되지 않은 파일 형식입니다. (PDF, JPG, PNG만 가능)', 'warning')
-                                except Exception as e:
-                                    try:
-                                        import sys
-                                        import traceback
-                                        sys.stderr.write(f"License attachment upload error: {e}\n")
-                                        sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                                    except Exception:
-                                        pass
-                                    flash('종사원증 파일 업로드 중 오류가 발생했습니다.', 'warning')
-                            
-                            try:
-                                import sys
-                                sys.stderr.write(f"Member save: Updating member {member_username} (ID: {member_id})\n")
-                            except Exception:
-                                pass
-                            
-                            commit_success = safe_commit()
-                            
-                            if commit_success:
-                                # 커밋 성공 후 검증
-                                try:
-                                    import sys
-                                    verify_member = db.session.get(Member, member_id)
-                                    if verify_member:
-                                        sys.stderr.write(f"Member save: Verified member {member_username} (ID: {member_id}) exists\n")
-                                    else:
-                                        sys.stderr.write(f"Member save: WARNING - Member {member_username} not found after commit!\n")
-                                except Exception:
-                                    pass
-                                flash('회원 정보가 저장되었습니다.', 'success')
-                            else:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Member save: Commit failed for {member_username}\n")
-                                    sys.stderr.write(f"Member save traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                flash('회원 정보 저장 중 오류가 발생했습니다.', 'danger')
-                        except Exception as e:
-                            try:
-                                import sys
-                                import traceback
-                                sys.stderr.write(f"Member update error: {e}\n")
-                                sys.stderr.write(f"Member update traceback: {traceback.format_exc()}\n")
-                            except Exception:
-                                pass
-                            try:
-                                db.session.rollback()
-                            except Exception:
-                                pass
-                            flash('회원 정보 저장 중 오류가 발생했습니다.', 'danger')
-            
-            return redirect(url_for('partner_admin_member_approval', edit_id=request.args.get('edit_id')))
-        
-        edit_id = request.args.get('edit_id')
-        members = db.session.query(Member).filter_by(
-            partner_group_id=partner_group_id,
-            role='member'
-        ).order_by(Member.created_at.desc()).all()
-
-        return render_template('partner/admin_member_approval.html',
-                             members=members,
-                             partner_group_name=partner_group_name,
-                             edit_id=edit_id)
-        
-    except Exception as e:
-        try:
-            import sys
-            sys.stderr.write(f"Partner admin member approval error: {e}\n")
-        except Exception:
-            pass
-        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_admin'))
-
-# 파트너그룹 회원가입승인 엑셀 양식 다운로드
-@app.route('/partner/admin/member-approval/excel-template')
-def partner_admin_member_excel_template():
-    try:
-        ensure_initialized()
-        import pandas as pd
-        from io import BytesIO
-        
-        # 엑셀 양식 생성
-        data = {
-            'username': ['아이디'],
-            'password': ['패스워드'],
-            'company_name': ['상사명'],
-            'address': ['주소'],
-            'business_number': ['사업자번호'],
-            'corporation_number': ['법인번호'],
-            'representative': ['대표자'],
-            'phone': ['연락처'],
-            'mobile': ['휴대폰'],
-            'email': ['이메일'],
-            'approval_status': ['승인'],
-            'settlement_method': ['포인트 또는 후불정산'],
-            'memo': ['비고'],
-        }
-        
-        df = pd.DataFrame(data)
-        buffer = BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='회원업로드양식')
-        buffer.seek(0)
-        
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name='회원업로드양식.xlsx',
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        )
-    except Exception as e:
-        try:
-            import sys
-            sys.stderr.write(f"Excel template download error: {e}\n")
-        except Exception:
-            pass
-        flash('양식 다운로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_admin_member_approval'))
-
-# 파트너그룹 책임보험승인 페이지
-@app.route('/partner/admin/insurance-approval', methods=['GET', 'POST'])
-def partner_admin_insurance_approval():
-    try:
-        ensure_initialized()
-        
-        # 파트너그룹 관리자만 접근 가능
-        if 'user_type' not in session or session['user_type'] != 'partner_admin':
-            flash('파트너그룹 관리자만 접근 가능합니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group_id = session.get('partner_group_id')
-        if not partner_group_id:
-            flash('파트너그룹 정보가 없습니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group = db.session.query(PartnerGroup).filter_by(id=partner_group_id).first()
-        if partner_group:
-            partner_group_name = partner_group.name
-        else:
-            partner_group_name = session.get('partner_group_name', '')
-        
-        if request.method == 'POST':
-            action = request.form.get('action')
-            
-            if action == 'bulk_approve':
-                # 일괄 승인
-                applications = db.session.query(InsuranceApplication).filter_by(
-                    partner_group_id=partner_group_id,
-                    approved_at=None
-                ).all()
-                
-                now = datetime.now(KST)
-                for app in applications:
-                    app.approved_at = now
-                    app.status = '조합승인'
-                
-                try:
-                    import sys
-                    sys.stderr.write(f"Insurance bulk approve: Approving {len(applications)} applications\n")
-                except Exception:
-                    pass
-                
-                commit_success = safe_commit()
-                
-                if commit_success:
-                    try:
-                        import sys
-                        sys.stderr.write(f"Insurance bulk approve: Successfully approved {len(applications)} applications\n")
-                    except Exception:
-                        pass
-                    flash(f'{len(applications)}건이 일괄 승인되었습니다.', 'success')
-                else:
-                    try:
-                        import sys
-                        import traceback
-                        sys.stderr.write(f"Insurance bulk approve: Commit failed\n")
-                        sys.stderr.write(f"Insurance bulk approve traceback: {traceback.format_exc()}\n")
-                    except Exception:
-                        pass
-                    flash('일괄 승인 처리 중 오류가 발생했습니다.', 'danger')
-            
-            elif action in ['save', 'delete', 'approve']:
-                app_id = request.form.get('app_id')
-                if app_id:
-                    application = db.session.get(InsuranceApplication, int(app_id))
-                    if application and application.partner_group_id == partner_group_id:
-                        if action == 'approve':
-                            try:
-                                app_id = application.id
-                                now = datetime.now(KST)
-                                application.approved_at = now
-                                application.status = '조합승인'
-                                
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Insurance approve: Approving application ID {app_id}\n")
-                                except Exception:
-                                    pass
-                                
-                                commit_success = safe_commit()
-                                
-                                if commit_success:
-                                    try:
-                                        import sys
-                                        sys.stderr.write(f"Insurance approve: Successfully approved application ID {app_id}\n")
-                                    except Exception:
-                                        pass
-                                    flash('승인되었습니다.', 'success')
-                                else:
-                                    try:
-                                        import sys
-                                        import traceback
-                                        sys.stderr.write(f"Insurance approve: Commit failed for ID {app_id}\n")
-                                        sys.stderr.write(f"Insurance approve traceback: {traceback.format_exc()}\n")
-                                    except Exception:
-                                        pass
-                                    flash('승인 처리 중 오류가 발생했습니다.', 'danger')
-                            except Exception as e:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Insurance approve error: {e}\n")
-                                    sys.stderr.write(f"Insurance approve traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                try:
-                                    db.session.rollback()
-                                except Exception:
-                                    pass
-                                flash('승인 처리 중 오류가 발생했습니다.', 'danger')
-                        
-                        elif action == 'delete':
-                            try:
-                                app_id = application.id
-                                db.session.delete(application)
-                                
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Insurance delete (approval): Deleting application ID {app_id}\n")
-                                except Exception:
-                                    pass
-                                
-                                commit_success = safe_commit()
-                                
-                                if commit_success:
-                                    try:
-                                        import sys
-                                        sys.stderr.write(f"Insurance delete (approval): Successfully deleted ID {app_id}\n")
-                                    except Exception:
-                                        pass
-                                    flash('삭제되었습니다.', 'success')
-                                else:
-                                    try:
-                                        import sys
-                                        import traceback
-                                        sys.stderr.write(f"Insurance delete (approval): Commit failed for ID {app_id}\n")
-                                        sys.stderr.write(f"Insurance delete traceback: {traceback.format_exc()}\n")
-                                    except Exception:
-                                        pass
-                                    flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                            except Exception as e:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Insurance deletion error: {e}\n")
-                                    sys.stderr.write(f"Insurance deletion traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                try:
-                                    db.session.rollback()
-                                except Exception:
-                                    pass
-                                flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                        
-                        elif action == 'save':
-                            try:
-                                app_id = application.id
-                                application.car_plate = request.form.get('car_plate', '').strip()
-                                application.vin = request.form.get('vin', '').strip()
-                                application.car_name = request.form.get('car_name', '').strip()
-                                application.car_registered_at = parse_date(request.form.get('car_registered_at', ''))
-                                application.insured_code = request.form.get('insured_code', '').strip()
-                                application.contractor_code = request.form.get('contractor_code', '').strip()
-                                application.memo = request.form.get('memo', '').strip()
-                                
-                                try:
-                                    import sys
-                                    sys.stderr.write(f"Insurance save (approval): Updating application ID {app_id}\n")
-                                except Exception:
-                                    pass
-                                
-                                commit_success = safe_commit()
-                                
-                                if commit_success:
-                                    try:
-                                        import sys
-                                        verify_app = db.session.get(InsuranceApplication, app_id)
-                                        if verify_app:
-                                            sys.stderr.write(f"Insurance save (approval): Verified application ID {app_id} exists\n")
-                                        else:
-                                            sys.stderr.write(f"Insurance save (approval): WARNING - Application ID {app_id} not found after commit!\n")
-                                    except Exception:
-                                        pass
-                                    flash('저장되었습니다.', 'success')
-                                else:
-                                    try:
-                                        import sys
-                                        import traceback
-                                        sys.stderr.write(f"Insurance save (approval): Commit failed for ID {app_id}\n")
-                                        sys.stderr.write(f"Insurance save traceback: {traceback.format_exc()}\n")
-                                    except Exception:
-                                        pass
-                                    flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-                            except Exception as e:
-                                try:
-                                    import sys
-                                    import traceback
-                                    sys.stderr.write(f"Insurance save error: {e}\n")
-                                    sys.stderr.write(f"Insurance save traceback: {traceback.format_exc()}\n")
-                                except Exception:
-                                    pass
-                                try:
-                                    db.session.rollback()
-                                except Exception:
-                                    pass
-                                flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-            
-            return redirect(url_for('partner_admin_insurance_approval', 
-                                  req_start=request.args.get('req_start'),
-                                  req_end=request.args.get('req_end'),
-                                  approved=request.args.get('approved'),
-                                  appr_start=request.args.get('appr_start'),
-                                  appr_end=request.args.get('appr_end'),
-                                  edit_id=request.args.get('edit_id')))
-        
-        # 검색 조건
-        req_start = parse_date(request.args.get('req_start', ''))
-        req_end = parse_date(request.args.get('req_end', ''))
-        approved = request.args.get('approved', '전체')
-        appr_start = parse_date(request.args.get('appr_start', ''))
-        appr_end = parse_date(request.args.get('appr_end', ''))
-        edit_id = request.args.get('edit_id')
-        
-        q = db.session.query(InsuranceApplication).filter_by(partner_group_id=partner_group_id)
-        
-        # 신청시간 기준 검색
-        if req_start:
-            q = q.filter(InsuranceApplication.created_at >= datetime.combine(req_start, datetime.min.time(), tzinfo=KST))
-        if req_end:
-            q = q.filter(InsuranceApplication.created_at <= datetime.combine(req_end, datetime.max.time(), tzinfo=KST))
-        
-        # 승인여부 검색
-        if approved == '승인':
-            q = q.filter(InsuranceApplication.approved_at.is_not(None))
-        elif approved == '미승인':
-            q = q.filter(InsuranceApplication.approved_at.is_(None))
-        
-        # 조합승인시간 기준 검색
-        if appr_start:
-            q = q.filter(InsuranceApplication.approved_at >= datetime.combine(appr_start, datetime.min.time(), tzinfo=KST))
-        if appr_end:
-            q = q.filter(InsuranceApplication.approved_at <= datetime.combine(appr_end, datetime.max.time(), tzinfo=KST))
-        
-        applications = q.order_by(InsuranceApplication.created_at.desc()).all()
-        
-        # 상태 재계산
-        for app in applications:
-            app.recompute_status()
-        safe_commit()
-        
-        return render_template('partner/admin_insurance_approval.html',
-                             applications=applications,
-                             partner_group_name=partner_group_name,
-                             req_start=req_start,
-                             req_end=req_end,
-                             approved=approved,
-                             appr_start=appr_start,
-                             appr_end=appr_end,
-                             edit_id=edit_id)
-        
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Partner admin insurance approval error: {e}\n")
-            sys.stderr.write(f"Partner admin insurance approval traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_admin'))
+def document_store():
+    """문서 저장소 (첫 사용 시 생성 - s3 백엔드의 boto3 import 를 기동 경로에서 제외)"""
+    store = _document_store['store']
+    if store is None:
+        with _document_store['lock']:
+            store = _document_store['store']
+            if store is None:
+                store = _document_store['store'] = _load_document_store()
+    return store
 
-# 파트너그룹 책임보험승인 엑셀 다운로드
-@app.route('/partner/admin/insurance-approval/export')
-def partner_admin_insurance_approval_export():
-    try:
-        ensure_initialized()
-        
-        # 파트너그룹 관리자만 접근 가능
-        if 'user_type' not in session or session['user_type'] != 'partner_admin':
-            flash('파트너그룹 관리자만 접근 가능합니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group_id = session.get('partner_group_id')
-        if not partner_group_id:
-            flash('파트너그룹 정보가 없습니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        import pandas as pd
-        from io import BytesIO
-        
-        # 검색 조건 (동일한 필터 적용)
-        req_start = parse_date(request.args.get('req_start', ''))
-        req_end = parse_date(request.args.get('req_end', ''))
-        approved = request.args.get('approved', '전체')
-        appr_start = parse_date(request.args.get('appr_start', ''))
-        appr_end = parse_date(request.args.get('appr_end', ''))
-        
-        if db is None:
-            flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-            return redirect(url_for('partner_admin_insurance_approval'))
-        
-        # 보험신청 데이터 조회 (동일한 필터)
-        q = db.session.query(InsuranceApplication).filter_by(partner_group_id=partner_group_id)
-        
-        # 신청시간 기준 검색
-        if req_start:
-            q = q.filter(InsuranceApplication.created_at >= datetime.combine(req_start, datetime.min.time(), tzinfo=KST))
-        if req_end:
-            q = q.filter(InsuranceApplication.created_at <= datetime.combine(req_end, datetime.max.time(), tzinfo=KST))
-        
-        # 승인여부 검색
-        if approved == '승인':
-            q = q.filter(InsuranceApplication.approved_at.is_not(None))
-        elif approved == '미승인':
-            q = q.filter(InsuranceApplication.approved_at.is_(None))
-        
-        # 조합승인시간 기준 검색
-        if appr_start:
-            q = q.filter(InsuranceApplication.approved_at >= datetime.combine(appr_start, datetime.min.time(), tzinfo=KST))
-        if appr_end:
-            q = q.filter(InsuranceApplication.approved_at <= datetime.combine(appr_end, datetime.max.time(), tzinfo=KST))
-        
-        applications = q.order_by(InsuranceApplication.created_at.desc()).all()
-        
-        # 엑셀 데이터 생성
-        data = []
-        for app in applications:
-            data.append({
-                '순번': len(data) + 1,
-                '상사명': app.created_by_member.company_name if app.created_by_member else '',
-                '대표자': app.created_by_member.representative if app.created_by_member else '',
-                '사업자번호': app.created_by_member.business_number if app.created_by_member else '',
-                '신청시간': app.created_at.strftime('%Y-%m-%d %H:%M:%S') if app.created_at else '',
-                '가입시간': app.start_at.strftime('%Y-%m-%d %H:%M:%S') if app.start_at else '',
-                '종료시간': app.end_at.strftime('%Y-%m-%d %H:%M:%S') if app.end_at else '',
-                '조합승인시간': app.approved_at.strftime('%Y-%m-%d %H:%M:%S') if app.approved_at else '',
-                '피보험자코드': app.insured_code or '',
-                '계약자코드': app.contractor_code or '',
-                '한글차량번호': app.car_plate or '',
-                '차대번호': app.vin or '',
-                '차량명': app.car_name or '',
-                '차량등록일자': app.car_registered_at.strftime('%Y-%m-%d') if app.car_registered_at else '',
-                '보험료': app.premium or 0,
-                '상태': app.status or '',
-                '비고': app.memo or '',
-            })
-        
-        df = pd.DataFrame(data)
-        buffer = BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='책임보험승인')
-        buffer.seek(0)
-        
-        partner_group = db.session.query(PartnerGroup).filter_by(id=partner_group_id).first()
-        partner_group_name = partner_group.name if partner_group else '파트너그룹'
-        filename = f'{partner_group_name}_책임보험승인_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        )
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Partner admin insurance approval export error: {e}\n")
-            sys.stderr.write(f"Partner admin insurance approval export traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        flash('엑셀 다운로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_admin_insurance_approval'))
 
-# 파트너그룹 정산 페이지
-@app.route('/partner/admin/settlement', methods=['GET', 'POST'])
-def partner_admin_settlement():
-    try:
-        ensure_initialized()
-        
-        # 파트너그룹 관리자만 접근 가능
-        if 'user_type' not in session or session['user_type'] != 'partner_admin':
-            flash('파트너그룹 관리자만 접근 가능합니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group_id = session.get('partner_group_id')
-        if not partner_group_id:
-            flash('파트너그룹 정보가 없습니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group = db.session.query(PartnerGroup).filter_by(id=partner_group_id).first()
-        if not partner_group:
-            flash('파트너그룹을 찾을 수 없습니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group_name = partner_group.name if partner_group else ''
-        
-        # 현재 날짜를 timezone-aware로 가져오기
-        now = datetime.now(KST)
-        try:
-            year = int(request.args.get('year', now.year))
-        except (ValueError, TypeError):
-            year = now.year
-        try:
-            month = int(request.args.get('month', now.month))
-        except (ValueError, TypeError):
-            month = now.month
-        
-        # 월 유효성 검사
-        if month < 1 or month > 12:
-            month = now.month
-        if year < 2000 or year > 2100:
-            year = now.year
-        
-        # 정산 데이터 계산
-        start_period = datetime(year, month, 1, tzinfo=KST)
-        if month == 12:
-            next_month = datetime(year + 1, 1, 1, tzinfo=KST)
-        else:
-            next_month = datetime(year, month + 1, 1, tzinfo=KST)
-        
-        applications = db.session.query(InsuranceApplication).filter(
-            InsuranceApplication.partner_group_id == partner_group_id,
-            InsuranceApplication.start_at.is_not(None),
-            InsuranceApplication.start_at >= start_period,
-            InsuranceApplication.start_at < next_month,
-        ).all()
-        
-        # 회사별 정산 데이터 집계
-        settlements = {}
-        for app in applications:
-            try:
-                # created_by_member가 None일 수 있으므로 안전하게 처리
-                if app.created_by_member:
-                    company_name = app.created_by_member.company_name or ''
-                    representative = app.created_by_member.representative or ''
-                    business_number = app.created_by_member.business_number or ''
-                    settlement_method = app.created_by_member.settlement_method or '포인트'
-                    
-                    company_key = (company_name, representative, business_number)
-                    if company_key not in settlements:
-                        settlements[company_key] = {
-                            'company_name': company_name,
-                            'representative': representative,
-                            'business_number': business_number,
-                            'settlement_method': settlement_method,
-                            'count': 0,
-                            'amount': 0
-                        }
-                    else:
-                        if not settlements[company_key].get('settlement_method'):
-                            settlements[company_key]['settlement_method'] = settlement_method
-                    settlements[company_key]['count'] += 1
-                    settlements[company_key]['amount'] += 9500  # 건수 × 9,500원
-            except Exception as app_err:
-                try:
-                    import sys
-                    sys.stderr.write(f"Settlement aggregation error for app {app.id}: {app_err}\n")
-                except Exception:
-                    pass
-                continue
-        
-        total_count = sum(s['count'] for s in settlements.values())
-        total_amount = sum(s['amount'] for s in settlements.values())
-        
-        # PartnerGroup 객체를 딕셔너리로 변환 (JSON 직렬화 가능하도록)
-        partner_group_dict = None
-        if partner_group:
-            partner_group_dict = {
-                'id': partner_group.id,
-                'name': partner_group.name,
-                'business_number': partner_group.business_number or '',
-                'representative': partner_group.representative or '',
-                'phone': partner_group.phone or '',
-                'mobile': partner_group.mobile or '',
-                'address': partner_group.address or '',
-                'bank_name': partner_group.bank_name or '',
-                'account_number': partner_group.account_number or '',
-            }
-        
-        return render_template('partner/admin_settlement.html',
-                             settlements=list(settlements.values()),
-                             partner_group=partner_group_dict,
-                             partner_group_name=partner_group_name,
-                             year=year,
-                             month=month,
-                             total_count=total_count,
-                             total_amount=total_amount)
-        
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Partner admin settlement error: {e}\n")
-            sys.stderr.write(f"Partner admin settlement traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_admin'))
+def document_ref(stored_path):
+    """DB 에 저장된 경로가 문서 저장소 파일('uploads/<sha256>.pdf')이면 sha256, 이전 방식이면 None"""
+    if not stored_path:
+        return None
+    match = DOCUMENT_REF_RE.match(os.path.basename(stored_path.replace('\\', '/')))
+    return match.group(1) if match else None
+
+
+def _document_meta_from_row(row):
+    return DocumentMeta(row.sha256, row.size, row.mimetype, row.processing_status or 'pending',
+                        row.page_count, row.width, row.height, bool(row.has_preview))
+
 
+def _cache_document_meta(meta):
+    # 처리 대기 중인 문서는 결과가 바뀌므로 캐시하지 않음
+    if meta.processing_status == 'pending':
+        return
+    with _document_meta_lock:
+        if len(_document_meta) >= DOCUMENT_META_CACHE_SIZE:
+            _document_meta.clear()
+        _document_meta[meta.sha256] = meta
+
+
+def get_document_meta(sha256):
+    """문서 메타데이터 (처리가 끝나면 바뀌지 않으므로 프로세스 메모리에 캐시). 없으면 None"""
+    meta = _document_meta.get(sha256)
+    if meta is None and db is not None:
+        with db.session.no_autoflush:
+            row = db.session.get(StoredDocument, sha256)
+        if row is None:
+            return None
+        meta = _document_meta_from_row(row)
+        _cache_document_meta(meta)
+    return meta
 
-@app.route('/partner/admin/settlement/export')
-def partner_admin_settlement_export():
-    """파트너 정산 결과를 엑셀로 다운로드"""
+
+def prefetch_documents(stored_paths):
+    """목록 화면용: 캐시에 없는 문서 메타데이터를 IN 조회 한 번으로 읽어 둔다"""
+    missing = {sha256 for sha256 in map(document_ref, stored_paths) if sha256 and sha256 not in _document_meta}
+    if not missing or db is None:
+        return
     try:
-        ensure_initialized()
-        import pandas as pd
-        from io import BytesIO
-        
-        # 파트너그룹 관리자만 접근 가능
-        if 'user_type' not in session or session['user_type'] != 'partner_admin':
-            flash('파트너그룹 관리자만 접근 가능합니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group_id = session.get('partner_group_id')
-        if not partner_group_id:
-            flash('파트너그룹 정보가 없습니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group = db.session.query(PartnerGroup).filter_by(id=partner_group_id).first()
-        if not partner_group:
-            flash('파트너그룹을 찾을 수 없습니다.', 'warning')
-            return redirect(url_for('partner_dashboard'))
-        
-        partner_group_name = partner_group.name if partner_group else ''
-        
-        # 년도/월 파라미터 처리
-        now = datetime.now(KST)
-        try:
-            year = int(request.args.get('year', now.year))
-        except (ValueError, TypeError):
-            year = now.year
-        try:
-            month = int(request.args.get('month', now.month))
-        except (ValueError, TypeError):
-            month = now.month
-        
-        # 월 유효성 검사
-        if month < 1 or month > 12:
-            month = now.month
-        if year < 2000 or year > 2100:
-            year = now.year
-        
-        # 정산 데이터 계산 (partner_admin_settlement와 동일한 로직)
-        start_period = datetime(year, month, 1, tzinfo=KST)
-        if month == 12:
-            next_month = datetime(year + 1, 1, 1, tzinfo=KST)
-        else:
-            next_month = datetime(year, month + 1, 1, tzinfo=KST)
-        
-        applications = db.session.query(InsuranceApplication).filter(
-            InsuranceApplication.partner_group_id == partner_group_id,
-            InsuranceApplication.start_at.is_not(None),
-            InsuranceApplication.start_at >= start_period,
-            InsuranceApplication.start_at < next_month,
-        ).all()
-        
-        # 회사별 정산 데이터 집계
-        settlements = {}
-        for app in applications:
-            try:
-                if app.created_by_member:
-                    company_name = app.created_by_member.company_name or ''
-                    representative = app.created_by_member.representative or ''
-                    business_number = app.created_by_member.business_number or ''
-                    settlement_method = app.created_by_member.settlement_method or '포인트'
-                    
-                    company_key = (company_name, representative, business_number)
-                    if company_key not in settlements:
-                        settlements[company_key] = {
-                            'company_name': company_name,
-                            'representative': representative,
-                            'business_number': business_number,
-                            'settlement_method': settlement_method,
-                            'count': 0,
-                            'amount': 0
-                        }
-                    else:
-                        if not settlements[company_key].get('settlement_method'):
-                            settlements[company_key]['settlement_method'] = settlement_method
-                    settlements[company_key]['count'] += 1
-                    settlements[company_key]['amount'] += 9500  # 건수 × 9,500원
-            except Exception:
-                continue
-        
-        # 엑셀 데이터 생성
-        data = []
-        row_num = 1
-        total_count = 0
-        total_amount = 0
-        
-        for company_key in sorted(settlements.keys()):
-            settlement = settlements[company_key]
-            total_count += settlement['count']
-            total_amount += settlement['amount']
-            
-            data.append({
-                '순번': row_num,
-                '상사명': settlement['company_name'],
-                '대표자': settlement['representative'],
-                '사업자번호': settlement['business_number'],
-                '대금정산방법': settlement['settlement_method'],
-                '건수': settlement['count'],
-                '금액': settlement['amount'],
-                '비고': '',
-            })
-            row_num += 1
-        
-        # 합계 행 추가
-        if data:
-            data.append({
-                '순번': '',
-                '상사명': '합계',
-                '대표자': '',
-                '사업자번호': '',
-                '대금정산방법': '',
-                '건수': total_count,
-                '금액': total_amount,
-                '비고': '',
-            })
-        
-        # DataFrame 생성 및 엑셀 파일 생성
-        df = pd.DataFrame(data)
-        buffer = BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='정산내역')
-        buffer.seek(0)
-        
-        filename = f'{partner_group_name}_정산내역_{year}년{month}월_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        )
-        
-    except Exception as e:
-        try:
-            import sys
-            import traceback
-            sys.stderr.write(f"Partner admin settlement export error: {e}\n")
-            sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-        except Exception:
-            pass
-        flash('엑셀 다운로드 중 오류가 발생했습니다.', 'danger')
-        return redirect(url_for('partner_admin_settlement'))
+        with db.session.no_autoflush:
+            for row in db.session.query(StoredDocument).filter(StoredDocument.sha256.in_(missing)):
+                _cache_document_meta(_document_meta_from_row(row))
+    except SQLAlchemyError as e:
+        files_log.warning("Document prefetch failed: %s", e)
 
 
-@app.route('/admin')
-@login_required
-@admin_required
-def admin_home():
-    # 전체대시보드로 리다이렉트
-    return redirect(url_for('admin_dashboard'))
+def document_info(stored_path):
+    """템플릿용 문서 정보 (썸네일 여부, PDF 쪽수). 이전 방식 파일이거나 없으면 None"""
+    sha256 = document_ref(stored_path)
+    return get_document_meta(sha256) if sha256 else None
 
 
-@app.route('/admin/members', methods=['GET', 'POST'])
-@login_required
-@admin_required
-def admin_members():
-    ensure_initialized()  # Ensure initialization
-    if request.method == 'POST':
-        action = request.form.get('action')
-        member_id = request.form.get('member_id')
-        if member_id:
-            m = db.session.get(Member, int(member_id))
-            if m:
-                if action == 'update_status':
-                    m.approval_status = request.form.get('approval_status', '신청')
-                    if not safe_commit():
-                        flash('승인 상태 변경 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('승인 상태가 변경되었습니다.', 'success')
-                elif action == 'save':
-                    m.company_name = request.form.get('company_name', '').strip()
-                    m.address = request.form.get('address', '').strip()
-                    m.corporation_number = request.form.get('corporation_number', '').strip()
-                    m.representative = request.form.get('representative', '').strip()
-                    m.phone = request.form.get('phone', '').strip()
-                    m.mobile = request.form.get('mobile', '').strip()
-                    m.email = request.form.get('email', '').strip()
-                    m.approval_status = request.form.get('approval_status', '신청')
-                    m.role = request.form.get('role', m.role or 'member')
-                    m.memo = request.form.get('memo', '').strip()
-                    
-                    # 사업자등록증 파일 업로드 처리
-                    if 'registration_cert' in request.files:
-                        try:
-                            file = request.files['registration_cert']
-                            if file and file.filename:
-                                allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
-                                file_ext = os.path.splitext(file.filename)[1].lower()
-                                if file_ext in allowed_extensions:
-                                    # 업로드 디렉토리 확인 및 생성
-                                    os.makedirs(UPLOAD_DIR, exist_ok=True)
-                                    
-                                    # 기존 파일이 있으면 삭제 (선택사항)
-                                    if m.registration_cert_path:
-                                        old_filepath = os.path.join(UPLOAD_DIR, m.registration_cert_path.split('/')[-1])
-                                        try:
-                                            if os.path.exists(old_filepath):
-                                                os.remove(old_filepath)
-                                        except Exception:
-                                            pass  # 기존 파일 삭제 실패해도 계속 진행
-                                    
-                                    # 새 파일 저장
-                                    timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                                    business_number = m.business_number or 'unknown'
-                                    filename = f"{business_number}_{timestamp}{file_ext}"
-                                    filepath = os.path.join(UPLOAD_DIR, filename)
-                                    file.save(filepath)
-                                    
-                                    # 파일이 실제로 저장되었는지 확인
-                                    if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                        m.registration_cert_path = os.path.join('uploads', filename)
-                                        print(f"Registration cert updated successfully: {m.registration_cert_path}")
-                                    else:
-                                        print(f"ERROR: Registration cert file was not saved properly. Path: {filepath}")
-                                else:
-                                    flash(f'허용되지 않은 파일 형식입니다. (PDF, JPG, PNG만 가능)', 'warning')
-                        except Exception as e:
-                            try:
-                                import sys
-                                import traceback
-                                sys.stderr.write(f"Registration cert upload error: {e}\n")
-                                sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                            except Exception:
-                                pass
-                            flash('사업자등록증 파일 업로드 중 오류가 발생했습니다.', 'warning')
-                            # 파일 업로드 실패해도 다른 정보는 저장
-                    
-                    if not safe_commit():
-                        flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('저장되었습니다.', 'success')
-                    return redirect(url_for('admin_members'))
-                elif action == 'delete':
-                    db.session.delete(m)
-                    if not safe_commit():
-                        flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('삭제되었습니다.', 'success')
-        else:
-            if action == 'create':
-                # 파트너그룹 ID 처리
-                partner_group_id = request.form.get('partner_group_id', '').strip()
-                partner_group_id_int = None
-                if partner_group_id:
-                    try:
-                        partner_group_id_int = int(partner_group_id)
-                    except (ValueError, TypeError):
-                        flash('올바른 파트너그룹을 선택해주세요.', 'warning')
-                        return redirect(url_for('admin_members'))
-                
-                username = request.form.get('username', '').strip()
-                password = request.form.get('password', 'temp1234')
-                company_name = request.form.get('company_name', '').strip()
-                address = request.form.get('address', '').strip()
-                business_number = request.form.get('business_number', '').strip()
-                corporation_number = request.form.get('corporation_number', '').strip()
-                representative = request.form.get('representative', '').strip()
-                phone = request.form.get('phone', '').strip()
-                mobile = request.form.get('mobile', '').strip()
-                email = request.form.get('email', '').strip()
-                member_type = request.form.get('member_type', '법인')
-                privacy_agreement = request.form.get('privacy_agreement') == 'on'
-                approval_status = request.form.get('approval_status', '승인')
-                role = request.form.get('role', 'member')
-                
-                if not username or not company_name or not business_number:
-                    flash('아이디/상사명/사업자번호는 필수입니다.', 'warning')
-                elif not partner_group_id_int:
-                    flash('파트너그룹을 선택해주세요.', 'warning')
-                elif db.session.query(Member).filter((Member.username == username) | (Member.business_number == business_number)).first():
-                    flash('이미 존재하는 아이디 또는 사업자번호입니다.', 'danger')
-                else:
-                    # 사업자등록증 파일 업로드 처리
-                    registration_cert_path = None
-                    if 'registration_cert' in request.files:
-                        try:
-                            file = request.files['registration_cert']
-                            if file and file.filename:
-                                allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
-                                file_ext = os.path.splitext(file.filename)[1].lower()
-                                if file_ext in allowed_extensions:
-                                    # 업로드 디렉토리 확인 및 생성
-                                    os.makedirs(UPLOAD_DIR, exist_ok=True)
-                                    
-                                    timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
-                                    filename = f"{business_number}_{timestamp}{file_ext}"
-                                    filepath = os.path.join(UPLOAD_DIR, filename)
-                                    file.save(filepath)
-                                    
-                                    # 파일이 실제로 저장되었는지 확인
-                                    if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-                                        registration_cert_path = os.path.join('uploads', filename)
-                                        print(f"Registration cert saved successfully: {registration_cert_path}")
-                                    else:
-                                        print(f"ERROR: Registration cert file was not saved properly. Path: {filepath}")
-                                else:
-                                    flash(f'허용되지 않은 파일 형식입니다. (PDF, JPG, PNG만 가능)', 'warning')
-                        except Exception as e:
-                            try:
-                                import sys
-                                import traceback
-                                sys.stderr.write(f"Registration cert upload error: {e}\n")
-                                sys.stderr.write(f"Traceback: {traceback.format_exc()}\n")
-                            except Exception:
-                                pass
-                            flash('사업자등록증 파일 업로드 중 오류가 발생했습니다.', 'warning')
-                    
-                    nm = Member(
-                        partner_group_id=partner_group_id_int,
-                        username=username,
-                        company_name=company_name,
-                        address=address,
-                        business_number=business_number,
-                        corporation_number=corporation_number,
-                        representative=representative,
-                        phone=phone,
-                        mobile=mobile,
-                        email=email,
-                        member_type=member_type,
-                        privacy_agreement=privacy_agreement if member_type == '개인' else False,
-                        registration_cert_path=registration_cert_path,
-                        approval_status=approval_status,
-                        role=role,
-                    )
-                    nm.set_password(password)
-                    db.session.add(nm)
-                    if not safe_commit():
-                        flash('회원 추가 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('회원이 추가되었습니다.', 'success')
-                return redirect(url_for('admin_members'))
+app.add_template_global(document_info)
 
-    edit_id = request.args.get('edit_id')
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('dashboard'))
-    members = db.session.query(Member).order_by(Member.created_at.desc()).all()
-    
-    # 파트너그룹 목록 가져오기
-    partner_groups = []
+
+def _store_document_stream(stream, file_ext, fallback_mimetype=None):
+    store = document_store()
+    if store.temp_dir:
+        os.makedirs(store.temp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(prefix='upload-', dir=store.temp_dir)
     try:
-        partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.name).all()
-    except Exception:
-        pass
-    
-    return render_template('admin/members.html', members=members, edit_id=edit_id, partner_groups=partner_groups)
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in iter(lambda: stream.read(1 << 16), b''):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        if size == 0:
+            return None
+        sha256 = digest.hexdigest()
+        file_ext = (file_ext or '').lower()
+        mimetype = mimetypes.guess_type('document' + file_ext)[0] or fallback_mimetype or 'application/octet-stream'
+        # 행 존재 여부는 DB 로 확인 (다른 프로세스의 prune 이 지운 행이 메모리 캐시에 남아 있을 수 있음).
+        # 같은 요청에서 먼저 올린 파일(아직 커밋 전)도 중복으로 본다
+        with db.session.no_autoflush:
+            known = db.session.get(StoredDocument, sha256) is not None or any(
+                isinstance(obj, StoredDocument) and obj.sha256 == sha256 for obj in db.session.new)
+        if not known:
+            db.session.add(StoredDocument(sha256=sha256, size=size, mimetype=mimetype, processing_status='pending'))
+            # 커밋되면 백그라운드에서 처리 (_process_committed_documents)
+            db.session.info.setdefault('documents_to_process', set()).add(sha256)
+        if not known or not store.exists(sha256):
+            store.put(sha256, temp_path, mimetype)
+            if not known:
+                # 커밋되지 않고 끝나면 파일을 지운다 (_discard_documents_to_process)
+                db.session.info.setdefault('documents_put', set()).add(sha256)
+        files_log.debug("Stored document %s (%s bytes, %s)", sha256, size, 'reused' if known else 'new')
+        return sha256 + file_ext
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def store_document(file_storage, file_ext=''):
+    """업로드 파일을 문서 저장소에 저장하고 DB 에 넣을 파일명('<sha256><ext>')을 반환. 빈 파일이면 None
+
+    메타데이터 행은 현재 세션에 추가되어 호출한 쪽의 커밋과 함께 저장된다.
+    """
+    return _store_document_stream(file_storage.stream, file_ext, file_storage.mimetype)
+
+
+def _send_stored_document(key, etag, mimetype, immutable, as_attachment=False, download_name=None):
+    store = document_store()
+    path = store.local_path(key)
+    if path is None:
+        url = store.url(key, mimetype, download_name)
+        if not url:
+            return None
+        response = redirect(url)
+        # presigned URL 이 만료되기 전까지만 리다이렉트를 캐시
+        response.headers['Cache-Control'] = (
+            f'private, max-age={DOCUMENT_URL_EXPIRES // 2}' if immutable else 'private, no-cache')
+        return response
+    if not os.path.isfile(path):
+        files_log.warning("Document %s missing from store %s", key, DOCUMENT_STORE_DIR)
+        return None
+    if immutable:
+        cache_control = f'private, max-age={DOCUMENT_CACHE_MAX_AGE}, immutable'
+    else:
+        cache_control = 'private, no-cache'
+    return send_file_response(path, etag, mimetype, cache_control,
+                              as_attachment=as_attachment, download_name=download_name)
 
 
-@app.route('/admin/members/upload', methods=['POST'])
-@login_required
-@admin_required
-def admin_members_upload():
-    ensure_initialized()  # Ensure initialization
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('admin_members'))
-    if is_serverless:
-        flash('Vercel 환경에서는 엑셀 업로드가 제한됩니다.', 'warning')
-        return redirect(url_for('admin_members'))
-    file = request.files.get('file')
-    if not file:
-        flash('엑셀 파일을 선택하세요.', 'warning')
-        return redirect(url_for('admin_members'))
-    try:
-        # Import pandas only when needed
-        import pandas as pd
-        df = pd.read_excel(file)
-        created = 0
-        skipped = 0
-        required_cols = {'username', 'company_name', 'business_number'}
-        if not required_cols.issubset(set(df.columns)):
-            flash('엑셀 컬럼이 올바르지 않습니다. (필수: username, company_name, business_number)', 'danger')
-            return redirect(url_for('admin_members'))
-        for _, row in df.iterrows():
-            username = str(row.get('username', '')).strip()
-            company_name = str(row.get('company_name', '')).strip()
-            business_number = str(row.get('business_number', '')).strip()
-            if not username or not company_name or not business_number:
-                skipped += 1
-                continue
-            # Dup checks
-            if db.session.query(Member).filter((Member.username == username) | (Member.business_number == business_number)).first():
-                skipped += 1
-                continue
-            m = Member(
-                username=username,
-                company_name=company_name,
-                address=str(row.get('address', '') or '').strip(),
-                business_number=business_number,
-                corporation_number=str(row.get('corporation_number', '') or '').strip(),
-                representative=str(row.get('representative', '') or '').strip(),
-                phone=str(row.get('phone', '') or '').strip(),
-                mobile=str(row.get('mobile', '') or '').strip(),
-                email=str(row.get('email', '') or '').strip(),
-                approval_status=str(row.get('approval_status', '승인') or '승인').strip() or '승인',
-                role=str(row.get('role', 'member') or 'member').strip() or 'member',
-            )
-            password = str(row.get('password', 'temp1234'))
-            m.set_password(password)
-            db.session.add(m)
-            created += 1
-        if not safe_commit():
-            flash('일괄 업로드 처리 중 오류가 발생했습니다.', 'danger')
-        else:
-            flash(f'일괄 업로드 완료: 추가 {created}건, 건너뜀 {skipped}건', 'success')
-    except Exception:
-        flash('업로드 처리 중 오류가 발생했습니다.', 'danger')
-    return redirect(url_for('admin_members'))
+def send_document(stored_path, immutable=True, as_attachment=False, download_name=None):
+    """문서 저장소 파일 응답. 저장소 참조가 아니거나 파일이 없으면 None (호출한 쪽에서 이전 방식 처리)
 
+    immutable: /uploads/<sha256>.pdf 처럼 URL 이 내용을 가리키면 1년 캐시,
+    보험증권처럼 같은 URL 의 내용이 바뀔 수 있으면 no-cache + ETag 재검증.
+    """
+    sha256 = document_ref(stored_path)
+    meta = get_document_meta(sha256) if sha256 else None
+    if meta is None:
+        return None
+    return _send_stored_document(sha256, meta.sha256, meta.mimetype, immutable,
+                                 as_attachment=as_attachment, download_name=download_name)
 
-@app.route('/admin/insurance', methods=['GET', 'POST'])
-@login_required
-@admin_required
-def admin_insurance():
-    ensure_initialized()  # Ensure initialization
-    if request.method == 'POST':
-        if request.form.get('bulk_approve') == '1':
-            # 일괄 승인: 미승인(= status == 신청)인 데이터 모두 승인 시간 부여
-            if db is None:
-                flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-                return redirect(url_for('admin_insurance'))
-            rows = db.session.query(InsuranceApplication).filter(
-                (InsuranceApplication.approved_at.is_(None))
-            ).all()
-            now = datetime.now(KST)
-            for r in rows:
-                r.approved_at = now
-                r.status = '조합승인'
-            if not safe_commit():
-                flash('일괄 승인 처리 중 오류가 발생했습니다.', 'danger')
-            else:
-                flash('일괄 승인되었습니다.', 'success')
-        else:
-            # 단건 수정/삭제
-            action = request.form.get('action')
-            row_id = request.form.get('row_id')
-            print(f"DEBUG: action={action}, row_id={row_id}")  # 디버그 로그
-            
-            if row_id:
-                try:
-                    row = db.session.get(InsuranceApplication, int(row_id))
-                    print(f"DEBUG: Found row={row}")  # 디버그 로그
-                except Exception as e:
-                    print(f"DEBUG: Error finding row: {e}")
-                    row = None
-            else:
-                row = None
-                
-            if row and action:
-                if action == 'approve':
-                    print(f"DEBUG: Approving row {row.id}")  # 디버그 로그
-                    approval_time = datetime.now(KST)
-                    row.approved_at = approval_time
-                    row.status = '조합승인'
-                    if not safe_commit():
-                        flash('승인 처리 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('승인되었습니다.', 'success')
-                        print(f"DEBUG: Approval completed for row {row.id}")  # 디버그 로그
-                elif action == 'delete':
-                    db.session.delete(row)
-                    if not safe_commit():
-                        flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('삭제되었습니다.', 'success')
-                elif action == 'save_memo':
-                    row.memo = request.form.get('memo', row.memo)
-                    if not safe_commit():
-                        flash('비고 저장 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('비고가 저장되었습니다.', 'success')
-                elif action == 'save':
-                    # 편집 모드에서 저장
-                    row.car_plate = request.form.get('car_plate', '').strip()
-                    row.vin = request.form.get('vin', '').strip()
-                    row.car_name = request.form.get('car_name', '').strip()
-                    row.car_registered_at = parse_date(request.form.get('car_registered_at'))
-                    row.start_at = parse_datetime(request.form.get('start_at')) # 가입시간 수정 추가
-                    row.end_at = parse_datetime(request.form.get('end_at'))   # 종료시간 수정 추가
-                    row.memo = request.form.get('memo', '').strip()
-                    # 보험증권 정보 저장
-                    if hasattr(row, 'insurance_policy_path'):
-                        row.insurance_policy_path = request.form.get('insurance_policy_path', '').strip() or None
-                    if hasattr(row, 'insurance_policy_url'):
-                        row.insurance_policy_url = request.form.get('insurance_policy_url', '').strip() or None
-                    if not safe_commit():
-                        flash('저장 처리 중 오류가 발생했습니다.', 'danger')
-                    else:
-                        flash('저장되었습니다.', 'success')
-                    return redirect(url_for('admin_insurance', 
-                                           req_start=request.args.get('req_start'),
-                                           req_end=request.args.get('req_end'),
-                                           approved=request.args.get('approved'),
-                                           appr_start=request.args.get('appr_start'),
-                                           appr_end=request.args.get('appr_end')))
-
-    # Filters
-    req_start = parse_date(request.args.get('req_start', ''))
-    req_end = parse_date(request.args.get('req_end', ''))
-    approved_filter = request.args.get('approved')  # 승인/미승인/전체
-    appr_start = parse_date(request.args.get('appr_start', ''))
-    appr_end = parse_date(request.args.get('appr_end', ''))
-    edit_id = request.args.get('edit_id')
 
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('dashboard'))
-    q = db.session.query(InsuranceApplication)
-    if req_start:
-        q = q.filter(InsuranceApplication.created_at >= datetime.combine(req_start, datetime.min.time(), tzinfo=KST))
-    if req_end:
-        q = q.filter(InsuranceApplication.created_at <= datetime.combine(req_end, datetime.max.time(), tzinfo=KST))
-    if approved_filter == '승인':
-        q = q.filter(InsuranceApplication.approved_at.is_not(None))
-    elif approved_filter == '미승인':
-        q = q.filter(InsuranceApplication.approved_at.is_(None))
-    if appr_start:
-        q = q.filter(InsuranceApplication.approved_at >= datetime.combine(appr_start, datetime.min.time(), tzinfo=KST))
-    if appr_end:
-        q = q.filter(InsuranceApplication.approved_at <= datetime.combine(appr_end, datetime.max.time(), tzinfo=KST))
-
-    rows = q.order_by(InsuranceApplication.created_at.desc()).all()
-    for r in rows:
-        r.recompute_status()
-    safe_commit()  # Status updates - don't show error if it fails
-
-    # Build view models with pre-formatted strings to avoid tzlocal usage in templates
-    def fmt_display(dt):
-        if not dt:
-            return ''
-        try:
-            # Ensure timezone-aware datetime and convert to KST
-            if dt.tzinfo is None:
-                # If naive, assume it's already in KST
-                local_dt = dt.replace(tzinfo=KST)
-            else:
-                # Convert to KST
-                local_dt = dt.astimezone(KST)
-            return local_dt.strftime('%Y-%m-%d %H:%M')
-        except Exception:
-            return ''
+def send_document_variant(stored_path, variant):
+    """이미지 문서의 미리보기/썸네일 JPEG 응답. 아직 처리 전이거나 PDF 면 None"""
+    sha256 = document_ref(stored_path)
+    meta = get_document_meta(sha256) if sha256 else None
+    if meta is None or not meta.has_preview or variant not in DOCUMENT_VARIANTS:
+        return None
+    return _send_stored_document(f'{sha256}.{variant}', f'{sha256}-{variant}', 'image/jpeg', True)
 
-    def fmt_input(dt):
-        if not dt:
-            return ''
+
+@contextmanager
+def _document_local_copy(store, key):
+    """처리용 로컬 파일 경로 (원격 저장소면 임시 파일로 내려받음)"""
+    path = store.local_path(key)
+    if path is not None:
+        yield path
+        return
+    fd, temp_path = tempfile.mkstemp(prefix='document-')
+    os.close(fd)
+    try:
+        store.download(key, temp_path)
+        yield temp_path
+    finally:
+        os.remove(temp_path)
+
+
+def _save_document_variant(store, key, image):
+    fd, temp_path = tempfile.mkstemp(prefix='variant-', suffix='.jpg', dir=store.temp_dir)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            image.save(out, 'JPEG', quality=80, optimize=True, progressive=True)
+        store.put(key, temp_path, 'image/jpeg')
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _process_image_document(store, sha256, path):
+    """EXIF 방향을 보정한 미리보기/썸네일 JPEG 생성. Returns 메타데이터 갱신값"""
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as image:
+        page_count = getattr(image, 'n_frames', 1)
+        width, height = image.size
+        if image.getexif().get(0x0112) in (5, 6, 7, 8):  # 90/270도 회전
+            width, height = height, width
+        # JPEG 은 미리보기 크기에 맞춰 축소 디코딩 (수천만 화소 원본도 전체를 풀지 않음)
+        image.draft('RGB', (DOCUMENT_PREVIEW_SIZE, DOCUMENT_PREVIEW_SIZE))
+        preview = ImageOps.exif_transpose(image)
+        if preview.mode in ('RGBA', 'LA', 'P'):
+            rgba = preview.convert('RGBA')
+            preview = Image.new('RGB', rgba.size, 'white')
+            preview.paste(rgba, mask=rgba.getchannel('A'))
+        elif preview.mode != 'RGB':
+            preview = preview.convert('RGB')
+    preview.thumbnail((DOCUMENT_PREVIEW_SIZE, DOCUMENT_PREVIEW_SIZE), Image.LANCZOS)
+    _save_document_variant(store, f'{sha256}.preview', preview)
+    preview.thumbnail((DOCUMENT_THUMBNAIL_SIZE, DOCUMENT_THUMBNAIL_SIZE), Image.LANCZOS)
+    _save_document_variant(store, f'{sha256}.thumbnail', preview)
+    return {'page_count': page_count, 'width': width, 'height': height, 'has_preview': True}
+
+
+def _process_pdf_document(path):
+    from pypdf import PdfReader
+
+    return {'page_count': len(PdfReader(path, strict=False).pages)}
+
+
+def process_document(sha256):
+    """업로드된 문서 처리 (백그라운드 워커): 이미지 미리보기/썸네일, PDF 쪽수. Returns 처리 상태"""
+    with app.app_context():
+        row = db.session.get(StoredDocument, sha256)
+        if row is None:
+            return None
+        store = document_store()
+        updates, status = {}, 'ready'
         try:
-            # Ensure timezone-aware datetime and convert to KST
-            if dt.tzinfo is None:
-                # If naive, assume it's already in KST
-                local_dt = dt.replace(tzinfo=KST)
-            else:
-                # Convert to KST
-                local_dt = dt.astimezone(KST)
-            return local_dt.strftime('%Y-%m-%dT%H:%M')
-        except Exception:
-            return ''
+            with _document_local_copy(store, sha256) as path:
+                if row.mimetype == 'application/pdf':
+                    updates = _process_pdf_document(path)
+                elif row.mimetype.startswith('image/'):
+                    updates = _process_image_document(store, sha256, path)
+        except Exception as e:
+            files_log.warning("Document processing failed (%s, %s): %s", sha256, row.mimetype, e)
+            status = 'failed'
+        for column, value in updates.items():
+            setattr(row, column, value)
+        row.processing_status = status
+        row.processed_at = datetime.now(KST)
+        if not safe_commit(label='process document'):
+            return None
+        _cache_document_meta(_document_meta_from_row(row))
+        files_log.debug("Processed document %s: %s %s", sha256, status, updates)
+        return status
 
-    items = []
-    for r in rows:
-        items.append({
-            'id': r.id,
-            'created_by_company': (r.created_by_member.company_name if r.created_by_member else ''),
-            'created_at_str': fmt_display(r.created_at),
-            'start_at_str': fmt_display(r.start_at),
-            'end_at_str': fmt_display(r.end_at),
-            'approved_at_str': fmt_display(r.approved_at),
-            'start_at_input': fmt_input(r.start_at),
-            'end_at_input': fmt_input(r.end_at),
-            'insured_code': r.insured_code,
-            'contractor_code': r.contractor_code,
-            'car_plate': r.car_plate,
-            'vin': r.vin,
-            'car_name': r.car_name,
-            'car_registered_at': r.car_registered_at,
-            'approved_at': r.approved_at,
-            'memo': r.memo or '',
-        })
 
-    return render_template('admin/insurance.html', rows=rows, items=items, edit_id=edit_id)
+def process_documents(sha256s):
+    for sha256 in sha256s:
+        process_document(sha256)
 
 
-@app.route('/admin/insurance/download')
-@login_required
-@admin_required
-def admin_insurance_download():
-    ensure_initialized()  # Ensure initialization
-    # Import pandas only when needed
-    import pandas as pd
-    
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('admin_insurance'))
-    # Export to Excel
-    rows = db.session.query(InsuranceApplication).order_by(InsuranceApplication.created_at.desc()).all()
-    data = []
-    for r in rows:
-        data.append({
-            '상사명': r.created_by_member.company_name if r.created_by_member else '',
-            '신청시간': r.created_at,
-            '가입시간': r.start_at,
-            '종료시간': r.end_at,
-            '조합승인시간': r.approved_at,
-            '피보험자코드': r.insured_code,
-            '계약자코드': r.contractor_code,
-            '한글차량번호': r.car_plate,
-            '차대번호': r.vin,
-            '차량명': r.car_name,
-            '차량등록일자': r.car_registered_at,
-            '보험료': r.premium,
-            '조합승인': '승인' if r.approved_at else '미승인',
-            '비고': r.memo or '',
-        })
-    df = pd.DataFrame(data)
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='data')
-    buffer.seek(0)
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name='insurance_data.xlsx',
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
+def delete_uncommitted_documents(sha256s):
+    """커밋되지 않은 업로드가 올린 파일 삭제 (백그라운드 워커). 그 사이 다른 요청이 행을 만들었으면 남긴다"""
+    with app.app_context():
+        store = document_store()
+        for sha256 in sha256s:
+            try:
+                if db.session.get(StoredDocument, sha256) is None:
+                    store.delete(sha256)
+                    files_log.debug("Deleted uncommitted document %s", sha256)
+            except Exception as e:
+                files_log.error("Document delete error (%s): %s", sha256, e)
 
 
-@app.route('/admin/settlement')
-@login_required
-@admin_required
-def admin_settlement():
-    ensure_initialized()  # Ensure initialization
-    year = int(request.args.get('year', datetime.now().year))
-    month = int(request.args.get('month', datetime.now().month))
-
-    # 기준: 책임보험 승인페이지에서 해당 년/월 데이터 (시작일 기준)
-    start_period = datetime(year, month, 1, tzinfo=KST)
-    if month == 12:
-        next_month = datetime(year + 1, 1, 1, tzinfo=KST)
+def _process_committed_documents(orm_session):
+    orm_session.info.pop('documents_put', None)
+    sha256s = orm_session.info.pop('documents_to_process', None)
+    if sha256s:
+        run_in_background(process_documents, sorted(sha256s))
+
+
+def _discard_documents_to_process(orm_session, transaction):
+    # 롤백뿐 아니라 커밋 없이 세션이 닫힌 경우(요청 중 예외 후 teardown)에도 호출된다
+    if transaction.parent is not None:
+        return
+    orm_session.info.pop('documents_to_process', None)
+    sha256s = orm_session.info.pop('documents_put', None)
+    if sha256s:
+        run_in_background(delete_uncommitted_documents, sorted(sha256s))
+
+
+event.listen(OrmSession, 'after_commit', _process_committed_documents)
+event.listen(OrmSession, 'after_transaction_end', _discard_documents_to_process)
+
+
+def legacy_policy_path(policy_path):
+    """이전 방식 보험증권 경로(관리자가 입력한 상대/절대 경로)의 실제 파일. 없으면 None"""
+    if os.path.isabs(policy_path):
+        candidates = [policy_path]
     else:
-        next_month = datetime(year, month + 1, 1, tzinfo=KST)
+        candidates = [
+            os.path.join(UPLOAD_DIR, policy_path),
+            os.path.join(BASE_DIR, 'uploads', policy_path),
+            os.path.join(BASE_DIR, policy_path),
+        ]
+    return next((path for path in candidates if os.path.isfile(path)), None)
 
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('admin_settlement'))
-    rows = db.session.query(InsuranceApplication).filter(
-        InsuranceApplication.start_at.is_not(None),
-        InsuranceApplication.start_at >= start_period,
-        InsuranceApplication.start_at < next_month,
-    ).all()
-
-    # 그룹핑: 상사별 건수/금액
-    by_company = {}
-    for r in rows:
-        company = r.created_by_member.company_name if r.created_by_member else '미상'
-        rep = r.created_by_member.representative if r.created_by_member else ''
-        biz = r.created_by_member.business_number if r.created_by_member else ''
-        settlement_method = (r.created_by_member.settlement_method if r.created_by_member else '포인트') or '포인트'
-        key = (company, rep, biz)
-        if key not in by_company:
-            by_company[key] = {
-                'count': 0,
-                'amount': 0,
-                'settlement_method': settlement_method
-            }
-        else:
-            if not by_company[key].get('settlement_method'):
-                by_company[key]['settlement_method'] = settlement_method
-        by_company[key]['count'] += 1
-
-    settlements = []
-    total_count = 0
-    total_amount = 0
-    for (company, rep, biz), data in by_company.items():
-        count = data['count']
-        amount = count * 9500
-        total_count += count
-        total_amount += amount
-        settlements.append({
-            'company': company,
-            'representative': rep,
-            'business_number': biz,
-            'count': count,
-            'amount': amount,
-            'settlement_method': data.get('settlement_method', '포인트'),
-        })
 
-    # Ensure total_count and total_amount are always integers (not None)
-    total_count = int(total_count) if total_count else 0
-    total_amount = int(total_amount) if total_amount else 0
+def _document_columns():
+    return [
+        Member.registration_cert_path,
+        Member.license_attachment_path,
+        PartnerGroup.registration_cert_path,
+        InsuranceApplication.insurance_policy_path,
+    ]
 
-    return render_template('admin/settlement.html', 
-                          year=year, 
-                          month=month, 
-                          settlements=settlements, 
-                          total_count=total_count, 
-                          total_amount=total_amount)
 
+def migrate_legacy_documents():
+    """이전 방식 첨부/보험증권 파일을 문서 저장소로 옮기고 DB 경로를 바꾼다 (원본 파일은 남김).
 
-@app.route('/admin/settlement/export')
-@login_required
-@admin_required
-def admin_settlement_export():
-    """정산 결과를 엑셀로 다운로드"""
-    ensure_initialized()
-    import pandas as pd
-    from io import BytesIO
-    
+    Returns (옮긴 경로 수, 파일을 찾지 못한 경로 목록, success).
+    """
+    moved, missing = 0, []
+    for column in _document_columns():
+        values = [value for (value,) in db.session.query(column).filter(column.isnot(None), column != '').distinct()]
+        for value in values:
+            if document_ref(value):
+                continue
+            if column is InsuranceApplication.insurance_policy_path:
+                path = legacy_policy_path(value)
+            else:
+                path = _upload_file_path(value)
+            if not path or not os.path.isfile(path):
+                missing.append(value)
+                continue
+            with open(path, 'rb') as f:
+                filename = _store_document_stream(f, os.path.splitext(path)[1])
+            if not filename:
+                missing.append(value)
+                continue
+            prefix = 'uploads/' if value.replace('\\', '/').startswith('uploads/') else ''
+            db.session.query(column.class_).filter(column == value).update(
+                {column: prefix + filename}, synchronize_session=False)
+            if not safe_commit(label='migrate documents'):
+                return moved, missing, False
+            moved += 1
+    return moved, missing, True
+
+
+def prune_documents():
+    """어떤 회원/그룹/신청도 참조하지 않는 문서의 메타데이터와 파일 삭제. Returns (삭제 수, success)
+
+    stored_document 행이 없는 저장소 파일(커밋되지 못한 업로드가 남긴 것)도 DOCUMENT_ORPHAN_GRACE 가
+    지났으면 함께 지운다.
+    """
+    referenced = set()
+    for column in _document_columns():
+        for (value,) in db.session.query(column).filter(column.isnot(None)).distinct():
+            sha256 = document_ref(value)
+            if sha256:
+                referenced.add(sha256)
+    known = {sha256 for (sha256,) in db.session.query(StoredDocument.sha256)}
+    orphans = [sha256 for sha256 in known if sha256 not in referenced]
+    for start in range(0, len(orphans), 500):
+        db.session.query(StoredDocument).filter(
+            StoredDocument.sha256.in_(orphans[start:start + 500])).delete(synchronize_session=False)
+    if orphans and not safe_commit(label='prune documents'):
+        return 0, False
+    store = document_store()
+    for sha256 in orphans:
+        try:
+            for key in [sha256] + [f'{sha256}.{variant}' for variant in DOCUMENT_VARIANTS]:
+                store.delete(key)
+        except Exception as e:
+            files_log.error("Document delete error (%s): %s", sha256, e)
+    with _document_meta_lock:
+        _document_meta.clear()
+    return len(orphans) + _prune_unrecorded_documents(store, known), True
+
+
+def _prune_unrecorded_documents(store, known):
+    """행이 없는 저장소 파일(원본/미리보기) 삭제. Returns 삭제한 문서 수"""
+    list_keys = getattr(store, 'keys', None)
+    if list_keys is None:
+        return 0
+    cutoff = time.time() - DOCUMENT_ORPHAN_GRACE
+    deleted = set()
     try:
-        year = int(request.args.get('year', datetime.now().year))
-        month = int(request.args.get('month', datetime.now().month))
-    except (ValueError, TypeError):
-        flash('올바른 년도와 월을 입력해주세요.', 'warning')
-        return redirect(url_for('admin_settlement'))
-    
-    # 월 유효성 검사
-    if month < 1 or month > 12:
-        flash('올바른 월을 입력해주세요. (1-12)', 'warning')
-        return redirect(url_for('admin_settlement'))
-    if year < 2000 or year > 2100:
-        flash('올바른 년도를 입력해주세요.', 'warning')
-        return redirect(url_for('admin_settlement'))
-    
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('admin_settlement'))
-    
-    # 정산 데이터 계산 (admin_settlement와 동일한 로직)
-    start_period = datetime(year, month, 1, tzinfo=KST)
-    if month == 12:
-        next_month = datetime(year + 1, 1, 1, tzinfo=KST)
-    else:
-        next_month = datetime(year, month + 1, 1, tzinfo=KST)
-    
-    rows = db.session.query(InsuranceApplication).filter(
-        InsuranceApplication.start_at.is_not(None),
-        InsuranceApplication.start_at >= start_period,
-        InsuranceApplication.start_at < next_month,
-    ).all()
-    
-    # 그룹핑: 상사별 건수/금액
-    by_company = {}
-    for r in rows:
-        company = r.created_by_member.company_name if r.created_by_member else '미상'
-        rep = r.created_by_member.representative if r.created_by_member else ''
-        biz = r.created_by_member.business_number if r.created_by_member else ''
-        settlement_method = (r.created_by_member.settlement_method if r.created_by_member else '포인트') or '포인트'
-        key = (company, rep, biz)
-        if key not in by_company:
-            by_company[key] = {
-                'count': 0,
-                'settlement_method': settlement_method
-            }
-        else:
-            if not by_company[key].get('settlement_method'):
-                by_company[key]['settlement_method'] = settlement_method
-        by_company[key]['count'] += 1
-    
-    # 엑셀 데이터 생성
-    data = []
-    row_num = 1
-    total_count = 0
-    total_amount = 0
+        for key, modified in list(list_keys()):
+            sha256 = key.split('.', 1)[0]
+            if sha256 in known or modified > cutoff:
+                continue
+            store.delete(key)
+            deleted.add(sha256)
+    except Exception as e:
+        files_log.error("Document store sweep error: %s", e)
+    if deleted:
+        files_log.info("Deleted %s unrecorded documents from the store", len(deleted))
+    return len(deleted)
+
+
+@app.route('/favicon.ico')
+def favicon():
+    """Serve logo.png as favicon or return 204"""
+    return send_static_asset('logo.png') or ('', 204)
+
+@app.route('/static/logo.png')
+def serve_logo():
+    """Serve logo.png (static 디렉토리 우선, 없으면 루트)"""
+    return send_static_asset('logo.png') or ('', 404)
+
+
+@app.route('/debug/template-check')
+def debug_template_check():
+    """Debug route to check template loading"""
+    if not app.debug and is_serverless:
+        return "Debug disabled", 404
     
-    for (company, rep, biz), info in sorted(by_company.items()):
-        count = info['count']
-        amount = count * 9500
-        total_count += count
-        total_amount += amount
+    import os
+    template_path = os.path.join(TEMPLATE_DIR, 'admin', 'insurance.html')
+    try:
+        with open(template_path, 'r', encoding='utf-8') as f:
+            content = f.read()
         
-        data.append({
-            '순번': row_num,
-            '상사명': company,
-            '대금정산방법': info.get('settlement_method', '포인트'),
-            '대표자': rep,
-            '사업자번호': biz,
-            '건수': count,
-            '금액': amount,
-            '비고': '',
-        })
-        row_num += 1
-    
-    # 합계 행 추가
-    if data:
-        data.append({
-            '순번': '',
-            '상사명': '합계',
-            '대금정산방법': '',
-            '대표자': '',
-            '사업자번호': '',
-            '건수': total_count,
-            '금액': total_amount,
-            '비고': '',
-        })
-    
-    # DataFrame 생성 및 엑셀 파일 생성
-    df = pd.DataFrame(data)
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='정산내역')
-    buffer.seek(0)
-    
-    filename = f'정산내역_{year}년{month}월_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=filename,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
+        # Check if the template has been updated
+        has_filter = 'to_local_datetime' in content
+        has_old_syntax = 'tzlocal()' in content
+        
+        return f"""
+        <h1>Template Debug Info</h1>
+        <p><strong>Template Path:</strong> {template_path}</p>
+        <p><strong>File exists:</strong> {os.path.exists(template_path)}</p>
+        <p><strong>Has new filter:</strong> {has_filter}</p>
+        <p><strong>Has old syntax:</strong> {has_old_syntax}</p>
+        <p><strong>Template mode:</strong> {TEMPLATE_MODE} (auto reload: {app.jinja_env.auto_reload})</p>
+        <hr>
+        <h2>Line 86 area:</h2>
+        <pre>{chr(10).join(content.split(chr(10))[83:89])}</pre>
+        """
+    except Exception as e:
+        return f"Error reading template: {e}"
 
 
-@app.route('/admin/invoice')
-@login_required
-@admin_required
-def admin_invoice():
-    ensure_initialized()  # Ensure initialization
-    company = request.args.get('company', '')
-    representative = request.args.get('representative', '')
-    business_number = request.args.get('business_number', '')
+def parse_date(value: str):
+    if not value:
+        return None
     try:
-        year = int(request.args.get('year'))
-        month = int(request.args.get('month'))
-        count = int(request.args.get('count'))
-        amount = int(request.args.get('amount'))
+        return datetime.strptime(value, '%Y-%m-%d').date()
     except Exception:
-        flash('요청 파라미터가 올바르지 않습니다.', 'danger')
-        return redirect(url_for('admin_settlement'))
-    return render_template('invoice.html',
-                           company=company,
-                           representative=representative,
-                           business_number=business_number,
-                           year=year,
-                           month=month,
-                           count=count,
-                           amount=amount)
-
-
-@app.route('/admin/invoice/batch')
-@login_required
-@admin_required
-def admin_invoice_batch():
-    ensure_initialized()  # Ensure initialization
-    # Render a combined printable page for all companies for the selected month
-    year = int(request.args.get('year', datetime.now().year))
-    month = int(request.args.get('month', datetime.now().month))
-
-    start_period = datetime(year, month, 1, tzinfo=KST)
-    if month == 12:
-        next_month = datetime(year + 1, 1, 1, tzinfo=KST)
-    else:
-        next_month = datetime(year, month + 1, 1, tzinfo=KST)
+        return None
 
-    if db is None:
-        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
-        return redirect(url_for('admin_settlement'))
-    rows = db.session.query(InsuranceApplication).filter(
-        InsuranceApplication.start_at.is_not(None),
-        InsuranceApplication.start_at >= start_period,
-        InsuranceApplication.start_at < next_month,
-    ).all()
-
-    by_company = {}
-    for r in rows:
-        company = r.created_by_member.company_name if r.created_by_member else '미상'
-        rep = r.created_by_member.representative if r.created_by_member else ''
-        biz = r.created_by_member.business_number if r.created_by_member else ''
-        key = (company, rep, biz)
-        by_company.setdefault(key, 0)
-        by_company[key] += 1
-
-    invoices = []
-    for (company, rep, biz), count in by_company.items():
-        amount = count * 9500
-        invoices.append({
-            'company': company,
-            'representative': rep,
-            'business_number': biz,
-            'year': year,
-            'month': month,
-            'count': count,
-            'amount': amount,
-        })
-    return render_template('invoice_batch.html', invoices=invoices)
+
+def parse_datetime(value: str):
+    if not value:
+        return None
+    try:
+        dt = datetime.strptime(value, '%Y-%m-%d %H:%M')
+        return _ensure_aware(dt)
+    except ValueError:
+        try:
+            dt = datetime.strptime(value, '%Y-%m-%d')
+            return _ensure_aware(dt)
+        except Exception:
+            return None
+    except Exception:
+        return None
 
 
 @app.errorhandler(Exception)
@@ -8356,28 +4166,10 @@ def handle_unexpected_error(e):
     if isinstance(e, HTTPException):
         return e
     
-    # Log full stack trace for debugging
-    import traceback
-    error_trace = traceback.format_exc()
     error_msg = str(e)
-    error_type = type(e).__name__
-    
-    # Log to stderr for Vercel (more reliable than app.logger)
-    try:
-        import sys
-        sys.stderr.write(f"\n{'='*60}\n")
-        sys.stderr.write(f"UNHANDLED EXCEPTION: {error_type}\n")
-        sys.stderr.write(f"Error Message: {error_msg}\n")
-        sys.stderr.write(f"Traceback:\n{error_trace}\n")
-        sys.stderr.write(f"{'='*60}\n")
-    except Exception:
-        pass
     
-    # Also log via Flask logger if available
-    try:
-        app.logger.exception("Unhandled exception")
-    except Exception:
-        pass
+    # Single structured record; traceback is rendered by the log listener thread
+    app_log.error("Unhandled exception: %s: %s", type(e).__name__, error_msg, exc_info=e)
     
     # Try to provide user-friendly error message
     try:
@@ -8402,12 +4194,12 @@ def handle_unexpected_error(e):
                 
                 if not is_auth:
                     try:
-                        return redirect(url_for('login'))
+                        return redirect(url_for('auth.login'))
                     except Exception:
                         pass
                 else:
                     try:
-                        return redirect(url_for('dashboard'))
+                        return redirect(url_for('auth.dashboard'))
                     except Exception:
                         pass
             except Exception:
@@ -8425,11 +4217,83 @@ def handle_unexpected_error(e):
     
     # Ultimate fallback: return minimal error response
     try:
-        return f"<h1>서버 오류</h1><p>오류가 발생했습니다: {error_type}</p>", 500
+        return f"<h1>서버 오류</h1><p>오류가 발생했습니다: {type(e).__name__}</p>", 500
     except Exception:
         return ("서버 오류가 발생했습니다.", 500)
 
 
+@app.cli.command('migrate-indexes')
+def migrate_indexes_command():
+    """인덱스 마이그레이션 수동 실행 (serverless 배포는 기동 시 자동 실행하지 않음)"""
+    ensure_initialized()
+    apply_index_migrations()
+    apply_search_indexes()
+    click.echo(f'인덱스 마이그레이션 완료: 확인 {len(INDEX_MIGRATIONS)}개, 정리 {len(RETIRED_INDEXES)}개, 검색 백엔드 {search_backend()}')
+
+
+@app.cli.command('backfill-vehicle-keys')
+@click.option('--batch-size', type=int, default=None, help='배치당 행 수 (기본: VEHICLE_KEY_BACKFILL_BATCH_SIZE)')
+def backfill_vehicle_keys_command(batch_size):
+    """정규화 차량번호/차대번호(car_plate_normalized, vin_normalized) 백필"""
+    ensure_initialized()
+    updated, success = backfill_vehicle_keys(batch_size)
+    click.echo(f'정규화 차량번호/차대번호 백필: {updated}건' + ('' if success else ' (중단됨: 로그 확인)'))
+
+
+@app.cli.command('precompile-templates')
+def precompile_templates_command():
+    """템플릿 바이트코드 캐시 생성 (이미지 빌드 시 실행)"""
+    if TEMPLATE_MODE != 'production':
+        click.echo('TEMPLATE_MODE=development 에서는 바이트코드 캐시를 사용하지 않습니다.')
+        return
+    compiled, failed = precompile_templates()
+    click.echo(f'템플릿 컴파일: {compiled}개 → {TEMPLATE_BYTECODE_DIR}' + (f' (실패: {", ".join(failed)})' if failed else ''))
+
+
+@app.cli.command('migrate-documents')
+def migrate_documents_command():
+    """이전 방식 첨부/보험증권 파일을 문서 저장소(내용 해시)로 옮김"""
+    ensure_initialized()
+    moved, missing, success = migrate_legacy_documents()
+    click.echo(f'문서 저장소 이전: {moved}건 ({document_store().__class__.__name__})' + ('' if success else ' (중단됨: 로그 확인)'))
+    for value in missing:
+        click.echo(f'  파일 없음: {value}')
+
+
+@app.cli.command('process-documents')
+@click.option('--all', 'reprocess_all', is_flag=True, help='처리된 문서도 다시 처리 (썸네일 크기 변경 등)')
+def process_documents_command(reprocess_all):
+    """처리 대기/실패 문서의 미리보기·썸네일·쪽수 생성 (컬럼 추가 전 문서, 워커 중단 시)"""
+    ensure_initialized()
+    query = db.session.query(StoredDocument.sha256)
+    if not reprocess_all:
+        query = query.filter((StoredDocument.processing_status != 'ready') | StoredDocument.processing_status.is_(None))
+    sha256s = [sha256 for (sha256,) in query]
+    statuses = [process_document(sha256) for sha256 in sha256s]
+    click.echo(f'문서 처리: {statuses.count("ready")}건 완료, {len(sha256s) - statuses.count("ready")}건 실패')
+
+
+@app.cli.command('prune-documents')
+def prune_documents_command():
+    """참조가 없는 문서 저장소 파일 정리 (cron 등에서 주기 실행)"""
+    ensure_initialized()
+    deleted, success = prune_documents()
+    click.echo(f'문서 정리: {deleted}건' + ('' if success else ' (중단됨: 로그 확인)'))
+
+
+@app.cli.command('archive-applications')
+@click.option('--days', type=int, default=None, help='종료 후 보관까지 경과 일수 (기본: ARCHIVE_AFTER_DAYS)')
+def archive_applications_command(days):
+    """종료된 보험신청 보관 처리 (cron 등에서 주기 실행)"""
+    ensure_initialized()
+    archived_count, success = archive_expired_applications(older_than_days=days)
+    click.echo(f'보관 처리: {archived_count}건' + ('' if success else ' (중단됨: 로그 확인)'))
+
+
+_startup_mark('routes')
+STARTUP_IMPORT_PHASES = ('imports', 'environment', 'create_app', 'models', 'routes')
+
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 8080)), debug=True)
 
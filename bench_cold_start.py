@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+콜드 스타트 벤치마크 (모듈 import + 첫 요청)
+
+매 회 새 프로세스에서 `import app` 과 첫 요청(ensure_initialized: 테이블 생성/마이그레이션/초기 데이터)을
+측정합니다. 기본은 Vercel 과 같은 서버리스 설정(APP_SERVERLESS=1, /tmp 계열 디렉토리, 빈 SQLite)입니다.
+
+- 단계별 소요 시간: app.STARTUP_PHASES (/admin/diagnostics/startup 과 동일)
+- -X importtime 보고서: import 에 오래 걸리는 모듈 상위 목록
+
+사용법:
+    python bench_cold_start.py              # 5회, 서버리스 설정
+    python bench_cold_start.py 10 --container
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import statistics
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TOP_MODULES = 15
+
+
+def child():
+    """자식 프로세스: import / 첫 요청 시간을 JSON 으로 출력"""
+    sys.path.insert(0, BASE_DIR)
+    started = time.perf_counter()
+    import app as app_module
+    imported = time.perf_counter()
+    response = app_module.app.test_client().get('/healthz')
+    finished = time.perf_counter()
+    heavy = [name for name in ('pandas', 'openpyxl', 'requests', 'numpy') if name in sys.modules]
+    print(json.dumps({
+        'import_ms': (imported - started) * 1000,
+        'first_request_ms': (finished - imported) * 1000,
+        'status': response.status_code,
+        'phases': app_module.STARTUP_PHASES,
+        'heavy_modules': heavy,
+    }))
+
+
+def child_env(tmp_dir, serverless):
+    env = dict(os.environ)
+    env['LOG_LEVEL'] = 'WARNING'
+    env['SQLITE_MAINTENANCE_INTERVAL'] = '0'
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'data', 'cold.db')}"
+    os.makedirs(os.path.join(tmp_dir, 'data'), exist_ok=True)
+    if serverless:
+        env['APP_SERVERLESS'] = '1'
+        env['INSTANCE_PATH'] = os.path.join(tmp_dir, 'instance')
+        env['DATA_DIR'] = os.path.join(tmp_dir, 'data')
+        env['UPLOAD_DIR'] = os.path.join(tmp_dir, 'uploads')
+    else:
+        env['APP_SERVERLESS'] = '0'
+    return env
+
+
+def run_once(serverless, importtime=False):
+    tmp_dir = tempfile.mkdtemp(prefix='cold-start-')
+    try:
+        cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + [os.path.abspath(__file__), '--child']
+        proc = subprocess.run(cmd, cwd=BASE_DIR, env=child_env(tmp_dir, serverless), capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr[-2000:])
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        return result, proc.stderr
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def importtime_report(stderr):
+    """-X importtime 출력에서 self 시간 상위 모듈과 app 이 직접 import 한 패키지(누적) 상위 목록"""
+    rows, children, direct = [], [], []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        row = (name.strip(), depth, int(self_us), int(cumulative_us))
+        rows.append(row)
+        # 하위 모듈이 부모보다 먼저 출력되므로, 'app' 직전까지 모인 depth 1 항목이 app 의 직접 import
+        if depth == 1:
+            children.append(row)
+        elif depth == 0:
+            if row[0] == 'app':
+                direct = children
+            children = []
+    by_self = sorted(rows, key=lambda row: row[2], reverse=True)[:TOP_MODULES]
+    direct = sorted(direct, key=lambda row: row[3], reverse=True)[:TOP_MODULES]
+    return by_self, direct
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    runs = int(args[0]) if args else 5
+    serverless = '--container' not in sys.argv
+
+    print("=" * 60)
+    print(f"콜드 스타트 벤치마크 ({'serverless' if serverless else 'container'}, {runs}회)")
+    print("=" * 60)
+
+    results = [run_once(serverless)[0] for _ in range(runs)]
+    import_ms = [r['import_ms'] for r in results]
+    first_ms = [r['first_request_ms'] for r in results]
+    print(f"\n   import        median {statistics.median(import_ms):8.1f} ms   (min {min(import_ms):.1f})")
+    print(f"   first request median {statistics.median(first_ms):8.1f} ms   (min {min(first_ms):.1f})")
+    print(f"   /healthz status {results[-1]['status']}, heavy modules loaded: {results[-1]['heavy_modules'] or '-'}")
+
+    print("\n단계별 (중앙값)")
+    phases = {}
+    for result in results:
+        for name, ms in result['phases']:
+            phases.setdefault(name, []).append(ms)
+    for name, values in phases.items():
+        print(f"   {name:24s} {statistics.median(values):8.1f} ms")
+
+    _, stderr = run_once(serverless, importtime=True)
+    by_self, direct = importtime_report(stderr)
+    print(f"\n-X importtime: app 이 직접 import 한 모듈 (누적, 상위 {TOP_MODULES})")
+    for name, _, _, cumulative in direct:
+        print(f"   {name:40s} {cumulative / 1000:8.1f} ms")
+    print(f"\n-X importtime: 모듈 자체 시간 (self, 상위 {TOP_MODULES})")
+    for name, _, self_us, _ in by_self:
+        print(f"   {name:40s} {self_us / 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    if '--child' in sys.argv:
+        child()
+    else:
+        main()
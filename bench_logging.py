@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+로깅 처리량 벤치마크
+
+1) 호출 단위: 기존 `try: import sys; sys.stderr.write(f"...")` 패턴, 동기 핸들러(요청 스레드에서
+   포맷/출력)와 큐 기반 로거(활성/비활성 레벨)의 호출당 비용 비교
+2) 요청 단위: Flask test client로 주요 화면을 반복 호출하여 동기 핸들러 / 큐 핸들러의 요청/초 비교
+
+사용법:
+    python bench_logging.py                # 기본 2000회 / 요청 200회
+    python bench_logging.py 5000 500
+    LOG_LEVEL=DEBUG python bench_logging.py
+
+stderr 출력은 /dev/null 로 보내고 측정합니다 (터미널 출력 비용 제외).
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_sync_logging(app_module):
+    """비교 기준: 큐 없이 요청 스레드에서 바로 포맷/출력하는 StreamHandler (같은 포맷터)"""
+    app_module.stop_logging()
+    handler = app_module._StderrHandler()
+    handler.setFormatter(app_module.JsonLogFormatter())
+    logging.getLogger(app_module.LOG_ROOT).handlers = [handler]
+
+
+def use_queue_logging(app_module):
+    app_module.stop_logging()
+    app_module.configure_logging()
+
+
+def _legacy_write(row_id):
+    try:
+        import sys
+        sys.stderr.write(f"Insurance save: Updating application ID {row_id}\n")
+    except Exception:
+        pass
+
+
+def bench_calls(n):
+    """호출당 비용 (마이크로초)"""
+    import app as app_module
+
+    log = app_module.insurance_log
+    results = {}
+
+    start = time.perf_counter()
+    for i in range(n):
+        _legacy_write(i)
+    results['legacy sys.stderr.write'] = time.perf_counter() - start
+
+    previous = log.level
+    log.setLevel(logging.INFO)
+    start = time.perf_counter()
+    for i in range(n):
+        log.debug("Insurance save: Updating application ID %s", i)
+    results['logger.debug (disabled)'] = time.perf_counter() - start
+
+    log.setLevel(logging.DEBUG)
+    use_sync_logging(app_module)
+    start = time.perf_counter()
+    for i in range(n):
+        log.debug("Insurance save: Updating application ID %s", i)
+    results['logger.debug (enabled, sync)'] = time.perf_counter() - start
+
+    use_queue_logging(app_module)
+    start = time.perf_counter()
+    for i in range(n):
+        log.debug("Insurance save: Updating application ID %s", i)
+    results['logger.debug (enabled, queued)'] = time.perf_counter() - start
+    log.setLevel(previous)
+
+    # 큐에 쌓인 레코드를 모두 출력한 뒤 다음 측정으로 넘어감
+    use_queue_logging(app_module)
+
+    print(f"\n[호출 단위] n={n}")
+    for name, elapsed in results.items():
+        print(f"   {name:<34} {elapsed / n * 1e6:8.2f} us/call")
+
+
+def bench_requests(n):
+    """요청/초 (관리자 로그인 후 주요 조회 화면)"""
+    import app as app_module
+
+    client = app_module.app.test_client()
+    client.post('/login', data={'username': 'hyundai', 'password': '#admin1004', 'partner_group_id': 'admin'})
+    paths = ['/login', '/admin/dashboard', '/admin/insurance', '/admin/partner-groups']
+
+    for path in paths:
+        client.get(path)  # warm-up (템플릿 컴파일)
+
+    results = {}
+    for mode, configure in (('sync', use_sync_logging), ('queued', use_queue_logging)):
+        configure(app_module)
+        for path in paths:
+            start = time.perf_counter()
+            for _ in range(n):
+                client.get(path)
+            results[(path, mode)] = n / (time.perf_counter() - start)
+    use_queue_logging(app_module)
+
+    print(f"\n[요청 단위] n={n}, LOG_LEVEL={os.environ.get('LOG_LEVEL', 'INFO')}")
+    print(f"   {'':<28} {'sync':>10} {'queued':>10}")
+    for path in paths:
+        sync, queued = results[(path, 'sync')], results[(path, 'queued')]
+        print(f"   {path:<28} {sync:8.1f}/s {queued:8.1f}/s  ({(queued / sync - 1) * 100:+.1f}%)")
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    requests_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print("=" * 60)
+    print("로깅 처리량 벤치마크")
+    print("=" * 60)
+
+    devnull = open(os.devnull, 'w')
+    sys.stderr = devnull
+    try:
+        bench_calls(calls)
+        bench_requests(requests_count)
+    finally:
+        sys.stderr = sys.__stderr__
+        devnull.close()
+
+
+if __name__ == '__main__':
+    main()
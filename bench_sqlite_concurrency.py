@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+SQLite 동시성 벤치마크 (rollback journal vs WAL)
+
+임시 DB에 보험신청 형태의 테이블을 만들고,
+- 쓰기 스레드 1개: 일괄 승인처럼 여러 행을 한 트랜잭션에서 UPDATE (트랜잭션당 일정 시간 유지)
+- 읽기 스레드 N개: 목록 조회 SELECT 반복
+- 내보내기 스레드 1개: 엑셀 내보내기처럼 읽기 트랜잭션을 길게 유지
+을 동시에 실행하여 모드별 읽기/쓰기 처리량과 "database is locked" 발생 횟수를 비교합니다.
+
+- legacy: 기존 설정 (foreign_keys=ON, journal_mode=DELETE, synchronous=FULL)
+- tuned : app.sqlite_pragmas() (WAL, synchronous=NORMAL, cache/mmap/temp_store, busy_timeout)
+
+사용법:
+    python bench_sqlite_concurrency.py            # 기본 5초, 읽기 스레드 4개
+    python bench_sqlite_concurrency.py 10 8
+"""
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+ROWS = 20000
+BATCH = 500
+HOLD_SECONDS = 0.05  # 쓰기 트랜잭션을 잡고 있는 시간
+EXPORT_SECONDS = 0.2  # 내보내기 읽기 트랜잭션 유지 시간 (엑셀 생성)
+
+
+def legacy_pragmas():
+    return [
+        "PRAGMA foreign_keys=ON",
+        "PRAGMA journal_mode=DELETE",
+        "PRAGMA synchronous=FULL",
+    ]
+
+
+def tuned_pragmas():
+    import app as app_module
+    return app_module.sqlite_pragmas()
+
+
+def connect(path, pragmas):
+    # SQLAlchemy connect_args 와 동일한 timeout
+    conn = sqlite3.connect(path, timeout=20, check_same_thread=False, isolation_level=None)
+    for pragma in pragmas:
+        conn.execute(pragma)
+    return conn
+
+
+def prepare(path, pragmas):
+    conn = connect(path, pragmas)
+    conn.execute(
+        "CREATE TABLE insurance_application ("
+        "id INTEGER PRIMARY KEY, partner_group_id INTEGER, status TEXT, "
+        "car_plate TEXT, created_at TEXT)"
+    )
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO insurance_application (partner_group_id, status, car_plate, created_at) "
+        "VALUES (?, '신청', ?, datetime('now'))",
+        [(i % 20, f"{i % 100:02d}가{i:04d}") for i in range(ROWS)],
+    )
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def run(mode, pragmas, duration, readers):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    os.remove(path)
+    stats = {'reads': 0, 'writes': 0, 'read_locked': 0, 'write_locked': 0, 'read_max_ms': 0.0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    try:
+        prepare(path, pragmas)
+
+        def writer():
+            conn = connect(path, pragmas)
+            offset = 0
+            while not stop.is_set():
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.execute(
+                        "UPDATE insurance_application SET status = '조합승인' "
+                        "WHERE id > ? AND id <= ?", (offset, offset + BATCH),
+                    )
+                    time.sleep(HOLD_SECONDS)
+                    conn.execute("COMMIT")
+                    with lock:
+                        stats['writes'] += 1
+                except sqlite3.OperationalError:
+                    with lock:
+                        stats['write_locked'] += 1
+                    try:
+                        conn.execute("ROLLBACK")
+                    except sqlite3.Error:
+                        pass
+                offset = (offset + BATCH) % ROWS
+            conn.close()
+
+        def reader(group_id):
+            conn = connect(path, pragmas)
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    conn.execute(
+                        "SELECT id, status, car_plate FROM insurance_application "
+                        "WHERE partner_group_id = ? ORDER BY id DESC LIMIT 50", (group_id,),
+                    ).fetchall()
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    with lock:
+                        stats['reads'] += 1
+                        stats['read_max_ms'] = max(stats['read_max_ms'], elapsed_ms)
+                except sqlite3.OperationalError:
+                    with lock:
+                        stats['read_locked'] += 1
+            conn.close()
+
+        def exporter():
+            conn = connect(path, pragmas)
+            while not stop.is_set():
+                try:
+                    conn.execute("BEGIN")
+                    cursor = conn.execute("SELECT * FROM insurance_application")
+                    cursor.fetchmany(100)
+                    time.sleep(EXPORT_SECONDS)
+                    cursor.fetchall()
+                    conn.execute("COMMIT")
+                except sqlite3.OperationalError:
+                    try:
+                        conn.execute("ROLLBACK")
+                    except sqlite3.Error:
+                        pass
+            conn.close()
+
+        threads = [threading.Thread(target=writer), threading.Thread(target=exporter)]
+        threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in threads:
+            t.join()
+    finally:
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+    print(f"\n[{mode}] {duration}s, readers={readers}")
+    print(f"   reads        {stats['reads'] / duration:10.1f} /s   (max {stats['read_max_ms']:.1f} ms)")
+    print(f"   writes       {stats['writes'] / duration:10.1f} /s")
+    print(f"   read locked  {stats['read_locked']:10d}")
+    print(f"   write locked {stats['write_locked']:10d}")
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    print("=" * 60)
+    print("SQLite 동시성 벤치마크")
+    print("=" * 60)
+
+    run('legacy (DELETE journal)', legacy_pragmas(), duration, readers)
+    run('tuned (WAL)', tuned_pragmas(), duration, readers)
+
+
+if __name__ == '__main__':
+    main()
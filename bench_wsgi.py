@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+WSGI 서버 부하 비교 (개발 서버 vs gunicorn)
+
+- dev     : 기존 Docker CMD 그대로 `python app.py` (Werkzeug 개발 서버, debug=True)
+- gunicorn: `gunicorn -c gunicorn.conf.py wsgi:app` (WEB_CONCURRENCY / GUNICORN_THREADS 적용)
+
+각 서버를 임시 SQLite DB로 띄운 뒤, 동시 클라이언트 N개가 관리자로 로그인하여
+/healthz, /login, /admin/dashboard 를 keep-alive 로 반복 호출하고 요청/초와 지연시간을 비교합니다.
+
+사용법:
+    python bench_wsgi.py              # 기본 10초, 동시 16
+    python bench_wsgi.py 20 32
+    WEB_CONCURRENCY=4 GUNICORN_THREADS=8 python bench_wsgi.py
+"""
+import os
+import sys
+import time
+import shutil
+import signal
+import tempfile
+import threading
+import subprocess
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PATHS = ['/healthz', '/login', '/admin/dashboard']
+
+
+def start_server(command, port, data_dir):
+    env = dict(os.environ)
+    env.update({
+        'PORT': str(port),
+        'DATABASE_URL': f"sqlite:///{os.path.join(data_dir, 'bench.db')}",
+        'LOG_LEVEL': 'WARNING',
+        'LOGIN_MAX_ATTEMPTS_PER_IP': '100000',
+    })
+    return subprocess.Popen(
+        command, cwd=BASE_DIR, env=env, start_new_session=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f'http://127.0.0.1:{port}/healthz', timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def stop_server(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def load(port, duration, concurrency):
+    base = f'http://127.0.0.1:{port}'
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def client():
+        session = requests.Session()
+        session.post(f'{base}/login', data={'username': 'hyundai', 'password': '#admin1004', 'partner_group_id': 'admin'})
+        local, failed, i = [], 0, 0
+        while not stop.is_set():
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                response = session.get(base + path, timeout=30, allow_redirects=False)
+                if response.status_code >= 500:
+                    failed += 1
+            except requests.RequestException:
+                failed += 1
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return latencies, errors[0]
+
+
+def run(name, command, port, duration, concurrency):
+    data_dir = tempfile.mkdtemp(prefix='bench-wsgi-')
+    proc = start_server(command, port, data_dir)
+    try:
+        if not wait_ready(port):
+            print(f"\n[{name}] 서버가 기동되지 않았습니다")
+            return
+        latencies, errors = load(port, duration, concurrency)
+    finally:
+        stop_server(proc)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    latencies.sort()
+    count = len(latencies)
+
+    def pct(p):
+        return latencies[min(count - 1, int(count * p))] * 1000 if count else 0.0
+
+    print(f"\n[{name}] {duration}s, concurrency={concurrency}")
+    print(f"   requests   {count:10d}   ({count / duration:.1f} req/s)")
+    print(f"   p50        {pct(0.50):10.1f} ms")
+    print(f"   p95        {pct(0.95):10.1f} ms")
+    print(f"   p99        {pct(0.99):10.1f} ms")
+    print(f"   errors     {errors:10d}")
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    print("=" * 60)
+    print("WSGI 서버 부하 비교")
+    print("=" * 60)
+
+    run('dev (python app.py)', [sys.executable, 'app.py'], 18081, duration, concurrency)
+    if shutil.which('gunicorn'):
+        run('gunicorn', ['gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'], 18082, duration, concurrency)
+    else:
+        print("\n[gunicorn] 설치되어 있지 않습니다 (pip install -r requirements.txt)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+쿼리 플랜 회귀 검사 스크립트
+
+주요 목록/정산/승인 화면을 test client 로 호출하면서 실행된 SELECT 문을 수집하고,
+핫 테이블(보험신청, 입금내역, 포인트조정, 입금요청, 가상계좌)에 대해 EXPLAIN 을 실행합니다.
+인덱스 없이 전체 스캔하는 쿼리가 하나라도 있으면 종료 코드 1 로 실패합니다.
+검사 경로가 200 이 아니거나(로그인 리다이렉트 등) 핫 테이블 쿼리를 하나도 실행하지 않아도 실패합니다.
+
+- SQLite  : EXPLAIN QUERY PLAN 결과에 인덱스 없는 "SCAN <table>" 이 있으면 실패
+- Postgres: enable_seqscan=off 상태에서 EXPLAIN (FORMAT JSON) 에 "Seq Scan" 이 있으면 실패
+            (행 수가 적은 검사용 DB 에서도 인덱스 경로가 있는지만 확인)
+
+검사용 데이터(파트너그룹/회원/보험신청 등)를 생성하므로 반드시 임시 DB 에서 실행하세요.
+
+사용법:
+    python check_query_plans.py                                      # 임시 SQLite
+    PLAN_CHECK_DATABASE_URL=postgresql://.../scratch python check_query_plans.py
+"""
+import os
+import re
+import sys
+import json
+import tempfile
+from datetime import datetime, timedelta
+
+_tmp_dir = None
+if os.environ.get('PLAN_CHECK_DATABASE_URL'):
+    os.environ['DATABASE_URL'] = os.environ['PLAN_CHECK_DATABASE_URL']
+else:
+    _tmp_dir = tempfile.mkdtemp(prefix='plan-check-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'plan.db')}"
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('SQLITE_MAINTENANCE_INTERVAL', '0')
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event  # noqa: E402
+
+import app as app_module  # noqa: E402
+
+HOT_TABLES = ('insurance_application', 'deposit_history', 'point_adjustment', 'deposit_request', 'virtual_account')
+HOT_TABLE_RE = re.compile(r'\bFROM\s+(%s)\b' % '|'.join(HOT_TABLES), re.IGNORECASE)
+MEMBER_USERNAME = 'planmember'
+
+
+def seed():
+    """검사용 최소 데이터: 파트너그룹 1, 회원 1, 보험신청/입금/포인트 이력
+
+    로그인은 그룹 관리자 아이디를 먼저 확인하므로 회원 아이디는 그룹 관리자와 다르게 둔다.
+    """
+    m = app_module
+    db = m.db
+    now = datetime.now(m.KST)
+    group = db.session.query(m.PartnerGroup).filter_by(admin_username='plancheck').first()
+    if group is None:
+        group = m.PartnerGroup(
+            name='플랜검사그룹', admin_username='plancheck', business_number='999-99-99999',
+            representative='검사', phone='000',
+        )
+        group.set_admin_password('plancheck')
+        db.session.add(group)
+        db.session.flush()
+    member = db.session.query(m.Member).filter_by(username=MEMBER_USERNAME, partner_group_id=group.id).first()
+    if member is None:
+        member = m.Member(
+            username=MEMBER_USERNAME, partner_group_id=group.id, company_name='플랜검사상사',
+            business_number='999-99-99998', representative='검사', approval_status='승인', role='member',
+        )
+        member.set_password('plancheck')
+        db.session.add(member)
+        db.session.flush()
+    for i in range(20):
+        db.session.add(m.InsuranceApplication(
+            partner_group_id=group.id, created_by_member_id=member.id, car_plate=f'00가{i:04d}',
+            approved_at=now - timedelta(days=i) if i % 2 else None,
+            start_at=now - timedelta(days=i) if i % 2 else None,
+        ))
+        db.session.add(m.DepositHistory(
+            member_id=member.id, partner_group_id=group.id, bank_name='은행', account_number='1', deposit_amount=1000,
+        ))
+        db.session.add(m.PointAdjustment(member_id=member.id, partner_group_id=group.id, note='검사'))
+    db.session.commit()
+    return group.id, member.id
+
+
+def capture(client, paths, statements, problems):
+    """경로별로 200 응답과 핫 테이블 쿼리 수집을 확인 (리다이렉트로 검사가 빠지지 않도록)"""
+    for path in paths:
+        before = len(statements)
+        response = client.get(path)
+        if response.status_code != 200:
+            problems.append(f"{path} -> {response.status_code} {response.headers.get('Location', '')}".rstrip())
+        elif len(statements) == before:
+            problems.append(f"{path} -> 핫 테이블 쿼리 없음")
+
+
+def sqlite_full_scans(raw_conn, statement, parameters):
+    rows = raw_conn.execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        match = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+        if match and match.group(1) in HOT_TABLES and 'USING' not in detail:
+            scans.append(detail)
+    return scans
+
+
+def postgres_full_scans(raw_conn, statement, parameters):
+    cursor = raw_conn.cursor()
+    try:
+        cursor.execute('SET enable_seqscan = off')
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + statement, parameters)
+        plan = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans = []
+    stack = [plan[0]['Plan']]
+    while stack:
+        node = stack.pop()
+        if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in HOT_TABLES:
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        stack.extend(node.get('Plans', []))
+    return scans
+
+
+def main():
+    m = app_module
+    app = m.app
+    statements = []
+    problems = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and HOT_TABLE_RE.search(statement):
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        m.ensure_initialized()
+        group_id, member_id = seed()
+        engine = m.db.engine
+        dialect = engine.dialect.name
+
+    print("=" * 60)
+    print(f"쿼리 플랜 회귀 검사 ({dialect})")
+    print("=" * 60)
+
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    client = app.test_client()
+
+    client.post('/login', data={'username': 'hyundai', 'password': '#admin1004', 'partner_group_id': 'admin'})
+    capture(client, [
+        '/admin/dashboard', '/admin/insurance-overview', '/admin/insurance',
+        '/admin/settlement', '/admin/settlement-overview', '/admin/insurance/download',
+    ], statements, problems)
+    client.get('/logout')
+
+    client.post('/login', data={'username': 'plancheck', 'password': 'plancheck', 'partner_group_id': str(group_id)})
+    capture(client, [
+        '/partner/admin/insurance-approval', '/partner/admin/settlement', '/partner/admin/point-management',
+        f'/partner/admin/point-history/{member_id}', '/partner/admin/deposit-request-count', '/partner/insurance',
+        '/partner/insurance?start_date=2020-01-01&end_date=2030-12-31',
+    ], statements, problems)
+    client.get('/logout')
+
+    client.post('/login', data={'username': MEMBER_USERNAME, 'password': 'plancheck', 'partner_group_id': str(group_id)})
+    capture(client, ['/insurance', '/insurance?start_date=2020-01-01&end_date=2030-12-31'], statements, problems)
+    event.remove(engine, 'before_cursor_execute', on_execute)
+
+    unique = {}
+    for statement, parameters in statements:
+        unique.setdefault(statement, parameters)
+
+    failures = []
+    raw_conn = engine.raw_connection()
+    try:
+        for statement, parameters in unique.items():
+            if dialect == 'sqlite':
+                scans = sqlite_full_scans(raw_conn, statement, parameters)
+            else:
+                scans = postgres_full_scans(raw_conn, statement, parameters)
+                raw_conn.rollback()
+            if scans:
+                failures.append((statement, scans))
+    finally:
+        raw_conn.close()
+
+    print(f"\n검사한 쿼리: {len(unique)}개")
+    if problems:
+        print(f"검사하지 못한 경로: {len(problems)}개\n")
+        for problem in problems:
+            print(f"   ! {problem}")
+    if failures:
+        print(f"전체 스캔: {len(failures)}개\n")
+        for statement, scans in failures:
+            print("-" * 60)
+            print(' '.join(statement.split())[:400])
+            for scan in scans:
+                print(f"   => {scan}")
+        return 1
+    if problems:
+        return 1
+    print("전체 스캔 없음")
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    finally:
+        if _tmp_dir:
+            import shutil
+            shutil.rmtree(_tmp_dir, ignore_errors=True)
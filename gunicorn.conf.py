@@ -0,0 +1,52 @@
+"""
+gunicorn 설정 (Docker 프로덕션 실행용)
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+환경변수로 조정:
+    PORT                     바인드 포트 (기본 8080)
+    WEB_CONCURRENCY          워커 프로세스 수 (기본 CPU*2+1, 최대 8)
+    GUNICORN_THREADS         워커당 스레드 수 (기본 4, 1 이면 sync 워커)
+    GUNICORN_KEEPALIVE       keep-alive 초 (기본 5, 앞단 로드밸런서 idle timeout 보다 짧게)
+    GUNICORN_TIMEOUT         요청 처리 제한 초 (기본 60, 엑셀 내보내기 고려)
+    GUNICORN_MAX_REQUESTS    워커 재시작 주기(요청 수, 기본 1000, 0 이면 비활성)
+    GUNICORN_PRELOAD         마스터에서 앱 미리 로드 (기본 1)
+    GUNICORN_ACCESS_LOG      1 이면 접근 로그를 stdout 으로 출력
+"""
+import os
+import sys
+import multiprocessing
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = _env_int('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8))
+threads = _env_int('GUNICORN_THREADS', 4)
+worker_class = 'gthread' if threads > 1 else 'sync'
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# 메모리 증가(pandas 등) 대비: N 요청마다 워커 교체, 동시 재시작을 피하려고 jitter 부여
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', max(max_requests // 10, 0))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1').lower() in ('1', 'true', 'yes', 'on')
+
+accesslog = '-' if os.environ.get('GUNICORN_ACCESS_LOG', '').lower() in ('1', 'true', 'yes', 'on') else None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+forwarded_allow_ips = os.environ.get('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+
+def post_fork(server, worker):
+    """fork 로 물려받은 DB 커넥션/스레드 정리 (preload 시에만 앱 모듈이 이미 로드되어 있음)"""
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.reset_after_fork()
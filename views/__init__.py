@@ -0,0 +1,133 @@
+"""
+블루프린트 및 URL 테이블
+
+URL 규칙은 여기서 모두 등록하고, 실제 뷰 모듈(views/*.py)은 해당 URL 로 첫 요청이 올 때 import 한다
+(Flask "Lazily Loading Views" 패턴). 서버리스 함수는 실제로 받은 요청의 모듈만 로드하고,
+엑셀 내보내기/업로드/청구서처럼 무거운 모듈은 사용하기 전까지 로드되지 않는다.
+url_for 는 모듈 import 없이 동작한다 (엔드포인트: '<블루프린트>.<이름>').
+
+- auth      : 로그인/로그아웃/회원가입, 역할별 대시보드 분기
+- insurance : 회원 보험신청, 약관, 업로드 파일, 차량 조회/검색 API
+- partner   : 파트너그룹 관리자 (대시보드, 회원승인, 보험승인, 정산)
+- points    : 포인트/입금요청/가상계좌
+- admin     : 전체관리자
+- exports   : 엑셀 내보내기/양식 다운로드
+
+이 패키지는 app 을 import 하지 않으므로 create_app() 에서 바로 등록할 수 있다.
+뷰 모듈은 app 의 모델/헬퍼를 import 하며, 첫 요청 시점에는 app 이 이미 로드되어 있다.
+"""
+import threading
+
+from flask import Blueprint
+from werkzeug.utils import import_string
+
+auth_bp = Blueprint('auth', __name__)
+insurance_bp = Blueprint('insurance', __name__)
+partner_bp = Blueprint('partner', __name__)
+points_bp = Blueprint('points', __name__)
+admin_bp = Blueprint('admin', __name__)
+exports_bp = Blueprint('exports', __name__)
+
+BLUEPRINTS = (auth_bp, insurance_bp, partner_bp, points_bp, admin_bp, exports_bp)
+LAZY_VIEWS = []
+
+
+class LazyView:
+    """첫 호출 시 'module.function' 을 import 해서 실행하는 뷰"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, import_name):
+        self.import_name = 'views.' + import_name
+        self.__module__, self.__name__ = self.import_name.rsplit('.', 1)
+        self._view = None
+
+    def load(self):
+        if self._view is None:
+            with self._lock:
+                if self._view is None:
+                    self._view = import_string(self.import_name)
+        return self._view
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+
+def _lazy(blueprint, rule, endpoint, import_name, **options):
+    view = LazyView(import_name)
+    LAZY_VIEWS.append(view)
+    blueprint.add_url_rule(rule, endpoint, view_func=view, **options)
+
+
+def register_blueprints(app):
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
+
+
+def preload_views():
+    """모든 뷰 모듈을 미리 import (gunicorn preload 마스터에서 호출해 워커가 공유)"""
+    for view in LAZY_VIEWS:
+        view.load()
+    return len(LAZY_VIEWS)
+
+
+_lazy(auth_bp, '/', 'index', 'auth.index')
+_lazy(auth_bp, '/login', 'login', 'auth.login', methods=['GET', 'POST'])
+_lazy(auth_bp, '/logout', 'logout', 'auth.logout')
+_lazy(auth_bp, '/register', 'register', 'auth.register', methods=['GET', 'POST'])
+_lazy(auth_bp, '/dashboard', 'dashboard', 'auth.dashboard')
+
+_lazy(insurance_bp, '/insurance/<int:insurance_id>/policy', 'policy', 'insurance.serve_insurance_policy')
+_lazy(insurance_bp, '/uploads/<filename>', 'uploaded_file', 'insurance.uploaded_file')
+_lazy(insurance_bp, '/uploads/<filename>/<any(preview, thumbnail):variant>', 'uploaded_file_variant',
+      'insurance.uploaded_file_variant')
+_lazy(insurance_bp, '/terms', 'terms', 'insurance.terms')
+_lazy(insurance_bp, '/terms/guide.pdf', 'terms_guide_pdf', 'insurance.terms_guide_pdf')
+_lazy(insurance_bp, '/terms/policy/download', 'terms_policy_download', 'insurance.terms_policy_download')
+_lazy(insurance_bp, '/insurance', 'index', 'insurance.insurance', methods=['GET', 'POST'])
+_lazy(insurance_bp, '/insurance/upload', 'upload', 'uploads.insurance_upload', methods=['POST'])
+_lazy(insurance_bp, '/api/search', 'api_search', 'insurance.api_search')
+_lazy(insurance_bp, '/api/vehicle-history', 'api_vehicle_history', 'insurance.api_vehicle_history')
+_lazy(insurance_bp, '/partner/insurance', 'partner_insurance', 'insurance.partner_insurance', methods=['GET', 'POST'])
+_lazy(insurance_bp, '/api/get-car-info', 'api_get_car_info', 'insurance.api_get_car_info', methods=['POST'])
+_lazy(insurance_bp, '/partner/terms', 'partner_terms', 'insurance.partner_terms')
+
+_lazy(partner_bp, '/partner/dashboard', 'dashboard', 'partner.partner_dashboard')
+_lazy(partner_bp, '/partner/admin', 'admin', 'partner.partner_admin')
+_lazy(partner_bp, '/partner/admin/member-approval', 'member_approval', 'partner.partner_admin_member_approval', methods=['GET', 'POST'])
+_lazy(partner_bp, '/partner/admin/insurance-approval', 'insurance_approval', 'partner.partner_admin_insurance_approval', methods=['GET', 'POST'])
+_lazy(partner_bp, '/partner/admin/settlement', 'settlement', 'partner.partner_admin_settlement', methods=['GET', 'POST'])
+
+_lazy(points_bp, '/partner/admin/point-management', 'management', 'points.partner_admin_point_management', methods=['GET', 'POST'])
+_lazy(points_bp, '/partner/admin/deposit-request-count', 'deposit_request_count', 'points.partner_admin_deposit_request_count')
+_lazy(points_bp, '/partner/admin/point-history/<int:member_id>', 'history', 'points.partner_admin_point_history')
+_lazy(points_bp, '/partner/admin/deposit-summary', 'deposit_summary', 'points.partner_admin_deposit_summary')
+_lazy(points_bp, '/partner/virtual-account', 'partner_virtual_account', 'points.partner_virtual_account', methods=['POST'])
+_lazy(points_bp, '/virtual-account', 'virtual_account', 'points.virtual_account', methods=['POST'])
+_lazy(points_bp, '/deposit-request', 'deposit_request', 'points.create_deposit_request', methods=['POST'])
+
+_lazy(admin_bp, '/admin/dashboard', 'dashboard', 'admin.admin_dashboard')
+_lazy(admin_bp, '/admin/premium-settings', 'premium_settings', 'admin.admin_premium_settings', methods=['GET', 'POST'])
+_lazy(admin_bp, '/admin/partner-groups', 'partner_groups', 'admin.admin_partner_groups', methods=['GET', 'POST'])
+_lazy(admin_bp, '/admin/insurance-overview', 'insurance_overview', 'admin.admin_insurance_overview', methods=['GET', 'POST'])
+_lazy(admin_bp, '/admin/insurance-overview/members', 'insurance_overview_members', 'admin.admin_insurance_overview_members')
+_lazy(admin_bp, '/admin/settlement-overview', 'settlement_overview', 'admin.admin_settlement_overview')
+_lazy(admin_bp, '/admin/administrators', 'administrators', 'admin.admin_administrators', methods=['GET', 'POST'])
+_lazy(admin_bp, '/admin', 'home', 'admin.admin_home')
+_lazy(admin_bp, '/admin/members', 'members', 'admin.admin_members', methods=['GET', 'POST'])
+_lazy(admin_bp, '/admin/members/upload', 'members_upload', 'uploads.admin_members_upload', methods=['POST'])
+_lazy(admin_bp, '/admin/insurance', 'insurance', 'admin.admin_insurance', methods=['GET', 'POST'])
+_lazy(admin_bp, '/admin/settlement', 'settlement', 'admin.admin_settlement')
+_lazy(admin_bp, '/admin/invoice', 'invoice', 'invoices.admin_invoice')
+_lazy(admin_bp, '/admin/invoice/batch', 'invoice_batch', 'invoices.admin_invoice_batch')
+
+_lazy(exports_bp, '/insurance/template', 'insurance_template', 'exports.insurance_template_download')
+_lazy(exports_bp, '/admin/insurance-overview/export', 'admin_insurance_overview', 'exports.admin_insurance_overview_export')
+_lazy(exports_bp, '/admin/insurance-overview/overlaps', 'admin_insurance_overlaps', 'exports.admin_insurance_overlaps_export')
+_lazy(exports_bp, '/admin/settlement-overview/export', 'admin_settlement_overview', 'exports.admin_settlement_overview_export')
+_lazy(exports_bp, '/partner/insurance/excel-template', 'partner_insurance_template', 'exports.partner_insurance_excel_template')
+_lazy(exports_bp, '/partner/admin/member-approval/excel-template', 'partner_member_template', 'exports.partner_admin_member_excel_template')
+_lazy(exports_bp, '/partner/admin/insurance-approval/export', 'partner_insurance_approval', 'exports.partner_admin_insurance_approval_export')
+_lazy(exports_bp, '/partner/admin/settlement/export', 'partner_settlement', 'exports.partner_admin_settlement_export')
+_lazy(exports_bp, '/admin/insurance/download', 'admin_insurance', 'exports.admin_insurance_download')
+_lazy(exports_bp, '/admin/settlement/export', 'admin_settlement', 'exports.admin_settlement_export')
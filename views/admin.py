@@ -0,0 +1,1224 @@
+"""전체관리자 화면 (대시보드, 파트너그룹, 회원, 보험, 정산, 관리자)"""
+
+import os
+from datetime import datetime
+
+from flask import current_app, flash, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+from werkzeug.utils import secure_filename
+
+from app import (
+    InsuranceApplication, KST, Member, PartnerGroup, PremiumSetting, admin_log, admin_required,
+    bulk_approve_applications, bump_partner_directory, db, discard_upload, ensure_initialized,
+    exclude_archived, get_partner_directory, include_archived_requested, insurance_approved,
+    invalidate_auth_context, invalidate_partner_group, parse_date, parse_datetime,
+    prefetch_documents, read_replica, remove_member, safe_commit, search_member_ids, store_document,
+)
+
+
+# 전체관리자 대시보드 (요구사항의 전체대시보드페이지)
+@admin_required
+@read_replica
+def admin_dashboard():
+    try:
+        ensure_initialized()
+        
+        # 통계 데이터 계산
+        total_partner_groups = 0
+        total_members = 0
+        total_insurance = 0
+        
+        try:
+            total_partner_groups = db.session.query(PartnerGroup).count()
+        except Exception:
+            pass
+        
+        try:
+            total_members = db.session.query(Member).filter_by(role='member').count()
+        except Exception:
+            pass
+        
+        try:
+            total_insurance = db.session.query(InsuranceApplication).count()
+        except Exception:
+            pass
+        
+        return render_template('admin/dashboard.html',
+                             total_partner_groups=total_partner_groups,
+                             total_members=total_members,
+                             total_insurance=total_insurance)
+    except Exception as e:
+        admin_log.error("Admin dashboard route error: %s", e)
+        flash('전체대시보드 로드 중 오류가 발생했습니다.', 'danger')
+        try:
+            return render_template('admin/dashboard.html',
+                                 total_partner_groups=0,
+                                 total_members=0,
+                                 total_insurance=0)
+        except Exception:
+            try:
+                return redirect(url_for('auth.login'))
+            except Exception:
+                return "전체대시보드를 불러올 수 없습니다.", 500
+
+
+# 보험료 설정 페이지
+@admin_required
+def admin_premium_settings():
+    try:
+        ensure_initialized()
+        
+        if request.method == 'POST':
+            action = request.form.get('action')
+            
+            if action == 'add':
+                # 새 보험료 추가
+                vehicle_type = request.form.get('vehicle_type', '').strip()
+                premium_amount = request.form.get('premium_amount', '').strip()
+                
+                if not vehicle_type or not premium_amount:
+                    flash('차종분류와 보험료는 필수입니다.', 'warning')
+                else:
+                    try:
+                        premium_amount_int = int(premium_amount)
+                        
+                        # 중복 확인
+                        existing = db.session.query(PremiumSetting).filter_by(vehicle_type=vehicle_type).first()
+                        if existing:
+                            flash('이미 존재하는 차종분류입니다.', 'danger')
+                        else:
+                            new_setting = PremiumSetting(
+                                vehicle_type=vehicle_type,
+                                premium_amount=premium_amount_int
+                            )
+                            db.session.add(new_setting)
+                            
+                            if safe_commit():
+                                flash('보험료가 추가되었습니다.', 'success')
+                            else:
+                                flash('보험료 추가 중 오류가 발생했습니다.', 'danger')
+                    except ValueError:
+                        flash('보험료는 숫자로 입력해주세요.', 'warning')
+            
+            elif action == 'save':
+                # 보험료 수정
+                setting_id = request.form.get('setting_id')
+                vehicle_type = request.form.get('vehicle_type', '').strip()
+                premium_amount = request.form.get('premium_amount', '').strip()
+                
+                if setting_id and vehicle_type and premium_amount:
+                    try:
+                        premium_amount_int = int(premium_amount)
+                        setting = db.session.get(PremiumSetting, int(setting_id))
+                        
+                        if setting:
+                            # 차종분류 변경 시 중복 확인
+                            if setting.vehicle_type != vehicle_type:
+                                existing = db.session.query(PremiumSetting).filter_by(vehicle_type=vehicle_type).first()
+                                if existing:
+                                    flash('이미 존재하는 차종분류입니다.', 'danger')
+                                    return redirect(url_for('admin.premium_settings'))
+                            
+                            setting.vehicle_type = vehicle_type
+                            setting.premium_amount = premium_amount_int
+                            setting.updated_at = datetime.now(KST)
+                            
+                            if safe_commit():
+                                flash('보험료가 수정되었습니다.', 'success')
+                            else:
+                                flash('보험료 수정 중 오류가 발생했습니다.', 'danger')
+                        else:
+                            flash('보험료 설정을 찾을 수 없습니다.', 'danger')
+                    except ValueError:
+                        flash('보험료는 숫자로 입력해주세요.', 'warning')
+            
+            elif action == 'delete':
+                # 보험료 삭제
+                setting_id = request.form.get('setting_id')
+                if setting_id:
+                    setting = db.session.get(PremiumSetting, int(setting_id))
+                    if setting:
+                        db.session.delete(setting)
+                        if safe_commit():
+                            flash('보험료가 삭제되었습니다.', 'success')
+                        else:
+                            flash('보험료 삭제 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash('보험료 설정을 찾을 수 없습니다.', 'danger')
+            
+            return redirect(url_for('admin.premium_settings'))
+        
+        # GET 요청: 보험료 목록 조회
+        edit_id = request.args.get('edit_id')
+        settings = db.session.query(PremiumSetting).order_by(PremiumSetting.vehicle_type).all()
+        
+        return render_template('admin/premium_settings.html',
+                             settings=settings,
+                             edit_id=edit_id)
+    
+    except Exception as e:
+        admin_log.exception("Premium settings route error: %s", e)
+        flash('보험료 설정 페이지 로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('admin.dashboard'))
+
+
+# 파트너그룹 관리 (요구사항의 파트너그룹만들기 페이지)
+@login_required
+@admin_required
+def admin_partner_groups():
+    ensure_initialized()
+    
+    if request.method == 'POST':
+        action = request.form.get('action')
+        
+        if action == 'create':
+            # 신규 파트너그룹 생성
+            name = request.form.get('name', '').strip()
+            admin_username = request.form.get('admin_username', '').strip()
+            admin_password = request.form.get('admin_password', '').strip()
+            business_number = request.form.get('business_number', '').strip()
+            representative = request.form.get('representative', '').strip()
+            phone = request.form.get('phone', '').strip()
+            mobile = request.form.get('mobile', '').strip()
+            address = request.form.get('address', '').strip()
+            bank_name = request.form.get('bank_name', '').strip()
+            account_number = request.form.get('account_number', '').strip()
+            memo = request.form.get('memo', '').strip()
+            
+            # 필수 항목 검증
+            if not name or not business_number or not representative or not phone:
+                flash('파트너그룹명, 사업자등록번호, 대표자, 유선번호는 필수항목입니다.', 'warning')
+                return redirect(url_for('admin.partner_groups'))
+            
+            # 중복 검증
+            if db.session.query(PartnerGroup).filter(
+                (PartnerGroup.name == name) | 
+                (PartnerGroup.business_number == business_number) |
+                (PartnerGroup.admin_username == admin_username)
+            ).first():
+                flash('이미 존재하는 파트너그룹명, 사업자번호 또는 관리자 아이디입니다.', 'danger')
+                return redirect(url_for('admin.partner_groups'))
+            
+            # 파일 업로드 처리
+            registration_cert_path = None
+            logo_path = None
+            
+            # 사업자등록증 파일 처리
+            if 'registration_cert' in request.files:
+                file = request.files['registration_cert']
+                file_filename = file.filename if file else None
+                admin_log.debug("Registration cert file: %s, filename: %s", file, file_filename)
+                
+                # 파일이 실제로 선택되었는지 확인 (빈 파일이 아닌지)
+                if file and file_filename and file_filename.strip():
+                    try:
+                        filename = secure_filename(file.filename)
+                        file_ext = os.path.splitext(filename)[1].lower()
+                        allowed_extensions = ['.pdf', '.jpg', '.jpeg', '.png']
+                        
+                        admin_log.debug("Processing registration cert: %s, ext: %s", filename, file_ext)
+                        if file_ext in allowed_extensions:
+                            new_filename = store_document(file, file_ext)
+                            if new_filename:
+                                registration_cert_path = new_filename
+                                admin_log.debug("Registration cert saved successfully: %s", registration_cert_path)
+                            else:
+                                admin_log.error("Registration cert file was not saved properly (empty file): %s", file.filename)
+                                registration_cert_path = None
+                        else:
+                            admin_log.debug("Invalid file extension for registration cert: %s", file_ext)
+                    except Exception as e:
+                        admin_log.exception("Registration cert upload error: %s", e)
+            else:
+                admin_log.debug("No registration_cert file in request")
+            
+            # 로고 파일 처리
+            if 'logo' in request.files:
+                file = request.files['logo']
+                file_filename = file.filename if file else None
+                admin_log.debug("Logo file: %s, filename: %s", file, file_filename)
+                
+                # 파일이 실제로 선택되었는지 확인 (빈 파일이 아닌지)
+                if file and file_filename and file_filename.strip():
+                    try:
+                        filename = secure_filename(file.filename)
+                        file_ext = os.path.splitext(filename)[1].lower()
+                        allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif']
+                        
+                        admin_log.debug("Processing logo: %s, ext: %s", filename, file_ext)
+                        if file_ext in allowed_extensions:
+                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
+                            new_filename = f"logo_{business_number}_{timestamp}{file_ext}"
+                            
+                            # 파트너그룹 로고 디렉토리에 저장
+                            partner_logo_dir = os.path.join('static', 'partner_logos')
+                            os.makedirs(partner_logo_dir, exist_ok=True)
+                            filepath = os.path.join(partner_logo_dir, new_filename)
+                            admin_log.debug("Saving logo to: %s", filepath)
+                            
+                            # 파일 저장
+                            file.save(filepath)
+                            
+                            # 파일이 실제로 저장되었는지 확인
+                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+                                logo_path = os.path.join('partner_logos', new_filename)
+                                admin_log.debug("Logo saved successfully: %s", logo_path)
+                            else:
+                                admin_log.error("Logo file was not saved properly (empty file): %s", file.filename)
+                                logo_path = None
+                        else:
+                            admin_log.debug("Invalid file extension for logo: %s", file_ext)
+                    except Exception as e:
+                        admin_log.exception("Logo upload error: %s", e)
+            else:
+                admin_log.debug("No logo file in request")
+
+            try:
+                admin_log.debug("Creating partner group with files: cert=%s, logo=%s", registration_cert_path, logo_path)
+                
+                partner_group = PartnerGroup(
+                    name=name,
+                    admin_username=admin_username,
+                    business_number=business_number,
+                    representative=representative,
+                    phone=phone,
+                    mobile=mobile,
+                    address=address,
+                    bank_name=bank_name,
+                    account_number=account_number,
+                    registration_cert_path=registration_cert_path,
+                    logo_path=logo_path,
+                    memo=memo
+                )
+                partner_group.set_admin_password(admin_password)
+                db.session.add(partner_group)
+                admin_log.debug("Partner group added to session: %s", name)
+                
+                admin_log.debug("Partner group create: Adding %s to session", name)
+                
+                commit_success = safe_commit(verify=partner_group, label='Partner group create')
+                
+                if not commit_success:
+                    admin_log.error("Partner group create: Commit failed for %s", name)
+                    flash('파트너그룹 생성 중 오류가 발생했습니다.', 'danger')
+                    admin_log.error("Failed to commit partner group to database")
+                else:
+                    bump_partner_directory()
+                    admin_log.debug("Partner group saved: %s (cert: %s, logo: %s)", name, registration_cert_path, logo_path)
+                    
+                    # 로고가 업로드된 경우 파트너그룹별 로고 파일도 생성
+                    if logo_path and 'logo' in request.files:
+                        try:
+                            file = request.files['logo']
+                            file_ext = os.path.splitext(secure_filename(file.filename))[1].lower()
+                            group_logo_filename = f"group_{partner_group.id}_logo{file_ext}"
+                            partner_logo_dir = os.path.join('static', 'partner_logos')
+                            group_logo_path = os.path.join(partner_logo_dir, group_logo_filename)
+                            file.seek(0)  # 파일 포인터 리셋
+                            file.save(group_logo_path)
+                        except Exception as e:
+                            admin_log.error("Group logo creation error: %s", e)
+                    
+                    flash(f'파트너그룹 "{name}"이 생성되었습니다.', 'success')
+            except Exception as e:
+                admin_log.error("Partner group creation error: %s", e)
+                flash('파트너그룹 생성 중 오류가 발생했습니다.', 'danger')
+                
+        elif action in ['save', 'delete']:
+            # 수정/삭제
+            group_id = request.form.get('group_id')
+            if group_id:
+                group = db.session.get(PartnerGroup, int(group_id))
+                if group:
+                    if action == 'delete':
+                        try:
+                            group_id = group.id
+                            group_name = group.name
+                            db.session.delete(group)
+                            
+                            admin_log.debug("Partner group delete: Deleting %s (ID: %s)", group_name, group_id)
+                            
+                            commit_success = safe_commit()
+                            
+                            if commit_success:
+                                invalidate_partner_group(group_id)
+                                bump_partner_directory()
+                                admin_log.debug("Partner group delete: Successfully deleted %s", group_name)
+                                flash('파트너그룹이 삭제되었습니다.', 'success')
+                            else:
+                                admin_log.error("Partner group delete: Commit failed for %s", group_name)
+                                flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                        except Exception as e:
+                            admin_log.exception("Partner group deletion error: %s", e)
+                            try:
+                                db.session.rollback()
+                            except Exception:
+                                pass
+                            flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                    elif action == 'save':
+                        try:
+                            group.name = request.form.get('name', '').strip()
+                            group.admin_username = request.form.get('admin_username', '').strip()
+                            if request.form.get('admin_password', '').strip():
+                                group.set_admin_password(request.form.get('admin_password', '').strip())
+                            group.business_number = request.form.get('business_number', '').strip()
+                            group.representative = request.form.get('representative', '').strip()
+                            group.phone = request.form.get('phone', '').strip()
+                            group.mobile = request.form.get('mobile', '').strip()
+                            group.address = request.form.get('address', '').strip()
+                            group.bank_name = request.form.get('bank_name', '').strip()
+                            group.account_number = request.form.get('account_number', '').strip()
+                            group.memo = request.form.get('memo', '').strip()
+                            
+                            # 파일 업데이트 처리
+                            # 사업자등록증 파일 처리
+                            if 'registration_cert' in request.files:
+                                file = request.files['registration_cert']
+                                if file and file.filename:
+                                    try:
+                                        filename = secure_filename(file.filename)
+                                        file_ext = os.path.splitext(filename)[1].lower()
+                                        allowed_extensions = ['.pdf', '.jpg', '.jpeg', '.png']
+                                        
+                                        if file_ext in allowed_extensions:
+                                            new_filename = store_document(file, file_ext)
+                                            if new_filename:
+                                                group.registration_cert_path = new_filename
+                                                admin_log.info("Registration cert updated: %s", new_filename)
+                                            else:
+                                                admin_log.error("Registration cert save failed (empty file): %s", file.filename)
+                                    except Exception as e:
+                                        admin_log.error("Registration cert update error: %s", e)
+                            
+                            # 로고 파일 처리
+                            if 'logo' in request.files:
+                                file = request.files['logo']
+                                if file and file.filename:
+                                    try:
+                                        filename = secure_filename(file.filename)
+                                        file_ext = os.path.splitext(filename)[1].lower()
+                                        allowed_extensions = ['.jpg', '.jpeg', '.png', '.gif']
+                                        
+                                        if file_ext in allowed_extensions:
+                                            timestamp = datetime.now(KST).strftime('%Y%m%d_%H%M%S')
+                                            new_filename = f"logo_{group.business_number}_{timestamp}{file_ext}"
+                                            
+                                            # 파트너그룹 로고 디렉토리에 저장
+                                            partner_logo_dir = os.path.join('static', 'partner_logos')
+                                            os.makedirs(partner_logo_dir, exist_ok=True)
+                                            filepath = os.path.join(partner_logo_dir, new_filename)
+                                            file.save(filepath)
+                                            
+                                            # 파일이 실제로 저장되었는지 확인
+                                            if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+                                                group.logo_path = os.path.join('partner_logos', new_filename)
+                                                
+                                                # 파트너그룹별 로고 파일도 생성 (group_{id}_logo.png)
+                                                try:
+                                                    group_logo_filename = f"group_{group.id}_logo{file_ext}"
+                                                    group_logo_path = os.path.join(partner_logo_dir, group_logo_filename)
+                                                    file.seek(0)  # 파일 포인터 리셋
+                                                    file.save(group_logo_path)
+                                                    
+                                                    admin_log.info("Logo updated: %s", group.logo_path)
+                                                except Exception as e:
+                                                    admin_log.error("Group logo copy error: %s", e)
+                                            else:
+                                                admin_log.error("Logo save failed: %s", filepath)
+                                    except Exception as e:
+                                        admin_log.error("Logo update error: %s", e)
+                            
+                            admin_log.debug("Partner group save: Updating %s (ID: %s)", group_name, group_id)
+                            
+                            commit_success = safe_commit(verify=group, label='Partner group save')
+                            
+                            if commit_success:
+                                invalidate_partner_group(group_id)
+                                bump_partner_directory()
+                                flash('파트너그룹 정보가 저장되었습니다.', 'success')
+                            else:
+                                admin_log.error("Partner group save: Commit failed for %s", group_name)
+                                flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+                        except Exception as e:
+                            admin_log.exception("Partner group update error: %s", e)
+                            try:
+                                db.session.rollback()
+                            except Exception:
+                                pass
+                            flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+        
+        return redirect(url_for('admin.partner_groups'))
+    
+    # GET 요청: 파트너그룹 목록 조회
+    edit_id = request.args.get('edit_id')
+    partner_groups = []
+    if db is not None:
+        try:
+            partner_groups = db.session.query(PartnerGroup).order_by(PartnerGroup.created_at.desc()).all()
+        except Exception as e:
+            admin_log.error("Error fetching partner groups: %s", e)
+    
+    return render_template('admin/partner_groups.html', 
+                         partner_groups=partner_groups, 
+                         edit_id=edit_id)
+
+
+# 전체책임보험현황 (요구사항의 전체책임보험현황페이지)
+# 조회 중 상태 재계산(포인트 차감)과 커밋을 하므로 읽기 복제본을 쓰지 않는다.
+@admin_required
+def admin_insurance_overview():
+    ensure_initialized()
+    
+    edit_id = request.args.get('edit_id', '')
+    
+    if request.method == 'POST':
+        action = request.form.get('action')
+        application_id = request.form.get('application_id')
+        
+        if not application_id:
+            flash('신청 ID가 필요합니다.', 'danger')
+            return redirect(url_for('admin.insurance_overview'))
+        
+        try:
+            app = db.session.query(InsuranceApplication).filter_by(id=int(application_id)).first()
+            if not app:
+                flash('보험 신청을 찾을 수 없습니다.', 'danger')
+                return redirect(url_for('admin.insurance_overview'))
+            
+            if action == 'save':
+                # 수정 저장
+                app.car_plate = request.form.get('car_plate', '').strip() or app.car_plate
+                app.vin = request.form.get('vin', '').strip() or app.vin
+                app.car_name = request.form.get('car_name', '').strip() or app.car_name
+                app.car_registered_at = parse_date(request.form.get('car_registered_at', '')) or app.car_registered_at
+                app.insured_code = request.form.get('insured_code', '').strip() or app.insured_code
+                app.contractor_code = request.form.get('contractor_code', '').strip() or app.contractor_code
+                app.premium = float(request.form.get('premium', 0) or 0) or app.premium
+                app.memo = request.form.get('memo', '').strip() or app.memo
+                
+                # 가입시간 처리
+                start_at_str = request.form.get('start_at', '').strip()
+                if start_at_str:
+                    try:
+                        app.start_at = datetime.strptime(start_at_str, '%Y-%m-%dT%H:%M').replace(tzinfo=KST)
+                    except ValueError:
+                        pass
+                
+                # 종료시간 처리
+                end_at_str = request.form.get('end_at', '').strip()
+                if end_at_str:
+                    try:
+                        app.end_at = datetime.strptime(end_at_str, '%Y-%m-%dT%H:%M').replace(tzinfo=KST)
+                    except ValueError:
+                        pass
+                
+                # 조합승인시간 처리
+                approved_at_str = request.form.get('approved_at', '').strip()
+                if approved_at_str:
+                    try:
+                        app.approved_at = datetime.strptime(approved_at_str, '%Y-%m-%dT%H:%M').replace(tzinfo=KST)
+                        app.status = '조합승인'
+                    except ValueError:
+                        pass
+                
+                db.session.add(app)
+                if safe_commit():
+                    flash('보험 신청 정보가 저장되었습니다.', 'success')
+                else:
+                    flash('저장 중 오류가 발생했습니다.', 'danger')
+            
+            elif action == 'delete':
+                # 삭제
+                db.session.delete(app)
+                if safe_commit():
+                    flash('보험 신청이 삭제되었습니다.', 'success')
+                else:
+                    flash('삭제 중 오류가 발생했습니다.', 'danger')
+        
+        except Exception as e:
+            flash(f'처리 중 오류가 발생했습니다: {str(e)}', 'danger')
+        
+        # 검색 조건 유지하며 리다이렉트
+        params = {}
+        for key in ['start_date', 'end_date', 'partner_group_id', 'company_name', 'status_filter']:
+            if request.args.get(key):
+                params[key] = request.args.get(key)
+        return redirect(url_for('admin.insurance_overview', **params))
+    
+    # 검색 조건
+    start_date = parse_date(request.args.get('start_date', ''))
+    end_date = parse_date(request.args.get('end_date', ''))
+    partner_group_id = request.args.get('partner_group_id', '')
+    company_name = request.args.get('company_name', '').strip()
+    status_filter = request.args.get('status_filter', '')  # 가입완료/미가입
+    
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('admin.dashboard'))
+    
+    # 파트너그룹 목록
+    partner_groups = get_partner_directory()
+    
+    # 선택된 파트너그룹의 회원사 목록 (상사명 필터용)
+    members = []
+    if partner_group_id:
+        try:
+            members = db.session.query(Member).filter_by(
+                partner_group_id=int(partner_group_id),
+                role='member'
+            ).order_by(Member.company_name).all()
+        except (ValueError, Exception):
+            pass
+    
+    # 보험신청 데이터 조회
+    include_archived = include_archived_requested()
+    q = exclude_archived(db.session.query(InsuranceApplication), include_archived)
+    
+    if start_date:
+        q = q.filter(InsuranceApplication.created_at >= datetime.combine(start_date, datetime.min.time(), tzinfo=KST))
+    if end_date:
+        q = q.filter(InsuranceApplication.created_at <= datetime.combine(end_date, datetime.max.time(), tzinfo=KST))
+    if partner_group_id:
+        try:
+            q = q.filter(InsuranceApplication.partner_group_id == int(partner_group_id))
+        except ValueError:
+            pass
+    if company_name:
+        q = q.filter(InsuranceApplication.created_by_member_id.in_(search_member_ids(company_name)))
+    if status_filter == '가입완료':
+        q = q.filter(InsuranceApplication.start_at.is_not(None))
+    elif status_filter == '미가입':
+        q = q.filter(InsuranceApplication.start_at.is_(None))
+    
+    applications = q.order_by(InsuranceApplication.created_at.desc()).all()
+    
+    # 상태 재계산
+    for app in applications:
+        app.recompute_status()
+    safe_commit()
+    
+    return render_template('admin/insurance_overview.html',
+                         applications=applications,
+                         partner_groups=partner_groups,
+                         members=members,
+                         start_date=start_date,
+                         end_date=end_date,
+                         partner_group_id=partner_group_id,
+                         company_name=company_name,
+                         status_filter=status_filter,
+                         include_archived=include_archived,
+                         edit_id=edit_id)
+
+
+# 전체책임보험현황 회원사 목록 API
+@admin_required
+@read_replica
+def admin_insurance_overview_members():
+    ensure_initialized()
+    partner_group_id = request.args.get('partner_group_id', '')
+    
+    if not partner_group_id:
+        return jsonify({'members': []})
+    
+    try:
+        members = db.session.query(Member).filter_by(
+            partner_group_id=int(partner_group_id),
+            role='member'
+        ).order_by(Member.company_name).all()
+        
+        return jsonify({
+            'members': [{'company_name': m.company_name} for m in members]
+        })
+    except Exception as e:
+        return jsonify({'members': [], 'error': str(e)})
+
+
+# 전체정산페이지 (요구사항의 전체정산페이지)
+@admin_required
+@read_replica
+def admin_settlement_overview():
+    ensure_initialized()
+    
+    year = int(request.args.get('year', datetime.now().year))
+    month = int(request.args.get('month', datetime.now().month))
+    partner_group_id = request.args.get('partner_group_id', '')
+    
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('admin.dashboard'))
+    
+    # 파트너그룹 목록
+    partner_groups = get_partner_directory()
+    
+    # 정산 데이터 계산
+    start_period = datetime(year, month, 1, tzinfo=KST)
+    if month == 12:
+        next_month = datetime(year + 1, 1, 1, tzinfo=KST)
+    else:
+        next_month = datetime(year, month + 1, 1, tzinfo=KST)
+    
+    q = db.session.query(InsuranceApplication).filter(
+        InsuranceApplication.start_at.is_not(None),
+        InsuranceApplication.start_at >= start_period,
+        InsuranceApplication.start_at < next_month,
+    )
+    
+    if partner_group_id:
+        try:
+            q = q.filter(InsuranceApplication.partner_group_id == int(partner_group_id))
+        except ValueError:
+            pass
+    
+    applications = q.all()
+    
+    # 파트너그룹별 정산 데이터 집계
+    settlements_by_group = {}
+    for app in applications:
+        if app.partner_group and app.created_by_member:
+            group_key = app.partner_group_id
+            company_key = (app.created_by_member.company_name, app.created_by_member.representative)
+            
+            if group_key not in settlements_by_group:
+                settlements_by_group[group_key] = {
+                    'group_name': app.partner_group.name,
+                    'companies': {},
+                    'total_count': 0,
+                    'total_amount': 0
+                }
+            
+            if company_key not in settlements_by_group[group_key]['companies']:
+                settlements_by_group[group_key]['companies'][company_key] = {
+                    'company_name': app.created_by_member.company_name,
+                    'representative': app.created_by_member.representative,
+                    'count': 0,
+                    'amount': 0
+                }
+            
+            settlements_by_group[group_key]['companies'][company_key]['count'] += 1
+            settlements_by_group[group_key]['companies'][company_key]['amount'] += 95000  # 건수 × 95,000원
+            settlements_by_group[group_key]['total_count'] += 1
+            settlements_by_group[group_key]['total_amount'] += 95000
+    
+    # 전체 합계
+    grand_total_count = sum(group['total_count'] for group in settlements_by_group.values())
+    grand_total_amount = sum(group['total_amount'] for group in settlements_by_group.values())
+    
+    return render_template('admin/settlement_overview.html',
+                         settlements_by_group=settlements_by_group,
+                         partner_groups=partner_groups,
+                         year=year,
+                         month=month,
+                         partner_group_id=partner_group_id,
+                         grand_total_count=grand_total_count,
+                         grand_total_amount=grand_total_amount)
+
+
+# 전체관리자페이지 (요구사항의 전체관리자페이지)
+@admin_required
+def admin_administrators():
+    ensure_initialized()
+    
+    if request.method == 'POST':
+        action = request.form.get('action')
+        
+        if action == 'create':
+            # 새 관리자 추가
+            name = request.form.get('name', '').strip()
+            username = request.form.get('username', '').strip()
+            password = request.form.get('password', '').strip()
+            is_active = request.form.get('is_active') == 'on'
+            permission = request.form.get('permission', 'viewer')
+            memo = request.form.get('memo', '').strip()
+            
+            if not name or not username or not password:
+                flash('이름, 아이디, 비밀번호는 필수입니다.', 'warning')
+                return redirect(url_for('admin.administrators'))
+            
+            # 중복 확인
+            if db.session.query(Member).filter(
+                Member.username == username,
+                Member.partner_group_id.is_(None)
+            ).first():
+                flash('이미 존재하는 아이디입니다.', 'danger')
+                return redirect(url_for('admin.administrators'))
+            
+            try:
+                admin = Member(
+                    partner_group_id=None,
+                    username=username,
+                    company_name=name,
+                    representative=name,
+                    approval_status='승인' if is_active else '신청',
+                    role='admin' if permission == 'admin' else 'viewer'  # 권한: 관리자 또는 열람
+                )
+                admin.set_password(password)
+                db.session.add(admin)
+                
+                if not safe_commit():
+                    flash('관리자 추가 중 오류가 발생했습니다.', 'danger')
+                else:
+                    flash('관리자가 추가되었습니다.', 'success')
+            except Exception as e:
+                admin_log.error("Admin creation error: %s", e)
+                flash('관리자 추가 중 오류가 발생했습니다.', 'danger')
+        
+        elif action in ['save', 'delete']:
+            admin_id = request.form.get('admin_id')
+            if admin_id:
+                admin = db.session.get(Member, int(admin_id))
+                if admin and admin.partner_group_id is None:
+                    if action == 'delete':
+                        # 자기 자신은 삭제할 수 없음
+                        if admin.id == current_user.id:
+                            flash('자기 자신은 삭제할 수 없습니다.', 'warning')
+                        else:
+                            try:
+                                db.session.delete(admin)
+                                if not safe_commit():
+                                    flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                                else:
+                                    flash('관리자가 삭제되었습니다.', 'success')
+                            except Exception as e:
+                                admin_log.error("Admin deletion error: %s", e)
+                                flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                    elif action == 'save':
+                        try:
+                            admin.company_name = request.form.get('name', '').strip()
+                            admin.representative = request.form.get('name', '').strip()
+                            admin.username = request.form.get('username', '').strip()
+                            if request.form.get('password', '').strip():
+                                admin.set_password(request.form.get('password', '').strip())
+                            admin.approval_status = '승인' if request.form.get('is_active') == 'on' else '신청'
+                            permission = request.form.get('permission', 'viewer')
+                            admin.role = 'admin' if permission == 'admin' else 'viewer'  # 권한 업데이트
+                            invalidate_auth_context(admin.id)
+                            
+                            if not safe_commit():
+                                flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+                            else:
+                                flash('관리자 정보가 저장되었습니다.', 'success')
+                        except Exception as e:
+                            admin_log.error("Admin update error: %s", e)
+                            flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+        
+        return redirect(url_for('admin.administrators'))
+    
+    # GET 요청: 관리자 목록 조회
+    edit_id = request.args.get('edit_id')
+    administrators = []
+    if db is not None:
+        try:
+            # 전체관리자 페이지: role='admin' 또는 role='viewer'인 관리자 모두 조회
+            administrators = db.session.query(Member).filter(
+                Member.partner_group_id.is_(None),
+                Member.role.in_(['admin', 'viewer'])
+            ).order_by(Member.created_at.desc()).all()
+        except Exception as e:
+            admin_log.error("Error fetching administrators: %s", e)
+    
+    return render_template('admin/administrators.html',
+                         administrators=administrators,
+                         edit_id=edit_id)
+
+
+@login_required
+@admin_required
+def admin_home():
+    # 전체대시보드로 리다이렉트
+    return redirect(url_for('admin.dashboard'))
+
+
+@login_required
+@admin_required
+def admin_members():
+    ensure_initialized()  # Ensure initialization
+    if request.method == 'POST':
+        action = request.form.get('action')
+        member_id = request.form.get('member_id')
+        if member_id:
+            m = db.session.get(Member, int(member_id))
+            if m:
+                if action == 'update_status':
+                    m.approval_status = request.form.get('approval_status', '신청')
+                    invalidate_auth_context(m.id)
+                    if not safe_commit():
+                        flash('승인 상태 변경 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash('승인 상태가 변경되었습니다.', 'success')
+                elif action == 'save':
+                    m.company_name = request.form.get('company_name', '').strip()
+                    m.address = request.form.get('address', '').strip()
+                    m.corporation_number = request.form.get('corporation_number', '').strip()
+                    m.representative = request.form.get('representative', '').strip()
+                    m.phone = request.form.get('phone', '').strip()
+                    m.mobile = request.form.get('mobile', '').strip()
+                    m.email = request.form.get('email', '').strip()
+                    m.approval_status = request.form.get('approval_status', '신청')
+                    m.role = request.form.get('role', m.role or 'member')
+                    invalidate_auth_context(m.id)
+                    m.memo = request.form.get('memo', '').strip()
+                    
+                    # 사업자등록증 파일 업로드 처리
+                    if 'registration_cert' in request.files:
+                        try:
+                            file = request.files['registration_cert']
+                            if file and file.filename:
+                                allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
+                                file_ext = os.path.splitext(file.filename)[1].lower()
+                                if file_ext in allowed_extensions:
+                                    filename = store_document(file, file_ext)
+                                    if filename:
+                                        discard_upload(m.registration_cert_path)  # 기존 파일 정리
+                                        m.registration_cert_path = os.path.join('uploads', filename)
+                                        admin_log.debug("Registration cert updated successfully: %s", m.registration_cert_path)
+                                    else:
+                                        admin_log.error("Registration cert file was not saved properly (empty file): %s", file.filename)
+                                else:
+                                    flash(f'허용되지 않은 파일 형식입니다. (PDF, JPG, PNG만 가능)', 'warning')
+                        except Exception as e:
+                            admin_log.exception("Registration cert upload error: %s", e)
+                            flash('사업자등록증 파일 업로드 중 오류가 발생했습니다.', 'warning')
+                            # 파일 업로드 실패해도 다른 정보는 저장
+                    
+                    if not safe_commit():
+                        flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash('저장되었습니다.', 'success')
+                    return redirect(url_for('admin.members'))
+                elif action == 'delete':
+                    if not remove_member(m):
+                        flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash('삭제되었습니다.', 'success')
+        else:
+            if action == 'create':
+                # 파트너그룹 ID 처리
+                partner_group_id = request.form.get('partner_group_id', '').strip()
+                partner_group_id_int = None
+                if partner_group_id:
+                    try:
+                        partner_group_id_int = int(partner_group_id)
+                    except (ValueError, TypeError):
+                        flash('올바른 파트너그룹을 선택해주세요.', 'warning')
+                        return redirect(url_for('admin.members'))
+                
+                username = request.form.get('username', '').strip()
+                password = request.form.get('password', 'temp1234')
+                company_name = request.form.get('company_name', '').strip()
+                address = request.form.get('address', '').strip()
+                business_number = request.form.get('business_number', '').strip()
+                corporation_number = request.form.get('corporation_number', '').strip()
+                representative = request.form.get('representative', '').strip()
+                phone = request.form.get('phone', '').strip()
+                mobile = request.form.get('mobile', '').strip()
+                email = request.form.get('email', '').strip()
+                member_type = request.form.get('member_type', '법인')
+                privacy_agreement = request.form.get('privacy_agreement') == 'on'
+                approval_status = request.form.get('approval_status', '승인')
+                role = request.form.get('role', 'member')
+                
+                if not username or not company_name or not business_number:
+                    flash('아이디/상사명/사업자번호는 필수입니다.', 'warning')
+                elif not partner_group_id_int:
+                    flash('파트너그룹을 선택해주세요.', 'warning')
+                elif db.session.query(Member).filter((Member.username == username) | (Member.business_number == business_number)).first():
+                    flash('이미 존재하는 아이디 또는 사업자번호입니다.', 'danger')
+                else:
+                    # 사업자등록증 파일 업로드 처리
+                    registration_cert_path = None
+                    if 'registration_cert' in request.files:
+                        try:
+                            file = request.files['registration_cert']
+                            if file and file.filename:
+                                allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
+                                file_ext = os.path.splitext(file.filename)[1].lower()
+                                if file_ext in allowed_extensions:
+                                    filename = store_document(file, file_ext)
+                                    if filename:
+                                        registration_cert_path = os.path.join('uploads', filename)
+                                        admin_log.debug("Registration cert saved successfully: %s", registration_cert_path)
+                                    else:
+                                        admin_log.error("Registration cert file was not saved properly (empty file): %s", file.filename)
+                                else:
+                                    flash(f'허용되지 않은 파일 형식입니다. (PDF, JPG, PNG만 가능)', 'warning')
+                        except Exception as e:
+                            admin_log.exception("Registration cert upload error: %s", e)
+                            flash('사업자등록증 파일 업로드 중 오류가 발생했습니다.', 'warning')
+                    
+                    nm = Member(
+                        partner_group_id=partner_group_id_int,
+                        username=username,
+                        company_name=company_name,
+                        address=address,
+                        business_number=business_number,
+                        corporation_number=corporation_number,
+                        representative=representative,
+                        phone=phone,
+                        mobile=mobile,
+                        email=email,
+                        member_type=member_type,
+                        privacy_agreement=privacy_agreement if member_type == '개인' else False,
+                        registration_cert_path=registration_cert_path,
+                        approval_status=approval_status,
+                        role=role,
+                    )
+                    nm.set_password(password)
+                    db.session.add(nm)
+                    if not safe_commit():
+                        flash('회원 추가 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash('회원이 추가되었습니다.', 'success')
+                return redirect(url_for('admin.members'))
+
+    edit_id = request.args.get('edit_id')
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('auth.dashboard'))
+    members = db.session.query(Member).order_by(Member.created_at.desc()).all()
+    prefetch_documents([m.registration_cert_path for m in members])
+    
+    # 파트너그룹 목록 가져오기
+    partner_groups = get_partner_directory()
+    
+    return render_template('admin/members.html', members=members, edit_id=edit_id, partner_groups=partner_groups)
+
+
+@login_required
+@admin_required
+def admin_insurance():
+    ensure_initialized()  # Ensure initialization
+    if request.method == 'POST':
+        if request.form.get('bulk_approve') == '1':
+            # 일괄 승인: 미승인(= status == 신청)인 데이터 모두 승인 시간 부여
+            if db is None:
+                flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+                return redirect(url_for('admin.insurance'))
+            approved_count, commit_success = bulk_approve_applications()
+            if not commit_success:
+                flash('일괄 승인 처리 중 오류가 발생했습니다.', 'danger')
+            else:
+                admin_log.debug("Bulk approve: %s applications", approved_count)
+                flash('일괄 승인되었습니다.', 'success')
+        else:
+            # 단건 수정/삭제
+            action = request.form.get('action')
+            row_id = request.form.get('row_id')
+            admin_log.debug("action=%s, row_id=%s", action, row_id)
+            
+            if row_id:
+                try:
+                    row = db.session.get(InsuranceApplication, int(row_id))
+                    admin_log.debug("Found row=%s", row)
+                except Exception as e:
+                    admin_log.debug("Error finding row: %s", e)
+                    row = None
+            else:
+                row = None
+                
+            if row and action:
+                if action == 'approve':
+                    admin_log.debug("Approving row %s", row.id)
+                    approval_time = datetime.now(KST)
+                    row.approved_at = approval_time
+                    row.status = '조합승인'
+                    if not safe_commit():
+                        flash('승인 처리 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        insurance_approved.send(
+                            current_app._get_current_object(), partner_group_id=row.partner_group_id,
+                            approved_at=approval_time, id_range=(row.id, row.id), count=1,
+                        )
+                        flash('승인되었습니다.', 'success')
+                        admin_log.debug("Approval completed for row %s", row.id)
+                elif action == 'delete':
+                    db.session.delete(row)
+                    if not safe_commit():
+                        flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash('삭제되었습니다.', 'success')
+                elif action == 'save_memo':
+                    row.memo = request.form.get('memo', row.memo)
+                    if not safe_commit():
+                        flash('비고 저장 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash('비고가 저장되었습니다.', 'success')
+                elif action == 'save':
+                    # 편집 모드에서 저장
+                    row.car_plate = request.form.get('car_plate', '').strip()
+                    row.vin = request.form.get('vin', '').strip()
+                    row.car_name = request.form.get('car_name', '').strip()
+                    row.car_registered_at = parse_date(request.form.get('car_registered_at'))
+                    row.start_at = parse_datetime(request.form.get('start_at')) # 가입시간 수정 추가
+                    row.end_at = parse_datetime(request.form.get('end_at'))   # 종료시간 수정 추가
+                    row.memo = request.form.get('memo', '').strip()
+                    # 보험증권 정보 저장
+                    if hasattr(row, 'insurance_policy_path'):
+                        row.insurance_policy_path = request.form.get('insurance_policy_path', '').strip() or None
+                    if hasattr(row, 'insurance_policy_url'):
+                        row.insurance_policy_url = request.form.get('insurance_policy_url', '').strip() or None
+                    if not safe_commit():
+                        flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash('저장되었습니다.', 'success')
+                    return redirect(url_for('admin.insurance', 
+                                           req_start=request.args.get('req_start'),
+                                           req_end=request.args.get('req_end'),
+                                           approved=request.args.get('approved'),
+                                           appr_start=request.args.get('appr_start'),
+                                           appr_end=request.args.get('appr_end')))
+
+    # Filters
+    req_start = parse_date(request.args.get('req_start', ''))
+    req_end = parse_date(request.args.get('req_end', ''))
+    approved_filter = request.args.get('approved')  # 승인/미승인/전체
+    appr_start = parse_date(request.args.get('appr_start', ''))
+    appr_end = parse_date(request.args.get('appr_end', ''))
+    edit_id = request.args.get('edit_id')
+
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('auth.dashboard'))
+    q = exclude_archived(db.session.query(InsuranceApplication), include_archived_requested())
+    if req_start:
+        q = q.filter(InsuranceApplication.created_at >= datetime.combine(req_start, datetime.min.time(), tzinfo=KST))
+    if req_end:
+        q = q.filter(InsuranceApplication.created_at <= datetime.combine(req_end, datetime.max.time(), tzinfo=KST))
+    if approved_filter == '승인':
+        q = q.filter(InsuranceApplication.approved_at.is_not(None))
+    elif approved_filter == '미승인':
+        q = q.filter(InsuranceApplication.approved_at.is_(None))
+    if appr_start:
+        q = q.filter(InsuranceApplication.approved_at >= datetime.combine(appr_start, datetime.min.time(), tzinfo=KST))
+    if appr_end:
+        q = q.filter(InsuranceApplication.approved_at <= datetime.combine(appr_end, datetime.max.time(), tzinfo=KST))
+
+    rows = q.order_by(InsuranceApplication.created_at.desc()).all()
+    for r in rows:
+        r.recompute_status()
+    safe_commit()  # Status updates - don't show error if it fails
+
+    # Build view models with pre-formatted strings to avoid tzlocal usage in templates
+    def fmt_display(dt):
+        if not dt:
+            return ''
+        try:
+            # Ensure timezone-aware datetime and convert to KST
+            if dt.tzinfo is None:
+                # If naive, assume it's already in KST
+                local_dt = dt.replace(tzinfo=KST)
+            else:
+                # Convert to KST
+                local_dt = dt.astimezone(KST)
+            return local_dt.strftime('%Y-%m-%d %H:%M')
+        except Exception:
+            return ''
+
+    def fmt_input(dt):
+        if not dt:
+            return ''
+        try:
+            # Ensure timezone-aware datetime and convert to KST
+            if dt.tzinfo is None:
+                # If naive, assume it's already in KST
+                local_dt = dt.replace(tzinfo=KST)
+            else:
+                # Convert to KST
+                local_dt = dt.astimezone(KST)
+            return local_dt.strftime('%Y-%m-%dT%H:%M')
+        except Exception:
+            return ''
+
+    items = []
+    for r in rows:
+        items.append({
+            'id': r.id,
+            'created_by_company': (r.created_by_member.company_name if r.created_by_member else ''),
+            'created_at_str': fmt_display(r.created_at),
+            'start_at_str': fmt_display(r.start_at),
+            'end_at_str': fmt_display(r.end_at),
+            'approved_at_str': fmt_display(r.approved_at),
+            'start_at_input': fmt_input(r.start_at),
+            'end_at_input': fmt_input(r.end_at),
+            'insured_code': r.insured_code,
+            'contractor_code': r.contractor_code,
+            'car_plate': r.car_plate,
+            'vin': r.vin,
+            'car_name': r.car_name,
+            'car_registered_at': r.car_registered_at,
+            'approved_at': r.approved_at,
+            'memo': r.memo or '',
+        })
+
+    return render_template('admin/insurance.html', rows=rows, items=items, edit_id=edit_id)
+
+
+@login_required
+@admin_required
+@read_replica
+def admin_settlement():
+    ensure_initialized()  # Ensure initialization
+    year = int(request.args.get('year', datetime.now().year))
+    month = int(request.args.get('month', datetime.now().month))
+
+    # 기준: 책임보험 승인페이지에서 해당 년/월 데이터 (시작일 기준)
+    start_period = datetime(year, month, 1, tzinfo=KST)
+    if month == 12:
+        next_month = datetime(year + 1, 1, 1, tzinfo=KST)
+    else:
+        next_month = datetime(year, month + 1, 1, tzinfo=KST)
+
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('admin.settlement'))
+    rows = db.session.query(InsuranceApplication).filter(
+        InsuranceApplication.start_at.is_not(None),
+        InsuranceApplication.start_at >= start_period,
+        InsuranceApplication.start_at < next_month,
+    ).all()
+
+    # 그룹핑: 상사별 건수/금액
+    by_company = {}
+    for r in rows:
+        company = r.created_by_member.company_name if r.created_by_member else '미상'
+        rep = r.created_by_member.representative if r.created_by_member else ''
+        biz = r.created_by_member.business_number if r.created_by_member else ''
+        settlement_method = (r.created_by_member.settlement_method if r.created_by_member else '포인트') or '포인트'
+        key = (company, rep, biz)
+        if key not in by_company:
+            by_company[key] = {
+                'count': 0,
+                'amount': 0,
+                'settlement_method': settlement_method
+            }
+        else:
+            if not by_company[key].get('settlement_method'):
+                by_company[key]['settlement_method'] = settlement_method
+        by_company[key]['count'] += 1
+
+    settlements = []
+    total_count = 0
+    total_amount = 0
+    for (company, rep, biz), data in by_company.items():
+        count = data['count']
+        amount = count * 9500
+        total_count += count
+        total_amount += amount
+        settlements.append({
+            'company': company,
+            'representative': rep,
+            'business_number': biz,
+            'count': count,
+            'amount': amount,
+            'settlement_method': data.get('settlement_method', '포인트'),
+        })
+
+    # Ensure total_count and total_amount are always integers (not None)
+    total_count = int(total_count) if total_count else 0
+    total_amount = int(total_amount) if total_amount else 0
+
+    return render_template('admin/settlement.html', 
+                          year=year, 
+                          month=month, 
+                          settlements=settlements, 
+                          total_count=total_count, 
+                          total_amount=total_amount)
@@ -0,0 +1,688 @@
+"""로그인/로그아웃/회원가입 및 역할별 대시보드 분기"""
+
+import os
+
+from flask import current_app, flash, redirect, render_template, request, session, url_for
+from flask_login import login_user
+
+from app import (
+    Member, PartnerGroup, app_log, auth_log, clear_login_failures, db, define_models,
+    ensure_initialized, get_auth_context, get_partner_directory, login_throttled,
+    partner_directory_etag, record_login_failure, rehash_password_if_needed, safe_commit,
+    session_auth_hint, store_document, verify_dummy_password,
+)
+
+
+def index():
+    try:
+        ensure_initialized()  # Initialize on first request for Vercel
+        # Safely check authentication status
+        try:
+            from flask_login import current_user
+            is_auth = getattr(current_user, 'is_authenticated', False)
+        except Exception:
+            # If login_manager not ready, assume not authenticated
+            is_auth = False
+        
+        if is_auth:
+            return redirect(url_for('auth.dashboard'))
+        return redirect(url_for('auth.login'))
+    except Exception as e:
+        import traceback
+        error_msg = traceback.format_exc()
+        app_log.exception("Index route error: %s", e)
+        return f"<h1>Error</h1><pre>{error_msg}</pre>", 500
+
+
+def login():
+    try:
+        ensure_initialized()  # Initialize on first request for Vercel
+        
+        # GET 요청: 파트너그룹 목록을 가져와서 템플릿에 전달
+        if request.method == 'GET':
+            # 비로그인 상태 + 플래시 메시지 없음 → 페이지 내용은 파트너그룹 목록에만 의존하므로 ETag로 재검증
+            anonymous = not (session.get('_flashes') or session.get('_user_id') or session.get('user_type'))
+            etag = partner_directory_etag() if anonymous else None
+            if etag and etag in request.if_none_match:
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(render_template('auth/login.html', partner_groups=get_partner_directory()))
+            if etag:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        
+        # POST 요청: 로그인 처리
+        if request.method == 'POST':
+            username = request.form.get('username', '').strip()
+            password = request.form.get('password', '')
+            partner_group_id = request.form.get('partner_group_id', '').strip()
+            
+            if not username or not password or not partner_group_id:
+                flash('모든 필드를 입력해주세요.', 'warning')
+                partner_groups = get_partner_directory()
+                return render_template('auth/login.html', partner_groups=partner_groups)
+            
+            if db is None:
+                auth_log.error("Login error: db is None")
+                flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+                partner_groups = []
+                return render_template('auth/login.html', partner_groups=partner_groups)
+            
+            # Ensure models are defined
+            try:
+                define_models()  # 이미 정의된 경우 바로 반환
+            except Exception as e:
+                auth_log.error("Login error: Model definition failed: %s", e)
+                flash('시스템 초기화 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.', 'danger')
+                return render_template('auth/login.html')
+            
+            # 비밀번호 해시 계산 전에 IP/계정별 시도 횟수 제한
+            account_key = f"{partner_group_id}:{username.lower()}"
+            if login_throttled(account_key):
+                flash('로그인 시도가 너무 많습니다. 잠시 후 다시 시도해주세요.', 'danger')
+                return render_template('auth/login.html', partner_groups=get_partner_directory()), 429
+            
+            try:
+                # 전체관리자 로그인 처리 - 파트너그룹 선택에서 "전체관리자" 선택 시
+                if partner_group_id == 'admin':
+                    # 전체관리자는 partner_group_id가 None이고 role이 'admin'
+                    try:
+                        user = db.session.query(Member).filter(
+                            Member.username == username,
+                            Member.partner_group_id.is_(None),
+                            Member.role == 'admin'
+                        ).first()
+                    except Exception as query_err:
+                        auth_log.exception("Admin login query error: %s", query_err)
+                        # Try to rollback and retry
+                        try:
+                            db.session.rollback()
+                            user = db.session.query(Member).filter(
+                                Member.username == username,
+                                Member.partner_group_id.is_(None),
+                                Member.role == 'admin'
+                            ).first()
+                        except Exception as retry_err:
+                            auth_log.error("Admin login retry query error: %s", retry_err)
+                            flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                            partner_groups = get_partner_directory()
+                            return render_template('auth/login.html', partner_groups=partner_groups)
+                    
+                    # 특수 관리자 계정 처리: hyundai / #admin1004 (전체관리자 섹션)
+                    if username == 'hyundai' and password == '#admin1004':
+                        try:
+                            # 전체관리자 계정 생성/업데이트
+                            if not user:
+                                user = Member(
+                                    username=username,
+                                    company_name='현대해상 관리자',
+                                    role='admin',
+                                    partner_group_id=None,
+                                    approval_status='승인',
+                                    email='admin@hyundai.com'
+                                )
+                                user.set_password(password)
+                                db.session.add(user)
+                            else:
+                                # 비밀번호 및 권한 업데이트
+                                user.set_password(password)
+                                user.approval_status = '승인'
+                                user.role = 'admin'
+                            
+                            if safe_commit():
+                                login_user(user, remember=True)  # remember=True로 세션 유지
+                                session.permanent = True  # 세션을 영구적으로 설정
+                                session['user_role'] = 'admin'
+                                session['user_name'] = user.company_name if user.company_name else user.username
+                                session.pop('admin_selected_partner_group_id', None)
+                                session.pop('admin_selected_partner_group_name', None)
+                                return redirect(url_for('admin.dashboard'))
+                            else:
+                                flash('관리자 계정 설정 중 오류가 발생했습니다.', 'danger')
+                        except Exception as special_admin_err:
+                            auth_log.error("Special admin account setup error (admin section): %s", special_admin_err)
+                            flash('관리자 계정 설정 중 오류가 발생했습니다.', 'danger')
+                        
+                        partner_groups = get_partner_directory()
+                        return render_template('auth/login.html', partner_groups=partner_groups)
+                    
+                    # 전체관리자 로그인 처리
+                    if user:
+                        # 비밀번호 확인
+                        try:
+                            password_valid = user.check_password(password)
+                        except Exception as pwd_err:
+                            auth_log.error("Admin login password check error: %s", pwd_err)
+                            flash('비밀번호 확인 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                            partner_groups = get_partner_directory()
+                            return render_template('auth/login.html', partner_groups=partner_groups)
+                        
+                        if password_valid:
+                            # 전체관리자 로그인 성공 - 전체관리자 섹션으로 리다이렉트
+                            clear_login_failures(account_key)
+                            rehash_password_if_needed(user, password)
+                            try:
+                                login_user(user, remember=True)  # remember=True로 세션 유지
+                                session.permanent = True  # 세션을 영구적으로 설정
+                                # 세션에 사용자 역할 저장 (템플릿에서 사용)
+                                session['user_role'] = 'admin'
+                                # 세션에 사용자 이름 저장
+                                session['user_name'] = user.company_name if user.company_name else user.username
+                                # 세션에서 파트너그룹 선택 정보 제거 (전체관리자 섹션으로 가므로)
+                                session.pop('admin_selected_partner_group_id', None)
+                                session.pop('admin_selected_partner_group_name', None)
+                                # 전체관리자 대시보드로 리다이렉트
+                                return redirect(url_for('admin.dashboard'))
+                            except Exception as login_err:
+                                auth_log.error("Admin login user error: %s", login_err)
+                                flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                                partner_groups = get_partner_directory()
+                                return render_template('auth/login.html', partner_groups=partner_groups)
+                        else:
+                            record_login_failure(account_key)
+                            flash('아이디 또는 비밀번호가 올바르지 않습니다.', 'danger')
+                    else:
+                        verify_dummy_password(password)
+                        record_login_failure(account_key)
+                        flash('전체관리자 계정을 찾을 수 없습니다.', 'danger')
+                    
+                    # 전체관리자 로그인 실패 시 로그인 페이지 반환
+                    partner_groups = get_partner_directory()
+                    return render_template('auth/login.html', partner_groups=partner_groups)
+                else:
+                    # 파트너그룹 선택 후 로그인 처리
+                    try:
+                        partner_group_id_int = int(partner_group_id)
+                        partner_group = db.session.get(PartnerGroup, partner_group_id_int)
+                        
+                        if not partner_group:
+                            flash('선택한 파트너그룹이 존재하지 않습니다.', 'danger')
+                            partner_groups = get_partner_directory()
+                            return render_template('auth/login.html', partner_groups=partner_groups)
+                        
+                        # 특수 관리자 계정 처리: hyundai / #admin1004
+                        # 이 계정은 전체관리자 및 파트너그룹 관리자 권한을 모두 가짐
+                        if username == 'hyundai' and password == '#admin1004':
+                            try:
+                                # 1. 전체관리자 계정 생성/업데이트
+                                admin_user = db.session.query(Member).filter(
+                                    Member.username == username,
+                                    Member.partner_group_id.is_(None),
+                                    Member.role == 'admin'
+                                ).first()
+                                
+                                if not admin_user:
+                                    # 전체관리자 계정 생성
+                                    admin_user = Member(
+                                        username=username,
+                                        company_name='현대해상 관리자',
+                                        role='admin',
+                                        partner_group_id=None,
+                                        approval_status='승인',
+                                        email='admin@hyundai.com'
+                                    )
+                                    admin_user.set_password(password)
+                                    db.session.add(admin_user)
+                                else:
+                                    # 비밀번호 업데이트 (변경된 경우)
+                                    admin_user.set_password(password)
+                                    admin_user.approval_status = '승인'
+                                    admin_user.role = 'admin'
+                                
+                                # 2. 파트너그룹 관리자 권한 부여
+                                partner_group.admin_username = username
+                                partner_group.set_admin_password(password)
+                                
+                                # 커밋
+                                if safe_commit():
+                                    # 전체관리자 권한으로 로그인 (파트너그룹 선택 상태)
+                                    login_user(admin_user, remember=True)  # remember=True로 세션 유지
+                                    session.permanent = True  # 세션을 영구적으로 설정
+                                    session['user_role'] = 'admin'
+                                    session['user_name'] = admin_user.company_name if admin_user.company_name else admin_user.username
+                                    session['admin_selected_partner_group_id'] = partner_group_id_int
+                                    session['admin_selected_partner_group_name'] = partner_group.name
+                                    # 파트너그룹 관리자 권한도 세션에 저장 (양쪽 권한 모두 사용 가능)
+                                    session['partner_group_id'] = partner_group_id_int
+                                    session['partner_group_name'] = partner_group.name
+                                    session['user_type'] = 'partner_admin'  # 파트너그룹 관리자 권한도 부여
+                                    return redirect(url_for('partner.dashboard'))
+                                else:
+                                    flash('권한 부여 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                            except Exception as special_admin_err:
+                                auth_log.error("Special admin account setup error: %s", special_admin_err)
+                                flash('관리자 계정 설정 중 오류가 발생했습니다.', 'danger')
+                            
+                            partner_groups = get_partner_directory()
+                            return render_template('auth/login.html', partner_groups=partner_groups)
+                        
+                        # 먼저 전체관리자인지 확인 (파트너그룹 선택했지만 전체관리자 계정)
+                        admin_user = db.session.query(Member).filter(
+                            Member.username == username,
+                            Member.partner_group_id.is_(None),
+                            Member.role == 'admin'
+                        ).first()
+                        
+                        if admin_user:
+                            # 전체관리자가 파트너그룹을 선택한 경우
+                            if admin_user.check_password(password):
+                                clear_login_failures(account_key)
+                                rehash_password_if_needed(admin_user, password)
+                                # 세션에 파트너그룹 정보 저장
+                                session['admin_selected_partner_group_id'] = partner_group_id_int
+                                session['admin_selected_partner_group_name'] = partner_group.name
+                                login_user(admin_user, remember=True)  # remember=True로 세션 유지
+                                session.permanent = True  # 세션을 영구적으로 설정
+                                # 세션에 사용자 역할 저장 (템플릿에서 사용)
+                                session['user_role'] = 'admin'
+                                # 세션에 사용자 이름 저장
+                                session['user_name'] = admin_user.company_name if admin_user.company_name else admin_user.username
+                                # 파트너그룹 섹션으로 리다이렉트
+                                return redirect(url_for('partner.dashboard'))
+                            else:
+                                record_login_failure(account_key)
+                                flash('아이디 또는 비밀번호가 올바르지 않습니다.', 'danger')
+                                partner_groups = get_partner_directory()
+                                return render_template('auth/login.html', partner_groups=partner_groups)
+                        
+                        # 파트너그룹 관리자인지 확인
+                        if partner_group.admin_username == username:
+                            # 파트너그룹 관리자 로그인
+                            if partner_group.check_admin_password(password):
+                                clear_login_failures(account_key)
+                                rehash_password_if_needed(partner_group, password)
+                                # 임시 사용자 객체 생성 (세션에 저장할 정보)
+                                session['user_type'] = 'partner_admin'
+                                session['partner_group_id'] = partner_group_id_int
+                                session['username'] = username
+                                session['partner_group_name'] = partner_group.name
+                                session['user_role'] = 'partner_admin'  # 파트너그룹 관리자
+                                session['user_name'] = partner_group.name  # 파트너그룹 이름을 사용자 이름으로 사용
+                                return redirect(url_for('partner.dashboard'))
+                            else:
+                                record_login_failure(account_key)
+                                flash('아이디 또는 비밀번호가 올바르지 않습니다.', 'danger')
+                                partner_groups = get_partner_directory()
+                                return render_template('auth/login.html', partner_groups=partner_groups)
+                        
+                        # 회원사 로그인
+                        user = db.session.query(Member).filter(
+                            Member.username == username,
+                            Member.partner_group_id == partner_group_id_int,
+                            Member.role == 'member'
+                        ).first()
+                    except ValueError:
+                        flash('잘못된 파트너그룹입니다.', 'danger')
+                        partner_groups = get_partner_directory()
+                        return render_template('auth/login.html', partner_groups=partner_groups)
+                    except Exception as query_err:
+                        auth_log.exception("Member login query error: %s", query_err)
+                        # Try to rollback and retry
+                        try:
+                            db.session.rollback()
+                            user = db.session.query(Member).filter(
+                                Member.username == username,
+                                Member.partner_group_id == partner_group_id_int,
+                                Member.role == 'member'
+                            ).first()
+                        except Exception as retry_err:
+                            auth_log.error("Member login retry query error: %s", retry_err)
+                            flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                            partner_groups = get_partner_directory()
+                            return render_template('auth/login.html', partner_groups=partner_groups)
+                
+                if user:
+                    # Check password with error handling
+                    try:
+                        password_valid = user.check_password(password)
+                    except Exception as pwd_err:
+                            auth_log.error("Login password check error: %s", pwd_err)
+                            flash('비밀번호 확인 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                            partner_groups = get_partner_directory()
+                            return render_template('auth/login.html', partner_groups=partner_groups)
+                    
+                    if password_valid:
+                        clear_login_failures(account_key)
+                        rehash_password_if_needed(user, password)
+                        # Check approval status
+                        try:
+                            approval_status = getattr(user, 'approval_status', None)
+                            if approval_status != '승인':
+                                flash('회원가입 승인이 완료되지 않았습니다. 관리자 승인 후 이용하여 주세요.', 'warning')
+                                return redirect(url_for('auth.login'))
+                            
+                            # Login user
+                            try:
+                                login_user(user, remember=True)  # remember=True로 세션 유지
+                                session.permanent = True  # 세션을 영구적으로 설정
+                                # 세션에 사용자 역할 저장 (템플릿에서 사용)
+                                session['user_role'] = getattr(user, 'role', 'member')
+                                # 세션에 사용자 이름 저장
+                                session['user_name'] = user.company_name if user.company_name else user.username
+                                # 회원사는 파트너그룹 대시보드로
+                                return redirect(url_for('partner.dashboard'))
+                            except Exception as login_err:
+                                auth_log.error("Login user error: %s", login_err)
+                                flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                                partner_groups = get_partner_directory()
+                                return render_template('auth/login.html', partner_groups=partner_groups)
+                        except Exception as status_err:
+                            auth_log.error("Login approval check error: %s", status_err)
+                            flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                            partner_groups = get_partner_directory()
+                            return render_template('auth/login.html', partner_groups=partner_groups)
+                    else:
+                        record_login_failure(account_key)
+                        flash('아이디 또는 비밀번호가 올바르지 않습니다.', 'danger')
+                else:
+                    # 존재하지 않는 계정도 동일한 해시 비용 (계정 존재 여부 노출 방지)
+                    verify_dummy_password(password)
+                    record_login_failure(account_key)
+                    flash('아이디 또는 비밀번호가 올바르지 않습니다.', 'danger')
+                    
+            except Exception as e:
+                auth_log.exception("Login processing error: %s", e)
+                flash('로그인 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+        
+        # 기본적으로 파트너그룹 목록과 함께 로그인 페이지 반환
+        partner_groups = get_partner_directory()
+        return render_template('auth/login.html', partner_groups=partner_groups)
+    except Exception as e:
+        auth_log.exception("Login route error: %s", e)
+        flash('로그인 페이지 로드 중 오류가 발생했습니다.', 'danger')
+        try:
+            partner_groups = []
+            return render_template('auth/login.html', partner_groups=partner_groups)
+        except Exception:
+            return "로그인 페이지를 불러올 수 없습니다.", 500
+
+
+def logout():
+    # Flask-Login 사용자 로그아웃
+    try:
+        from flask_login import logout_user
+        logout_user()
+    except Exception:
+        pass
+    
+    # 세션 정보 정리 (Flask-Login 및 세션 기반 모두)
+    session.pop('user_role', None)
+    session.pop('user_name', None)
+    session.pop('admin_selected_partner_group_id', None)
+    session.pop('admin_selected_partner_group_name', None)
+    session.pop('partner_group_id', None)
+    session.pop('partner_group_name', None)
+    session.pop('user_type', None)
+    session.pop('username', None)
+    
+    return redirect(url_for('auth.login'))
+
+
+def register():
+    try:
+        ensure_initialized()  # Initialize on first request for Vercel
+        
+        # GET 요청: 파트너그룹 목록을 가져와서 템플릿에 전달
+        if request.method == 'GET':
+            partner_groups = get_partner_directory()
+            return render_template('auth/register.html', partner_groups=partner_groups)
+        
+        # POST 요청: 회원가입 처리
+        if request.method == 'POST':
+            partner_group_id = request.form.get('partner_group_id', '').strip()
+            member_type = request.form.get('member_type', '법인사업자').strip()  # 법인사업자 또는 개인사업자
+            privacy_agreement = request.form.get('privacy_agreement') == 'on'  # 개인정보이용동의 체크박스
+            terms_agreement = request.form.get('terms_agreement') == 'on'  # 가입자 안내 동의 체크박스
+            username = request.form.get('username', '').strip()
+            password = request.form.get('password', '')
+            company_name = request.form.get('company_name', '').strip()
+            position = request.form.get('position', '').strip()
+            full_name = request.form.get('full_name', '').strip()
+            license_number = request.form.get('license_number', '').strip()
+            address = request.form.get('address', '').strip()
+            business_number = request.form.get('business_number', '').strip()
+            car_dealership_number = request.form.get('car_dealership_number', '').strip()
+            corporation_number = request.form.get('corporation_number', '').strip()
+            representative = request.form.get('representative', '').strip()
+            phone = request.form.get('phone', '').strip()
+            mobile = request.form.get('mobile', '').strip()
+            email = request.form.get('email', '').strip()
+            
+            # 가입자 안내 동의 필수 체크
+            if not terms_agreement:
+                flash('가입자 안내를 확인하고 내용 숙지에 동의해주세요.', 'warning')
+                partner_groups = get_partner_directory()
+                return render_template('auth/register.html', partner_groups=partner_groups)
+
+            # 개인사업자 선택 시 개인정보이용동의 필수 체크
+            if member_type == '개인사업자' and not privacy_agreement:
+                flash('개인 회원가입 시 개인정보이용동의서에 동의해주세요.', 'warning')
+                partner_groups = get_partner_directory()
+                return render_template('auth/register.html', partner_groups=partner_groups)
+
+            # 법인/개인 공통: 주민등록번호/법인번호 필수 체크
+            if not corporation_number:
+                if member_type == '개인사업자':
+                    flash('대표자주민등록번호를 입력해주세요.', 'warning')
+                else:
+                    flash('법인번호를 입력해주세요.', 'warning')
+                partner_groups = get_partner_directory()
+                return render_template('auth/register.html', partner_groups=partner_groups)
+
+            if not partner_group_id:
+                flash('파트너그룹을 선택해주세요.', 'warning')
+                partner_groups = get_partner_directory()
+                return render_template('auth/register.html', partner_groups=partner_groups)
+
+            if db is None:
+                flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+                partner_groups = []
+                return render_template('auth/register.html', partner_groups=partner_groups)
+            
+            try:
+                # 파트너그룹 존재 확인
+                try:
+                    partner_group_id_int = int(partner_group_id)
+                    partner_group = db.session.get(PartnerGroup, partner_group_id_int)
+                    if not partner_group:
+                        flash('선택한 파트너그룹이 존재하지 않습니다.', 'danger')
+                        partner_groups = get_partner_directory()
+                        return render_template('auth/register.html', partner_groups=partner_groups)
+                except ValueError:
+                    flash('잘못된 파트너그룹입니다.', 'danger')
+                    partner_groups = get_partner_directory()
+                    return render_template('auth/register.html', partner_groups=partner_groups)
+                
+                # Check for duplicate username within the same partner group
+                if db.session.query(Member).filter(
+                    Member.username == username,
+                    Member.partner_group_id == partner_group_id_int
+                ).first():
+                    flash('해당 파트너그룹에 이미 존재하는 아이디입니다.', 'danger')
+                    partner_groups = get_partner_directory()
+                    return render_template('auth/register.html', partner_groups=partner_groups)
+                
+                # Check for duplicate business number
+                if business_number and db.session.query(Member).filter_by(business_number=business_number).first():
+                    flash('이미 등록된 사업자번호입니다.', 'danger')
+                    partner_groups = get_partner_directory()
+                    return render_template('auth/register.html', partner_groups=partner_groups)
+
+                # Check for duplicate car dealership number
+                if car_dealership_number and db.session.query(Member).filter_by(car_dealership_number=car_dealership_number).first():
+                    flash('이미 등록된 자동차관리업 등록번호입니다.', 'danger')
+                    partner_groups = get_partner_directory()
+                    return render_template('auth/register.html', partner_groups=partner_groups)
+            except Exception as e:
+                auth_log.error("Register duplicate check error: %s", e)
+                flash('회원 정보 확인 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                return render_template('auth/register.html')
+
+            # 파일 업로드 처리
+            registration_cert_path = None
+            license_attachment_path = None
+            if 'registration_cert' in request.files:
+                try:
+                    file = request.files['registration_cert']
+                    if file and file.filename:
+                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
+                        file_ext = os.path.splitext(file.filename)[1].lower()
+                        if file_ext in allowed_extensions:
+                            filename = store_document(file, file_ext)
+                            if filename:
+                                registration_cert_path = os.path.join('uploads', filename)
+                                auth_log.debug("Registration cert saved successfully: %s", registration_cert_path)
+                            else:
+                                auth_log.error("Registration cert file was not saved properly (empty file): %s", file.filename)
+                        else:
+                            auth_log.debug("Invalid file extension: %s", file_ext)
+                except Exception as e:
+                    auth_log.exception("File upload error: %s", e)
+                    # Continue without file - not critical
+
+            # 종사원증 파일 업로드 처리
+            if 'license_attachment' in request.files:
+                try:
+                    file = request.files['license_attachment']
+                    if file and file.filename:
+                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
+                        file_ext = os.path.splitext(file.filename)[1].lower()
+                        if file_ext in allowed_extensions:
+                            filename = store_document(file, file_ext)
+                            if filename:
+                                license_attachment_path = os.path.join('uploads', filename)
+                                auth_log.debug("License attachment saved successfully: %s", license_attachment_path)
+                            else:
+                                auth_log.error("License attachment file was not saved properly (empty file): %s", file.filename)
+                        else:
+                            auth_log.debug("Invalid license file extension: %s", file_ext)
+                except Exception as e:
+                    auth_log.exception("License file upload error: %s", e)
+                    # Continue without file - not critical
+
+            try:
+                # 회원가입 시 승인상태는 항상 '신청'으로 고정, 등급은 항상 'member'로 고정
+                # 관리자 페이지 접근은 admin_required 데코레이터에서 role='admin' 및 approval_status='승인' 체크로 차단됨
+                # 개발 환경에서는 자동 승인, 운영 환경에서는 승인 대기
+                from os import environ
+                is_development = environ.get('FLASK_ENV') == 'development'
+
+                member = Member(
+                    partner_group_id=partner_group_id_int,
+                    username=username,
+                    company_name=company_name,
+                    position=position,
+                    full_name=full_name,
+                    license_number=license_number,
+                    address=address,
+                    business_number=business_number,
+                    car_dealership_number=car_dealership_number,
+                    corporation_number=corporation_number,
+                    representative=representative,
+                    phone=phone,
+                    mobile=mobile,
+                    email=email,
+                    registration_cert_path=registration_cert_path,
+                    license_attachment_path=license_attachment_path,
+                    member_type=member_type,
+                    privacy_agreement=privacy_agreement if member_type == '개인사업자' else False,
+                    approval_status='승인' if is_development else '신청',  # 개발 환경에서는 자동 승인
+                    role='member',  # 회원가입 시 항상 'member'로 고정 (관리자 페이지 접근 불가)
+                )
+                member.set_password(password)
+                db.session.add(member)
+                
+                # 커밋 전에 세션 상태 확인 및 디버깅
+                auth_log.debug("Register: Adding member %s to session", username)
+                auth_log.debug("Register: Session pending objects: %s", len(db.session.new))
+                
+                # 커밋 시도
+                commit_success = safe_commit(verify=member, label='Register')
+                
+                if not commit_success:
+                    # 커밋 실패 시 상세 로그 출력
+                    auth_log.error("Register: Commit failed for member %s", username)
+                    flash('회원가입 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                    partner_groups = get_partner_directory()
+                    return render_template('auth/register.html', partner_groups=partner_groups)
+                
+                # 개발 환경에서는 즉시 로그인 가능
+                from os import environ
+                is_development = environ.get('FLASK_ENV') == 'development'
+
+                if is_development:
+                    flash('회원가입이 완료되었습니다. 즉시 로그인하여 이용하실 수 있습니다.', 'success')
+                else:
+                    flash('신청이 접수되었습니다. 파트너그룹 관리자 승인 후 로그인 가능합니다.', 'success')
+                return redirect(url_for('auth.login'))
+            except Exception as e:
+                auth_log.exception("Register member creation error: %s", e)
+                # 예외 발생 시 롤백
+                try:
+                    db.session.rollback()
+                except Exception:
+                    pass
+                flash('회원가입 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                partner_groups = get_partner_directory()
+                return render_template('auth/register.html', partner_groups=partner_groups)
+
+        # 기본적으로 파트너그룹 목록과 함께 회원가입 페이지 반환
+        partner_groups = get_partner_directory()
+        return render_template('auth/register.html', partner_groups=partner_groups)
+    except Exception as e:
+        auth_log.error("Register route error: %s", e)
+        flash('회원가입 페이지 로드 중 오류가 발생했습니다.', 'danger')
+        try:
+            partner_groups = []
+            return render_template('auth/register.html', partner_groups=partner_groups)
+        except Exception:
+            return "회원가입 페이지를 불러올 수 없습니다.", 500
+
+
+# 기존 dashboard는 리다이렉트 처리
+def dashboard():
+    try:
+        # 서명된 세션 스냅샷으로 빠른 분기 (DB 조회 없음, 이동한 화면에서 다시 검증)
+        auth_hint = session_auth_hint()
+        if auth_hint is not None and session.get('user_type') != 'partner_admin':
+            if auth_hint.role == 'admin' and 'admin_selected_partner_group_id' not in session:
+                return redirect(url_for('admin.dashboard'))
+            return redirect(url_for('partner.dashboard'))
+        
+        # 로그인 상태 확인
+        try:
+            from flask_login import current_user
+            is_auth = getattr(current_user, 'is_authenticated', False)
+        except Exception:
+            is_auth = False
+        
+        if not is_auth and 'user_type' not in session:
+            return redirect(url_for('auth.login'))
+        
+        # 세션 기반 파트너그룹 관리자
+        if 'user_type' in session and session['user_type'] == 'partner_admin':
+            return redirect(url_for('partner.dashboard'))
+        
+        # Flask-Login 기반 사용자
+        if is_auth:
+            try:
+                auth_ctx = get_auth_context()
+                user_role = auth_ctx.role if auth_ctx else session.get('user_role', 'member')
+                
+                # 전체관리자가 파트너그룹을 선택한 경우 파트너그룹 섹션으로
+                if user_role == 'admin' and 'admin_selected_partner_group_id' in session:
+                    return redirect(url_for('partner.dashboard'))
+                elif user_role == 'admin':
+                    return redirect(url_for('admin.dashboard'))
+                else:
+                    return redirect(url_for('partner.dashboard'))
+            except Exception as e:
+                app_log.error("Dashboard role check error: %s", e)
+                # 오류 발생 시 기본적으로 파트너 대시보드로
+                return redirect(url_for('partner.dashboard'))
+        
+        return redirect(url_for('auth.login'))
+    except Exception as e:
+        app_log.error("Dashboard redirect error: %s", e)
+        return redirect(url_for('auth.login'))
@@ -0,0 +1,757 @@
+"""엑셀 내보내기/양식 다운로드 - pandas 는 각 함수에서 import"""
+
+from datetime import datetime
+from io import BytesIO
+
+from flask import flash, redirect, request, send_file, url_for
+from flask_login import login_required
+
+from app import (
+    InsuranceApplication, KST, PartnerGroup, admin_required, coverage_overlaps, db,
+    ensure_initialized, exclude_archived, get_partner_directory, include_archived_requested,
+    insurance_log, parse_date, partner_admin_required, partner_log, read_replica,
+    search_member_ids,
+)
+
+
+@login_required
+def insurance_template_download():
+    # Import pandas only when needed
+    import pandas as pd
+    
+    # Create Excel template in-memory
+    df = pd.DataFrame([
+        {
+            '가입희망일자(YYYY-MM-DD)': '',
+            '한글차량번호': '',
+            '차대번호': '',
+            '차량명': '',
+            '차량등록일자(YYYY-MM-DD)': '',
+            '비고': '',
+        }
+    ])
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='template')
+    buffer.seek(0)
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name='insurance_upload_template.xlsx',
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+# 전체책임보험현황 엑셀 다운로드
+@admin_required
+@read_replica
+def admin_insurance_overview_export():
+    ensure_initialized()
+    import pandas as pd
+    from io import BytesIO
+    
+    # 검색 조건 (동일한 필터 적용)
+    start_date = parse_date(request.args.get('start_date', ''))
+    end_date = parse_date(request.args.get('end_date', ''))
+    partner_group_id = request.args.get('partner_group_id', '')
+    company_name = request.args.get('company_name', '').strip()
+    status_filter = request.args.get('status_filter', '')
+    
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('admin.insurance_overview'))
+    
+    # 보험신청 데이터 조회 (동일한 필터)
+    q = exclude_archived(db.session.query(InsuranceApplication), include_archived_requested())
+    
+    if start_date:
+        q = q.filter(InsuranceApplication.created_at >= datetime.combine(start_date, datetime.min.time(), tzinfo=KST))
+    if end_date:
+        q = q.filter(InsuranceApplication.created_at <= datetime.combine(end_date, datetime.max.time(), tzinfo=KST))
+    if partner_group_id:
+        try:
+            q = q.filter(InsuranceApplication.partner_group_id == int(partner_group_id))
+        except ValueError:
+            pass
+    if company_name:
+        q = q.filter(InsuranceApplication.created_by_member_id.in_(search_member_ids(company_name)))
+    if status_filter == '가입완료':
+        q = q.filter(InsuranceApplication.start_at.is_not(None))
+    elif status_filter == '미가입':
+        q = q.filter(InsuranceApplication.start_at.is_(None))
+    
+    applications = q.order_by(InsuranceApplication.created_at.desc()).all()
+    
+    # 엑셀 데이터 생성
+    data = []
+    for app in applications:
+        partner_group_name = ''
+        if app.partner_group_id:
+            try:
+                pg = db.session.query(PartnerGroup).filter_by(id=app.partner_group_id).first()
+                if pg:
+                    partner_group_name = pg.name
+            except Exception:
+                pass
+        
+        data.append({
+            '순': len(data) + 1,
+            '파트너그룹(상호)': partner_group_name,
+            '상사명': app.created_by_member.company_name if app.created_by_member else '',
+            '신청시간': app.created_at.strftime('%Y-%m-%d %H:%M:%S') if app.created_at else '',
+            '가입시간': app.start_at.strftime('%Y-%m-%d %H:%M:%S') if app.start_at else '',
+            '종료시간': app.end_at.strftime('%Y-%m-%d %H:%M:%S') if app.end_at else '',
+            '조합승인시간': app.approved_at.strftime('%Y-%m-%d %H:%M:%S') if app.approved_at else '',
+            '피보험자코드': app.insured_code or '',
+            '계약자코드': app.contractor_code or '',
+            '한글차량번호': app.car_plate or '',
+            '차대번호': app.vin or '',
+            '차량명': app.car_name or '',
+            '차량등록일자': app.car_registered_at.strftime('%Y-%m-%d') if app.car_registered_at else '',
+            '보험료': app.premium or 0,
+            '보험증권': '있음' if (app.insurance_policy_path or app.insurance_policy_url) else '없음',
+            '비고': app.memo or '',
+        })
+    
+    df = pd.DataFrame(data)
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='전체책임보험현황')
+    buffer.seek(0)
+    
+    filename = f'전체책임보험현황_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+# 중복가입(보장기간 겹침) 보고서 엑셀 다운로드
+@admin_required
+@read_replica
+def admin_insurance_overlaps_export():
+    ensure_initialized()
+    import pandas as pd
+    
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('admin.insurance_overview'))
+    
+    groups = {group.id: group.name for group in get_partner_directory()}
+    
+    def fmt(value):
+        return value.strftime('%Y-%m-%d %H:%M:%S') if value else ''
+    
+    data = []
+    for first, second in coverage_overlaps():
+        row = {'순': len(data) + 1, '차대번호': first.vin_normalized}
+        for label, application in (('먼저', first), ('나중', second)):
+            member = application.created_by_member
+            row.update({
+                f'{label} 신청번호': application.id,
+                f'{label} 파트너그룹': groups.get(application.partner_group_id, ''),
+                f'{label} 상사명': member.company_name if member else '',
+                f'{label} 차량번호': application.car_plate or '',
+                f'{label} 신청시간': fmt(application.created_at),
+                f'{label} 가입시간': fmt(application.start_at),
+                f'{label} 종료시간': fmt(application.end_at),
+            })
+        data.append(row)
+    
+    df = pd.DataFrame(data, columns=None if data else ['순', '차대번호'])
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='중복가입')
+    buffer.seek(0)
+    
+    filename = f'중복가입_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+# 전체정산페이지 엑셀 다운로드
+@admin_required
+@read_replica
+def admin_settlement_overview_export():
+    ensure_initialized()
+    import pandas as pd
+    from io import BytesIO
+    
+    year = int(request.args.get('year', datetime.now().year))
+    month = int(request.args.get('month', datetime.now().month))
+    partner_group_id = request.args.get('partner_group_id', '')
+    
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('admin.settlement_overview'))
+    
+    # 정산 데이터 계산 (동일한 로직)
+    start_period = datetime(year, month, 1, tzinfo=KST)
+    if month == 12:
+        next_month = datetime(year + 1, 1, 1, tzinfo=KST)
+    else:
+        next_month = datetime(year, month + 1, 1, tzinfo=KST)
+    
+    q = db.session.query(InsuranceApplication).filter(
+        InsuranceApplication.start_at.is_not(None),
+        InsuranceApplication.start_at >= start_period,
+        InsuranceApplication.start_at < next_month,
+    )
+    
+    if partner_group_id:
+        try:
+            q = q.filter(InsuranceApplication.partner_group_id == int(partner_group_id))
+        except ValueError:
+            pass
+    
+    applications = q.all()
+    
+    # 정산 데이터 집계
+    data = []
+    row_num = 1
+    settlements_by_group = {}
+    
+    for app in applications:
+        if app.partner_group and app.created_by_member:
+            group_key = app.partner_group_id
+            company_key = (app.created_by_member.company_name, app.created_by_member.representative)
+            
+            if group_key not in settlements_by_group:
+                settlements_by_group[group_key] = {
+                    'group_name': app.partner_group.name,
+                    'companies': {},
+                    'total_count': 0,
+                    'total_amount': 0
+                }
+            
+            if company_key not in settlements_by_group[group_key]['companies']:
+                settlements_by_group[group_key]['companies'][company_key] = {
+                    'company_name': app.created_by_member.company_name,
+                    'representative': app.created_by_member.representative,
+                    'count': 0,
+                    'amount': 0
+                }
+            
+            settlements_by_group[group_key]['companies'][company_key]['count'] += 1
+            settlements_by_group[group_key]['companies'][company_key]['amount'] += 95000
+            settlements_by_group[group_key]['total_count'] += 1
+            settlements_by_group[group_key]['total_amount'] += 95000
+    
+    # 엑셀 데이터 생성
+    grand_total_count = 0
+    grand_total_amount = 0
+    
+    for group_id, group_data in sorted(settlements_by_group.items()):
+        # 회사별 데이터
+        for company_key, company_data in sorted(group_data['companies'].items()):
+            data.append({
+                '순': row_num,
+                '파트너그룹': group_data['group_name'],
+                '상사명': company_data['company_name'],
+                '대표자': company_data['representative'],
+                '건수': company_data['count'],
+                '금액': company_data['amount'],
+                '비고': '',
+            })
+            row_num += 1
+        
+        # 파트너그룹별 합계
+        data.append({
+            '순': '',
+            '파트너그룹': f"{group_data['group_name']} 합계",
+            '상사명': '',
+            '대표자': '',
+            '건수': group_data['total_count'],
+            '금액': group_data['total_amount'],
+            '비고': '',
+        })
+        grand_total_count += group_data['total_count']
+        grand_total_amount += group_data['total_amount']
+    
+    # 총합계
+    if data:
+        data.append({
+            '순': '',
+            '파트너그룹': '총합계',
+            '상사명': '',
+            '대표자': '',
+            '건수': grand_total_count,
+            '금액': grand_total_amount,
+            '비고': '',
+        })
+    
+    df = pd.DataFrame(data)
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='정산내역')
+    buffer.seek(0)
+    
+    filename = f'정산내역_{year}년{month}월_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+# 파트너그룹 책임보험가입 엑셀 양식 다운로드
+def partner_insurance_excel_template():
+    try:
+        ensure_initialized()
+        import pandas as pd
+        from io import BytesIO
+        
+        # 엑셀 양식 생성
+        data = {
+            '가입희망일자': ['2024-01-01'],
+            '피보험자코드': ['123-45-67890'],
+            '계약자코드': [''],
+            '한글차량번호': ['12가3456'],
+            '차대번호': [''],
+            '차량명': ['소나타'],
+            '차량등록일자': ['2020-01-01'],
+            '비고': [''],
+        }
+        
+        df = pd.DataFrame(data)
+        buffer = BytesIO()
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name='보험가입양식')
+        buffer.seek(0)
+        
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name='보험가입업로드양식.xlsx',
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    except Exception as e:
+        insurance_log.exception("Partner insurance excel template error: %s", e)
+        flash('엑셀 양식 다운로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('insurance.partner_insurance'))
+
+
+# 파트너그룹 회원가입승인 엑셀 양식 다운로드
+def partner_admin_member_excel_template():
+    try:
+        ensure_initialized()
+        import pandas as pd
+        from io import BytesIO
+        
+        # 엑셀 양식 생성
+        data = {
+            'username': ['아이디'],
+            'password': ['패스워드'],
+            'company_name': ['상사명'],
+            'address': ['주소'],
+            'business_number': ['사업자번호'],
+            'corporation_number': ['법인번호'],
+            'representative': ['대표자'],
+            'phone': ['연락처'],
+            'mobile': ['휴대폰'],
+            'email': ['이메일'],
+            'approval_status': ['승인'],
+            'settlement_method': ['포인트 또는 후불정산'],
+            'memo': ['비고'],
+        }
+        
+        df = pd.DataFrame(data)
+        buffer = BytesIO()
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name='회원업로드양식')
+        buffer.seek(0)
+        
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name='회원업로드양식.xlsx',
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    except Exception as e:
+        partner_log.error("Excel template download error: %s", e)
+        flash('양식 다운로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('partner.member_approval'))
+
+
+# 파트너그룹 책임보험승인 엑셀 다운로드
+@partner_admin_required
+@read_replica
+def partner_admin_insurance_approval_export(partner):
+    try:
+        partner_group_id = partner.group_id
+        
+        import pandas as pd
+        from io import BytesIO
+        
+        # 검색 조건 (동일한 필터 적용)
+        req_start = parse_date(request.args.get('req_start', ''))
+        req_end = parse_date(request.args.get('req_end', ''))
+        approved = request.args.get('approved', '전체')
+        appr_start = parse_date(request.args.get('appr_start', ''))
+        appr_end = parse_date(request.args.get('appr_end', ''))
+        
+        if db is None:
+            flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+            return redirect(url_for('partner.insurance_approval'))
+        
+        # 보험신청 데이터 조회 (동일한 필터)
+        q = exclude_archived(
+            db.session.query(InsuranceApplication).filter_by(partner_group_id=partner_group_id),
+            include_archived_requested(),
+        )
+        
+        # 신청시간 기준 검색
+        if req_start:
+            q = q.filter(InsuranceApplication.created_at >= datetime.combine(req_start, datetime.min.time(), tzinfo=KST))
+        if req_end:
+            q = q.filter(InsuranceApplication.created_at <= datetime.combine(req_end, datetime.max.time(), tzinfo=KST))
+        
+        # 승인여부 검색
+        if approved == '승인':
+            q = q.filter(InsuranceApplication.approved_at.is_not(None))
+        elif approved == '미승인':
+            q = q.filter(InsuranceApplication.approved_at.is_(None))
+        
+        # 조합승인시간 기준 검색
+        if appr_start:
+            q = q.filter(InsuranceApplication.approved_at >= datetime.combine(appr_start, datetime.min.time(), tzinfo=KST))
+        if appr_end:
+            q = q.filter(InsuranceApplication.approved_at <= datetime.combine(appr_end, datetime.max.time(), tzinfo=KST))
+        
+        applications = q.order_by(InsuranceApplication.created_at.desc()).all()
+        
+        # 엑셀 데이터 생성
+        data = []
+        for app in applications:
+            data.append({
+                '순번': len(data) + 1,
+                '상사명': app.created_by_member.company_name if app.created_by_member else '',
+                '대표자': app.created_by_member.representative if app.created_by_member else '',
+                '사업자번호': app.created_by_member.business_number if app.created_by_member else '',
+                '신청시간': app.created_at.strftime('%Y-%m-%d %H:%M:%S') if app.created_at else '',
+                '가입시간': app.start_at.strftime('%Y-%m-%d %H:%M:%S') if app.start_at else '',
+                '종료시간': app.end_at.strftime('%Y-%m-%d %H:%M:%S') if app.end_at else '',
+                '조합승인시간': app.approved_at.strftime('%Y-%m-%d %H:%M:%S') if app.approved_at else '',
+                '피보험자코드': app.insured_code or '',
+                '계약자코드': app.contractor_code or '',
+                '한글차량번호': app.car_plate or '',
+                '차대번호': app.vin or '',
+                '차량명': app.car_name or '',
+                '차량등록일자': app.car_registered_at.strftime('%Y-%m-%d') if app.car_registered_at else '',
+                '보험료': app.premium or 0,
+                '상태': app.status or '',
+                '비고': app.memo or '',
+            })
+        
+        df = pd.DataFrame(data)
+        buffer = BytesIO()
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name='책임보험승인')
+        buffer.seek(0)
+        
+        partner_group = db.session.query(PartnerGroup).filter_by(id=partner_group_id).first()
+        partner_group_name = partner_group.name if partner_group else '파트너그룹'
+        filename = f'{partner_group_name}_책임보험승인_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name=filename,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    except Exception as e:
+        partner_log.exception("Partner admin insurance approval export error: %s", e)
+        flash('엑셀 다운로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('partner.insurance_approval'))
+
+
+@partner_admin_required
+@read_replica
+def partner_admin_settlement_export(partner):
+    """파트너 정산 결과를 엑셀로 다운로드"""
+    try:
+        import pandas as pd
+        from io import BytesIO
+        
+        partner_group_id = partner.group_id
+        partner_group = partner.group
+        partner_group_name = partner_group.name
+        
+        # 년도/월 파라미터 처리
+        now = datetime.now(KST)
+        try:
+            year = int(request.args.get('year', now.year))
+        except (ValueError, TypeError):
+            year = now.year
+        try:
+            month = int(request.args.get('month', now.month))
+        except (ValueError, TypeError):
+            month = now.month
+        
+        # 월 유효성 검사
+        if month < 1 or month > 12:
+            month = now.month
+        if year < 2000 or year > 2100:
+            year = now.year
+        
+        # 정산 데이터 계산 (partner_admin_settlement와 동일한 로직)
+        start_period = datetime(year, month, 1, tzinfo=KST)
+        if month == 12:
+            next_month = datetime(year + 1, 1, 1, tzinfo=KST)
+        else:
+            next_month = datetime(year, month + 1, 1, tzinfo=KST)
+        
+        applications = db.session.query(InsuranceApplication).filter(
+            InsuranceApplication.partner_group_id == partner_group_id,
+            InsuranceApplication.start_at.is_not(None),
+            InsuranceApplication.start_at >= start_period,
+            InsuranceApplication.start_at < next_month,
+        ).all()
+        
+        # 회사별 정산 데이터 집계
+        settlements = {}
+        for app in applications:
+            try:
+                if app.created_by_member:
+                    company_name = app.created_by_member.company_name or ''
+                    representative = app.created_by_member.representative or ''
+                    business_number = app.created_by_member.business_number or ''
+                    settlement_method = app.created_by_member.settlement_method or '포인트'
+                    
+                    company_key = (company_name, representative, business_number)
+                    if company_key not in settlements:
+                        settlements[company_key] = {
+                            'company_name': company_name,
+                            'representative': representative,
+                            'business_number': business_number,
+                            'settlement_method': settlement_method,
+                            'count': 0,
+                            'amount': 0
+                        }
+                    else:
+                        if not settlements[company_key].get('settlement_method'):
+                            settlements[company_key]['settlement_method'] = settlement_method
+                    settlements[company_key]['count'] += 1
+                    settlements[company_key]['amount'] += 9500  # 건수 × 9,500원
+            except Exception:
+                continue
+        
+        # 엑셀 데이터 생성
+        data = []
+        row_num = 1
+        total_count = 0
+        total_amount = 0
+        
+        for company_key in sorted(settlements.keys()):
+            settlement = settlements[company_key]
+            total_count += settlement['count']
+            total_amount += settlement['amount']
+            
+            data.append({
+                '순번': row_num,
+                '상사명': settlement['company_name'],
+                '대표자': settlement['representative'],
+                '사업자번호': settlement['business_number'],
+                '대금정산방법': settlement['settlement_method'],
+                '건수': settlement['count'],
+                '금액': settlement['amount'],
+                '비고': '',
+            })
+            row_num += 1
+        
+        # 합계 행 추가
+        if data:
+            data.append({
+                '순번': '',
+                '상사명': '합계',
+                '대표자': '',
+                '사업자번호': '',
+                '대금정산방법': '',
+                '건수': total_count,
+                '금액': total_amount,
+                '비고': '',
+            })
+        
+        # DataFrame 생성 및 엑셀 파일 생성
+        df = pd.DataFrame(data)
+        buffer = BytesIO()
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name='정산내역')
+        buffer.seek(0)
+        
+        filename = f'{partner_group_name}_정산내역_{year}년{month}월_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name=filename,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+        
+    except Exception as e:
+        partner_log.exception("Partner admin settlement export error: %s", e)
+        flash('엑셀 다운로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('partner.settlement'))
+
+
+@login_required
+@admin_required
+@read_replica
+def admin_insurance_download():
+    ensure_initialized()  # Ensure initialization
+    # Import pandas only when needed
+    import pandas as pd
+    
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('admin.insurance'))
+    # Export to Excel
+    rows = exclude_archived(
+        db.session.query(InsuranceApplication), include_archived_requested()
+    ).order_by(InsuranceApplication.created_at.desc()).all()
+    data = []
+    for r in rows:
+        data.append({
+            '상사명': r.created_by_member.company_name if r.created_by_member else '',
+            '신청시간': r.created_at,
+            '가입시간': r.start_at,
+            '종료시간': r.end_at,
+            '조합승인시간': r.approved_at,
+            '피보험자코드': r.insured_code,
+            '계약자코드': r.contractor_code,
+            '한글차량번호': r.car_plate,
+            '차대번호': r.vin,
+            '차량명': r.car_name,
+            '차량등록일자': r.car_registered_at,
+            '보험료': r.premium,
+            '조합승인': '승인' if r.approved_at else '미승인',
+            '비고': r.memo or '',
+        })
+    df = pd.DataFrame(data)
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='data')
+    buffer.seek(0)
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name='insurance_data.xlsx',
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+@login_required
+@admin_required
+@read_replica
+def admin_settlement_export():
+    """정산 결과를 엑셀로 다운로드"""
+    ensure_initialized()
+    import pandas as pd
+    from io import BytesIO
+    
+    try:
+        year = int(request.args.get('year', datetime.now().year))
+        month = int(request.args.get('month', datetime.now().month))
+    except (ValueError, TypeError):
+        flash('올바른 년도와 월을 입력해주세요.', 'warning')
+        return redirect(url_for('admin.settlement'))
+    
+    # 월 유효성 검사
+    if month < 1 or month > 12:
+        flash('올바른 월을 입력해주세요. (1-12)', 'warning')
+        return redirect(url_for('admin.settlement'))
+    if year < 2000 or year > 2100:
+        flash('올바른 년도를 입력해주세요.', 'warning')
+        return redirect(url_for('admin.settlement'))
+    
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('admin.settlement'))
+    
+    # 정산 데이터 계산 (admin_settlement와 동일한 로직)
+    start_period = datetime(year, month, 1, tzinfo=KST)
+    if month == 12:
+        next_month = datetime(year + 1, 1, 1, tzinfo=KST)
+    else:
+        next_month = datetime(year, month + 1, 1, tzinfo=KST)
+    
+    rows = db.session.query(InsuranceApplication).filter(
+        InsuranceApplication.start_at.is_not(None),
+        InsuranceApplication.start_at >= start_period,
+        InsuranceApplication.start_at < next_month,
+    ).all()
+    
+    # 그룹핑: 상사별 건수/금액
+    by_company = {}
+    for r in rows:
+        company = r.created_by_member.company_name if r.created_by_member else '미상'
+        rep = r.created_by_member.representative if r.created_by_member else ''
+        biz = r.created_by_member.business_number if r.created_by_member else ''
+        settlement_method = (r.created_by_member.settlement_method if r.created_by_member else '포인트') or '포인트'
+        key = (company, rep, biz)
+        if key not in by_company:
+            by_company[key] = {
+                'count': 0,
+                'settlement_method': settlement_method
+            }
+        else:
+            if not by_company[key].get('settlement_method'):
+                by_company[key]['settlement_method'] = settlement_method
+        by_company[key]['count'] += 1
+    
+    # 엑셀 데이터 생성
+    data = []
+    row_num = 1
+    total_count = 0
+    total_amount = 0
+    
+    for (company, rep, biz), info in sorted(by_company.items()):
+        count = info['count']
+        amount = count * 9500
+        total_count += count
+        total_amount += amount
+        
+        data.append({
+            '순번': row_num,
+            '상사명': company,
+            '대금정산방법': info.get('settlement_method', '포인트'),
+            '대표자': rep,
+            '사업자번호': biz,
+            '건수': count,
+            '금액': amount,
+            '비고': '',
+        })
+        row_num += 1
+    
+    # 합계 행 추가
+    if data:
+        data.append({
+            '순번': '',
+            '상사명': '합계',
+            '대금정산방법': '',
+            '대표자': '',
+            '사업자번호': '',
+            '건수': total_count,
+            '금액': total_amount,
+            '비고': '',
+        })
+    
+    # DataFrame 생성 및 엑셀 파일 생성
+    df = pd.DataFrame(data)
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='정산내역')
+    buffer.seek(0)
+    
+    filename = f'정산내역_{year}년{month}월_{datetime.now(KST).strftime("%Y%m%d_%H%M%S")}.xlsx'
+    return send_file(
+        buffer,
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
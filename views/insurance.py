@@ -0,0 +1,988 @@
+"""회원 보험신청 화면, 약관, 업로드 파일 제공, 차량 조회/검색 API"""
+
+import os
+from datetime import datetime
+
+from flask import abort, flash, jsonify, redirect, render_template, request, send_file, session, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import func
+from werkzeug.exceptions import HTTPException
+
+from app import (
+    DepositHistory, InsuranceApplication, KST, Member, PremiumSetting,
+    SEARCH_PER_PAGE, SEARCH_TARGETS, UPLOAD_DIR, VirtualAccount, api_log, app_log, db,
+    duplicate_coverage_message, ensure_initialized, exclude_archived, files_log,
+    find_active_coverage, get_auth_context, get_partner_group_info, include_archived_requested,
+    insurance_log, legacy_policy_path, normalize_plate, parse_date, partner_log,
+    partner_member_required, plate_history, read_replica, safe_commit, search_backend,
+    search_records, send_document, send_document_variant, send_static_asset,
+    split_duplicate_vins,
+)
+
+
+@login_required
+def serve_insurance_policy(insurance_id):
+    """Serve insurance policy PDF if available"""
+    try:
+        ensure_initialized()
+        if db is None:
+            flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+            return redirect(url_for('auth.dashboard'))
+        
+        # Get insurance application
+        insurance = db.session.get(InsuranceApplication, insurance_id)
+        if not insurance:
+            flash('보험 신청을 찾을 수 없습니다.', 'danger')
+            return redirect(url_for('auth.dashboard'))
+        
+        # Check permission: user can only view their own insurance policies unless admin
+        user_role = getattr(current_user, 'role', 'member')
+        if user_role != 'admin' and insurance.created_by_member_id != current_user.id:
+            flash('권한이 없습니다.', 'danger')
+            return redirect(url_for('auth.dashboard'))
+        
+        # Check if insurance policy path exists
+        policy_path = getattr(insurance, 'insurance_policy_path', None)
+        if policy_path:
+            # 문서 저장소 파일: 같은 URL 로 증권이 교체될 수 있으므로 ETag 재검증
+            response = send_document(policy_path, immutable=False)
+            if response is not None:
+                return response
+            path = legacy_policy_path(policy_path)
+            if path:
+                response = send_file(path, mimetype='application/pdf', as_attachment=False)
+                response.headers['Cache-Control'] = 'private, no-cache'
+                return response
+        
+        # If policy not found, return 404
+        flash('보험증권 파일을 찾을 수 없습니다.', 'warning')
+        return redirect(url_for('insurance.index'))
+        
+    except Exception as e:
+        files_log.error("Error in serve_insurance_policy: %s", e)
+        flash('보험증권 조회 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('auth.dashboard'))
+
+
+def _upload_access_response(filename):
+    """업로드 파일 접근 확인 (회원 로그인 또는 세션 로그인한 파트너그룹 관리자). 거부 시 응답, 허용 시 None"""
+    # Flask-Login의 세션 확인
+    from flask_login import current_user
+    
+    # 세션 쿠키 확인
+    session_cookie = request.cookies.get('hyundai_session') or request.cookies.get('session')
+    
+    # Flask-Login의 세션 키 확인 (Flask-Login은 '_user_id'를 사용)
+    flask_login_user_id = session.get('_user_id', None)
+    
+    # current_user 확인
+    is_authenticated = False
+    try:
+        is_authenticated = hasattr(current_user, 'is_authenticated') and current_user.is_authenticated
+    except Exception:
+        pass
+    
+    # 세션 쿠키가 있거나 Flask-Login 세션이 있으면 허용
+    if not session_cookie and not flask_login_user_id and not is_authenticated:
+        files_log.error("File access denied: No session. Cookies: %s, Session keys: %s", list(request.cookies.keys()), list(session.keys()))
+        return redirect(url_for('auth.login', next=request.url))
+    
+    # 보안: 파일명 검증 (경로 조작 방지)
+    if '..' in filename or '/' in filename or '\\' in filename:
+        abort(403, description="잘못된 파일 요청입니다.")
+    return None
+
+
+def uploaded_file(filename):
+    """업로드된 파일 제공 - 로그인한 사용자만 접근 가능"""
+    try:
+        denied = _upload_access_response(filename)
+        if denied is not None:
+            return denied
+        
+        # 문서 저장소 파일 (<sha256>.pdf): 내용이 바뀌지 않으므로 브라우저 캐시 1년, Range 지원
+        response = send_document(filename, immutable=True, download_name=filename)
+        if response is not None:
+            return response
+        
+        filepath = os.path.join(UPLOAD_DIR, filename)
+        
+        # 파일 존재 확인
+        if not os.path.exists(filepath):
+            files_log.info("File not found: %s", filepath)
+            abort(404, description="파일을 찾을 수 없습니다.")
+        
+        # MIME 타입 자동 감지
+        import mimetypes
+        mimetype = mimetypes.guess_type(filepath)[0] or 'application/octet-stream'
+        
+        # 파일 제공 (브라우저에서 직접 열기)
+        # 세션 쿠키를 명시적으로 설정하여 응답에 포함
+        response = send_file(
+            filepath, 
+            mimetype=mimetype,
+            as_attachment=False,
+            download_name=filename
+        )
+        
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        files_log.exception("File download error: %s", e)
+        abort(500, description="파일을 불러오는 중 오류가 발생했습니다.")
+
+
+def uploaded_file_variant(filename, variant):
+    """첨부 이미지의 미리보기/썸네일 (업로드 후 백그라운드에서 생성, 없으면 원본으로 이동)"""
+    denied = _upload_access_response(filename)
+    if denied is not None:
+        return denied
+    response = send_document_variant(filename, variant)
+    if response is None:
+        return redirect(url_for('insurance.uploaded_file', filename=filename))
+    return response
+
+
+def terms():
+    ensure_initialized()  # Ensure initialization
+    return render_template('terms.html')
+
+
+@login_required
+def terms_guide_pdf():
+    """상품안내 PDF를 브라우저에 표시 (inline)"""
+    response = send_static_asset('terms-guide.pdf')
+    if response is None:
+        flash('안내 문서를 불러올 수 없습니다.', 'danger')
+        return redirect(url_for('insurance.terms'))
+    return response
+
+
+@login_required
+def terms_policy_download():
+    """약관 PDF 다운로드"""
+    response = send_static_asset('terms-policy.pdf', as_attachment=True, download_name='중고차_매매업자_자동차보험_약관.pdf')
+    if response is None:
+        flash('약관 파일을 다운로드할 수 없습니다.', 'danger')
+        return redirect(url_for('insurance.terms'))
+    return response
+
+
+@login_required
+def insurance():
+    ensure_initialized()  # Ensure initialization
+    if request.method == 'POST':
+        action = request.form.get('action')
+        
+        if action == 'save' or action == 'delete':
+            # 저장/삭제 작업
+            row_id = request.form.get('row_id')
+            if row_id:
+                row = db.session.get(InsuranceApplication, int(row_id))
+                if row and row.created_by_member_id == current_user.id:
+                    if action == 'delete':
+                        if not row.approved_at:  # 조합승인 전까지만 삭제 가능
+                            try:
+                                row_id = row.id
+                                db.session.delete(row)
+                                
+                                insurance_log.debug("Insurance delete (/insurance): Deleting application ID %s", row_id)
+                                
+                                commit_success = safe_commit()
+                                
+                                if commit_success:
+                                    insurance_log.debug("Insurance delete (/insurance): Successfully deleted ID %s", row_id)
+                                    flash('삭제되었습니다.', 'success')
+                                else:
+                                    insurance_log.error("Insurance delete (/insurance): Commit failed for ID %s", row_id)
+                                    flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                            except Exception as e:
+                                insurance_log.exception("Insurance deletion error: %s", e)
+                                try:
+                                    db.session.rollback()
+                                except Exception:
+                                    pass
+                                flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                        else:
+                            flash('조합승인 후에는 삭제할 수 없습니다.', 'warning')
+                    elif action == 'save':
+                        if not row.approved_at:  # 조합승인 전까지만 수정 가능
+                            try:
+                                row_id = row.id
+                                # 편집 모드에서 온 경우에만 모든 필드 업데이트
+                                if request.form.get('car_plate'):
+                                    row.car_plate = request.form.get('car_plate', '').strip()
+                                    row.vin = request.form.get('vin', '').strip()
+                                    row.car_name = request.form.get('car_name', '').strip()
+                                    row.car_registered_at = parse_date(request.form.get('car_registered_at'))
+                                # 비고는 항상 업데이트 가능
+                                row.memo = request.form.get('memo', '').strip()
+                                
+                                insurance_log.debug("Insurance save (/insurance): Updating application ID %s", row_id)
+                                
+                                commit_success = safe_commit(verify=row, label='Insurance save (/insurance)')
+                                
+                                if commit_success:
+                                    flash('저장되었습니다.', 'success')
+                                else:
+                                    insurance_log.error("Insurance save (/insurance): Commit failed for ID %s", row_id)
+                                    flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+                            except Exception as e:
+                                insurance_log.exception("Insurance update error: %s", e)
+                                try:
+                                    db.session.rollback()
+                                except Exception:
+                                    pass
+                                flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+                        else:
+                            flash('조합승인 후에는 수정할 수 없습니다.', 'warning')
+            return redirect(url_for('insurance.index'))
+        
+        # 신규 가입
+        car_plate = request.form.get('car_plate', '').strip()
+        vin = request.form.get('vin', '').strip()
+        car_name = request.form.get('car_name', '').strip()
+        car_registered_at = parse_date(request.form.get('car_registered_at'))
+        memo = request.form.get('memo', '').strip()
+
+        existing = find_active_coverage(vin)
+        if existing:
+            flash(duplicate_coverage_message(existing), 'warning')
+            return redirect(url_for('insurance.index'))
+
+        try:
+            app_row = InsuranceApplication(
+                insured_code=current_user.business_number or '',
+                contractor_code='부산자동차매매사업자조합',
+                car_plate=car_plate,
+                vin=vin,
+                car_name=car_name,
+                car_registered_at=car_registered_at,
+                premium=9500,
+                memo=memo,
+                created_by_member_id=current_user.id,
+            )
+            db.session.add(app_row)
+            
+            insurance_log.debug("Insurance application (/insurance): Adding %s to session", car_plate)
+            
+            commit_success = safe_commit(verify=app_row, label='Insurance application (/insurance)')
+            
+            if not commit_success:
+                insurance_log.error("Insurance application (/insurance): Commit failed for %s", car_plate)
+                flash('신청 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+                return redirect(url_for('insurance.index'))
+            
+            flash('신청이 등록되었습니다.', 'success')
+            return redirect(url_for('insurance.index'))
+        except Exception as e:
+            insurance_log.exception("Insurance application (/insurance) error: %s", e)
+            try:
+                db.session.rollback()
+            except Exception:
+                pass
+            flash('신청 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+            return redirect(url_for('insurance.index'))
+
+    # 검색
+    start_date = parse_date(request.args.get('start_date', ''))
+    end_date = parse_date(request.args.get('end_date', ''))
+    edit_id = request.args.get('edit_id')  # 편집 모드
+
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('auth.dashboard'))
+    q = exclude_archived(
+        db.session.query(InsuranceApplication).filter_by(created_by_member_id=current_user.id),
+        include_archived_requested(),
+    )
+    # 기준일시(effective_date = 가입시간, 없으면 신청시간) 범위 검색
+    if start_date:
+        q = q.filter(InsuranceApplication.effective_date >= datetime.combine(start_date, datetime.min.time(), tzinfo=KST))
+    if end_date:
+        q = q.filter(InsuranceApplication.effective_date <= datetime.combine(end_date, datetime.max.time(), tzinfo=KST))
+
+    rows = q.order_by(InsuranceApplication.created_at.desc()).all()
+    # 상태 재계산
+    changed = False
+    for r in rows:
+        old_status = getattr(r, 'status', None)
+        r.recompute_status()
+        if getattr(r, 'status', None) != old_status:
+            changed = True
+    if changed:
+        safe_commit()  # Don't show error if status update fails, just log it
+
+    # Build view models with proper timezone formatting
+    def fmt_display_safe(dt):
+        if not dt:
+            return ''
+        try:
+            # Ensure timezone-aware datetime and convert to KST
+            if dt.tzinfo is None:
+                # If naive, assume it's already in KST
+                local_dt = dt.replace(tzinfo=KST)
+            else:
+                # Convert to KST
+                local_dt = dt.astimezone(KST)
+            return local_dt.strftime('%Y-%m-%d %H:%M')
+        except Exception:
+            return ''
+
+    items = []
+    for r in rows:
+        items.append({
+            'id': r.id,
+            'created_at_str': fmt_display_safe(r.created_at),
+            'start_at_str': fmt_display_safe(r.start_at),
+            'end_at_str': fmt_display_safe(r.end_at),
+            'approved_at_str': fmt_display_safe(r.approved_at),
+        })
+
+    # 포인트 관련 정보 추가
+    member_point_balance = 0
+    member_total_deposit = 0
+    member_recent_deposits = []
+    member_settlement_method = '포인트'
+    pending_virtual_account = None
+    point_requirement = 9500
+    
+    if hasattr(current_user, 'id'):
+        member = db.session.get(Member, current_user.id)
+        if member:
+            member_point_balance = member.point_balance or 0
+            member_settlement_method = member.settlement_method or '포인트'
+            member_total_deposit = db.session.query(
+                func.coalesce(func.sum(DepositHistory.deposit_amount), 0)
+            ).filter(
+                DepositHistory.member_id == member.id
+            ).scalar() or 0
+            recent_deposit_rows = db.session.query(DepositHistory).filter(
+                DepositHistory.member_id == member.id
+            ).order_by(DepositHistory.deposit_date.desc()).limit(3).all()
+            member_recent_deposits = [
+                f"{row.bank_name}/{row.account_number}/{row.deposit_amount:,}원"
+                for row in recent_deposit_rows
+            ]
+            pending_virtual_account = db.session.query(VirtualAccount).filter(
+                VirtualAccount.member_id == member.id,
+                VirtualAccount.status == '대기'
+            ).order_by(VirtualAccount.created_at.desc()).first()
+    
+    return render_template('insurance.html', 
+                         rows=rows, 
+                         items=items, 
+                         edit_id=edit_id,
+                         member_point_balance=member_point_balance,
+                         member_total_deposit=member_total_deposit,
+                         member_recent_deposits=member_recent_deposits,
+                         member_settlement_method=member_settlement_method,
+                         pending_virtual_account=pending_virtual_account,
+                         point_requirement=point_requirement)
+
+
+def _lookup_scope():
+    """조회 API 권한 범위: (partner_group_id 또는 None=전체, 오류 응답 또는 None)
+
+    전체관리자는 전체(또는 ?partner_group_id 지정), 파트너그룹 관리자는 자기 그룹만 조회한다.
+    """
+    if db is None:
+        return None, (jsonify({'success': False, 'message': '데이터베이스가 초기화되지 않았습니다.'}), 500)
+    if session.get('user_type') == 'partner_admin':
+        group = get_partner_group_info(session.get('partner_group_id'))
+        if group is None:
+            return None, (jsonify({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}), 400)
+        return group.id, None
+    ctx = get_auth_context()
+    if ctx is None or ctx.role != 'admin' or ctx.approval_status != '승인':
+        return None, (jsonify({'success': False, 'message': '접근 권한이 없습니다.'}), 403)
+    if request.args.get('partner_group_id'):
+        try:
+            return int(request.args.get('partner_group_id')), None
+        except ValueError:
+            return None, (jsonify({'success': False, 'message': '파트너그룹 ID가 올바르지 않습니다.'}), 400)
+    return None, None
+
+
+# 통합 검색 API: 상사명/대표자(type=member), 차량번호/차대번호(type=vehicle)
+@read_replica
+def api_search():
+    ensure_initialized()
+    partner_group_id, error = _lookup_scope()
+    if error:
+        return error
+    
+    term = request.args.get('q', '').strip()
+    kind = request.args.get('type', 'member')
+    if kind not in SEARCH_TARGETS:
+        return jsonify({'success': False, 'message': '검색 종류는 member 또는 vehicle 입니다.'}), 400
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', SEARCH_PER_PAGE))
+    except ValueError:
+        return jsonify({'success': False, 'message': '페이지 번호가 올바르지 않습니다.'}), 400
+    if not term:
+        return jsonify({'success': True, 'query': term, 'type': kind, 'total': 0, 'page': 1,
+                        'per_page': per_page, 'items': []})
+    
+    try:
+        result = search_records(kind, term, partner_group_id=partner_group_id, page=page,
+                                per_page=per_page, include_archived=include_archived_requested())
+    except Exception as e:
+        app_log.exception("Search error: %s", e)
+        return jsonify({'success': False, 'message': '검색 중 오류가 발생했습니다.'}), 500
+    return jsonify({'success': True, 'query': term, 'type': kind, 'backend': search_backend(), **result})
+
+
+# 차량 보험이력 조회 API: ?plate=12가3456 (표기 차이 무시), &prefix=1 이면 입력 중 접두 검색
+@read_replica
+def api_vehicle_history():
+    ensure_initialized()
+    partner_group_id, error = _lookup_scope()
+    if error:
+        return error
+    
+    plate = request.args.get('plate', '').strip()
+    normalized = normalize_plate(plate)
+    if not normalized:
+        return jsonify({'success': False, 'message': '차량번호를 입력해주세요.'}), 400
+    prefix = request.args.get('prefix') == '1'
+    try:
+        applications = plate_history(plate, partner_group_id=partner_group_id, prefix=prefix)
+    except Exception as e:
+        app_log.exception("Vehicle history error: %s", e)
+        return jsonify({'success': False, 'message': '차량 이력 조회 중 오류가 발생했습니다.'}), 500
+    
+    def iso(value):
+        return value.isoformat() if value else None
+    
+    history = []
+    for application in applications:
+        member = application.created_by_member
+        history.append({
+            'id': application.id,
+            'car_plate': application.car_plate,
+            'car_plate_normalized': application.car_plate_normalized,
+            'vin': application.vin,
+            'car_name': application.car_name,
+            'company_name': member.company_name if member else None,
+            'partner_group_id': application.partner_group_id,
+            'created_at': iso(application.created_at),
+            'approved_at': iso(application.approved_at),
+            'start_at': iso(application.start_at),
+            'end_at': iso(application.end_at),
+            'archived_at': iso(application.archived_at),
+            'premium': application.premium,
+            'memo': application.memo,
+        })
+    return jsonify({'success': True, 'plate': normalized, 'prefix': prefix, 'count': len(history), 'history': history})
+
+
+# 파트너그룹 섹션 라우트들
+
+# 파트너그룹 보험가입 페이지 (요구사항의 책임보험가입페이지)
+@partner_member_required
+def partner_insurance(partner):
+    try:
+        # 권한 확인 (partner_member_required)
+        partner_group_id = partner.group_id
+        is_partner_admin = partner.is_partner_admin
+        
+        member_for_points = None
+        available_points = 0
+        member_total_deposit = 0
+        member_recent_deposits = []
+        member_settlement_method = '포인트'
+        pending_virtual_account = None
+        point_requirement = 9500
+
+        if not is_partner_admin:
+            if hasattr(current_user, 'id'):
+                member_for_points = db.session.get(Member, current_user.id)
+                if member_for_points:
+                    available_points = member_for_points.point_balance or 0
+                    member_settlement_method = member_for_points.settlement_method or '포인트'
+                    member_total_deposit = db.session.query(
+                        func.coalesce(func.sum(DepositHistory.deposit_amount), 0)
+                    ).filter(
+                        DepositHistory.member_id == member_for_points.id
+                    ).scalar() or 0
+                    recent_deposit_rows = db.session.query(DepositHistory).filter(
+                        DepositHistory.member_id == member_for_points.id
+                    ).order_by(DepositHistory.deposit_date.desc()).limit(3).all()
+                    member_recent_deposits = [
+                        f"{row.bank_name}/{row.account_number}/{row.deposit_amount:,}원"
+                        for row in recent_deposit_rows
+                    ]
+                    pending_virtual_account = db.session.query(VirtualAccount).filter(
+                        VirtualAccount.member_id == member_for_points.id,
+                        VirtualAccount.status == '대기'
+                    ).order_by(VirtualAccount.created_at.desc()).first()
+
+        if request.method == 'POST':
+            action = request.form.get('action')
+            
+            if action == 'apply':
+                # 신규 가입 신청 (회원사 및 파트너그룹 관리자 모두 가능)
+                vehicle_type_id = request.form.get('vehicle_type_id', '').strip()
+                car_plate = request.form.get('car_plate', '').strip()
+                vin = request.form.get('vin', '').strip()
+                car_name = request.form.get('car_name', '').strip()
+                car_registered_at = parse_date(request.form.get('car_registered_at'))
+                memo = request.form.get('memo', '').strip()
+                
+                # 피보험자코드: 파트너그룹 관리자는 폼에서 가져오거나, 회원사는 자동으로
+                insured_code = request.form.get('insured_code', '').strip()
+                
+                # 차종분류와 차량번호는 필수
+                if not vehicle_type_id:
+                    flash('차종분류를 선택해주세요.', 'warning')
+                    return redirect(url_for('insurance.partner_insurance'))
+                
+                if not car_plate:
+                    flash('차량번호는 필수입니다.', 'warning')
+                    return redirect(url_for('insurance.partner_insurance'))
+                
+                existing = find_active_coverage(vin)
+                if existing:
+                    flash(duplicate_coverage_message(existing), 'warning')
+                    return redirect(url_for('insurance.partner_insurance'))
+                
+                # 차종분류에서 보험료 가져오기
+                premium_amount = 9500  # 기본값
+                try:
+                    premium_setting = db.session.get(PremiumSetting, int(vehicle_type_id))
+                    if premium_setting:
+                        premium_amount = premium_setting.premium_amount
+                except Exception:
+                    pass
+                
+                creation_allowed = True
+
+                if not is_partner_admin and member_for_points:
+                    current_balance = member_for_points.point_balance or 0
+                    if member_settlement_method != '후불정산' and current_balance < premium_amount:
+                        session['point_top_up_required'] = True
+                        flash('포인트 충전 후 사용해주세요.', 'warning')
+                        creation_allowed = False
+                
+                if creation_allowed:
+                    try:
+                        partner_group_name = partner.group.name
+                        
+                        # 피보험자코드 설정
+                        if not is_partner_admin:
+                            # 회원사: 로그인한 사업자의 사업자번호
+                            if hasattr(current_user, 'business_number'):
+                                insured_code = current_user.business_number or ''
+                            else:
+                                insured_code = ''
+                        # 파트너그룹 관리자는 폼에서 입력받은 값 사용 (이미 위에서 가져옴)
+                        
+                        # 계약자코드: 파트너그룹 이름
+                        contractor_code = partner_group_name
+                        
+                        application = InsuranceApplication(
+                            partner_group_id=partner_group_id,
+                            vehicle_type_id=int(vehicle_type_id) if vehicle_type_id else None,
+                            insured_code=insured_code,  # 피보험자코드
+                            contractor_code=contractor_code,  # 계약자코드: 파트너그룹 이름
+                            car_plate=car_plate,
+                            vin=vin,
+                            car_name=car_name,
+                            car_registered_at=car_registered_at,
+                            premium=premium_amount,  # 차종분류에 따른 보험료
+                            memo=memo,
+                            created_by_member_id=current_user.id if not is_partner_admin and hasattr(current_user, 'id') else None,
+                        )
+                        db.session.add(application)
+                        
+                        # 커밋 전 디버깅
+                        insurance_log.debug("Insurance application: Adding %s to session", car_plate)
+                        
+                        commit_success = safe_commit(verify=application, label='Insurance application')
+                        
+                        if not commit_success:
+                            insurance_log.error("Insurance application: Commit failed for %s", car_plate)
+                            flash('신청 처리 중 오류가 발생했습니다.', 'danger')
+                        else:
+                            flash('보험 신청이 등록되었습니다.', 'success')
+                    except Exception as e:
+                        insurance_log.exception("Insurance application error: %s", e)
+                        try:
+                            db.session.rollback()
+                        except Exception:
+                            pass
+                        flash(f'신청 처리 중 오류가 발생했습니다: {str(e)}', 'danger')
+            
+            elif action == 'excel_upload':
+                # 엑셀 일괄 업로드
+                if 'excel_file' not in request.files:
+                    flash('파일을 선택해주세요.', 'warning')
+                    return redirect(url_for('insurance.partner_insurance'))
+                
+                file = request.files['excel_file']
+                if file and file.filename:
+                    try:
+                        import pandas as pd
+                        from io import BytesIO
+                        
+                        # 엑셀 파일 읽기
+                        df = pd.read_excel(file)
+                        
+                        partner_group_name = partner.group.name
+                        
+                        success_count = 0
+                        error_count = 0
+                        
+                        rows = [row for _, row in df.iterrows()]
+                        # 파일 전체를 한 번에 기존 보장/파일 내 반복과 대조
+                        rows, duplicates = split_duplicate_vins(
+                            rows, lambda row: str(row.get('차대번호', '')).strip()
+                            if str(row.get('한글차량번호', '')).strip() else None
+                        )
+                        
+                        for row in rows:
+                            try:
+                                car_plate = str(row.get('한글차량번호', '')).strip()
+                                
+                                if not car_plate:
+                                    error_count += 1
+                                    continue
+                                
+                                # 피보험자코드: 회원사는 본인 사업자번호, 관리자는 엑셀에서 가져오거나 기본값
+                                if is_partner_admin:
+                                    insured_code = str(row.get('피보험자코드', '')).strip() or ''
+                                else:
+                                    insured_code = current_user.business_number or ''
+                                
+                                # 계약자코드: 파트너그룹 이름
+                                contractor_code = partner_group_name
+                                
+                                application = InsuranceApplication(
+                                    partner_group_id=partner_group_id,
+                                    insured_code=insured_code,
+                                    contractor_code=contractor_code,
+                                    car_plate=car_plate,
+                                    vin=str(row.get('차대번호', '')).strip() or None,
+                                    car_name=str(row.get('차량명', '')).strip() or None,
+                                    car_registered_at=parse_date(str(row.get('차량등록일자', ''))),
+                                    premium=9500,
+                                    memo=str(row.get('비고', '')).strip() or None,
+                                    created_by_member_id=current_user.id if not is_partner_admin else None,
+                                )
+                                db.session.add(application)
+                                success_count += 1
+                            except Exception as e:
+                                error_count += 1
+                                insurance_log.error("Insurance excel upload error: %s", e)
+                                continue
+                        
+                        # 커밋 전 디버깅
+                        insurance_log.debug("Insurance excel upload: Committing %s applications", success_count)
+                        
+                        commit_success = safe_commit()
+                        
+                        if commit_success:
+                            insurance_log.debug("Insurance excel upload: Successfully committed %s applications", success_count)
+                            flash(f'엑셀 업로드 완료: 성공 {success_count}건, 실패 {error_count}건, 중복 차대번호 {len(duplicates)}건',
+                                  'success' if success_count > 0 else 'warning')
+                        else:
+                            insurance_log.error("Insurance excel upload: Commit failed")
+                            flash('엑셀 업로드 중 오류가 발생했습니다.', 'danger')
+                    except Exception as e:
+                        insurance_log.error("Excel upload error: %s", e)
+                        flash(f'엑셀 파일 처리 중 오류가 발생했습니다: {str(e)}', 'danger')
+                
+                return redirect(url_for('insurance.partner_insurance'))
+            
+            elif action in ['save', 'delete']:
+                # 수정/삭제 (조합승인 전까지만 가능)
+                app_id = request.form.get('app_id')
+                if app_id:
+                    application = db.session.get(InsuranceApplication, int(app_id))
+                    if application and application.partner_group_id == partner_group_id:
+                        # 권한 확인: 본인이 신청한 것이거나 파트너그룹 관리자
+                        if not is_partner_admin:
+                            if not hasattr(current_user, 'id') or application.created_by_member_id != current_user.id:
+                                flash('권한이 없습니다.', 'warning')
+                                return redirect(url_for('insurance.partner_insurance'))
+                        if application.approved_at:
+                            flash('조합승인 후에는 수정/삭제할 수 없습니다.', 'warning')
+                        else:
+                            if action == 'delete':
+                                try:
+                                    app_id = application.id
+                                    db.session.delete(application)
+                                    
+                                    insurance_log.debug("Insurance delete: Deleting application ID %s", app_id)
+                                    
+                                    commit_success = safe_commit()
+                                    
+                                    if not commit_success:
+                                        insurance_log.error("Insurance delete: Commit failed for ID %s", app_id)
+                                        flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                                    else:
+                                        insurance_log.debug("Insurance delete: Successfully deleted application ID %s", app_id)
+                                        flash('삭제되었습니다.', 'success')
+                                except Exception as e:
+                                    insurance_log.exception("Insurance deletion error: %s", e)
+                                    try:
+                                        db.session.rollback()
+                                    except Exception:
+                                        pass
+                                    flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                            elif action == 'save':
+                                try:
+                                    app_id = application.id
+                                    application.car_plate = request.form.get('car_plate', '').strip()
+                                    application.vin = request.form.get('vin', '').strip()
+                                    application.car_name = request.form.get('car_name', '').strip()
+                                    application.car_registered_at = parse_date(request.form.get('car_registered_at'))
+                                    application.memo = request.form.get('memo', '').strip()
+                                    
+                                    insurance_log.debug("Insurance save: Updating application ID %s", app_id)
+                                    
+                                    commit_success = safe_commit(verify=application, label='Insurance save')
+                                    
+                                    if not commit_success:
+                                        insurance_log.error("Insurance save: Commit failed for ID %s", app_id)
+                                        flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+                                    else:
+                                        flash('저장되었습니다.', 'success')
+                                except Exception as e:
+                                    insurance_log.exception("Insurance update error: %s", e)
+                                    try:
+                                        db.session.rollback()
+                                    except Exception:
+                                        pass
+                                    flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+            
+            return redirect(url_for('insurance.partner_insurance'))
+        
+        # GET 요청: 보험신청 목록 조회
+        start_date = parse_date(request.args.get('start_date', ''))
+        end_date = parse_date(request.args.get('end_date', ''))
+        edit_id = request.args.get('edit_id')
+        
+        partner_group_name = partner.group.name
+        
+        # 보험료 설정 목록 가져오기
+        premium_settings = db.session.query(PremiumSetting).order_by(PremiumSetting.vehicle_type).all()
+        
+        # 위탁운영파트너 그룹 여부 확인
+        is_delegated_group = (partner_group_name == '위탁운영파트너 그룹')
+        delegated_members = []
+        if is_delegated_group and is_partner_admin:
+            # 위탁운영파트너 그룹의 승인된 회원 목록
+            delegated_members = db.session.query(Member).filter_by(
+                partner_group_id=partner_group_id,
+                approval_status='승인',
+                role='member'
+            ).order_by(Member.company_name).all()
+        
+        q = exclude_archived(
+            db.session.query(InsuranceApplication).filter_by(partner_group_id=partner_group_id),
+            include_archived_requested(),
+        )
+        
+        # 회원사는 본인 신청만 조회
+        if not is_partner_admin and hasattr(current_user, 'id'):
+            q = q.filter_by(created_by_member_id=current_user.id)
+        
+        # 검색 조건: 가입일자 기준 (effective_date = start_at이 있으면 start_at, 없으면 created_at)
+        if start_date:
+            q = q.filter(InsuranceApplication.effective_date >= datetime.combine(start_date, datetime.min.time(), tzinfo=KST))
+        if end_date:
+            q = q.filter(InsuranceApplication.effective_date <= datetime.combine(end_date, datetime.max.time(), tzinfo=KST))
+        
+        applications = q.order_by(InsuranceApplication.created_at.desc()).all()
+        
+        # 상태 재계산
+        for app in applications:
+            app.recompute_status()
+        safe_commit()
+        
+        show_point_modal = session.pop('point_top_up_required', False)
+
+        return render_template('partner/insurance.html',
+                             applications=applications,
+                             is_partner_admin=is_partner_admin,
+                             partner_group_id=partner_group_id,
+                             partner_group_name=partner_group_name,
+                             premium_settings=premium_settings,
+                             is_delegated_group=is_delegated_group,
+                             delegated_members=delegated_members,
+                             start_date=start_date,
+                             end_date=end_date,
+                             edit_id=edit_id,
+                            current_user=current_user if not is_partner_admin else None,
+                            member_point_balance=available_points,
+                            member_total_deposit=member_total_deposit,
+                            member_recent_deposits=member_recent_deposits,
+                            pending_virtual_account=pending_virtual_account,
+                             member_settlement_method=member_settlement_method,
+                             insufficient_points=show_point_modal,
+                            point_requirement=point_requirement)
+        
+    except Exception as e:
+        insurance_log.exception("Partner insurance route error: %s", e)
+        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('partner.dashboard'))
+
+
+# API: 차량 정보 조회 (보안을 위해 백엔드에서 처리)
+def api_get_car_info():
+    """외부 API에서 차량 정보를 가져오는 보안 엔드포인트"""
+    api_log.debug("car info: request start")
+    try:
+        ensure_initialized()
+        api_log.debug("car info: ensure_initialized 완료")
+
+        # 권한 확인
+        partner_group_id = None
+        is_partner_admin = False
+
+        api_log.debug("car info: Session: %s", dict(session))
+
+        if 'user_type' in session and session['user_type'] == 'partner_admin':
+            partner_group_id = session.get('partner_group_id')
+            is_partner_admin = True
+            api_log.debug("car info: Partner admin - group_id: %s", partner_group_id)
+        else:
+            try:
+                from flask_login import current_user
+                is_auth = getattr(current_user, 'is_authenticated', False)
+                api_log.debug("car info: Current user auth: %s", is_auth)
+            except Exception as auth_err:
+                api_log.debug("car info: Auth error: %s", auth_err)
+                is_auth = False
+
+            if not is_auth:
+                api_log.debug("car info: 로그인 필요")
+                return jsonify({'status': 'error', 'message': '로그인이 필요합니다.'}), 401
+
+            api_log.debug("car info: User role: %s, partner_group_id: %s", current_user.role, current_user.partner_group_id)
+
+            if current_user.role == 'member' and current_user.partner_group_id:
+                partner_group_id = current_user.partner_group_id
+            else:
+                api_log.debug("car info: 접근 권한 없음")
+                return jsonify({'status': 'error', 'message': '접근 권한이 없습니다.'}), 403
+
+        if not partner_group_id:
+            api_log.debug("car info: 파트너그룹 정보 없음")
+            return jsonify({'status': 'error', 'message': '파트너그룹 정보를 찾을 수 없습니다.'}), 403
+
+        api_log.debug("car info: Partner group ID: %s", partner_group_id)
+
+        # 요청 데이터 가져오기
+        data = request.get_json()
+        api_log.debug("car info: Request data: %s", data)
+
+        if not data:
+            api_log.debug("car info: 요청 데이터 없음")
+            return jsonify({'status': 'error', 'message': '요청 데이터가 없습니다.'}), 400
+
+        car_no = data.get('car_no', '').strip()
+        if not car_no:
+            api_log.debug("car info: 차량번호 없음")
+            return jsonify({'status': 'error', 'message': '차량번호를 입력해주세요.'}), 400
+
+        api_log.debug("car info: 차량번호: %s", car_no)
+
+        # 외부 API 호출 (authkey는 서버측에서 관리)
+        import requests
+        api_log.debug("car info: requests 모듈 임포트 완료")
+
+        api_url = 'https://diag.wecarmobility.co.kr/api/get_car_info'
+        authkey = 'ab9d332978438705e1fe52e6af0f0b025687128227dca046f9b6f6e5da5a5f7eee430edfdc6079092244a07fd737abc238e7e2ca71a36283619bfb4b978edb49'
+
+        api_log.debug("car info: 외부 API 호출 시작: %s", api_url)
+
+        try:
+            response = requests.post(
+                api_url,
+                data={
+                    'car_no': car_no,
+                    'authkey': authkey
+                },
+                timeout=10
+            )
+
+            api_log.debug("car info: 외부 API 응답 상태: %s", response.status_code)
+
+            if response.status_code == 200:
+                result = response.json()
+                api_log.debug("car info: 외부 API 응답 데이터: %s", result.get('status'))
+
+                # API 응답 확인
+                if result.get('status') == 'ok' and result.get('dto'):
+                    dto = result['dto']
+                    api_log.debug("car info: DTO 데이터 추출 완료")
+
+                    # 필요한 데이터만 추출
+                    car_info = {
+                        'status': 'ok',
+                        'data': {
+                            'diag_registered_date': dto.get('diag_registred_date'),  # 최초등록일
+                            'diag_car_id': dto.get('diag_car_id'),  # 차대번호
+                            'diag_model': dto.get('diag_model')  # 차량명
+                        }
+                    }
+
+                    api_log.debug("car info: 성공 응답 반환: %s", car_info)
+                    return jsonify(car_info), 200
+                else:
+                    error_msg = result.get('msg', '차량 정보를 찾을 수 없습니다.')
+                    api_log.debug("car info: API 에러 응답: %s", error_msg)
+                    return jsonify({
+                        'status': 'error',
+                        'message': error_msg
+                    }), 404
+            else:
+                api_log.debug("car info: HTTP 에러: %s", response.status_code)
+                return jsonify({
+                    'status': 'error',
+                    'message': f'외부 API 오류 (HTTP {response.status_code})'
+                }), 500
+
+        except requests.exceptions.Timeout:
+            api_log.debug("car info: Timeout 에러")
+            return jsonify({
+                'status': 'error',
+                'message': '요청 시간이 초과되었습니다. 다시 시도해주세요.'
+            }), 504
+        except requests.exceptions.RequestException as e:
+            api_log.debug("car info: Request 에러: %s", e)
+            api_log.error("Car info API error: %s", e)
+            return jsonify({
+                'status': 'error',
+                'message': '차량 정보 조회 중 오류가 발생했습니다.'
+            }), 500
+
+    except Exception as e:
+        api_log.exception("Get car info API error: %s", e)
+        return jsonify({
+            'status': 'error',
+            'message': f'서버 오류가 발생했습니다: {str(e)}'
+        }), 500
+
+
+# 파트너그룹 약관 페이지 (요구사항의 책임보험약관페이지)
+def partner_terms():
+    try:
+        ensure_initialized()
+        
+        # 권한 확인 (간단히)
+        if 'user_type' not in session and not getattr(current_user, 'is_authenticated', False):
+            flash('로그인이 필요합니다.', 'warning')
+            return redirect(url_for('auth.login'))
+        
+        return render_template('partner/terms.html')
+        
+    except Exception as e:
+        partner_log.error("Partner terms route error: %s", e)
+        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('partner.dashboard'))
@@ -0,0 +1,82 @@
+"""전체관리자 청구서 (단건/일괄) - 첫 요청 시 로드"""
+
+from datetime import datetime
+
+from flask import flash, redirect, render_template, request, url_for
+from flask_login import login_required
+
+from app import (
+    InsuranceApplication, KST, admin_required, db, ensure_initialized,
+)
+
+
+@login_required
+@admin_required
+def admin_invoice():
+    ensure_initialized()  # Ensure initialization
+    company = request.args.get('company', '')
+    representative = request.args.get('representative', '')
+    business_number = request.args.get('business_number', '')
+    try:
+        year = int(request.args.get('year'))
+        month = int(request.args.get('month'))
+        count = int(request.args.get('count'))
+        amount = int(request.args.get('amount'))
+    except Exception:
+        flash('요청 파라미터가 올바르지 않습니다.', 'danger')
+        return redirect(url_for('admin.settlement'))
+    return render_template('invoice.html',
+                           company=company,
+                           representative=representative,
+                           business_number=business_number,
+                           year=year,
+                           month=month,
+                           count=count,
+                           amount=amount)
+
+
+@login_required
+@admin_required
+def admin_invoice_batch():
+    ensure_initialized()  # Ensure initialization
+    # Render a combined printable page for all companies for the selected month
+    year = int(request.args.get('year', datetime.now().year))
+    month = int(request.args.get('month', datetime.now().month))
+
+    start_period = datetime(year, month, 1, tzinfo=KST)
+    if month == 12:
+        next_month = datetime(year + 1, 1, 1, tzinfo=KST)
+    else:
+        next_month = datetime(year, month + 1, 1, tzinfo=KST)
+
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('admin.settlement'))
+    rows = db.session.query(InsuranceApplication).filter(
+        InsuranceApplication.start_at.is_not(None),
+        InsuranceApplication.start_at >= start_period,
+        InsuranceApplication.start_at < next_month,
+    ).all()
+
+    by_company = {}
+    for r in rows:
+        company = r.created_by_member.company_name if r.created_by_member else '미상'
+        rep = r.created_by_member.representative if r.created_by_member else ''
+        biz = r.created_by_member.business_number if r.created_by_member else ''
+        key = (company, rep, biz)
+        by_company.setdefault(key, 0)
+        by_company[key] += 1
+
+    invoices = []
+    for (company, rep, biz), count in by_company.items():
+        amount = count * 9500
+        invoices.append({
+            'company': company,
+            'representative': rep,
+            'business_number': biz,
+            'year': year,
+            'month': month,
+            'count': count,
+            'amount': amount,
+        })
+    return render_template('invoice_batch.html', invoices=invoices)
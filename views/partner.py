@@ -0,0 +1,897 @@
+"""파트너그룹 관리자 화면 (대시보드, 회원승인, 보험승인, 정산)"""
+
+import os
+from datetime import datetime
+
+from flask import current_app, flash, redirect, render_template, request, session, url_for
+
+from app import (
+    InsuranceApplication, KST, Member, PartnerGroup, bulk_approve_applications, db,
+    discard_upload, ensure_initialized, exclude_archived, get_auth_context,
+    include_archived_requested, insurance_approved, invalidate_auth_context, parse_date,
+    partner_admin_required, partner_log, prefetch_documents, read_replica, remove_member, safe_commit,
+    store_document,
+)
+
+
+# 파트너그룹 대시보드 (요구사항의 파트너그룹별 대시보드페이지)
+@read_replica
+def partner_dashboard():
+    try:
+        ensure_initialized()
+        
+        # 세션 기반 파트너그룹 관리자 확인
+        if 'user_type' in session and session['user_type'] == 'partner_admin':
+            # 파트너그룹 관리자
+            partner_group_id = session.get('partner_group_id')
+            partner_group_name = session.get('partner_group_name')
+            
+            # 통계 계산
+            total_members = 0
+            monthly_insurance = 0
+            pending_approvals = 0
+            
+            try:
+                if db is not None and partner_group_id:
+                    try:
+                        partner_group_id_int = int(partner_group_id)
+                    except (ValueError, TypeError):
+                        partner_group_id_int = None
+                    
+                    if partner_group_id_int:
+                        # 총 회원사: 해당 파트너그룹의 role='member'인 회원 수
+                        total_members = db.session.query(Member).filter(
+                            Member.partner_group_id == partner_group_id_int,
+                            Member.role == 'member'
+                        ).count()
+                        
+                        # 이달 가입: 이번 달에 가입한 회원 수 (Member의 created_at 기준)
+                        now = datetime.now(KST)
+                        start_of_month = datetime(now.year, now.month, 1, tzinfo=KST)
+                        if now.month == 12:
+                            end_of_month = datetime(now.year + 1, 1, 1, tzinfo=KST)
+                        else:
+                            end_of_month = datetime(now.year, now.month + 1, 1, tzinfo=KST)
+                        
+                        monthly_insurance = db.session.query(Member).filter(
+                            Member.partner_group_id == partner_group_id_int,
+                            Member.role == 'member',
+                            Member.created_at.is_not(None),
+                            Member.created_at >= start_of_month,
+                            Member.created_at < end_of_month
+                        ).count()
+                        
+                        # 승인 대기: approval_status가 '신청'인 회원 수 (승인되지 않은 회원)
+                        pending_approvals = db.session.query(Member).filter(
+                            Member.partner_group_id == partner_group_id_int,
+                            Member.role == 'member',
+                            Member.approval_status == '신청'
+                        ).count()
+            except Exception as e:
+                partner_log.error("Partner dashboard stats error: %s", e)
+            
+            return render_template('partner/dashboard.html', 
+                                 is_partner_admin=True,
+                                 partner_group_id=partner_group_id,
+                                 partner_group_name=partner_group_name,
+                                 total_members=total_members,
+                                 monthly_insurance=monthly_insurance,
+                                 pending_approvals=pending_approvals)
+        
+        # Flask-Login 기반 사용자 확인
+        try:
+            from flask_login import current_user
+            is_auth = getattr(current_user, 'is_authenticated', False)
+        except Exception:
+            is_auth = False
+        
+        if not is_auth:
+            flash('로그인이 필요합니다.', 'warning')
+            return redirect(url_for('auth.login'))
+        
+        # 요청 단위 인증 컨텍스트 (load_user에서 읽은 행 재사용, 추가 쿼리 없음)
+        auth_ctx = get_auth_context()
+        user_role = auth_ctx.role if auth_ctx else session.get('user_role', 'member')
+        
+        # partner_admin 역할인 경우 추가 검증
+        if user_role == 'partner_admin' and auth_ctx is not None:
+            try:
+                if auth_ctx.approval_status != '승인':
+                    flash('관리자 권한이 없거나 승인되지 않은 계정입니다.', 'danger')
+                    return redirect(url_for('auth.login'))
+                
+                # 파트너그룹 정보 업데이트
+                if auth_ctx.partner_group_id:
+                    session['user_type'] = 'partner_admin'
+                    session['partner_group_id'] = auth_ctx.partner_group_id
+                    session['user_role'] = 'partner_admin'
+                    
+                    # 파트너그룹 이름 조회
+                    partner_group = db.session.get(PartnerGroup, auth_ctx.partner_group_id)
+                    if partner_group:
+                        session['partner_group_name'] = partner_group.name
+            except Exception as e:
+                partner_log.error("Partner admin verification error: %s", e)
+        
+        # 전체관리자가 파트너그룹을 선택한 경우
+        if user_role == 'admin' and 'admin_selected_partner_group_id' in session:
+            partner_group_id = session.get('admin_selected_partner_group_id')
+            partner_group_name = session.get('admin_selected_partner_group_name', '')
+            
+            # 통계 계산 (관리자가 파트너그룹을 선택한 경우에도 표시)
+            total_members = 0
+            monthly_insurance = 0
+            pending_approvals = 0
+            
+            try:
+                if db is not None and partner_group_id:
+                    try:
+                        partner_group_id_int = int(partner_group_id)
+                    except (ValueError, TypeError):
+                        partner_group_id_int = None
+                    
+                    if partner_group_id_int:
+                        # 총 회원사: 해당 파트너그룹의 role='member'인 회원 수
+                        total_members = db.session.query(Member).filter(
+                            Member.partner_group_id == partner_group_id_int,
+                            Member.role == 'member'
+                        ).count()
+                        
+                        # 이달 가입: 이번 달에 가입한 회원 수 (Member의 created_at 기준)
+                        now = datetime.now(KST)
+                        start_of_month = datetime(now.year, now.month, 1, tzinfo=KST)
+                        if now.month == 12:
+                            end_of_month = datetime(now.year + 1, 1, 1, tzinfo=KST)
+                        else:
+                            end_of_month = datetime(now.year, now.month + 1, 1, tzinfo=KST)
+                        
+                        monthly_insurance = db.session.query(Member).filter(
+                            Member.partner_group_id == partner_group_id_int,
+                            Member.role == 'member',
+                            Member.created_at.is_not(None),
+                            Member.created_at >= start_of_month,
+                            Member.created_at < end_of_month
+                        ).count()
+                        
+                        # 승인 대기: approval_status가 '신청'인 회원 수 (승인되지 않은 회원)
+                        pending_approvals = db.session.query(Member).filter(
+                            Member.partner_group_id == partner_group_id_int,
+                            Member.role == 'member',
+                            Member.approval_status == '신청'
+                        ).count()
+            except Exception as e:
+                partner_log.error("Admin partner dashboard stats error: %s", e)
+            
+            return render_template('partner/dashboard.html',
+                                 is_partner_admin=False,
+                                 partner_group_id=partner_group_id,
+                                 partner_group_name=partner_group_name,
+                                 is_admin=True,
+                                 total_members=total_members,
+                                 monthly_insurance=monthly_insurance,
+                                 pending_approvals=pending_approvals)
+        
+        # 회원사 로그인
+        if user_role == 'member':
+            try:
+                partner_group_id = None
+                partner_group_name = ''
+                if hasattr(current_user, 'partner_group_id') and current_user.partner_group_id:
+                    partner_group_id = current_user.partner_group_id
+                    if hasattr(current_user, 'partner_group') and current_user.partner_group:
+                        partner_group_name = current_user.partner_group.name
+                    else:
+                        # DB에서 조회
+                        if db is not None:
+                            partner_group = db.session.get(PartnerGroup, partner_group_id)
+                            if partner_group:
+                                partner_group_name = partner_group.name
+                
+                if partner_group_id:
+                    return render_template('partner/dashboard.html',
+                                         is_partner_admin=False,
+                                         partner_group_id=partner_group_id,
+                                         partner_group_name=partner_group_name)
+            except Exception as e:
+                partner_log.error("Partner dashboard member error: %s", e)
+        
+        # 전체관리자이지만 파트너그룹을 선택하지 않은 경우
+        # admin_dashboard는 @admin_required로 보호되므로 직접 접근해야 함
+        # 하지만 무한 루프를 방지하기 위해 세션 플래그 사용
+        if user_role == 'admin':
+            # admin_redirect_attempt 플래그가 없으면 한 번만 리다이렉트 시도
+            if 'admin_redirect_attempt' not in session:
+                session['admin_redirect_attempt'] = 1
+                return redirect(url_for('admin.dashboard'))
+            else:
+                # 이미 리다이렉트 시도했으면 플래그 제거하고 로그인으로
+                session.pop('admin_redirect_attempt', None)
+                flash('전체관리자 대시보드 접근 오류가 발생했습니다. 다시 로그인해주세요.', 'warning')
+                return redirect(url_for('auth.login'))
+        
+        flash('파트너그룹 접근 권한이 없습니다.', 'warning')
+        return redirect(url_for('auth.login'))
+                
+    except Exception as e:
+        partner_log.error("Partner dashboard route error: %s", e)
+        flash('대시보드 로드 중 오류가 발생했습니다.', 'danger')
+        try:
+            return render_template('partner/dashboard.html')
+        except Exception:
+            try:
+                return redirect(url_for('auth.login'))
+            except Exception:
+                return "대시보드를 불러올 수 없습니다.", 500
+
+
+# 파트너그룹 관리자페이지 (요구사항의 관리자페이지)
+@partner_admin_required
+def partner_admin(partner):
+    try:
+        partner_group_id = partner.group_id
+        partner_group_name = partner.group.name
+        
+        return render_template('partner/admin.html',
+                             partner_group_id=partner_group_id,
+                             partner_group_name=partner_group_name)
+        
+    except Exception as e:
+        partner_log.error("Partner admin route error: %s", e)
+        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('partner.dashboard'))
+
+
+# 파트너그룹 회원가입승인 페이지
+@partner_admin_required
+def partner_admin_member_approval(partner):
+    try:
+        partner_group_id = partner.group_id
+        partner_group_name = partner.group.name
+        
+        if request.method == 'POST':
+            action = request.form.get('action')
+            member_id = request.form.get('member_id')
+            
+            # 단건 승인 (신청 → 승인)
+            if action == 'approve' and member_id:
+                try:
+                    member = db.session.query(Member).filter_by(
+                        id=member_id,
+                        partner_group_id=partner_group_id,
+                        role='member'
+                    ).first()
+                    
+                    if not member:
+                        flash('해당 회원을 찾을 수 없습니다.', 'warning')
+                    else:
+                        if member.approval_status != '승인':
+                            member.approval_status = '승인'
+                            invalidate_auth_context(member.id)
+                            commit_success = safe_commit()
+                            if commit_success:
+                                flash('회원이 승인되었습니다.', 'success')
+                            else:
+                                flash('회원 승인 처리 중 오류가 발생했습니다.', 'danger')
+                        else:
+                            flash('이미 승인된 회원입니다.', 'info')
+                except Exception as e:
+                    partner_log.exception("Member approve error: %s", e)
+                    try:
+                        db.session.rollback()
+                    except Exception:
+                        pass
+                    flash('회원 승인 처리 중 오류가 발생했습니다.', 'danger')
+            
+            # 회원추가
+            elif action == 'add':
+                member_type = request.form.get('member_type', '법인사업자').strip()
+                company_name = request.form.get('company_name', '').strip()
+                position = request.form.get('position', '').strip()
+                full_name = request.form.get('full_name', '').strip()
+                license_number = request.form.get('license_number', '').strip()
+                username = request.form.get('username', '').strip()
+                password = request.form.get('password', '').strip()
+                address = request.form.get('address', '').strip()
+                business_number = request.form.get('business_number', '').strip()
+                car_dealership_number = request.form.get('car_dealership_number', '').strip()
+                corporation_number = request.form.get('corporation_number', '').strip()
+                representative = request.form.get('representative', '').strip()
+                phone = request.form.get('phone', '').strip()
+                mobile = request.form.get('mobile', '').strip()
+                email = request.form.get('email', '').strip()
+                approval_status = request.form.get('approval_status', '신청').strip()
+                memo = request.form.get('memo', '').strip()
+                settlement_method = request.form.get('settlement_method', '포인트').strip() or '포인트'
+                if settlement_method != '후불정산':
+                    settlement_method = '포인트'
+                
+                # 필수 필드 검증
+                if not company_name or not username or not password or not business_number or not car_dealership_number:
+                    flash('상사명, 아이디, 패스워드, 사업자번호, 자동차관리업 등록번호는 필수입니다.', 'warning')
+                elif not corporation_number:
+                    if member_type == '개인사업자':
+                        flash('대표자주민등록번호를 입력해주세요.', 'warning')
+                    else:
+                        flash('법인번호를 입력해주세요.', 'warning')
+                elif not position or not full_name or not license_number:
+                    flash('직책, 성명, 종사원증번호는 필수입니다.', 'warning')
+                elif not mobile or not representative:
+                    flash('휴대폰, 대표자는 필수입니다.', 'warning')
+                else:
+                    # 중복 확인 (파트너그룹 내에서)
+                    existing = db.session.query(Member).filter(
+                        Member.partner_group_id == partner_group_id,
+                        (Member.username == username) | (Member.business_number == business_number)
+                    ).first()
+                    
+                    if existing:
+                        flash('이미 존재하는 아이디 또는 사업자번호입니다.', 'danger')
+                    else:
+                        try:
+                            # 파일 업로드 처리
+                            registration_cert_path = None
+                            license_attachment_path = None
+                            
+                            # 사업자등록증 파일 처리
+                            if 'registration_cert' in request.files:
+                                try:
+                                    file = request.files['registration_cert']
+                                    if file and file.filename:
+                                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
+                                        file_ext = os.path.splitext(file.filename)[1].lower()
+                                        if file_ext in allowed_extensions:
+                                            filename = store_document(file, file_ext)
+                                            if filename:
+                                                registration_cert_path = os.path.join('uploads', filename)
+                                except Exception as e:
+                                    partner_log.error("Member add registration cert upload error: %s", e)
+                            
+                            # 종사원증 파일 처리
+                            if 'license_attachment' in request.files:
+                                try:
+                                    file = request.files['license_attachment']
+                                    if file and file.filename:
+                                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
+                                        file_ext = os.path.splitext(file.filename)[1].lower()
+                                        if file_ext in allowed_extensions:
+                                            filename = store_document(file, file_ext)
+                                            if filename:
+                                                license_attachment_path = os.path.join('uploads', filename)
+                                except Exception as e:
+                                    partner_log.error("Member add license attachment upload error: %s", e)
+                            
+                            new_member = Member(
+                                partner_group_id=partner_group_id,
+                                username=username,
+                                company_name=company_name,
+                                position=position,
+                                full_name=full_name,
+                                license_number=license_number,
+                                address=address,
+                                business_number=business_number,
+                                car_dealership_number=car_dealership_number,
+                                corporation_number=corporation_number,
+                                representative=representative,
+                                phone=phone,
+                                mobile=mobile,
+                                email=email,
+                                approval_status=approval_status,
+                                role='member',
+                                memo=memo,
+                                member_type=member_type,
+                                privacy_agreement=False,  # 관리자가 회원 추가 시 개인정보 동의는 불필요
+                                registration_cert_path=registration_cert_path,
+                                license_attachment_path=license_attachment_path,
+                                settlement_method=settlement_method
+                            )
+                            new_member.set_password(password)
+                            db.session.add(new_member)
+                            
+                            # 커밋 전 디버깅
+                            partner_log.debug("Add member: Adding %s to session", username)
+                            
+                            commit_success = safe_commit(verify=new_member, label='Add member')
+                            
+                            if commit_success:
+                                flash('회원이 추가되었습니다.', 'success')
+                            else:
+                                partner_log.error("Add member: Commit failed for %s", username)
+                                flash('회원 추가 중 오류가 발생했습니다.', 'danger')
+                        except Exception as e:
+                            partner_log.exception("Add member error: %s", e)
+                            try:
+                                db.session.rollback()
+                            except Exception:
+                                pass
+                            flash('회원 추가 중 오류가 발생했습니다.', 'danger')
+            
+            # 엑셀 업로드
+            elif action == 'excel_upload':
+                file = request.files.get('excel_file')
+                if not file:
+                    flash('엑셀 파일을 선택하세요.', 'warning')
+                else:
+                    try:
+                        import pandas as pd
+                        df = pd.read_excel(file)
+                        created = 0
+                        skipped = 0
+                        errors = []
+                        
+                        # 필수 컬럼 확인
+                        required_cols = {'username', 'company_name', 'business_number', 'car_dealership_number', 'password'}
+                        if not required_cols.issubset(set(df.columns)):
+                            flash('엑셀 컬럼이 올바르지 않습니다. (필수: username, company_name, business_number, password)', 'danger')
+                        else:
+                            for idx, row in df.iterrows():
+                                try:
+                                    username = str(row.get('username', '')).strip()
+                                    company_name = str(row.get('company_name', '')).strip()
+                                    business_number = str(row.get('business_number', '')).strip()
+                                    car_dealership_number = str(row.get('car_dealership_number', '')).strip()
+                                    password = str(row.get('password', '')).strip()
+                                    settlement_method = str(row.get('settlement_method', '포인트')).strip() or '포인트'
+                                    if settlement_method not in ('포인트', '후불정산'):
+                                        settlement_method = '포인트'
+                                    
+                                    if not username or not company_name or not business_number or not car_dealership_number or not password:
+                                        skipped += 1
+                                        continue
+                                    
+                                    # 중복 확인 (파트너그룹 내에서)
+                                    existing = db.session.query(Member).filter(
+                                        Member.partner_group_id == partner_group_id,
+                                        (Member.username == username) | (Member.business_number == business_number) | (Member.car_dealership_number == car_dealership_number)
+                                    ).first()
+                                    
+                                    if existing:
+                                        skipped += 1
+                                        continue
+                                    
+                                    new_member = Member(
+                                        partner_group_id=partner_group_id,
+                                        username=username,
+                                        company_name=company_name,
+                                        address=str(row.get('address', '') or '').strip(),
+                                        business_number=business_number,
+                                        car_dealership_number=car_dealership_number,
+                                        corporation_number=str(row.get('corporation_number', '') or '').strip(),
+                                        representative=str(row.get('representative', '') or '').strip(),
+                                        phone=str(row.get('phone', '') or '').strip(),
+                                        mobile=str(row.get('mobile', '') or '').strip(),
+                                        email=str(row.get('email', '') or '').strip(),
+                                        approval_status=str(row.get('approval_status', '신청') or '신청').strip() or '신청',
+                                        role='member',
+                                        memo=str(row.get('memo', '') or '').strip(),
+                                        member_type=str(row.get('member_type', '법인') or '법인').strip() or '법인',
+                                        privacy_agreement=bool(row.get('privacy_agreement', False)) if 'privacy_agreement' in row else False,
+                                        settlement_method=settlement_method
+                                    )
+                                    new_member.set_password(password)
+                                    db.session.add(new_member)
+                                    created += 1
+                                except Exception as e:
+                                    skipped += 1
+                                    errors.append(f"행 {idx+2}: {str(e)}")
+                                    partner_log.error("Excel upload member error at row %s: %s", idx + 2, e)
+                            
+                            # 커밋 전 디버깅
+                            partner_log.debug("Excel upload: Committing %s members", created)
+                            
+                            commit_success = safe_commit()
+                            
+                            if not commit_success:
+                                partner_log.error("Excel upload: Commit failed")
+                                flash('일괄 업로드 처리 중 오류가 발생했습니다.', 'danger')
+                            else:
+                                partner_log.debug("Excel upload: Successfully committed %s members", created)
+                                msg = f'일괄 업로드 완료: 추가 {created}건, 건너뜀 {skipped}건'
+                                if errors:
+                                    msg += f' (오류: {len(errors)}건)'
+                                flash(msg, 'success' if created > 0 else 'warning')
+                    except Exception as e:
+                        partner_log.error("Excel upload error: %s", e)
+                        flash('업로드 처리 중 오류가 발생했습니다.', 'danger')
+            
+            # 기존 수정/삭제 처리
+            elif action in ['save', 'delete'] and member_id:
+                member = db.session.get(Member, int(member_id))
+                if member and member.partner_group_id == partner_group_id:
+                    if action == 'delete':
+                        try:
+                            member_id = member.id
+                            member_username = member.username
+                            partner_log.debug("Member delete: Deleting member %s (ID: %s)", member_username, member_id)
+                            
+                            # 종속 데이터는 테이블별 DELETE, 첨부 파일은 커밋 후 백그라운드 삭제
+                            if remove_member(member):
+                                partner_log.debug("Member delete: Successfully deleted member %s", member_username)
+                                flash('회원이 삭제되었습니다.', 'success')
+                            else:
+                                partner_log.error("Member delete: Commit failed for %s", member_username)
+                                flash('회원 삭제 중 오류가 발생했습니다.', 'danger')
+                        except Exception as e:
+                            partner_log.exception("Member deletion error: %s", e)
+                            try:
+                                db.session.rollback()
+                            except Exception:
+                                pass
+                            flash('회원 삭제 중 오류가 발생했습니다.', 'danger')
+                    elif action == 'save':
+                        try:
+                            member_id = member.id
+                            member_username = member.username
+                            member.member_type = request.form.get('member_type', '법인사업자').strip()
+                            member.company_name = request.form.get('company_name', '').strip()
+                            member.position = request.form.get('position', '').strip()
+                            member.full_name = request.form.get('full_name', '').strip()
+                            member.license_number = request.form.get('license_number', '').strip()
+                            member.username = request.form.get('username', '').strip()
+                            if request.form.get('password', '').strip():
+                                member.set_password(request.form.get('password', '').strip())
+                            member.address = request.form.get('address', '').strip()
+                            member.business_number = request.form.get('business_number', '').strip()
+                            member.car_dealership_number = request.form.get('car_dealership_number', '').strip()
+                            member.corporation_number = request.form.get('corporation_number', '').strip()
+                            member.representative = request.form.get('representative', '').strip()
+                            member.phone = request.form.get('phone', '').strip()
+                            member.mobile = request.form.get('mobile', '').strip()
+                            member.email = request.form.get('email', '').strip()
+                            member.approval_status = request.form.get('approval_status', '신청')
+                            member.role = request.form.get('role', 'member')
+                            invalidate_auth_context(member.id)
+                            member.memo = request.form.get('memo', '').strip()
+                            settlement_method = request.form.get('settlement_method', member.settlement_method or '포인트').strip()
+                            if settlement_method not in ('포인트', '후불정산'):
+                                settlement_method = '포인트'
+                            member.settlement_method = settlement_method
+                            
+                            # 사업자등록증 파일 업로드 처리
+                            if 'registration_cert' in request.files:
+                                try:
+                                    file = request.files['registration_cert']
+                                    if file and file.filename:
+                                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
+                                        file_ext = os.path.splitext(file.filename)[1].lower()
+                                        if file_ext in allowed_extensions:
+                                            filename = store_document(file, file_ext)
+                                            if filename:
+                                                discard_upload(member.registration_cert_path)  # 기존 파일 정리
+                                                member.registration_cert_path = os.path.join('uploads', filename)
+                                                partner_log.debug("Registration cert updated successfully: %s", member.registration_cert_path)
+                                            else:
+                                                partner_log.error("Registration cert file was not saved properly (empty file): %s", file.filename)
+                                        else:
+                                            flash(f'허용되지 않은 파일 형식입니다. (PDF, JPG, PNG만 가능)', 'warning')
+                                except Exception as e:
+                                    partner_log.exception("Registration cert upload error: %s", e)
+                                    flash('사업자등록증 파일 업로드 중 오류가 발생했습니다.', 'warning')
+                                    # 파일 업로드 실패해도 다른 정보는 저장
+                            
+                            # 종사원증 파일 업로드 처리
+                            if 'license_attachment' in request.files:
+                                try:
+                                    file = request.files['license_attachment']
+                                    if file and file.filename:
+                                        allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
+                                        file_ext = os.path.splitext(file.filename)[1].lower()
+                                        if file_ext in allowed_extensions:
+                                            filename = store_document(file, file_ext)
+                                            if filename:
+                                                discard_upload(member.license_attachment_path)  # 기존 파일 정리
+                                                member.license_attachment_path = os.path.join('uploads', filename)
+                                                partner_log.debug("License attachment updated successfully: %s", member.license_attachment_path)
+                                            else:
+                                                partner_log.error("License attachment file was not saved properly (empty file): %s", file.filename)
+                                        else:
+                                            flash(f'허용되지 않은 파일 형식입니다. (PDF, JPG, PNG만 가능)', 'warning')
+                                except Exception as e:
+                                    partner_log.exception("License attachment upload error: %s", e)
+                                    flash('종사원증 파일 업로드 중 오류가 발생했습니다.', 'warning')
+                            
+                            partner_log.debug("Member save: Updating member %s (ID: %s)", member_username, member_id)
+                            
+                            commit_success = safe_commit(verify=member, label='Member save')
+                            
+                            if commit_success:
+                                flash('회원 정보가 저장되었습니다.', 'success')
+                            else:
+                                partner_log.error("Member save: Commit failed for %s", member_username)
+                                flash('회원 정보 저장 중 오류가 발생했습니다.', 'danger')
+                        except Exception as e:
+                            partner_log.exception("Member update error: %s", e)
+                            try:
+                                db.session.rollback()
+                            except Exception:
+                                pass
+                            flash('회원 정보 저장 중 오류가 발생했습니다.', 'danger')
+            
+            return redirect(url_for('partner.member_approval', edit_id=request.args.get('edit_id')))
+        
+        edit_id = request.args.get('edit_id')
+        members = db.session.query(Member).filter_by(
+            partner_group_id=partner_group_id,
+            role='member'
+        ).order_by(Member.created_at.desc()).all()
+        prefetch_documents([path for m in members for path in (m.registration_cert_path, m.license_attachment_path)])
+
+        return render_template('partner/admin_member_approval.html',
+                             members=members,
+                             partner_group_name=partner_group_name,
+                             edit_id=edit_id)
+        
+    except Exception as e:
+        partner_log.error("Partner admin member approval error: %s", e)
+        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('partner.admin'))
+
+
+# 파트너그룹 책임보험승인 페이지
+@partner_admin_required
+def partner_admin_insurance_approval(partner):
+    try:
+        partner_group_id = partner.group_id
+        partner_group_name = partner.group.name
+        
+        if request.method == 'POST':
+            action = request.form.get('action')
+            
+            if action == 'bulk_approve':
+                # 일괄 승인
+                approved_count, commit_success = bulk_approve_applications(partner_group_id=partner_group_id)
+                
+                if commit_success:
+                    partner_log.debug("Insurance bulk approve: Successfully approved %s applications", approved_count)
+                    flash(f'{approved_count}건이 일괄 승인되었습니다.', 'success')
+                else:
+                    partner_log.error("Insurance bulk approve: Commit failed after %s applications", approved_count)
+                    flash('일괄 승인 처리 중 오류가 발생했습니다.', 'danger')
+            
+            elif action in ['save', 'delete', 'approve']:
+                app_id = request.form.get('app_id')
+                if app_id:
+                    application = db.session.get(InsuranceApplication, int(app_id))
+                    if application and application.partner_group_id == partner_group_id:
+                        if action == 'approve':
+                            try:
+                                app_id = application.id
+                                now = datetime.now(KST)
+                                application.approved_at = now
+                                application.status = '조합승인'
+                                
+                                partner_log.debug("Insurance approve: Approving application ID %s", app_id)
+                                
+                                commit_success = safe_commit()
+                                
+                                if commit_success:
+                                    partner_log.debug("Insurance approve: Successfully approved application ID %s", app_id)
+                                    insurance_approved.send(
+                                        current_app._get_current_object(), partner_group_id=partner_group_id,
+                                        approved_at=now, id_range=(app_id, app_id), count=1,
+                                    )
+                                    flash('승인되었습니다.', 'success')
+                                else:
+                                    partner_log.error("Insurance approve: Commit failed for ID %s", app_id)
+                                    flash('승인 처리 중 오류가 발생했습니다.', 'danger')
+                            except Exception as e:
+                                partner_log.exception("Insurance approve error: %s", e)
+                                try:
+                                    db.session.rollback()
+                                except Exception:
+                                    pass
+                                flash('승인 처리 중 오류가 발생했습니다.', 'danger')
+                        
+                        elif action == 'delete':
+                            try:
+                                app_id = application.id
+                                db.session.delete(application)
+                                
+                                partner_log.debug("Insurance delete (approval): Deleting application ID %s", app_id)
+                                
+                                commit_success = safe_commit()
+                                
+                                if commit_success:
+                                    partner_log.debug("Insurance delete (approval): Successfully deleted ID %s", app_id)
+                                    flash('삭제되었습니다.', 'success')
+                                else:
+                                    partner_log.error("Insurance delete (approval): Commit failed for ID %s", app_id)
+                                    flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                            except Exception as e:
+                                partner_log.exception("Insurance deletion error: %s", e)
+                                try:
+                                    db.session.rollback()
+                                except Exception:
+                                    pass
+                                flash('삭제 처리 중 오류가 발생했습니다.', 'danger')
+                        
+                        elif action == 'save':
+                            try:
+                                app_id = application.id
+                                application.car_plate = request.form.get('car_plate', '').strip()
+                                application.vin = request.form.get('vin', '').strip()
+                                application.car_name = request.form.get('car_name', '').strip()
+                                application.car_registered_at = parse_date(request.form.get('car_registered_at', ''))
+                                application.insured_code = request.form.get('insured_code', '').strip()
+                                application.contractor_code = request.form.get('contractor_code', '').strip()
+                                application.memo = request.form.get('memo', '').strip()
+                                
+                                partner_log.debug("Insurance save (approval): Updating application ID %s", app_id)
+                                
+                                commit_success = safe_commit(verify=application, label='Insurance save (approval)')
+                                
+                                if commit_success:
+                                    flash('저장되었습니다.', 'success')
+                                else:
+                                    partner_log.error("Insurance save (approval): Commit failed for ID %s", app_id)
+                                    flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+                            except Exception as e:
+                                partner_log.exception("Insurance save error: %s", e)
+                                try:
+                                    db.session.rollback()
+                                except Exception:
+                                    pass
+                                flash('저장 처리 중 오류가 발생했습니다.', 'danger')
+            
+            return redirect(url_for('partner.insurance_approval', 
+                                  req_start=request.args.get('req_start'),
+                                  req_end=request.args.get('req_end'),
+                                  approved=request.args.get('approved'),
+                                  appr_start=request.args.get('appr_start'),
+                                  appr_end=request.args.get('appr_end'),
+                                  edit_id=request.args.get('edit_id')))
+        
+        # 검색 조건
+        req_start = parse_date(request.args.get('req_start', ''))
+        req_end = parse_date(request.args.get('req_end', ''))
+        approved = request.args.get('approved', '전체')
+        appr_start = parse_date(request.args.get('appr_start', ''))
+        appr_end = parse_date(request.args.get('appr_end', ''))
+        edit_id = request.args.get('edit_id')
+        
+        q = exclude_archived(
+            db.session.query(InsuranceApplication).filter_by(partner_group_id=partner_group_id),
+            include_archived_requested(),
+        )
+        
+        # 신청시간 기준 검색
+        if req_start:
+            q = q.filter(InsuranceApplication.created_at >= datetime.combine(req_start, datetime.min.time(), tzinfo=KST))
+        if req_end:
+            q = q.filter(InsuranceApplication.created_at <= datetime.combine(req_end, datetime.max.time(), tzinfo=KST))
+        
+        # 승인여부 검색
+        if approved == '승인':
+            q = q.filter(InsuranceApplication.approved_at.is_not(None))
+        elif approved == '미승인':
+            q = q.filter(InsuranceApplication.approved_at.is_(None))
+        
+        # 조합승인시간 기준 검색
+        if appr_start:
+            q = q.filter(InsuranceApplication.approved_at >= datetime.combine(appr_start, datetime.min.time(), tzinfo=KST))
+        if appr_end:
+            q = q.filter(InsuranceApplication.approved_at <= datetime.combine(appr_end, datetime.max.time(), tzinfo=KST))
+        
+        applications = q.order_by(InsuranceApplication.created_at.desc()).all()
+        
+        # 상태 재계산
+        for app in applications:
+            app.recompute_status()
+        safe_commit()
+        
+        return render_template('partner/admin_insurance_approval.html',
+                             applications=applications,
+                             partner_group_name=partner_group_name,
+                             req_start=req_start,
+                             req_end=req_end,
+                             approved=approved,
+                             appr_start=appr_start,
+                             appr_end=appr_end,
+                             edit_id=edit_id)
+        
+    except Exception as e:
+        partner_log.exception("Partner admin insurance approval error: %s", e)
+        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('partner.admin'))
+
+
+# 파트너그룹 정산 페이지
+@partner_admin_required
+@read_replica
+def partner_admin_settlement(partner):
+    try:
+        partner_group_id = partner.group_id
+        partner_group = partner.group
+        partner_group_name = partner_group.name
+        
+        # 현재 날짜를 timezone-aware로 가져오기
+        now = datetime.now(KST)
+        try:
+            year = int(request.args.get('year', now.year))
+        except (ValueError, TypeError):
+            year = now.year
+        try:
+            month = int(request.args.get('month', now.month))
+        except (ValueError, TypeError):
+            month = now.month
+        
+        # 월 유효성 검사
+        if month < 1 or month > 12:
+            month = now.month
+        if year < 2000 or year > 2100:
+            year = now.year
+        
+        # 정산 데이터 계산
+        start_period = datetime(year, month, 1, tzinfo=KST)
+        if month == 12:
+            next_month = datetime(year + 1, 1, 1, tzinfo=KST)
+        else:
+            next_month = datetime(year, month + 1, 1, tzinfo=KST)
+        
+        applications = db.session.query(InsuranceApplication).filter(
+            InsuranceApplication.partner_group_id == partner_group_id,
+            InsuranceApplication.start_at.is_not(None),
+            InsuranceApplication.start_at >= start_period,
+            InsuranceApplication.start_at < next_month,
+        ).all()
+        
+        # 회사별 정산 데이터 집계
+        settlements = {}
+        for app in applications:
+            try:
+                # created_by_member가 None일 수 있으므로 안전하게 처리
+                if app.created_by_member:
+                    company_name = app.created_by_member.company_name or ''
+                    representative = app.created_by_member.representative or ''
+                    business_number = app.created_by_member.business_number or ''
+                    settlement_method = app.created_by_member.settlement_method or '포인트'
+                    
+                    company_key = (company_name, representative, business_number)
+                    if company_key not in settlements:
+                        settlements[company_key] = {
+                            'company_name': company_name,
+                            'representative': representative,
+                            'business_number': business_number,
+                            'settlement_method': settlement_method,
+                            'count': 0,
+                            'amount': 0
+                        }
+                    else:
+                        if not settlements[company_key].get('settlement_method'):
+                            settlements[company_key]['settlement_method'] = settlement_method
+                    settlements[company_key]['count'] += 1
+                    settlements[company_key]['amount'] += 9500  # 건수 × 9,500원
+            except Exception as app_err:
+                partner_log.error("Settlement aggregation error for app %s: %s", app.id, app_err)
+                continue
+        
+        total_count = sum(s['count'] for s in settlements.values())
+        total_amount = sum(s['amount'] for s in settlements.values())
+        
+        # PartnerGroup 객체를 딕셔너리로 변환 (JSON 직렬화 가능하도록)
+        partner_group_dict = None
+        if partner_group:
+            partner_group_dict = {
+                'id': partner_group.id,
+                'name': partner_group.name,
+                'business_number': partner_group.business_number or '',
+                'representative': partner_group.representative or '',
+                'phone': partner_group.phone or '',
+                'mobile': partner_group.mobile or '',
+                'address': partner_group.address or '',
+                'bank_name': partner_group.bank_name or '',
+                'account_number': partner_group.account_number or '',
+            }
+        
+        return render_template('partner/admin_settlement.html',
+                             settlements=list(settlements.values()),
+                             partner_group=partner_group_dict,
+                             partner_group_name=partner_group_name,
+                             year=year,
+                             month=month,
+                             total_count=total_count,
+                             total_amount=total_amount)
+        
+    except Exception as e:
+        partner_log.exception("Partner admin settlement error: %s", e)
+        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('partner.admin'))
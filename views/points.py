@@ -0,0 +1,762 @@
+"""포인트/입금 (포인트 관리, 입금요청, 가상계좌)"""
+
+import uuid
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from flask import flash, jsonify, redirect, render_template, request, send_file, session, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import func
+
+from app import (
+    DepositHistory, DepositRequest, KST, Member, PointAdjustment, VirtualAccount, db,
+    ensure_initialized, partner_admin_required, partner_log, read_replica, safe_commit,
+)
+
+
+@partner_admin_required
+def partner_admin_point_management(partner):
+    try:
+        partner_group_id = partner.group_id
+        partner_group_name = partner.group.name
+        
+        if request.method == 'POST':
+            action = request.form.get('action')
+            
+            if action == 'deposit':
+                try:
+                    member_identifier = request.form.get('member_id') or request.form.get('member_username')
+                    bank_name = request.form.get('bank_name', '').strip()
+                    account_number = request.form.get('account_number', '').strip()
+                    deposit_amount_raw = request.form.get('deposit_amount', '').replace(',', '').strip()
+                    
+                    if not member_identifier or not bank_name or not account_number or not deposit_amount_raw:
+                        flash('회원, 은행, 계좌번호, 입금액은 필수입니다.', 'warning')
+                        return redirect(url_for('points.management'))
+                    
+                    try:
+                        deposit_amount = int(deposit_amount_raw)
+                    except ValueError:
+                        deposit_amount = 0
+                    
+                    if deposit_amount <= 0:
+                        flash('입금액은 0보다 큰 숫자여야 합니다.', 'warning')
+                        return redirect(url_for('points.management'))
+                    
+                    member = None
+                    # member_id 우선 확인
+                    try:
+                        member_id = int(member_identifier)
+                        member = db.session.get(Member, member_id)
+                    except (TypeError, ValueError):
+                        member = None
+                    
+                    if member is None:
+                        member = db.session.query(Member).filter(
+                            Member.partner_group_id == partner_group_id,
+                            Member.username == member_identifier
+                        ).first()
+                    
+                    if member is None or member.partner_group_id != partner_group_id:
+                        flash('선택한 회원을 찾을 수 없습니다.', 'danger')
+                        return redirect(url_for('points.management'))
+                    
+                    deposit_date_str = request.form.get('deposit_date', '').strip()
+                    deposit_date = datetime.now(KST)
+                    if deposit_date_str:
+                        try:
+                            deposit_date = datetime.strptime(deposit_date_str, '%Y-%m-%dT%H:%M')
+                            if deposit_date.tzinfo is None:
+                                deposit_date = deposit_date.replace(tzinfo=KST)
+                        except ValueError:
+                            flash('입금일시는 YYYY-MM-DDTHH:MM 형식으로 입력해주세요.', 'warning')
+                            return redirect(url_for('points.management'))
+                    
+                    deposit = DepositHistory(
+                        member_id=member.id,
+                        partner_group_id=partner_group_id,
+                        bank_name=bank_name,
+                        account_number=account_number,
+                        deposit_amount=deposit_amount,
+                        deposit_date=deposit_date
+                    )
+                    db.session.add(deposit)
+                    
+                    member.point_balance = (member.point_balance or 0) + deposit_amount
+                    
+                    if not safe_commit():
+                        flash('입금현황 저장 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash('입금현황이 저장되었습니다.', 'success')
+                    
+                except Exception as e:
+                    partner_log.exception("Point deposit error: %s", e)
+                    try:
+                        db.session.rollback()
+                    except Exception:
+                        pass
+                    flash('입금현황 저장 중 오류가 발생했습니다.', 'danger')
+                
+                return redirect(url_for('points.management'))
+            
+            elif action == 'adjust_points':
+                try:
+                    member_id_value = request.form.get('member_id')
+                    decrease_raw = (request.form.get('point_decrease') or '0').replace(',', '').strip()
+                    increase_raw = (request.form.get('point_increase') or '0').replace(',', '').strip()
+                    change_note = request.form.get('change_note', '').strip()
+                    
+                    if not member_id_value:
+                        flash('포인트를 수정할 회원을 선택해주세요.', 'warning')
+                        return redirect(url_for('points.management'))
+                    
+                    try:
+                        member_id_int = int(member_id_value)
+                    except (TypeError, ValueError):
+                        flash('잘못된 회원 정보입니다.', 'danger')
+                        return redirect(url_for('points.management'))
+                    
+                    member = db.session.get(Member, member_id_int)
+                    if member is None or member.partner_group_id != partner_group_id:
+                        flash('선택한 회원을 찾을 수 없습니다.', 'danger')
+                        return redirect(url_for('points.management'))
+                    
+                    try:
+                        decrease_amount = max(int(decrease_raw or 0), 0)
+                    except ValueError:
+                        decrease_amount = 0
+                    
+                    try:
+                        increase_amount = max(int(increase_raw or 0), 0)
+                    except ValueError:
+                        increase_amount = 0
+                    
+                    if decrease_amount == 0 and increase_amount == 0:
+                        flash('포인트 차감 또는 증가 금액을 입력해주세요.', 'warning')
+                        return redirect(url_for('points.management'))
+                    
+                    current_balance = member.point_balance or 0
+                    new_balance = current_balance - decrease_amount + increase_amount
+                    if new_balance < 0:
+                        new_balance = 0
+                    
+                    member.point_balance = new_balance
+                    
+                    note_parts = []
+                    if decrease_amount > 0:
+                        note_parts.append(f"포인트차감 {decrease_amount:,}원")
+                    if increase_amount > 0:
+                        note_parts.append(f"포인트증가 {increase_amount:,}원")
+                    if change_note:
+                        note_parts.append(change_note)
+                    note_text = ' / '.join(note_parts) if note_parts else '변경 없음'
+                    
+                    adjustment = PointAdjustment(
+                        member_id=member.id,
+                        partner_group_id=partner_group_id,
+                        decrease_amount=decrease_amount,
+                        increase_amount=increase_amount,
+                        change_amount=increase_amount - decrease_amount,
+                        note=note_text
+                    )
+                    db.session.add(adjustment)
+                    
+                    if not safe_commit():
+                        flash('포인트 수정 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash('포인트가 수정되었습니다.', 'success')
+                except Exception as e:
+                    partner_log.exception("Point adjust error: %s", e)
+                    try:
+                        db.session.rollback()
+                    except Exception:
+                        pass
+                    flash('포인트 수정 중 오류가 발생했습니다.', 'danger')
+                
+                return redirect(url_for('points.management'))
+            
+            elif action == 'export_excel':
+                try:
+                    members = db.session.query(Member).filter(
+                        Member.partner_group_id == partner_group_id,
+                        Member.approval_status == '승인'
+                    ).order_by(Member.company_name.asc()).all()
+                    
+                    from openpyxl import Workbook
+
+                    wb = Workbook()
+                    ws = wb.active
+                    ws.title = "포인트현황"
+                    ws.append(['아이디', '상사명', '대표자', '사업자번호', '잔류포인트', '누적입금액', '포인트현황'])
+                    
+                    for member in members:
+                        total_deposit = db.session.query(
+                            func.coalesce(func.sum(DepositHistory.deposit_amount), 0)
+                        ).filter(
+                            DepositHistory.member_id == member.id
+                        ).scalar() or 0
+                        
+                        point_balance = member.point_balance or 0
+                        total_points = point_balance + total_deposit
+                        
+                        ws.append([
+                            member.username or '',
+                            member.company_name or '',
+                            member.representative or '',
+                            member.business_number or '',
+                            point_balance,
+                            total_deposit,
+                            total_points
+                        ])
+                    
+                    output = BytesIO()
+                    wb.save(output)
+                    output.seek(0)
+                    
+                    filename = f"point_management_{datetime.now(KST).strftime('%Y%m%d_%H%M%S')}.xlsx"
+                    return send_file(
+                        output,
+                        as_attachment=True,
+                        download_name=filename,
+                        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                    )
+                except Exception as e:
+                    partner_log.exception("Point export error: %s", e)
+                    flash('엑셀 다운로드 중 오류가 발생했습니다.', 'danger')
+                    return redirect(url_for('points.management'))
+
+            elif action == 'confirm_deposit_request':
+                try:
+                    request_id = request.form.get('deposit_request_id')
+                    if not request_id:
+                        flash('입금신청 정보를 찾을 수 없습니다.', 'warning')
+                        return redirect(url_for('points.management'))
+                    
+                    deposit_request = db.session.get(DepositRequest, int(request_id))
+                    if not deposit_request or deposit_request.partner_group_id != partner_group_id:
+                        flash('입금신청 정보를 찾을 수 없습니다.', 'warning')
+                        return redirect(url_for('points.management'))
+                    
+                    if deposit_request.status == 'confirmed':
+                        flash('이미 확인 처리된 입금신청입니다.', 'warning')
+                        return redirect(url_for('points.management'))
+                    
+                    # 회원 정보 조회
+                    member = db.session.get(Member, deposit_request.member_id)
+                    if not member:
+                        flash('회원 정보를 찾을 수 없습니다.', 'danger')
+                        return redirect(url_for('points.management'))
+                    
+                    # 입금 내역 기록
+                    deposit_history = DepositHistory(
+                        member_id=member.id,
+                        partner_group_id=partner_group_id,
+                        bank_name=deposit_request.bank_name,
+                        account_number='249-13-000395-8',  # 부산은행 계좌번호
+                        deposit_amount=deposit_request.amount,
+                        deposit_date=datetime.now(KST)
+                    )
+                    db.session.add(deposit_history)
+                    
+                    # 포인트 증가
+                    current_balance = member.point_balance or 0
+                    member.point_balance = current_balance + deposit_request.amount
+                    
+                    # 포인트 조정 내역 기록
+                    point_adjustment = PointAdjustment(
+                        member_id=member.id,
+                        partner_group_id=partner_group_id,
+                        decrease_amount=0,
+                        increase_amount=deposit_request.amount,
+                        change_amount=deposit_request.amount,
+                        note=f'입금신청 확인 (입금자: {deposit_request.account_holder}, 은행: {deposit_request.bank_name})'
+                    )
+                    db.session.add(point_adjustment)
+                    
+                    # 입금신청 상태 업데이트
+                    deposit_request.status = 'confirmed'
+                    deposit_request.confirmed_at = datetime.now(KST)
+                    
+                    if not safe_commit():
+                        flash('입금신청 확인 처리 중 오류가 발생했습니다.', 'danger')
+                    else:
+                        flash(f'입금신청을 확인 처리했습니다. 포인트 {deposit_request.amount:,}원이 반영되었습니다.', 'success')
+                except Exception as e:
+                    partner_log.exception("Deposit request confirm error: %s", e)
+                    try:
+                        db.session.rollback()
+                    except Exception:
+                        pass
+                    flash('입금신청 확인 처리 중 오류가 발생했습니다.', 'danger')
+
+                return redirect(url_for('points.management'))
+        
+        members = db.session.query(Member).filter(
+            Member.partner_group_id == partner_group_id,
+            Member.approval_status == '승인'
+        ).order_by(Member.company_name.asc()).all()
+        
+        member_rows = []
+        
+        for member in members:
+            recent_deposits = db.session.query(DepositHistory).filter(
+                DepositHistory.member_id == member.id
+            ).order_by(DepositHistory.deposit_date.desc()).limit(3).all()
+            
+            recent_display = [
+                f"{deposit.bank_name}/{deposit.account_number}/{deposit.deposit_amount:,}원"
+                for deposit in recent_deposits
+            ]
+            
+            total_deposit = db.session.query(
+                func.coalesce(func.sum(DepositHistory.deposit_amount), 0)
+            ).filter(
+                DepositHistory.member_id == member.id
+            ).scalar() or 0
+            
+            point_balance = member.point_balance or 0
+            last_adjustment = db.session.query(PointAdjustment).filter(
+                PointAdjustment.member_id == member.id
+            ).order_by(PointAdjustment.created_at.desc()).first()
+            last_adjustment_note = last_adjustment.note if last_adjustment else ''
+            
+            member_rows.append({
+                'member': member,
+                'point_balance': point_balance,
+                'total_deposit': total_deposit,
+                'recent_deposits': recent_display,
+                'last_adjustment_note': last_adjustment_note,
+                'last_adjustment_at': last_adjustment.created_at if last_adjustment else None
+            })
+        
+        pending_deposit_requests = db.session.query(DepositRequest).filter(
+            DepositRequest.partner_group_id == partner_group_id,
+            DepositRequest.status == 'requested'
+        ).order_by(DepositRequest.created_at.desc()).all()
+        
+        return render_template(
+            'partner/admin_point_management.html',
+            partner_group_id=partner_group_id,
+            partner_group_name=partner_group_name,
+            members=members,
+            member_rows=member_rows,
+            deposit_requests=pending_deposit_requests
+        )
+    
+    except Exception as e:
+        partner_log.exception("Partner point management error: %s", e)
+        flash('페이지 로드 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('partner.dashboard'))
+
+
+@partner_admin_required(api=True, denied=({'count': 0, 'error': 'Unauthorized'}, 401),
+                        missing_group=({'count': 0, 'error': 'Partner group not found'}, 400))
+def partner_admin_deposit_request_count(partner):
+    """입금신청 개수 확인 API (알림용)"""
+    try:
+        partner_group_id = partner.group_id
+        
+        count = db.session.query(DepositRequest).filter(
+            DepositRequest.partner_group_id == partner_group_id,
+            DepositRequest.status == 'requested'
+        ).count()
+        
+        return jsonify({'count': count, 'success': True})
+    
+    except Exception as e:
+        partner_log.error("Deposit request count error: %s", e)
+        return jsonify({'count': 0, 'error': str(e)}), 500
+
+
+@partner_admin_required
+@read_replica
+def partner_admin_point_history(member_id, partner):
+    """회원의 포인트 입출금 세부내역 조회"""
+    try:
+        partner_group_id = partner.group_id
+        
+        # 회원 정보 조회
+        member = db.session.query(Member).filter_by(
+            id=member_id, 
+            partner_group_id=partner_group_id
+        ).first()
+        
+        if not member:
+            flash('회원 정보를 찾을 수 없습니다.', 'danger')
+            return redirect(url_for('points.management'))
+        
+        partner_group_name = partner.group.name
+        
+        # 입금 내역 조회 (최신순)
+        deposit_history = db.session.query(DepositHistory).filter_by(
+            member_id=member_id
+        ).order_by(DepositHistory.deposit_date.desc()).all()
+        
+        # 포인트 조정 내역 조회 (최신순)
+        point_adjustments = db.session.query(PointAdjustment).filter_by(
+            member_id=member_id
+        ).order_by(PointAdjustment.created_at.desc()).all()
+        
+        # 통합 내역 생성 (시간순 정렬)
+        transactions = []
+        
+        # 입금 내역 추가
+        for deposit in deposit_history:
+            transactions.append({
+                'type': 'deposit',
+                'date': deposit.deposit_date,
+                'amount': deposit.deposit_amount,
+                'description': f'{deposit.bank_name} {deposit.account_number}',
+                'note': f'입금 {deposit.deposit_amount:,}원',
+                'balance_change': f'+{deposit.deposit_amount:,}원'
+            })
+        
+        # 포인트 조정 내역 추가
+        for adjustment in point_adjustments:
+            if adjustment.decrease_amount > 0:
+                transactions.append({
+                    'type': 'point_decrease',
+                    'date': adjustment.created_at,
+                    'amount': -adjustment.decrease_amount,
+                    'description': '포인트 차감',
+                    'note': adjustment.note or '포인트 차감',
+                    'balance_change': f'-{adjustment.decrease_amount:,}원'
+                })
+            
+            if adjustment.increase_amount > 0:
+                transactions.append({
+                    'type': 'point_increase',
+                    'date': adjustment.created_at,
+                    'amount': adjustment.increase_amount,
+                    'description': '포인트 증가',
+                    'note': adjustment.note or '포인트 증가',
+                    'balance_change': f'+{adjustment.increase_amount:,}원'
+                })
+        
+        # 날짜순 정렬 (최신순)
+        transactions.sort(key=lambda x: x['date'], reverse=True)
+        
+        # 현재 포인트 잔액
+        current_balance = member.point_balance or 0
+        
+        # 총 입금액
+        total_deposits = sum(d.deposit_amount for d in deposit_history)
+        
+        # 총 포인트 차감액
+        total_decreases = sum(a.decrease_amount for a in point_adjustments)
+        
+        # 총 포인트 증가액
+        total_increases = sum(a.increase_amount for a in point_adjustments)
+        
+        return render_template(
+            'partner/admin_point_history.html',
+            member=member,
+            partner_group_name=partner_group_name,
+            transactions=transactions,
+            current_balance=current_balance,
+            total_deposits=total_deposits,
+            total_decreases=total_decreases,
+            total_increases=total_increases
+        )
+    
+    except Exception as e:
+        partner_log.exception("Point history error: %s", e)
+        flash('포인트 내역 조회 중 오류가 발생했습니다.', 'danger')
+        return redirect(url_for('points.management'))
+
+
+@partner_admin_required(api=True)
+def partner_admin_deposit_summary(partner):
+    """입금신청/확인 현황 요약"""
+    try:
+        partner_group_id = partner.group_id
+        
+        requests = db.session.query(DepositRequest, Member).join(Member, DepositRequest.member_id == Member.id).filter(
+            DepositRequest.partner_group_id == partner_group_id
+        ).order_by(DepositRequest.created_at.desc()).all()
+        
+        summary = {}
+        for deposit_request, member in requests:
+            month_key = deposit_request.created_at.strftime('%Y-%m') if deposit_request.created_at else '미상'
+            entry = {
+                'company_name': member.company_name or member.username or '-',
+                'amount': deposit_request.amount,
+                'status': '입금신청' if deposit_request.status == 'requested' else '확인',
+                'requested_at': deposit_request.created_at.strftime('%Y-%m-%d %H:%M') if deposit_request.created_at else '',
+                'confirmed_at': deposit_request.confirmed_at.strftime('%Y-%m-%d %H:%M') if deposit_request.confirmed_at else ''
+            }
+            summary.setdefault(month_key, []).append(entry)
+        
+        # 정렬 (최근 월부터)
+        sorted_summary = [
+            {'month': month, 'items': summary[month]}
+            for month in sorted(summary.keys(), reverse=True)
+        ]
+        
+        return jsonify({'success': True, 'data': sorted_summary})
+    
+    except Exception as e:
+        partner_log.exception("Deposit summary error: %s", e)
+        return jsonify({'success': False, 'message': '입금현황 요약을 불러오는 중 오류가 발생했습니다.'}), 500
+
+
+def partner_virtual_account():
+    try:
+        ensure_initialized()
+        
+        data = request.get_json(silent=True) or request.form
+        action_user_type = None
+        partner_group_id = None
+        target_member = None
+        
+        if 'user_type' in session and session['user_type'] == 'partner_admin':
+            action_user_type = 'partner_admin'
+            partner_group_id = session.get('partner_group_id')
+            
+            if not partner_group_id:
+                return jsonify({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}), 400
+            
+            member_identifier = data.get('member_id') or data.get('member_username')
+            if not member_identifier:
+                return jsonify({'success': False, 'message': '회원 정보를 입력해주세요.'}), 400
+            
+            try:
+                member_id = int(member_identifier)
+                target_member = db.session.get(Member, member_id)
+            except (TypeError, ValueError):
+                target_member = None
+            
+            if target_member is None:
+                target_member = db.session.query(Member).filter(
+                    Member.partner_group_id == partner_group_id,
+                    Member.username == member_identifier
+                ).first()
+            
+            if target_member is None or target_member.partner_group_id != partner_group_id:
+                return jsonify({'success': False, 'message': '선택한 회원을 찾을 수 없습니다.'}), 404
+        
+        else:
+            action_user_type = 'member'
+            if not current_user.is_authenticated:
+                return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
+            
+            partner_group_id = current_user.partner_group_id
+            if not partner_group_id:
+                return jsonify({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}), 400
+            
+            target_member = db.session.get(Member, current_user.id)
+            if target_member is None:
+                return jsonify({'success': False, 'message': '회원 정보를 확인할 수 없습니다.'}), 404
+        
+        account_holder = (data.get('account_holder') or '').strip()
+        bank_name = (data.get('bank_name') or '').strip()
+        deposit_amount_raw = (data.get('deposit_amount') or '').replace(',', '').strip()
+        
+        if not account_holder or not bank_name or not deposit_amount_raw:
+            return jsonify({'success': False, 'message': '입금주, 은행, 입금액은 필수입니다.'}), 400
+        
+        try:
+            deposit_amount = int(deposit_amount_raw)
+        except ValueError:
+            deposit_amount = 0
+        
+        if deposit_amount <= 0:
+            return jsonify({'success': False, 'message': '입금액은 0보다 큰 숫자여야 합니다.'}), 400
+        
+        def generate_account_number():
+            while True:
+                candidate = datetime.now(KST).strftime('%y%m%d') + str(uuid.uuid4().int)[-8:]
+                existing = db.session.query(VirtualAccount).filter(
+                    VirtualAccount.virtual_account_number == candidate
+                ).first()
+                if existing is None:
+                    return candidate
+        
+        # 기존 대기 중인 가상계좌 만료 처리
+        db.session.query(VirtualAccount).filter(
+            VirtualAccount.member_id == target_member.id,
+            VirtualAccount.status == '대기'
+        ).update({'status': '만료'}, synchronize_session=False)
+        
+        virtual_account_number = generate_account_number()
+        expiry_date = datetime.now(KST).date() + timedelta(days=3)
+        
+        virtual_account = VirtualAccount(
+            member_id=target_member.id,
+            partner_group_id=partner_group_id,
+            account_holder=account_holder,
+            bank_name=bank_name,
+            virtual_account_number=virtual_account_number,
+            deposit_amount=deposit_amount,
+            expiry_date=expiry_date,
+            status='대기'
+        )
+        db.session.add(virtual_account)
+        
+        if not safe_commit():
+            return jsonify({'success': False, 'message': '가상계좌 발급 중 오류가 발생했습니다.'}), 500
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'member_username': target_member.username,
+                'bank_name': bank_name,
+                'virtual_account_number': virtual_account_number,
+                'deposit_amount': deposit_amount,
+                'expiry_date': expiry_date.strftime('%Y-%m-%d'),
+                'account_holder': account_holder
+            }
+        })
+    
+    except Exception as e:
+        partner_log.exception("Virtual account issue error: %s", e)
+        return jsonify({'success': False, 'message': '가상계좌 발급 중 오류가 발생했습니다.'}), 500
+
+
+@login_required
+def virtual_account():
+    """일반 회원용 가상계좌 발급"""
+    try:
+        ensure_initialized()
+        
+        data = request.get_json(silent=True) or request.form
+        
+        # 로그인한 회원 정보 확인
+        if not current_user.is_authenticated:
+            return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
+        
+        partner_group_id = current_user.partner_group_id
+        if not partner_group_id:
+            return jsonify({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}), 400
+        
+        target_member = db.session.get(Member, current_user.id)
+        if target_member is None:
+            return jsonify({'success': False, 'message': '회원 정보를 확인할 수 없습니다.'}), 404
+        
+        account_holder = (data.get('account_holder') or '').strip()
+        bank_name = (data.get('bank_name') or '').strip()
+        deposit_amount_raw = (data.get('deposit_amount') or '').replace(',', '').strip()
+        
+        if not account_holder or not bank_name or not deposit_amount_raw:
+            return jsonify({'success': False, 'message': '입금주, 은행, 입금액은 필수입니다.'}), 400
+        
+        try:
+            deposit_amount = int(deposit_amount_raw)
+        except ValueError:
+            deposit_amount = 0
+        
+        if deposit_amount <= 0:
+            return jsonify({'success': False, 'message': '입금액은 0보다 큰 숫자여야 합니다.'}), 400
+        
+        def generate_account_number():
+            import uuid
+            while True:
+                candidate = datetime.now(KST).strftime('%y%m%d') + str(uuid.uuid4().int)[-8:]
+                existing = db.session.query(VirtualAccount).filter(
+                    VirtualAccount.virtual_account_number == candidate
+                ).first()
+                if existing is None:
+                    return candidate
+        
+        # 기존 대기 중인 가상계좌 만료 처리
+        db.session.query(VirtualAccount).filter(
+            VirtualAccount.member_id == target_member.id,
+            VirtualAccount.status == '대기'
+        ).update({'status': '만료'}, synchronize_session=False)
+        
+        virtual_account_number = generate_account_number()
+        expiry_date = datetime.now(KST).date() + timedelta(days=3)
+        
+        virtual_account = VirtualAccount(
+            member_id=target_member.id,
+            partner_group_id=partner_group_id,
+            account_holder=account_holder,
+            bank_name=bank_name,
+            virtual_account_number=virtual_account_number,
+            deposit_amount=deposit_amount,
+            expiry_date=expiry_date,
+            status='대기'
+        )
+        db.session.add(virtual_account)
+        
+        if not safe_commit():
+            return jsonify({'success': False, 'message': '가상계좌 발급 중 오류가 발생했습니다.'}), 500
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'member_username': target_member.username,
+                'bank_name': bank_name,
+                'virtual_account_number': virtual_account_number,
+                'deposit_amount': deposit_amount,
+                'expiry_date': expiry_date.strftime('%Y-%m-%d'),
+                'account_holder': account_holder
+            }
+        })
+    
+    except Exception as e:
+        partner_log.exception("Virtual account issue error: %s", e)
+        return jsonify({'success': False, 'message': '가상계좌 발급 중 오류가 발생했습니다.'}), 500
+
+
+@login_required
+def create_deposit_request():
+    """멤버가 입금 안내를 요청하면 관리자 검토를 위해 저장"""
+    try:
+        ensure_initialized()
+        if db is None:
+            return jsonify({'success': False, 'message': '데이터베이스가 초기화되지 않았습니다.'}), 500
+
+        from flask_login import current_user
+        if not current_user.is_authenticated:
+            return jsonify({'success': False, 'message': '로그인이 필요합니다.'}), 401
+
+        partner_group_id = getattr(current_user, 'partner_group_id', None)
+        if not partner_group_id:
+            return jsonify({'success': False, 'message': '파트너그룹 정보를 확인할 수 없습니다.'}), 400
+
+        data = request.get_json(silent=True) or request.form
+        raw_amount_value = data.get('amount')
+        if isinstance(raw_amount_value, str):
+            amount_raw = raw_amount_value.replace(',', '').strip()
+        elif isinstance(raw_amount_value, (int, float)):
+            amount_raw = str(int(raw_amount_value))
+        else:
+            amount_raw = ''
+
+        try:
+            amount = int(amount_raw)
+        except (TypeError, ValueError):
+            amount = 0
+
+        if amount < 100000 or amount > 2000000 or amount % 100000 != 0:
+            return jsonify({'success': False, 'message': '입금액은 10만원부터 200만원까지 10만원 단위로 선택해주세요.'}), 400
+
+        account_holder = (data.get('account_holder') or '').strip()
+        bank_name = (data.get('bank_name') or '').strip()
+        
+        if not account_holder:
+            return jsonify({'success': False, 'message': '입금자명을 입력해주세요.'}), 400
+        
+        if not bank_name:
+            return jsonify({'success': False, 'message': '입금은행을 입력해주세요.'}), 400
+
+        # 기존 대기중 요청이 있다면 그대로 두고 추가 저장
+        deposit_request = DepositRequest(
+            member_id=current_user.id,
+            partner_group_id=partner_group_id,
+            amount=amount,
+            account_holder=account_holder,
+            bank_name=bank_name,
+            status='requested',
+        )
+        db.session.add(deposit_request)
+
+        if not safe_commit():
+            return jsonify({'success': False, 'message': '입금신청 저장 중 오류가 발생했습니다.'}), 500
+
+        return jsonify({'success': True, 'message': '입금신청이 접수되었습니다.'})
+
+    except Exception as e:
+        partner_log.exception("Deposit request error: %s", e)
+        return jsonify({'success': False, 'message': '입금신청 처리 중 오류가 발생했습니다.'}), 500
@@ -0,0 +1,127 @@
+"""엑셀 일괄 업로드 (보험신청, 회원) - 첫 업로드 요청 시 로드"""
+
+from flask import flash, redirect, request, url_for
+from flask_login import current_user, login_required
+
+from app import (
+    InsuranceApplication, Member, admin_required, db, ensure_initialized, is_serverless,
+    parse_date, safe_commit, split_duplicate_vins,
+)
+
+
+@login_required
+def insurance_upload():
+    if is_serverless:
+        flash('Vercel 환경에서는 엑셀 업로드가 제한됩니다.', 'warning')
+        return redirect(url_for('insurance.index'))
+    file = request.files.get('file')
+    if not file:
+        flash('파일을 선택하세요.', 'warning')
+        return redirect(url_for('insurance.index'))
+    try:
+        # Import pandas only when needed
+        import pandas as pd
+        df = pd.read_excel(file)
+        required_cols = {
+            '한글차량번호',
+            '차대번호',
+            '차량명',
+            '차량등록일자(YYYY-MM-DD)'
+        }
+        if not required_cols.issubset(set(df.columns)):
+            flash('엑셀 양식이 올바르지 않습니다.', 'danger')
+            return redirect(url_for('insurance.index'))
+        rows = [row for _, row in df.iterrows() if str(row.get('한글차량번호', '')).strip()]
+        # 파일 전체를 한 번에 기존 보장과 대조 (행마다 조회하지 않음)
+        rows, duplicates = split_duplicate_vins(rows, lambda row: str(row.get('차대번호', '')).strip())
+        count = 0
+        for row in rows:
+            car_plate = str(row.get('한글차량번호', '')).strip()
+            vin = str(row.get('차대번호', '')).strip()
+            car_name = str(row.get('차량명', '')).strip()
+            car_registered_at = parse_date(str(row.get('차량등록일자(YYYY-MM-DD)', '')).strip())
+            memo = str(row.get('비고', '')).strip() if '비고' in df.columns else None
+            if not car_plate:
+                continue
+            app_row = InsuranceApplication(
+                insured_code=current_user.business_number or '',
+                contractor_code='부산자동차매매사업자조합',
+                car_plate=car_plate,
+                vin=vin,
+                car_name=car_name,
+                car_registered_at=car_registered_at,
+                premium=9500,
+                memo=memo,
+                created_by_member_id=current_user.id,
+            )
+            db.session.add(app_row)
+            count += 1
+        if not safe_commit():
+            flash('업로드 처리 중 오류가 발생했습니다. 다시 시도해주세요.', 'danger')
+        else:
+            skipped = f' (중복 차대번호 {len(duplicates)}건 제외)' if duplicates else ''
+            flash(f'{count}건 업로드되었습니다.{skipped}', 'success')
+    except Exception as e:
+        flash('업로드 중 오류가 발생했습니다.', 'danger')
+    return redirect(url_for('insurance.index'))
+
+
+@login_required
+@admin_required
+def admin_members_upload():
+    ensure_initialized()  # Ensure initialization
+    if db is None:
+        flash('데이터베이스가 초기화되지 않았습니다.', 'danger')
+        return redirect(url_for('admin.members'))
+    if is_serverless:
+        flash('Vercel 환경에서는 엑셀 업로드가 제한됩니다.', 'warning')
+        return redirect(url_for('admin.members'))
+    file = request.files.get('file')
+    if not file:
+        flash('엑셀 파일을 선택하세요.', 'warning')
+        return redirect(url_for('admin.members'))
+    try:
+        # Import pandas only when needed
+        import pandas as pd
+        df = pd.read_excel(file)
+        created = 0
+        skipped = 0
+        required_cols = {'username', 'company_name', 'business_number'}
+        if not required_cols.issubset(set(df.columns)):
+            flash('엑셀 컬럼이 올바르지 않습니다. (필수: username, company_name, business_number)', 'danger')
+            return redirect(url_for('admin.members'))
+        for _, row in df.iterrows():
+            username = str(row.get('username', '')).strip()
+            company_name = str(row.get('company_name', '')).strip()
+            business_number = str(row.get('business_number', '')).strip()
+            if not username or not company_name or not business_number:
+                skipped += 1
+                continue
+            # Dup checks
+            if db.session.query(Member).filter((Member.username == username) | (Member.business_number == business_number)).first():
+                skipped += 1
+                continue
+            m = Member(
+                username=username,
+                company_name=company_name,
+                address=str(row.get('address', '') or '').strip(),
+                business_number=business_number,
+                corporation_number=str(row.get('corporation_number', '') or '').strip(),
+                representative=str(row.get('representative', '') or '').strip(),
+                phone=str(row.get('phone', '') or '').strip(),
+                mobile=str(row.get('mobile', '') or '').strip(),
+                email=str(row.get('email', '') or '').strip(),
+                approval_status=str(row.get('approval_status', '승인') or '승인').strip() or '승인',
+                role=str(row.get('role', 'member') or 'member').strip() or 'member',
+            )
+            password = str(row.get('password', 'temp1234'))
+            m.set_password(password)
+            db.session.add(m)
+            created += 1
+        if not safe_commit():
+            flash('일괄 업로드 처리 중 오류가 발생했습니다.', 'danger')
+        else:
+            flash(f'일괄 업로드 완료: 추가 {created}건, 건너뜀 {skipped}건', 'success')
+    except Exception:
+        flash('업로드 처리 중 오류가 발생했습니다.', 'danger')
+    return redirect(url_for('admin.members'))
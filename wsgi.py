@@ -0,0 +1,18 @@
+"""
+프로덕션 WSGI 진입점
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn 이 preload_app=True 로 이 모듈을 마스터 프로세스에서 한 번 import 하므로,
+스키마 보정/인덱스 마이그레이션(ensure_initialized)도 워커마다가 아니라 기동 시 한 번만 실행됩니다.
+뷰 모듈(views/*.py)도 여기서 미리 import 해서 워커가 첫 요청마다 로드하지 않도록 합니다
+(서버리스 진입점 api/index.py 는 요청받은 뷰만 로드).
+"""
+from app import app, ensure_initialized
+from views import preload_views
+
+with app.app_context():
+    ensure_initialized()
+preload_views()
+
+application = app